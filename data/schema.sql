@@ -41,6 +41,7 @@ CREATE TABLE IF NOT EXISTS temel_plan_ders (
     bom_url TEXT, -- Bireysel Öğrenme Materyali URL'si
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ders_adi_norm TEXT, -- Eşleştirme anahtarı (utils_normalize.normalize_match_key_tr, utils_matching doldurur)
     UNIQUE(ders_adi, sinif) -- Aynı ders + sınıf kombinasyonu önleme
 );
 
@@ -171,6 +172,85 @@ CREATE TABLE IF NOT EXISTS schema_migrations (
     applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- =============================================================================
+-- 14. İSTATİSTİK SAYAÇLARI (Incremental Statistics)
+-- =============================================================================
+-- /api/get-statistics için COUNT(*) taramaları yerine tetikleyicilerle
+-- güncellenen sayaçlar. Anahtarlar utils_stats.get_database_statistics()
+-- dönüş değeriyle aynıdır.
+CREATE TABLE IF NOT EXISTS istatistik_sayac (
+    sayac_adi TEXT PRIMARY KEY,
+    deger INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- İlk kurulumda mevcut verilerden başlangıç değerleri (sonraki çalıştırmalarda yok sayılır)
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'alan_count', COUNT(*) FROM temel_plan_alan;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'cop_url_count', COUNT(*) FROM temel_plan_alan WHERE cop_url IS NOT NULL;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'dbf_url_count', COUNT(*) FROM temel_plan_alan WHERE dbf_urls IS NOT NULL;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'ders_count', COUNT(*) FROM temel_plan_ders;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'dal_count', COUNT(*) FROM temel_plan_dal;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'ders_dal_relations', COUNT(*) FROM temel_plan_ders_dal;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'ogrenme_birimi_count', COUNT(*) FROM temel_plan_ogrenme_birimi;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'konu_count', COUNT(*) FROM temel_plan_konu;
+INSERT OR IGNORE INTO istatistik_sayac (sayac_adi, deger) SELECT 'kazanim_count', COUNT(*) FROM temel_plan_kazanim;
+
+-- =============================================================================
+-- 15. DOSYA HASH İNDEKSİ (Content Deduplication)
+-- =============================================================================
+-- İndirilen dosyaların SHA-256 özetleri. Her satır klasör görünümündeki bir
+-- dosyayı (data/<tip>/<klasör>/<dosya>) dosya_blob'daki içeriğe bağlar.
+CREATE TABLE IF NOT EXISTS dosya_hash (
+    dosya_yolu TEXT PRIMARY KEY, -- data/<tip>/<klasör>/<dosya>
+    sha256 TEXT NOT NULL,
+    boyut INTEGER NOT NULL,
+    cache_type TEXT, -- cop, dbf, dm, bom
+    kaynak_url TEXT, -- İndirildiği URL (varsa)
+    hashed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    alan_klasoru TEXT, -- {meb_alan_id}_{alan_adi}
+    ek_bilgi TEXT -- Sınıf, dal vb. (dosya adına eklenen ek bilgi)
+);
+
+-- =============================================================================
+-- 16. İÇERİK ADRESLİ DOSYA DEPOSU (Blob Store)
+-- =============================================================================
+-- Dosya içerikleri data/blobs/<sha256[:2]>/<sha256><uzanti> altında tek kopya
+-- olarak saklanır; alan klasörleri bu blob'lara hard link'tir (utils_blob_store).
+CREATE TABLE IF NOT EXISTS dosya_blob (
+    sha256 TEXT PRIMARY KEY,
+    boyut INTEGER NOT NULL,
+    uzanti TEXT NOT NULL, -- .pdf, .docx, .rar, .zip
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =============================================================================
+-- 17. ARŞİV AÇMA KAYITLARI (Archive Extraction Results)
+-- =============================================================================
+-- Boyutu ve mtime'ı kayıttakiyle aynı olan arşivler tekrar açılmaz (utils_archive).
+CREATE TABLE IF NOT EXISTS arsiv_cikarma (
+    arsiv_yolu TEXT PRIMARY KEY, -- data/dbf/<klasör>/<arşiv>
+    boyut INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    hedef_klasor TEXT NOT NULL,
+    dosya_sayisi INTEGER DEFAULT 0, -- Çıkarılan PDF/DOCX sayısı
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =============================================================================
+-- 18. DOCX → PDF DÖNÜŞÜM ÖNBELLEĞİ (Conversion Cache Index)
+-- =============================================================================
+-- PDF'ler data/converted/<sha256[:2]>/<sha256>.pdf altında kaynak içeriğinin hash'i
+-- ile tutulur; bütçe aşılınca last_used_at'e göre silinir (utils_docx_to_pdf).
+CREATE TABLE IF NOT EXISTS pdf_donusum (
+    kaynak_sha256 TEXT PRIMARY KEY,
+    pdf_yolu TEXT NOT NULL,
+    yontem TEXT NOT NULL, -- libreoffice, pymupdf, legacy
+    boyut INTEGER NOT NULL,
+    kaynak_yolu TEXT, -- Son dönüştürülen belge yolu (bilgi amaçlı)
+    created_at REAL,
+    last_used_at REAL -- time.time(); LRU sıralaması için
+);
+
 -- =============================================================================
 -- İNDEXLER (Performance Optimization)
 -- =============================================================================
@@ -179,11 +259,20 @@ CREATE INDEX IF NOT EXISTS idx_temel_plan_ders_dal_ders_id ON temel_plan_ders_da
 CREATE INDEX IF NOT EXISTS idx_temel_plan_ders_dal_dal_id ON temel_plan_ders_dal(dal_id);
 CREATE INDEX IF NOT EXISTS idx_temel_plan_ders_sinif ON temel_plan_ders(sinif);
 CREATE INDEX IF NOT EXISTS idx_temel_plan_ogrenme_birimi_ders_id ON temel_plan_ogrenme_birimi(ders_id);
+-- Birim adları Python'da karşılaştırılıyor (save_learning_units); UPPER(birim_adi) indeksi
+-- hiçbir sorguda kullanılmadan her eklemede yazılıyordu
+DROP INDEX IF EXISTS idx_temel_plan_ogrenme_birimi_ders_birim_upper;
 CREATE INDEX IF NOT EXISTS idx_temel_plan_konu_ogrenme_birimi_id ON temel_plan_konu(ogrenme_birimi_id);
 CREATE INDEX IF NOT EXISTS idx_temel_plan_kazanim_konu_id ON temel_plan_kazanim(konu_id);
-CREATE INDEX IF NOT EXISTS idx_temel_plan_alan_adi ON temel_plan_alan(alan_adi);
+-- Alan adı tekildir: eşzamanlı scraper aşamaları aynı alanı iki kez ekleyemez (INSERT OR IGNORE)
+DROP INDEX IF EXISTS idx_temel_plan_alan_adi;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_temel_plan_alan_adi_unique ON temel_plan_alan(alan_adi);
 CREATE INDEX IF NOT EXISTS idx_temel_plan_dal_adi ON temel_plan_dal(dal_adi);
 CREATE INDEX IF NOT EXISTS idx_temel_plan_ders_adi ON temel_plan_ders(ders_adi);
+CREATE INDEX IF NOT EXISTS idx_temel_plan_ders_adi_norm ON temel_plan_ders(ders_adi_norm, sinif);
+CREATE INDEX IF NOT EXISTS idx_dosya_hash_sha256 ON dosya_hash(sha256);
+CREATE INDEX IF NOT EXISTS idx_dosya_hash_kaynak_url ON dosya_hash(kaynak_url);
+CREATE INDEX IF NOT EXISTS idx_pdf_donusum_last_used ON pdf_donusum(last_used_at);
 
 -- =============================================================================
 -- BAŞLANGIÇ VERİLERİ (Initial Data)
@@ -214,6 +303,28 @@ INSERT OR IGNORE INTO temel_plan_arac (arac_adi, kategori, aciklama) VALUES
 -- İlk migration versiyonu
 INSERT OR IGNORE INTO schema_migrations (version) VALUES (1);
 
+-- v2: istatistik_sayac tablosu ve sayaç tetikleyicileri
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (2);
+
+-- v3: öğrenme birimi UPPER(birim_adi) expression index'i
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (3);
+
+-- v4: dosya_blob tablosu, dosya_hash.alan_klasoru/ek_bilgi kolonları
+-- (mevcut veritabanlarına utils_database.apply_column_migrations ile eklenir)
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (4);
+
+-- v5: arsiv_cikarma tablosu
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (5);
+
+-- v6: pdf_donusum tablosu
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (6);
+
+-- v7: temel_plan_ders.ders_adi_norm kolonu ve indeksi
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (7);
+
+-- v8: kullanılmayan UPPER(birim_adi) expression index'i kaldırıldı
+INSERT OR IGNORE INTO schema_migrations (version) VALUES (8);
+
 -- =============================================================================
 -- GÜNCELLEME TETİKLEYİCİLERİ (Update Triggers)
 -- =============================================================================
@@ -238,6 +349,14 @@ BEGIN
     UPDATE temel_plan_ders SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
+-- Ders adı değişince eşleştirme anahtarı yeniden hesaplanmak üzere sıfırlanır (utils_matching)
+CREATE TRIGGER IF NOT EXISTS reset_temel_plan_ders_adi_norm
+    AFTER UPDATE OF ders_adi ON temel_plan_ders
+    FOR EACH ROW
+BEGIN
+    UPDATE temel_plan_ders SET ders_adi_norm = NULL WHERE id = NEW.id;
+END;
+
 CREATE TRIGGER IF NOT EXISTS update_temel_plan_ogrenme_birimi_timestamp 
     AFTER UPDATE ON temel_plan_ogrenme_birimi
     FOR EACH ROW
@@ -257,4 +376,137 @@ CREATE TRIGGER IF NOT EXISTS update_temel_plan_kazanim_timestamp
     FOR EACH ROW
 BEGIN
     UPDATE temel_plan_kazanim SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
\ No newline at end of file
+END;
+
+-- =============================================================================
+-- İSTATİSTİK TETİKLEYİCİLERİ (Counter Triggers)
+-- =============================================================================
+CREATE TRIGGER IF NOT EXISTS sayac_alan_insert
+    AFTER INSERT ON temel_plan_alan
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'alan_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_delete
+    AFTER DELETE ON temel_plan_alan
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'alan_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_dal_insert
+    AFTER INSERT ON temel_plan_dal
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'dal_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_dal_delete
+    AFTER DELETE ON temel_plan_dal
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'dal_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ders_insert
+    AFTER INSERT ON temel_plan_ders
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ders_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ders_delete
+    AFTER DELETE ON temel_plan_ders
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ders_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ders_dal_insert
+    AFTER INSERT ON temel_plan_ders_dal
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ders_dal_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ders_dal_delete
+    AFTER DELETE ON temel_plan_ders_dal
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ders_dal_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ogrenme_birimi_insert
+    AFTER INSERT ON temel_plan_ogrenme_birimi
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ogrenme_birimi_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_ogrenme_birimi_delete
+    AFTER DELETE ON temel_plan_ogrenme_birimi
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'ogrenme_birimi_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_konu_insert
+    AFTER INSERT ON temel_plan_konu
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'konu_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_konu_delete
+    AFTER DELETE ON temel_plan_konu
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'konu_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_kazanim_insert
+    AFTER INSERT ON temel_plan_kazanim
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'kazanim_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_kazanim_delete
+    AFTER DELETE ON temel_plan_kazanim
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'kazanim_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_cop_url_insert
+    AFTER INSERT ON temel_plan_alan
+    WHEN NEW.cop_url IS NOT NULL
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'cop_url_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_cop_url_delete
+    AFTER DELETE ON temel_plan_alan
+    WHEN OLD.cop_url IS NOT NULL
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'cop_url_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_cop_url_update
+    AFTER UPDATE OF cop_url ON temel_plan_alan
+    WHEN (OLD.cop_url IS NULL) <> (NEW.cop_url IS NULL)
+BEGIN
+    UPDATE istatistik_sayac
+    SET deger = deger + (CASE WHEN NEW.cop_url IS NULL THEN -1 ELSE 1 END), updated_at = CURRENT_TIMESTAMP
+    WHERE sayac_adi = 'cop_url_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_dbf_urls_insert
+    AFTER INSERT ON temel_plan_alan
+    WHEN NEW.dbf_urls IS NOT NULL
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger + 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'dbf_url_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_dbf_urls_delete
+    AFTER DELETE ON temel_plan_alan
+    WHEN OLD.dbf_urls IS NOT NULL
+BEGIN
+    UPDATE istatistik_sayac SET deger = deger - 1, updated_at = CURRENT_TIMESTAMP WHERE sayac_adi = 'dbf_url_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS sayac_alan_dbf_urls_update
+    AFTER UPDATE OF dbf_urls ON temel_plan_alan
+    WHEN (OLD.dbf_urls IS NULL) <> (NEW.dbf_urls IS NULL)
+BEGIN
+    UPDATE istatistik_sayac
+    SET deger = deger + (CASE WHEN NEW.dbf_urls IS NULL THEN -1 ELSE 1 END), updated_at = CURRENT_TIMESTAMP
+    WHERE sayac_adi = 'dbf_url_count';
+END;
@@ -1,21 +1,32 @@
 import requests
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import wait, FIRST_COMPLETED
 import os
 import sqlite3
 import json
 import time
+import threading
 from pathlib import Path
 from typing import Tuple, Dict, Optional, Generator
 import re
 try:
-    from .utils_normalize import normalize_to_title_case_tr, sanitize_filename_tr
+    from .utils_normalize import sanitize_filename_tr
     from .utils_database import with_database
     from .utils_file_management import download_and_cache_pdf
+    from .utils_http import http_get, create_session, parse_html, request as http_request, SCRAPE_CACHE_TTL
+    from .utils_env import get_output_json_path
+    from .utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
+    from .utils_matching import load_course_matcher
+    from .utils_area import get_area_resolver
 except ImportError:
-    from utils_normalize import normalize_to_title_case_tr, sanitize_filename_tr
+    from utils_normalize import sanitize_filename_tr
     from utils_database import with_database
     from utils_file_management import download_and_cache_pdf
+    from utils_http import http_get, create_session, parse_html, request as http_request, SCRAPE_CACHE_TTL
+    from utils_env import get_output_json_path
+    from utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
+    from utils_matching import load_course_matcher
+    from utils_area import get_area_resolver
 
 # Doğru URL: https://meslek.meb.gov.tr/moduller (debug ile doğrulandı)
 BASE_BOM_URL = "https://meslek.meb.gov.tr/moduller"
@@ -27,63 +38,6 @@ HEADERS = {
 
 BOM_ROOT_DIR = "data/bom"
 
-@with_database
-def get_areas_from_db(cursor):
-    """
-    Veritabanından alan ID, adları ve MEB ID'leri çeker (BOM için).
-    Returns: dict {alan_adi: {'id': alan_id, 'meb_alan_id': meb_alan_id}}
-    """
-    try:
-        cursor.execute("SELECT id, alan_adi, meb_alan_id FROM temel_plan_alan ORDER BY alan_adi")
-        results = cursor.fetchall()
-        return {alan_adi: {'id': alan_id, 'meb_alan_id': meb_alan_id} for alan_id, alan_adi, meb_alan_id in results}
-    except Exception as e:
-        print(f"Veritabanı okuma hatası: {e}")
-        return {}
-
-@with_database
-def get_ders_ids_from_db(cursor):
-    """
-    Veritabanından ders ID'lerini ve adlarını çeker (BÖM ders organizasyonu için)
-    Returns: dict {ders_adi: ders_id}
-    """
-    try:
-        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders ORDER BY ders_adi")
-        results = cursor.fetchall()
-        
-        # {ders_adi: id} şeklinde mapping oluştur
-        ders_dict = {}
-        for ders_id, ders_adi in results:
-            if ders_adi:
-                ders_dict[ders_adi.strip()] = ders_id
-                
-        return ders_dict
-    except Exception as e:
-        print(f"Veritabanı ders bilgileri çekme hatası: {e}")
-        return {}
-
-
-def find_matching_area_id(html_area_name, db_areas):
-    """
-    HTML'den gelen alan adını veritabanındaki alanlarla eşleştirir (BOM için).
-    Returns: (alan_id, meb_alan_id, matched_name) veya (None, None, None)
-    """
-    normalized_html_name = normalize_to_title_case_tr(html_area_name)
-    
-    # Tam eşleşme kontrolü
-    if normalized_html_name in db_areas:
-        area_info = db_areas[normalized_html_name]
-        return area_info['id'], area_info['meb_alan_id'], normalized_html_name
-    
-    # Kısmi eşleşme kontrolü
-    for db_name, area_info in db_areas.items():
-        if normalized_html_name.lower() in db_name.lower() or db_name.lower() in normalized_html_name.lower():
-            print(f"BOM Kısmi eşleşme bulundu: '{html_area_name}' -> '{db_name}' (ID: {area_info['id']})")
-            return area_info['id'], area_info['meb_alan_id'], db_name
-    
-    print(f"BOM Eşleşme bulunamadı: '{html_area_name}' (normalize: '{normalized_html_name}')")
-    return None, None, None
-
 def extract_update_year(date_string):
     """
     Tarih stringinden yıl bilgisini çıkarır.
@@ -125,7 +79,7 @@ def get_alanlar_from_moduller():
     Bu fonksiyon moduller sayfasında kullanılan gerçek ID formatını döndürür.
     """
     try:
-        resp = requests.get(BASE_BOM_URL, headers=HEADERS, timeout=10)
+        resp = http_get(BASE_BOM_URL, headers=HEADERS, timeout=10, cache_ttl=SCRAPE_CACHE_TTL)
         resp.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f"Moduller sayfası yüklenemedi: {e}")
@@ -165,86 +119,181 @@ def get_aspnet_form_data(soup):
             form_data[name] = value
     return form_data
 
-def get_bom_for_alan(alan_id, alan_adi, session):
+# ASP.NET sayfalarından sadece gereken etiketler parse edilir (viewstate'li sayfanın tamamı değil)
+FORM_STRAINER = SoupStrainer('input')
+DERS_LIST_STRAINER = SoupStrainer(['input', 'select'])
+MODUL_TABLE_STRAINER = SoupStrainer('table', id='ctl00_ContentPlaceHolder1_GridView1')
+
+# Sayfa işleri beklenirken iptal (SSE bağlantısının kapanması) bu aralıkla kontrol edilir
+BOM_WAIT_SLICE = 1.0
+# Başlangıç form durumu (viewstate) bu süre boyunca tekrar indirilmez
+INITIAL_FORM_STATE_TTL = 30 * 60
+
+_initial_form_state = {"data": None, "cookies": None, "fetched_at": 0.0}
+_initial_form_state_lock = threading.Lock()
+
+def get_initial_form_state(force_refresh=False):
+    """
+    Moduller sayfasının başlangıç ASP.NET form durumunu (viewstate vb.) ve
+    çerezlerini döndürür. Tüm alanlar aynı başlangıç durumunu kullandığı için
+    sayfa INITIAL_FORM_STATE_TTL boyunca bir kez indirilir.
+
+    Returns:
+        tuple: (form_data kopyası, çerez dict'i)
+    """
+    with _initial_form_state_lock:
+        age = time.time() - _initial_form_state["fetched_at"]
+        if force_refresh or _initial_form_state["data"] is None or age > INITIAL_FORM_STATE_TTL:
+            session = create_session()
+            initial_resp = http_request('GET', BASE_BOM_URL, session=session, headers=HEADERS, timeout=20, cache_ttl=SCRAPE_CACHE_TTL)
+            initial_resp.raise_for_status()
+            initial_soup = parse_html(initial_resp.text, parse_only=FORM_STRAINER)
+            _initial_form_state.update(
+                data=get_aspnet_form_data(initial_soup),
+                cookies=session.cookies.get_dict(),
+                fetched_at=time.time()
+            )
+        return dict(_initial_form_state["data"]), dict(_initial_form_state["cookies"])
+
+def _new_session_with_cookies(cookies):
+    """Çerezleri kopyalanmış bağımsız bir Session oluşturur (paralel POST'lar için)."""
+    session = create_session()
+    session.cookies.update(cookies)
+    return session
+
+def parse_bom_modul_table(html):
+    """Modül listesi sayfasındaki GridView tablosundan modülleri çıkarır."""
+    ders_modulleri = []
+    modul_soup = parse_html(html, parse_only=MODUL_TABLE_STRAINER)
+    modul_table = modul_soup.find('table', id='ctl00_ContentPlaceHolder1_GridView1')
+    if not modul_table:
+        return ders_modulleri
+
+    for row in modul_table.find_all('tr')[1:]:
+        cols = row.find_all('td')
+        if len(cols) >= 2:
+            modul_adi = cols[0].get_text(strip=True)
+            link_tag = cols[1].find('a', href=True)
+            if link_tag:
+                # URL base'ini meslek.meb.gov.tr olarak değiştir
+                if link_tag['href'].startswith('http'):
+                    full_link = link_tag['href']
+                else:
+                    full_link = requests.compat.urljoin("https://meslek.meb.gov.tr/", link_tag['href'])
+                
+                # Güncelleme tarihini bul (üçüncü sütundan)
+                update_date = ""
+                if len(cols) >= 3:
+                    update_date = cols[2].get_text(strip=True)
+                
+                # Güncelleme yılını çıkar
+                update_year = extract_update_year(update_date)
+                
+                ders_modulleri.append({
+                    "isim": modul_adi, 
+                    "link": full_link,
+                    "update_date": update_date,
+                    "update_year": update_year
+                })
+    return ders_modulleri
+
+def fetch_bom_ders_list(alan_id):
+    """
+    Alanın ders listesi sayfasını çeker (tek istek; zamanlayıcıda ayrı iş olarak çalışır).
+    Başlangıç form durumu tüm alanlar için paylaşılır.
+
+    Returns:
+        tuple: ([(ders_value, ders_adi), ...], ders listesi form durumu, çerez dict'i)
+    """
+    form_data, cookies = get_initial_form_state()
+    session = _new_session_with_cookies(cookies)
+    form_data['ctl00$ContentPlaceHolder1$DropDownList1'] = alan_id
+    form_data['__EVENTTARGET'] = 'ctl00$ContentPlaceHolder1$DropDownList1'
+
+    ders_list_resp = http_request('POST', BASE_BOM_URL, session=session, data=form_data, headers=HEADERS, timeout=20, cache_ttl=SCRAPE_CACHE_TTL)
+    ders_list_resp.raise_for_status()
+    ders_list_soup = parse_html(ders_list_resp.text, parse_only=DERS_LIST_STRAINER)
+
+    ders_select = ders_list_soup.find('select', {'name': 'ctl00$ContentPlaceHolder1$DropDownList2'})
+    if not ders_select:
+        return [], None, None
+
+    dersler = []
+    for ders_option in ders_select.find_all('option'):
+        ders_value = ders_option.get('value')
+        if not ders_value or ders_value == '0':
+            continue
+        dersler.append((ders_value, ders_option.text.strip()))
+
+    # Ders listesi sayfasının form durumu tüm dersler için aynıdır - bir kez çıkarılır
+    return dersler, get_aspnet_form_data(ders_list_soup), session.cookies.get_dict()
+
+def fetch_bom_ders_modulleri(alan_id, ders_value, ders_base_form_data, cookies):
+    """
+    Tek dersin modül listesi sayfasını çeker (tek istek; zamanlayıcıda ayrı iş olarak
+    çalışır). Her istek ders listesinin çerezleriyle bağımsız bir Session kullanır.
+    """
+    ders_form_data = dict(ders_base_form_data)
+    ders_form_data['ctl00$ContentPlaceHolder1$DropDownList1'] = alan_id
+    ders_form_data['ctl00$ContentPlaceHolder1$DropDownList2'] = ders_value
+    ders_form_data['ctl00$ContentPlaceHolder1$Button1'] = 'Listele'
+
+    modul_resp = http_request('POST', BASE_BOM_URL, session=_new_session_with_cookies(cookies),
+                              data=ders_form_data, headers=HEADERS, timeout=20, cache_ttl=SCRAPE_CACHE_TTL)
+    modul_resp.raise_for_status()
+    return parse_bom_modul_table(modul_resp.text)
+
+def get_bom_for_alan(alan_id, alan_adi):
+    """
+    Bir alanın derslerini ve ders başına BÖM modüllerini sırayla çeker (tek alan için;
+    toplu çalıştırma sayfa isteklerini zamanlayıcıya ayrı ayrı verir).
+    """
     bom_data = {"dersler": []}
     try:
-        initial_resp = session.get(BASE_BOM_URL, headers=HEADERS, timeout=20)
-        initial_resp.raise_for_status()
-        initial_soup = BeautifulSoup(initial_resp.text, 'html.parser')
-
-        form_data = get_aspnet_form_data(initial_soup)
-        form_data['ctl00$ContentPlaceHolder1$DropDownList1'] = alan_id
-        form_data['__EVENTTARGET'] = 'ctl00$ContentPlaceHolder1$DropDownList1'
-
-        ders_list_resp = session.post(BASE_BOM_URL, data=form_data, headers=HEADERS, timeout=20)
-        ders_list_resp.raise_for_status()
-        ders_list_soup = BeautifulSoup(ders_list_resp.text, 'html.parser')
-
-        ders_select = ders_list_soup.find('select', {'name': 'ctl00$ContentPlaceHolder1$DropDownList2'})
-        if not ders_select:
-            return bom_data
-
-        ders_options = ders_select.find_all('option')
-        if len(ders_options) <= 1:
-            return bom_data
-
-        for ders_option in ders_options:
-            ders_value = ders_option.get('value')
-            ders_adi = ders_option.text.strip()
-            if not ders_value or ders_value == '0':
-                continue
-
-            ders_form_data = get_aspnet_form_data(ders_list_soup)
-            ders_form_data['ctl00$ContentPlaceHolder1$DropDownList1'] = alan_id
-            ders_form_data['ctl00$ContentPlaceHolder1$DropDownList2'] = ders_value
-            ders_form_data['ctl00$ContentPlaceHolder1$Button1'] = 'Listele'
-
-            modul_resp = session.post(BASE_BOM_URL, data=ders_form_data, headers=HEADERS, timeout=20)
-            modul_resp.raise_for_status()
-            modul_soup = BeautifulSoup(modul_resp.text, 'html.parser')
-
-            ders_modulleri = []
-            modul_table = modul_soup.find('table', id='ctl00_ContentPlaceHolder1_GridView1')
-            if modul_table:
-                for row in modul_table.find_all('tr')[1:]:
-                    cols = row.find_all('td')
-                    if len(cols) >= 2:
-                        modul_adi = cols[0].get_text(strip=True)
-                        link_tag = cols[1].find('a', href=True)
-                        if link_tag:
-                            # URL base'ini meslek.meb.gov.tr olarak değiştir
-                            if link_tag['href'].startswith('http'):
-                                full_link = link_tag['href']
-                            else:
-                                full_link = requests.compat.urljoin("https://meslek.meb.gov.tr/", link_tag['href'])
-                            
-                            # Güncelleme tarihini bul (üçüncü sütundan)
-                            update_date = ""
-                            if len(cols) >= 3:
-                                update_date = cols[2].get_text(strip=True)
-                            
-                            # Güncelleme yılını çıkar
-                            update_year = extract_update_year(update_date)
-                            
-                            ders_modulleri.append({
-                                "isim": modul_adi, 
-                                "link": full_link,
-                                "update_date": update_date,
-                                "update_year": update_year
-                            })
-            
+        dersler, ders_base_form_data, cookies = fetch_bom_ders_list(alan_id)
+        for ders_value, ders_adi in dersler:
+            ders_modulleri = fetch_bom_ders_modulleri(alan_id, ders_value, ders_base_form_data, cookies)
             if ders_modulleri:
-                bom_data["dersler"].append({
-                    "ders_adi": ders_adi,
-                    "moduller": ders_modulleri
-                })
-
+                bom_data["dersler"].append({"ders_adi": ders_adi, "moduller": ders_modulleri})
     except requests.RequestException as e:
         print(f"BÖM Hata: '{alan_adi}' alanı için veri çekilemedi: {e}")
         return None
-    
+
     return bom_data
 
+# --- Alan bazlı ilerleme kaydı (yeniden başlatılan çalıştırma kaldığı yerden devam eder) ---
+
+BOM_PROGRESS_FILENAME = "get_bom_progress.json"
+_bom_progress_lock = threading.Lock()
+
+def _bom_progress_path():
+    return get_output_json_path(BOM_PROGRESS_FILENAME)
+
+def load_bom_progress():
+    """Önceki (yarıda kalmış) çalıştırmada tamamlanan alanları döndürür: {alan_id: bom_data}."""
+    try:
+        with open(_bom_progress_path(), 'r', encoding='utf-8') as f:
+            return json.load(f).get("alanlar", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_bom_progress(alan_id, alan_adi, bom_data):
+    """Bir alanın çekilen BÖM verisini ilerleme dosyasına atomik olarak ekler."""
+    with _bom_progress_lock:
+        alanlar = load_bom_progress()
+        alanlar[str(alan_id)] = {"alan_adi": alan_adi, "bom_data": bom_data, "saved_at": time.time()}
+        path = _bom_progress_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"alanlar": alanlar}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+def clear_bom_progress():
+    """Çalıştırma tamamlandığında ilerleme dosyasını siler."""
+    with _bom_progress_lock:
+        if os.path.exists(_bom_progress_path()):
+            os.remove(_bom_progress_path())
+
 @with_database
 def update_ders_bom_url(cursor, ders_id, bom_url):
     """
@@ -269,42 +318,36 @@ def update_ders_bom_url(cursor, ders_id, bom_url):
         print(f"❌ Ders BOM URL güncelleme hatası (ID: {ders_id}): {e}")
         return False
 
-def find_matching_ders_in_db(bom_ders_adi, alan_id, db_ders_dict):
+def find_matching_ders_in_db(bom_ders_adi, alan_id, course_matcher):
     """
     BÖM ders adını veritabanındaki derslerle eşleştirir.
     SOLID S: Single Responsibility - sadece ders eşleştirme
     
+    Önce alanın dersleri arasında aranır (farklı alanlarda aynı adlı dersler
+    olabilir), bulunamazsa tüm derslerde.
+    
     Args:
         bom_ders_adi: BÖM ders adı
         alan_id: Alan ID'si
-        db_ders_dict: Veritabanı ders mapping'i
+        course_matcher: Ortak ders eşleştirme motoru (utils_matching.CourseMatcher)
         
     Returns:
         ders_id veya None
     """
-    # Önce tam eşleşme
-    normalized_bom_ders = normalize_to_title_case_tr(bom_ders_adi)
-    if normalized_bom_ders in db_ders_dict:
-        return db_ders_dict[normalized_bom_ders]
-    
-    # Kısmi eşleşme - anahtar kelimeler
-    bom_keywords = set(normalized_bom_ders.lower().split())
-    
-    for db_ders_adi, ders_id in db_ders_dict.items():
-        db_keywords = set(db_ders_adi.lower().split())
-        
-        # En az 2 ortak kelime veya ders adının %70'i eşleşirse
-        common_words = bom_keywords.intersection(db_keywords)
-        if len(common_words) >= 2 or len(common_words) / len(bom_keywords) >= 0.7:
-            print(f"🔍 Eşleşme: '{bom_ders_adi}' -> '{db_ders_adi}' (ortak: {common_words})")
-            return ders_id
+    match = course_matcher.best(bom_ders_adi, alan_id=alan_id) if alan_id else None
+    if match is None:
+        match = course_matcher.best(bom_ders_adi)
+    if match is None:
+        return None
     
-    return None
+    if match.score < 1.0:
+        print(f"🔍 Eşleşme: '{bom_ders_adi}' -> '{match.ders_adi}' (puan: {match.score:.2f})")
+    return match.ders_id
 
 # save_bom_metadata fonksiyonu kaldırıldı - BÖM metadata'ya gerek yok
 
 
-def process_bom_data_for_area(alan_adi, bom_data, alan_id, db_ders_dict):
+def process_bom_data_for_area(alan_adi, bom_data, alan_id, course_matcher):
     """
     Bir alanın BÖM verilerini işler ve veritabanını günceller.
     SOLID S: Single Responsibility - alan bazlı BÖM işleme
@@ -313,7 +356,7 @@ def process_bom_data_for_area(alan_adi, bom_data, alan_id, db_ders_dict):
         alan_adi: Alan adı
         bom_data: BÖM verileri
         alan_id: Veritabanı alan ID'si
-        db_ders_dict: Veritabanı ders mapping'i
+        course_matcher: Ortak ders eşleştirme motoru
         
     Yields:
         dict: İlerleme mesajları
@@ -332,7 +375,7 @@ def process_bom_data_for_area(alan_adi, bom_data, alan_id, db_ders_dict):
             continue
             
         # Dersi veritabanında bul
-        ders_id = find_matching_ders_in_db(ders_adi, alan_id, db_ders_dict)
+        ders_id = find_matching_ders_in_db(ders_adi, alan_id, course_matcher)
         
         if ders_id:
             total_matched += 1
@@ -367,15 +410,17 @@ def process_bom_data_for_area(alan_adi, bom_data, alan_id, db_ders_dict):
     
     return total_matched, total_updated
 
-def process_single_area_bom(alan, db_areas, db_ders_dict):
+def process_single_area_bom(alan, area_resolver, course_matcher, saved_progress=None, bom_data=None):
     """
     Tek bir alanın BÖM verilerini işler.
     SOLID S: Single Responsibility - tek alan BÖM işleme
     
     Args:
         alan: Alan bilgileri dict
-        db_areas: Veritabanı alan bilgileri
-        db_ders_dict: Veritabanı ders mapping'i
+        area_resolver: Veritabanı alanlarının bellek içi çözümleyicisi
+        course_matcher: Ortak ders eşleştirme motoru
+        saved_progress: Önceki çalıştırmadan kalan bom_data (varsa ağdan çekilmez)
+        bom_data: Bu çalıştırmada çekilmiş veri (verilmezse alan sırayla çekilir)
         
     Yields:
         dict: İlerleme mesajları
@@ -383,23 +428,27 @@ def process_single_area_bom(alan, db_areas, db_ders_dict):
     alan_adi = alan['isim']
     
     try:
-        # BÖM verilerini çek
-        bom_data = get_bom_for_alan(alan['id'], alan_adi, requests.Session())
+        if saved_progress is not None:
+            bom_data = saved_progress
+            yield {'type': 'info', 'message': f"⏯️ {alan_adi} -> önceki çalıştırmadan devam ediliyor"}
+        elif bom_data is None:
+            # BÖM verilerini çek
+            bom_data = get_bom_for_alan(alan['id'], alan_adi)
+            if bom_data is not None:
+                save_bom_progress(alan['id'], alan_adi, bom_data)
         
         if bom_data and bom_data.get("dersler"):
-            normalized_area_name = normalize_to_title_case_tr(alan_adi)
-            
             # Veritabanında alan kontrolü
-            area_info = db_areas.get(alan_adi) or db_areas.get(normalized_area_name)
-            if area_info:
-                alan_id = area_info['id']
-                meb_alan_id = area_info.get('meb_alan_id', 'XX')
+            area_record = area_resolver.lookup(alan_adi)
+            if area_record:
+                alan_id = area_record.id
+                meb_alan_id = area_record.meb_alan_id or 'XX'
                 
                 # BÖM verilerini işle ve veritabanını güncelle
                 total_matched = 0
                 total_updated = 0
                 
-                for message in process_bom_data_for_area(alan_adi, bom_data, alan_id, db_ders_dict):
+                for message in process_bom_data_for_area(alan_adi, bom_data, alan_id, course_matcher):
                     yield message
                     if message['type'] == 'success':
                         total_updated += 1
@@ -426,13 +475,18 @@ def process_single_area_bom(alan, db_areas, db_ders_dict):
     except Exception as exc:
         yield {'type': 'warning', 'message': f"Genel Hata: '{alan_adi}' - {exc}"}
 
-def get_bom_with_db_integration(siniflar=["9", "10", "11", "12"]):
+def get_bom_with_db_integration(siniflar=["9", "10", "11", "12"], resume=True):
     """
     BÖM verilerini veritabanı entegrasyonu ile çeker ve ders URL'lerini günceller.
     SOLID S: Single Responsibility - BÖM workflow koordinasyonu
     
+    Alan bazında çekilen veriler data/get_bom_progress.json'a yazılır; yarıda kalan
+    bir çalıştırma yeniden başlatıldığında tamamlanmış alanlar ağdan tekrar çekilmez.
+    Çalıştırma tamamlanınca ilerleme dosyası silinir.
+    
     Args:
         siniflar: İşlenecek sınıflar listesi (BÖM'de kullanılmıyor, uyumluluk için)
+        resume: False ise önceki ilerleme yok sayılır
         
     Yields:
         dict: İlerleme mesajları
@@ -440,17 +494,18 @@ def get_bom_with_db_integration(siniflar=["9", "10", "11", "12"]):
     yield {'type': 'status', 'message': 'BÖM (Bireysel Öğrenme Materyali) verileri işleniyor...'}
     
     # Veritabanı bilgilerini al
-    db_areas = get_areas_from_db()
-    if not db_areas:
+    area_resolver = get_area_resolver()
+    if not len(area_resolver):
         yield {'type': 'error', 'message': 'Veritabanında alan bulunamadı! Önce Adım 1\'i çalıştırın.'}
         return
     
-    db_ders_dict = get_ders_ids_from_db()
-    if not db_ders_dict:
+    # Ders eşleştirme motoru çalıştırma başına bir kez kurulur
+    course_matcher = load_course_matcher()
+    if isinstance(course_matcher, dict) or not len(course_matcher):
         yield {'type': 'error', 'message': 'Veritabanında ders bulunamadı! Önce dersler yüklenmelidir.'}
         return
     
-    yield {'type': 'status', 'message': f'Veritabanından {len(db_areas)} alan ve {len(db_ders_dict)} ders alındı.'}
+    yield {'type': 'status', 'message': f'Veritabanından {len(area_resolver)} alan ve {len(course_matcher)} ders alındı.'}
     
     # BÖM alanlarını çek
     bom_alanlari = get_alanlar_from_moduller()
@@ -460,47 +515,95 @@ def get_bom_with_db_integration(siniflar=["9", "10", "11", "12"]):
         
     yield {'type': 'status', 'message': f'{len(bom_alanlari)} BÖM alanı bulundu, işleniyor...'}
     
+    saved_progress = load_bom_progress() if resume else {}
+    if saved_progress:
+        yield {'type': 'status', 'message': f'⏯️ Önceki çalıştırmadan {len(saved_progress)} alan tamamlanmış, kaldığı yerden devam ediliyor.'}
+    
     # Sonuçları topla
     total_areas_processed = 0
     total_matches = 0
     total_updates = 0
     
-    # SOLID D: Dependency Inversion - ThreadPoolExecutor kullanımı
-    with ThreadPoolExecutor(max_workers=3) as executor:  # BÖM için daha az worker
-        future_to_alan = {
-            executor.submit(list, process_single_area_bom(alan, db_areas, db_ders_dict)): alan 
-            for alan in bom_alanlari
-        }
+    def process_area(alan, saved=None, fetched=None):
+        """Alanı veritabanına işler, mesajları verir ve istatistikleri toplar."""
+        nonlocal total_areas_processed, total_matches, total_updates
+        area_processed = False
+        for message in process_single_area_bom(alan, area_resolver, course_matcher, saved, fetched):
+            yield message
+            if message.get('type') == 'progress':
+                area_processed = True
+                # "Örnek: 5 eşleşme, 3 güncelleme" formatından sayıları çıkar
+                msg = message.get('message', '')
+                matches = re.findall(r'(\d+) eşleşme', msg)
+                updates = re.findall(r'(\d+) güncelleme', msg)
+                if matches:
+                    total_matches += int(matches[0])
+                if updates:
+                    total_updates += int(updates[0])
+        if area_processed:
+            total_areas_processed += 1
+    
+    # Sayfa istekleri merkezi scraper kuyruğunda en düşük öncelikle ayrı işler olarak
+    # çalışır (dersler ÇÖP'ten gelir): önce alanın ders listesi, sonra her dersin modül
+    # sayfası. Uzun bir alan MESLEK host slotunu tüm süresi boyunca tutmaz.
+    # Veritabanı işleme bu generator'da, alanın tüm sayfaları gelince yapılır.
+    with get_scrape_scheduler().group('bom', priority=SCRAPE_PRIORITIES['bom'], host=MESLEK_HOST) as group:
+        pending = {}  # future -> (alan, ders sırası veya None)
+        areas = {}    # alan id -> {"dersler", "moduller", "remaining", "failed"}
+        
+        for alan in bom_alanlari:
+            saved = (saved_progress.get(str(alan['id'])) or {}).get('bom_data')
+            if saved is not None:
+                yield from process_area(alan, saved=saved)
+            else:
+                pending[group.submit(fetch_bom_ders_list, alan['id'], name=f"bom:{alan['isim']}")] = (alan, None)
         
-        for future in as_completed(future_to_alan):
-            alan = future_to_alan[future]
-            try:
-                messages = future.result(timeout=180)  # 3 dakika timeout
+        while pending:
+            done, _ = wait(list(pending), timeout=BOM_WAIT_SLICE, return_when=FIRST_COMPLETED)
+            # İptal edilen (SSE bağlantısı kapanan) çalıştırmanın ilerlemesi korunur
+            if group.cancelled:
+                return
+            for future in done:
+                alan, index = pending.pop(future)
+                alan_adi = alan['isim']
+                state = areas.get(alan['id'])
+                if future.cancelled() or (state and state['failed']):
+                    continue
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    if state:
+                        state['failed'] = True
+                    yield {'type': 'warning', 'message': f"BÖM Hata: '{alan_adi}' alanı için veri çekilemedi: {exc}"}
+                    continue
                 
-                area_processed = False
-                for message in messages:
-                    yield message
-                    
-                    # İstatistik toplama
-                    if message.get('type') == 'progress':
-                        area_processed = True
-                        # Mesajdan sayıları çıkar
-                        msg = message.get('message', '')
-                        if 'eşleşme' in msg and 'güncelleme' in msg:
-                            # "Örnek: 5 eşleşme, 3 güncelleme" formatından sayıları çıkar
-                            import re
-                            matches = re.findall(r'(\d+) eşleşme', msg)
-                            updates = re.findall(r'(\d+) güncelleme', msg)
-                            if matches:
-                                total_matches += int(matches[0])
-                            if updates:
-                                total_updates += int(updates[0])
+                if index is None:
+                    dersler, ders_base_form_data, cookies = result
+                    state = areas[alan['id']] = {"dersler": dersler, "moduller": [None] * len(dersler),
+                                                 "remaining": len(dersler), "failed": False}
+                    for i, (ders_value, ders_adi) in enumerate(dersler):
+                        ders_future = group.submit(fetch_bom_ders_modulleri, alan['id'], ders_value,
+                                                   ders_base_form_data, cookies, name=f"bom:{alan_adi}:{ders_adi}")
+                        pending[ders_future] = (alan, i)
+                else:
+                    state['moduller'][index] = result
+                    state['remaining'] -= 1
                 
-                if area_processed:
-                    total_areas_processed += 1
-                        
-            except Exception as exc:
-                yield {'type': 'warning', 'message': f"Future hatası: '{alan['isim']}' - {exc}"}
+                if state['remaining'] == 0:
+                    # Ders sırası sayfadaki ile aynı kalır
+                    bom_data = {"dersler": [
+                        {"ders_adi": ders_adi, "moduller": moduller}
+                        for (_, ders_adi), moduller in zip(state['dersler'], state['moduller']) if moduller
+                    ]}
+                    del areas[alan['id']]
+                    save_bom_progress(alan['id'], alan_adi, bom_data)
+                    yield from process_area(alan, fetched=bom_data)
+        
+        summary = group.summary()
+        yield {'type': 'info', 'message': f"⏱️ BÖM sayfaları: {summary['done']}/{summary['tasks']} iş, toplam çalışma {summary['total_run_s']}s, kuyrukta bekleme {summary['total_wait_s']}s"}
+    
+    # Çalıştırma tamamlandı - bir sonraki çalıştırma baştan başlar
+    clear_bom_progress()
     
     # Sonuç özeti
     yield {
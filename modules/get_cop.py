@@ -9,29 +9,24 @@ veritabanında eksik olan alanları ekler.
 import os
 import sqlite3
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from .utils_normalize import normalize_to_title_case_tr
+from .utils_http import http_get, parse_html, SCRAPE_CACHE_TTL
 from .utils_database import find_or_create_database, get_or_create_alan, with_database, get_meb_alan_id_with_fallback, get_folder_name_for_download, get_meb_alan_ids_cached
 from .utils_file_management import download_and_cache_pdf
+from .utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
 import re
 import json
 
+# ÇÖP PDF'leri için eşzamanlı indirme sayısı (host sınırı utils_http'de ayrıca uygulanır)
+COP_DOWNLOAD_WORKERS = 6
+
 
 def update_meb_alan_ids():
     """
     MEB'den alan ID'lerini çeker ve veritabanını günceller.
     cercevelistele.aspx sayfasındaki select dropdown'dan alan ID'lerini çıkarır.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9,tr;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-    
     alan_id_map = {}  # {alan_adi: meb_alan_id}
     
     try:
@@ -39,11 +34,11 @@ def update_meb_alan_ids():
         url = "https://meslek.meb.gov.tr/cercevelistele.aspx"
         params = {"sinif_kodu": "9", "kurum_id": "1"}
         
-        response = requests.get(url, params=params, headers=headers, timeout=45)
+        response = http_get(url, params=params, timeout=45, cache_ttl=SCRAPE_CACHE_TTL)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parse_html(response.text)
         
         # Select dropdown'daki option'ları bul
         # Örnek: <option value="01">Adalet</option>
@@ -108,15 +103,6 @@ def get_alan_cop_links(sinif):
     Returns:
         dict: {alan_adi: {'url': cop_url, 'update_year': year}}
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9,tr;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-    
     alan_links = {}
     
     try:
@@ -124,11 +110,17 @@ def get_alan_cop_links(sinif):
         url = "https://meslek.meb.gov.tr/cercevelistele.aspx"
         params = {"sinif_kodu": sinif, "kurum_id": "1"}
         
-        response = requests.get(url, params=params, headers=headers, timeout=45)
+        response = http_get(url, params=params, timeout=45, cache_ttl=SCRAPE_CACHE_TTL)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        page_html = response.text
+        # Sadece <a href> etiketleri ağaca alınır (sayfanın geri kalanı parse edilmez)
+        soup = parse_html(page_html, parse_only=SoupStrainer('a', href=True))
+        
+        # Güncelleme yılı sayfa genelindedir - sayfa başına bir kez çıkarılır
+        page_update_year = None
+        page_update_year_done = False
         
         # ÇÖP linklerini içeren tablo/yapıyı bul
         # PDF linklerini filtrele
@@ -180,12 +172,14 @@ def get_alan_cop_links(sinif):
                         else:
                             pdf_url = f"https://meslek.meb.gov.tr/{href}"
                         
-                        # Güncelleme yılını HTML içeriğinden çıkar
-                        update_year = extract_update_year(response.text)
+                        # Güncelleme yılını HTML içeriğinden çıkar (sayfa başına bir kez)
+                        if not page_update_year_done:
+                            page_update_year = extract_update_year(page_html)
+                            page_update_year_done = True
                         
                         alan_links[alan_adi] = {
                             'url': pdf_url,
-                            'update_year': update_year
+                            'update_year': page_update_year
                         }
                         
                         print(f"  {sinif}. sınıf ÇÖP: {alan_adi}")
@@ -201,20 +195,28 @@ def get_cop_links():
     """
     Tüm sınıflar için ÇÖP linklerini paralel olarak çeker.
     Alan ID'lerini dropdown'dan eşleştirir.
+    MEB alan ID'leri sınıf sayfalarıyla aynı anda çekilir; toplam süre
+    en yavaş tek sayfanın süresiyle sınırlıdır.
     """
     all_links = []
     siniflar = ["9", "10", "11", "12"]
     
-    # Önce MEB alan ID'lerini çek (cache'den)
-    print("📋 MEB Alan ID'leri çek...")
-    meb_alan_ids = get_meb_alan_ids_cached()
-    
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        future_to_sinif = {executor.submit(get_alan_cop_links, sinif): sinif for sinif in siniflar}
-        for future in as_completed(future_to_sinif):
+    with get_scrape_scheduler().group('cop', priority=SCRAPE_PRIORITIES['cop'], host=MESLEK_HOST) as group:
+        # MEB alan ID'leri (cache'den veya MEB'den) sınıf sayfalarıyla paralel
+        print("📋 MEB Alan ID'leri çek...")
+        meb_future = group.submit(get_meb_alan_ids_cached, name="cop:meb_alan_ids")
+        future_to_sinif = {group.submit(get_alan_cop_links, sinif, name=f"cop:{sinif}"): sinif for sinif in siniflar}
+        meb_alan_ids = None
+        for future in group.as_completed(future_to_sinif):
             sinif = future_to_sinif[future]
             try:
                 data = future.result()
+                if meb_alan_ids is None:
+                    try:
+                        meb_alan_ids = meb_future.result() or {}
+                    except Exception as exc:
+                        print(f'⚠️ MEB Alan ID\'leri alınamadı: {exc}')
+                        meb_alan_ids = {}
                 for alan_adi, link_data in data.items():
                     if isinstance(link_data, dict):
                         # MEB alan ID'sini dropdown'dan eşleştir
@@ -318,6 +320,8 @@ def get_cop_with_cursor():
             
             import json
             saved_alan_count = 0
+            # Alan başına MEB ID bir kez çözülür; indirme aşaması da bunu kullanır
+            resolved_meb_ids = {}
             for alan_adi, alan_info in alan_cop_urls.items():
                 try:
                     data_meb_id = alan_info['meb_alan_id']
@@ -325,6 +329,7 @@ def get_cop_with_cursor():
                     
                     # MEB ID'yi fallback stratejisi ile al
                     meb_alan_id, source = get_meb_alan_id_with_fallback(alan_adi, data_meb_id)
+                    resolved_meb_ids[alan_adi] = meb_alan_id
                     
                     # URL'leri JSON formatında kaydet
                     cop_urls_json_string = json.dumps(cop_urls_json)
@@ -349,51 +354,55 @@ def get_cop_with_cursor():
             except Exception as e:
                 yield {'type': 'warning', 'message': f'İstatistik alınamadı: {e}'}
             
-            # SONRA: PDF indirme işlemi (isteğe bağlı)
+            # SONRA: PDF indirme işlemi (isteğe bağlı) - sınırlı thread havuzu ile paralel
             yield {'type': 'status', 'message': 'PDF dosyaları kontrol ediliyor...'}
             
-            processed_count = 0
+            download_jobs = []
             for alan_adi, alan_info in alan_cop_urls.items():
-                try:
-                    data_meb_id = alan_info['meb_alan_id']
-                    cop_urls_json = alan_info['urls']
-                    
-                    # MEB ID'yi fallback stratejisi ile al
-                    meb_alan_id, source = get_meb_alan_id_with_fallback(alan_adi, data_meb_id)
-                    
-                    # PDF'leri MEB ID bazlı klasör yapısında indir/kontrol et
-                    for sinif_key, sinif_data in cop_urls_json.items():
-                        try:
-                            # Sınıf verisinden URL'i al
-                            if isinstance(sinif_data, dict):
-                                cop_url = sinif_data['url']
-                            else:
-                                cop_url = sinif_data  # Backward compatibility
-                            
-                            # MEB ID bazlı klasör yapısı: data/cop/{meb_alan_id}_{alan_adi}/
-                            file_path = download_and_cache_pdf(
-                                cop_url, 
-                                "cop", 
-                                alan_adi=alan_adi, 
-                                additional_info=None,  # Dosya adını değiştirme
-                                meb_alan_id=meb_alan_id
-                            )
-                            if file_path:
-                                yield {'type': 'success', 'message': f'PDF hazır: {os.path.basename(file_path)}'}
-                            else:
-                                yield {'type': 'warning', 'message': f'PDF indirme başarısız: {alan_adi} {sinif_key}'}
-                        except Exception as e:
-                            yield {'type': 'error', 'message': f'PDF kontrol hatası ({alan_adi} {sinif_key}): {e}'}
-                    
-                    processed_count += 1
-                    
-                    # Standardize edilmiş konsol çıktısı - alan bazlı toplam
-                    alan_cop_count = len(cop_urls_json)
-                    yield {'type': 'progress', 'message': f'{meb_alan_id} - {alan_adi} ({processed_count}/{len(alan_cop_urls)}) Toplam {alan_cop_count} ÇÖP indi.', 'progress': processed_count / len(alan_cop_urls)}
+                for sinif_key, sinif_data in alan_info['urls'].items():
+                    # Sınıf verisinden URL'i al
+                    if isinstance(sinif_data, dict):
+                        cop_url = sinif_data['url']
+                    else:
+                        cop_url = sinif_data  # Backward compatibility
+                    download_jobs.append((alan_adi, sinif_key, cop_url))
+            
+            remaining_per_alan = {alan_adi: len(alan_info['urls']) for alan_adi, alan_info in alan_cop_urls.items()}
+            processed_count = 0
+            
+            def download_cop_pdf(alan_adi, cop_url):
+                # MEB ID bazlı klasör yapısı: data/cop/{meb_alan_id}_{alan_adi}/
+                return download_and_cache_pdf(
+                    cop_url, 
+                    "cop", 
+                    alan_adi=alan_adi, 
+                    additional_info=None,  # Dosya adını değiştirme
+                    meb_alan_id=resolved_meb_ids.get(alan_adi, alan_cop_urls[alan_adi]['meb_alan_id'])
+                )
+            
+            with ThreadPoolExecutor(max_workers=COP_DOWNLOAD_WORKERS) as executor:
+                future_to_job = {
+                    executor.submit(download_cop_pdf, alan_adi, cop_url): (alan_adi, sinif_key)
+                    for alan_adi, sinif_key, cop_url in download_jobs
+                }
+                for future in as_completed(future_to_job):
+                    alan_adi, sinif_key = future_to_job[future]
+                    try:
+                        file_path = future.result()
+                        if file_path:
+                            yield {'type': 'success', 'message': f'PDF hazır: {os.path.basename(file_path)}'}
+                        else:
+                            yield {'type': 'warning', 'message': f'PDF indirme başarısız: {alan_adi} {sinif_key}'}
+                    except Exception as e:
+                        yield {'type': 'error', 'message': f'PDF kontrol hatası ({alan_adi} {sinif_key}): {e}'}
                     
-                except Exception as e:
-                    yield {'type': 'error', 'message': f'PDF işleme hatası ({alan_adi}): {e}'}
-                    continue
+                    remaining_per_alan[alan_adi] -= 1
+                    if remaining_per_alan[alan_adi] == 0:
+                        processed_count += 1
+                        
+                        # Standardize edilmiş konsol çıktısı - alan bazlı toplam
+                        alan_cop_count = len(alan_cop_urls[alan_adi]['urls'])
+                        yield {'type': 'progress', 'message': f'{resolved_meb_ids.get(alan_adi)} - {alan_adi} ({processed_count}/{len(alan_cop_urls)}) Toplam {alan_cop_count} ÇÖP indi.', 'progress': processed_count / len(alan_cop_urls)}
 
             # JSON çıktı dosyası oluştur
             from .utils_env import get_output_json_path
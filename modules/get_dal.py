@@ -6,9 +6,13 @@ import sqlite3
 from pathlib import Path
 from .utils_normalize import normalize_to_title_case_tr
 from .utils_database import with_database, find_or_create_database
+from .utils_http import http_get, http_post
+from .utils_area import note_area
+from .utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MTEGM_HOST
 
-# requests.Session() kullanarak çerezleri ve oturum bilgilerini yönetiyoruz
-session = requests.Session()
+# İstekler utils_http'nin paylaşılan istemcisiyle yapılır: oturum çerezi paylaşılan
+# Session'da tutulur, mtegm host eşzamanlılık ve hız sınırları her isteğe uygulanır.
+# Zamanlayıcı worker thread'leri modül seviyesinde ayrı bir Session paylaşmaz.
 
 # Ortak HTTP başlıklarını tanımlıyoruz
 COMMON_HEADERS = {
@@ -41,8 +45,8 @@ def get_provinces():
 
 
     try:
-        # Session kullanılarak GET isteği gönderiliyor
-        response = session.get(ajax_url, headers=headers, timeout=15) 
+        # Paylaşılan istemci ile GET isteği gönderiliyor
+        response = http_get(ajax_url, headers=headers, timeout=15, conditional=False)
         response.raise_for_status()
 
         response_text = response.text
@@ -85,8 +89,8 @@ def get_areas_for_province(province_id):
 
 
     try:
-        # Session kullanılarak POST isteği gönderiliyor
-        response = session.post(ajax_url, data=data, headers=headers, timeout=15)
+        # Paylaşılan istemci ile POST isteği gönderiliyor
+        response = http_post(ajax_url, data=data, headers=headers, timeout=15)
         
         response.raise_for_status()
 
@@ -133,8 +137,8 @@ def get_branches_for_area(province_id, area_value):
 
 
     try:
-        # Session kullanılarak POST isteği gönderiliyor
-        response = session.post(ajax_url, data=data, headers=headers, timeout=15)
+        # Paylaşılan istemci ile POST isteği gönderiliyor
+        response = http_post(ajax_url, data=data, headers=headers, timeout=15)
         
         response.raise_for_status()
         
@@ -185,6 +189,7 @@ def save_area_and_branches_to_db(cursor, area_name, branches):
                 (normalized_area_name,)
             )
             area_id = cursor.lastrowid
+            note_area(area_id, normalized_area_name, None)
         
         # Dalları ekle (yineleme kontrolü ile)
         for branch_name in branches:
@@ -227,7 +232,7 @@ def get_dal():
     yield {'type': 'status', 'message': 'Ana sayfa ziyareti yapılıyor (oturum çerezini almak için)...'}
     
     try:
-        session.get("https://mtegm.meb.gov.tr/kurumlar/", headers=COMMON_HEADERS, timeout=10)
+        http_get("https://mtegm.meb.gov.tr/kurumlar/", headers=COMMON_HEADERS, timeout=10, conditional=False)
     except requests.exceptions.RequestException as e:
         yield {'type': 'error', 'message': f'Ana sayfa ziyaretinde hata: {e}'}
         return
@@ -243,82 +248,90 @@ def get_dal():
     total_provinces = len(provinces)
     processed_provinces = 0
     
-    for province_id, province_name in provinces.items():
-        processed_provinces += 1
-        new_areas_in_province = 0
-        new_branches_in_province = 0
+    # İllerin alan listeleri merkezi scraper kuyruğunda önceden çekilir; iller yine sırayla
+    # işlenir, dal istekleri ve veritabanı yazımı önceki illerin yanıtlarını beklemez
+    with get_scrape_scheduler().group('dal', priority=SCRAPE_PRIORITIES['dal'], host=MTEGM_HOST) as group:
+        area_futures = {
+            province_id: group.submit(get_areas_for_province, str(province_id), name=f"dal:{province_name}")
+            for province_id, province_name in provinces.items()
+        }
         
-        areas = get_areas_for_province(str(province_id))
+        for province_id, province_name in provinces.items():
+            processed_provinces += 1
+            new_areas_in_province = 0
+            new_branches_in_province = 0
         
-        if not areas:
-            # Alan bulunamasa bile ilerleme logunu göster
-            yield {
-                'type': 'province_summary',
-                'province_name': province_name.upper(),
-                'province_progress': f"({processed_provinces}/{total_provinces})",
-                'alan_sayisi_province': 0,
-                'alan_sayisi_total_province': 0,
-                'dal_sayisi_province': 0,
-                'dal_sayisi_total_so_far': total_branches_found
-            }
-            time.sleep(0.1) # Sunucuyu yormamak için bekleme
-            continue # Sonraki ile geç
+            areas = area_futures[province_id].result()
+        
+            if not areas:
+                # Alan bulunamasa bile ilerleme logunu göster
+                yield {
+                    'type': 'province_summary',
+                    'province_name': province_name.upper(),
+                    'province_progress': f"({processed_provinces}/{total_provinces})",
+                    'alan_sayisi_province': 0,
+                    'alan_sayisi_total_province': 0,
+                    'dal_sayisi_province': 0,
+                    'dal_sayisi_total_so_far': total_branches_found
+                }
+                time.sleep(0.1) # Sunucuyu yormamak için bekleme
+                continue # Sonraki ile geç
         
-        total_areas_in_province = len(areas)
-        processed_areas_in_province = 0
+            total_areas_in_province = len(areas)
+            processed_areas_in_province = 0
         
-        for area_value, area_name in areas.items():
-            processed_areas_in_province += 1
+            for area_value, area_name in areas.items():
+                processed_areas_in_province += 1
             
-            # Alan işleme mesajı
-            yield {
-                'type': 'area_processing',
-                'area_name': area_name,
-                'area_progress': f"({processed_areas_in_province}/{total_areas_in_province})"
-            }
+                # Alan işleme mesajı
+                yield {
+                    'type': 'area_processing',
+                    'area_name': area_name,
+                    'area_progress': f"({processed_areas_in_province}/{total_areas_in_province})"
+                }
             
-            if area_name not in unique_areas_with_branches:
-                branches_or_none = get_branches_for_area(str(province_id), area_value)
+                if area_name not in unique_areas_with_branches:
+                    branches_or_none = get_branches_for_area(str(province_id), area_value)
                 
-                # Hata durumunda (None) boş liste ata, yoksa gelen listeyi kullan
-                branches = branches_or_none if branches_or_none is not None else []
+                    # Hata durumunda (None) boş liste ata, yoksa gelen listeyi kullan
+                    branches = branches_or_none if branches_or_none is not None else []
                 
-                if branches_or_none is None:
-                    yield {'type': 'warning', 'message': f"⚠️ {area_name} -> Dal bilgisi çekilemedi, yine de alan kaydedilecek"}
+                    if branches_or_none is None:
+                        yield {'type': 'warning', 'message': f"⚠️ {area_name} -> Dal bilgisi çekilemedi, yine de alan kaydedilecek"}
 
-                unique_areas_with_branches[area_name] = branches
-                new_areas_in_province += 1
-                new_branches_in_province += len(branches)
+                    unique_areas_with_branches[area_name] = branches
+                    new_areas_in_province += 1
+                    new_branches_in_province += len(branches)
                 
-                # Dal işleme mesajı
-                yield {
-                    'type': 'branches_processing',
-                    'branches_count': len(branches),
-                    'total_branches': new_branches_in_province
-                }
+                    # Dal işleme mesajı
+                    yield {
+                        'type': 'branches_processing',
+                        'branches_count': len(branches),
+                        'total_branches': new_branches_in_province
+                    }
                 
-                # Her durumda alanı ve dalları (boş olsa bile) kaydet
-                area_id = save_area_and_branches_to_db(area_name, branches)
+                    # Her durumda alanı ve dalları (boş olsa bile) kaydet
+                    area_id = save_area_and_branches_to_db(area_name, branches)
                 
-                if not area_id:
-                    yield {'type': 'warning', 'message': f"❌ {area_name} -> Veritabanına kaydedilemedi"}
+                    if not area_id:
+                        yield {'type': 'warning', 'message': f"❌ {area_name} -> Veritabanına kaydedilemedi"}
                 
-                time.sleep(0.1)
+                    time.sleep(0.1)
         
-        total_areas_found += new_areas_in_province
-        total_branches_found += new_branches_in_province
+            total_areas_found += new_areas_in_province
+            total_branches_found += new_branches_in_province
 
-        yield {
-            'type': 'province_summary',
-            'province_name': province_name.upper(),
-            'province_progress': f"({processed_provinces}/{total_provinces})",
-            'alan_sayisi_province': new_areas_in_province,
-            'alan_sayisi_total_province': len(areas),
-            'dal_sayisi_province': new_branches_in_province,
-            'dal_sayisi_total_so_far': total_branches_found
-        }
+            yield {
+                'type': 'province_summary',
+                'province_name': province_name.upper(),
+                'province_progress': f"({processed_provinces}/{total_provinces})",
+                'alan_sayisi_province': new_areas_in_province,
+                'alan_sayisi_total_province': len(areas),
+                'dal_sayisi_province': new_branches_in_province,
+                'dal_sayisi_total_so_far': total_branches_found
+            }
 
-        time.sleep(0.2)  # Her ilin işlenmesi arasında daha uzun bir gecikme
+            time.sleep(0.2)  # Her ilin işlenmesi arasında daha uzun bir gecikme
     
     # Sonuç özeti
     
@@ -1,10 +1,16 @@
 import os
 import requests
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
-from .utils_normalize import normalize_to_title_case_tr, sanitize_filename_tr
+from .utils_normalize import sanitize_filename_tr
 from .utils_database import with_database, get_or_create_alan, get_meb_alan_id_with_fallback, get_folder_name_for_download, get_meb_alan_ids_cached
+from .utils_stats import record_file_in_inventory
+from .utils_http import http_get, SCRAPE_CACHE_TTL
+from .utils_file_management import download_files_concurrently, PARTIAL_SUFFIX
+from .utils_archive import extract_archives_concurrently, ARCHIVE_EXTRACT_WORKERS
+from .utils_matching import name_similarity, MATCH_MIN_SCORE
+from .utils_area import find_matching_area_id
+from .utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
 
 BASE_DBF_URL = "https://meslek.meb.gov.tr/dbfgoster.aspx"
 HEADERS = {
@@ -13,72 +19,8 @@ HEADERS = {
 }
 
 DBF_ROOT_DIR = "data/dbf"
-
-@with_database
-def get_areas_from_db_with_meb_id(cursor):
-    """
-    Veritabanından alan ID, adı ve MEB ID'sini çeker.
-    Returns: dict {alan_adi: {'id': alan_id, 'meb_alan_id': meb_alan_id}}
-    """
-    try:
-        cursor.execute("SELECT id, alan_adi, meb_alan_id FROM temel_plan_alan ORDER BY alan_adi")
-        results = cursor.fetchall()
-        return {alan_adi: {'id': area_id, 'meb_alan_id': meb_alan_id} for area_id, alan_adi, meb_alan_id in results}
-    except Exception as e:
-        print(f"Veritabanı okuma hatası: {e}")
-        return {}
-
-@with_database
-def get_areas_from_db(cursor):
-    """
-    Veritabanından alan ID ve adlarını çeker.
-    Returns: dict {alan_adi: alan_id}
-    """
-    try:
-        cursor.execute("SELECT id, alan_adi FROM temel_plan_alan ORDER BY alan_adi")
-        results = cursor.fetchall()
-        return {alan_adi: alan_id for alan_id, alan_adi in results}
-    except Exception as e:
-        print(f"Veritabanı okuma hatası: {e}")
-        return {}
-
-
-def find_matching_area_id(html_area_name, db_areas):
-    """
-    HTML'den gelen alan adını veritabanındaki alanlarla eşleştirir.
-    Protokol alanları için öncelik mantığı vardır.
-    Returns: (alan_id, matched_name) veya (None, None)
-    """
-    normalized_html_name = normalize_to_title_case_tr(html_area_name)
-    
-    # Tam eşleşme kontrolü
-    if normalized_html_name in db_areas:
-        return db_areas[normalized_html_name], normalized_html_name
-    
-    # Protokol alan kontrolü - önce protokol eşleşmelerini ara
-    is_protocol_search = "- Protokol" in normalized_html_name or "protokol" in normalized_html_name.lower()
-    
-    if is_protocol_search:
-        # Protokol alanı arıyoruz - önce protokol eşleşmelerini kontrol et
-        for db_name, area_id in db_areas.items():
-            if "- Protokol" in db_name and (normalized_html_name.lower() in db_name.lower() or db_name.lower() in normalized_html_name.lower()):
-                print(f"Protokol eşleşme bulundu: '{html_area_name}' -> '{db_name}' (ID: {area_id})")
-                return area_id, db_name
-    else:
-        # Normal alan arıyoruz - önce protokol olmayan eşleşmeleri kontrol et  
-        for db_name, area_id in db_areas.items():
-            if "- Protokol" not in db_name and (normalized_html_name.lower() in db_name.lower() or db_name.lower() in normalized_html_name.lower()):
-                print(f"Normal eşleşme bulundu: '{html_area_name}' -> '{db_name}' (ID: {area_id})")
-                return area_id, db_name
-    
-    # Genel kısmi eşleşme kontrolü (eski mantık - fallback)
-    for db_name, area_id in db_areas.items():
-        if normalized_html_name.lower() in db_name.lower() or db_name.lower() in normalized_html_name.lower():
-            print(f"Genel eşleşme bulundu: '{html_area_name}' -> '{db_name}' (ID: {area_id})")
-            return area_id, db_name
-    
-    print(f"Eşleşme bulunamadı: '{html_area_name}' (normalize: '{normalized_html_name}')")
-    return None, None
+# Eşzamanlı arşiv indirme sayısı (MEB sunucusunu zorlamamak için sınırlı)
+DBF_DOWNLOAD_WORKERS = 4
 
 def get_dbf_data_for_alan_and_sinif(alan_adi, meb_alan_id, sinif_kodu):
     """
@@ -88,7 +30,7 @@ def get_dbf_data_for_alan_and_sinif(alan_adi, meb_alan_id, sinif_kodu):
     params = {"kurum_id": "1", "sinif_kodu": sinif_kodu, "alan_id": meb_alan_id}
     
     try:
-        response = requests.get(BASE_DBF_URL, params=params, headers=HEADERS, timeout=15)
+        response = http_get(BASE_DBF_URL, params=params, headers=HEADERS, timeout=15, cache_ttl=SCRAPE_CACHE_TTL)
         response.raise_for_status()
         response.encoding = response.apparent_encoding
         soup = BeautifulSoup(response.text, "html.parser")
@@ -168,7 +110,7 @@ def get_all_dbf_files_for_alan_and_sinif(alan_adi, meb_alan_id, sinif_kodu):
     params = {"kurum_id": "1", "sinif_kodu": sinif_kodu, "alan_id": meb_alan_id}
     
     try:
-        response = requests.get(BASE_DBF_URL, params=params, headers=HEADERS, timeout=15)
+        response = http_get(BASE_DBF_URL, params=params, headers=HEADERS, timeout=15, cache_ttl=SCRAPE_CACHE_TTL)
         response.raise_for_status()
         response.encoding = response.apparent_encoding
         soup = BeautifulSoup(response.text, "html.parser")
@@ -303,16 +245,17 @@ def get_dbf_data(siniflar=["9", "10", "11", "12"]):
     # Sonuçları organize et
     all_dbf_data = {}
     
-    # Paralel işleme
-    with ThreadPoolExecutor(max_workers=len(siniflar)) as executor:
+    # Paralel işleme: merkezi scraper kuyruğu (global + host sınırı utils_scheduler'da)
+    with get_scrape_scheduler().group('dbf', priority=SCRAPE_PRIORITIES['dbf'], host=MESLEK_HOST) as group:
         # Future'ları submit et
         future_to_task = {
-            executor.submit(get_all_dbf_files_for_alan_and_sinif, alan_adi, meb_alan_id, sinif): (alan_adi, meb_alan_id, sinif)
+            group.submit(get_all_dbf_files_for_alan_and_sinif, alan_adi, meb_alan_id, sinif,
+                         name=f"dbf:{alan_adi}:{sinif}"): (alan_adi, meb_alan_id, sinif)
             for alan_adi, meb_alan_id, sinif in tasks
         }
         
         # Sonuçları topla
-        for future in as_completed(future_to_task):
+        for future in group.as_completed(future_to_task):
             base_alan_adi, meb_alan_id, sinif = future_to_task[future]
             
             try:
@@ -339,6 +282,9 @@ def get_dbf_data(siniflar=["9", "10", "11", "12"]):
                     
             except Exception as e:
                 print(f"❌ {base_alan_adi} ({sinif}. sınıf) DBF işleme hatası: {e}")
+        
+        summary = group.summary()
+        print(f"⏱️ DBF sayfaları: {summary['done']}/{summary['tasks']} iş, toplam çalışma {summary['total_run_s']}s, kuyrukta bekleme {summary['total_wait_s']}s")
     
     return all_dbf_data
 
@@ -362,14 +308,10 @@ def get_or_create_area_for_download(cursor, alan_adi, meb_alan_ids=None):
     Returns:
         tuple: (alan_id, meb_alan_id, matched_name)
     """
-    # Önce mevcut alanları kontrol et
-    db_areas = get_areas_from_db()
-    area_id, matched_name = find_matching_area_id(alan_adi, db_areas)
+    # Önce mevcut alanları kontrol et (bellekteki alan çözümleyicisinden)
+    area_id, meb_alan_id, matched_name = find_matching_area_id(alan_adi, cursor)
     
     if area_id:
-        # Alan bulundu, MEB ID'sini al
-        db_areas_with_meb = get_areas_from_db_with_meb_id()
-        meb_alan_id = db_areas_with_meb.get(matched_name, {}).get('meb_alan_id')
         return area_id, meb_alan_id, matched_name
     
     # Alan bulunamadı, oluştur
@@ -389,12 +331,15 @@ def get_or_create_area_for_download(cursor, alan_adi, meb_alan_ids=None):
 # Sadece get_dbf() fonksiyonu kullanılacak (indirme + URL kaydetme)
 
 @with_database
-def get_dbf(cursor, dbf_data=None):
+def get_dbf(cursor, dbf_data=None, extract_archives=False):
     """
     DBF (Ders Bilgi Formu) linklerini çeker ve işler.
     HTML parsing ile yeni alanları kontrol eder.
     URL'leri JSON formatında gruplar ve veritabanına kaydeder.
-    RAR/ZIP dosyalarını indirir (açmaz).
+    RAR/ZIP dosyalarını indirir. Arşivler varsayılan olarak açılmaz: DBF metinleri
+    arşivden bellekte okunur, dosya sadece sunulurken açılır (utils_archive).
+    extract_archives=True ile PDF/DOCX dosyaları alan klasörüne topluca açılır
+    (değişmemiş arşivler tekrar açılmaz).
     data/get_dbf.json çıktı dosyası üretir.
     Progress mesajları yield eder.
     """
@@ -412,6 +357,9 @@ def get_dbf(cursor, dbf_data=None):
     # MEB alan ID'lerini al (cache'den)
     meb_alan_ids = get_meb_alan_ids_cached()
 
+    # 1. Aşama: klasörleri hazırla ve indirilecek dosyaları topla (DB işlemleri ana thread'de)
+    download_jobs = []
+    extract_jobs = []
     for sinif, alanlar in dbf_data.items():
         for alan_adi, info in alanlar.items():
             link = info["link"]
@@ -449,83 +397,74 @@ def get_dbf(cursor, dbf_data=None):
             archive_filename = os.path.basename(link)
             archive_path = os.path.join(alan_dir, archive_filename)
 
-            # Dosya zaten varsa atla
+            # Dosya zaten varsa indirme (açma aşamasında değişmediyse o da atlanır)
             if os.path.exists(archive_path):
                 file_size = os.path.getsize(archive_path)
                 yield {"type": "info", "message": f"📁 {alan_adi} -> {archive_filename} zaten mevcut ({file_size // (1024*1024)}MB)"}
+                if not any(job["path"] == archive_path for job in extract_jobs):
+                    extract_jobs.append({"path": archive_path, "extract_to": alan_dir, "alan_adi": alan_adi, "filename": archive_filename})
                 continue
 
-            # İndir - hata durumunda devam et
-            yield {"type": "status", "message": f"⬇️ {alan_adi} -> {archive_filename} indiriliyor..."}
-            
-            try:
-                # Önce HEAD request ile dosya varlığını kontrol et
-                head_response = requests.head(link, timeout=10)
-                if head_response.status_code == 404:
-                    yield {"type": "warning", "message": f"⚠️ {alan_adi} -> {archive_filename} dosya bulunamadı (404) - atlanıyor"}
-                    continue
-                elif head_response.status_code >= 400:
-                    yield {"type": "warning", "message": f"⚠️ {alan_adi} -> {archive_filename} erişim hatası ({head_response.status_code}) - atlanıyor"}
-                    continue
-                
-                # Dosya indirme
-                with requests.get(link, stream=True, timeout=60) as r:
-                    r.raise_for_status()
-                    
-                    # Content-Length header'dan dosya boyutunu al
-                    total_size = int(r.headers.get('content-length', 0))
-                    downloaded_size = 0
-                    
-                    with open(archive_path, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded_size += len(chunk)
-                
-                # Başarılı indirme
-                yield {"type": "success", "message": f"📁 {alan_adi} -> {archive_filename} indirildi ({downloaded_size // (1024*1024)}MB)"}
-                
-            except requests.exceptions.Timeout:
-                yield {"type": "error", "message": f"❌ {alan_adi} -> {archive_filename} indirme timeout (60s) - atlanıyor"}
-                # Yarıda kalan dosyayı sil
-                if os.path.exists(archive_path):
-                    os.remove(archive_path)
-                continue
-                
-            except requests.exceptions.HTTPError as e:
-                yield {"type": "error", "message": f"❌ {alan_adi} -> {archive_filename} HTTP hatası: {e} - atlanıyor"}
-                # Yarıda kalan dosyayı sil
-                if os.path.exists(archive_path):
-                    os.remove(archive_path)
-                continue
-                
-            except requests.exceptions.RequestException as e:
-                yield {"type": "error", "message": f"❌ {alan_adi} -> {archive_filename} bağlantı hatası: {e} - atlanıyor"}
-                # Yarıda kalan dosyayı sil
-                if os.path.exists(archive_path):
-                    os.remove(archive_path)
-                continue
-                
-            except Exception as e:
-                yield {"type": "error", "message": f"❌ {alan_adi} -> {archive_filename} genel hata: {e} - atlanıyor"}
-                # Yarıda kalan dosyayı sil
-                if os.path.exists(archive_path):
-                    os.remove(archive_path)
+            # Aynı arşiv birden fazla sınıf için listelenebilir - tek sefer indir
+            if any(job["path"] == archive_path for job in download_jobs):
                 continue
 
-            # AÇMA İŞLEMİ GEÇİCİ OLARAK KAPAT
-            # msg = f"[{alan_adi}] {archive_filename} açılıyor..."
-            # print(msg)
-            # yield {"type": "status", "message": msg}
-            # try:
-            #     extract_archive(archive_path, alan_dir)
-            #     msg = f"[{alan_adi}] {archive_filename} başarıyla açıldı."
-            #     print(msg)
-            #     yield {"type": "status", "message": msg}
-            # except Exception as e:
-            #     msg = f"[{alan_adi}] {archive_filename} açılamadı: {e}"
-            #     print(msg)
-            #     yield {"type": "error", "message": msg}
+            if os.path.exists(archive_path + PARTIAL_SUFFIX):
+                partial_size = os.path.getsize(archive_path + PARTIAL_SUFFIX)
+                yield {"type": "status", "message": f"⏯️ {alan_adi} -> {archive_filename} yarım indirme bulundu ({partial_size // (1024*1024)}MB), devam edilecek"}
+            download_jobs.append({"url": link, "path": archive_path, "extract_to": alan_dir, "alan_adi": alan_adi, "filename": archive_filename})
+
+    # Alan kayıtlarını indirmelerden önce yaz: with_database generator gövdesinden önce commit
+    # eder, açık kalan yazma kilidi eşzamanlı çalışan diğer scraper'ları bekletir
+    cursor.connection.commit()
+
+    # 2. Aşama: arşivleri sınırlı thread havuzu ile paralel indir (Range ile devam ettirilebilir)
+    if download_jobs:
+        yield {"type": "status", "message": f"⬇️ {len(download_jobs)} arşiv {DBF_DOWNLOAD_WORKERS} paralel bağlantı ile indiriliyor..."}
+
+    for event in download_files_concurrently(download_jobs, max_workers=DBF_DOWNLOAD_WORKERS, timeout=60):
+        if event["event"] == "throughput":
+            if event["bytes"]:
+                yield {"type": "progress",
+                       "message": f"⬇️ {event['completed']}/{event['total']} arşiv tamamlandı - "
+                                  f"{event['bytes'] // (1024*1024)}MB indirildi ({event['rate'] / (1024*1024):.2f} MB/s)",
+                       "progress": event["completed"] / event["total"]}
+            continue
+
+        job, result = event["job"], event["result"]
+        alan_adi, archive_filename = job["alan_adi"], job["filename"]
+        if result["success"]:
+            # Başarılı indirme - istatistik envanterini güncelle
+            record_file_in_inventory(job["path"])
+            extract_jobs.append(job)
+            resumed = f", {result['resumed_from'] // (1024*1024)}MB'tan devam edildi" if result["resumed_from"] else ""
+            yield {"type": "success", "message": f"📁 {alan_adi} -> {archive_filename} indirildi ({result['bytes'] // (1024*1024)}MB{resumed})"}
+        elif result["status_code"] == 404:
+            yield {"type": "warning", "message": f"⚠️ {alan_adi} -> {archive_filename} dosya bulunamadı (404) - atlanıyor"}
+        elif result["status_code"] and result["status_code"] >= 400:
+            yield {"type": "warning", "message": f"⚠️ {alan_adi} -> {archive_filename} erişim hatası ({result['status_code']}) - atlanıyor"}
+        else:
+            # Yarım kalan .part dosyası silinmez; bir sonraki çalıştırmada kaldığı yerden devam edilir
+            yield {"type": "error", "message": f"❌ {alan_adi} -> {archive_filename} indirilemedi: {result['error']} - sonraki çalıştırmada devam edilecek"}
+
+    # 3. Aşama (isteğe bağlı): arşivlerdeki PDF/DOCX dosyalarını süreç içinde, paralel aç
+    if not extract_archives:
+        extract_jobs = []
+    if extract_jobs:
+        yield {"type": "status", "message": f"📦 {len(extract_jobs)} arşiv {ARCHIVE_EXTRACT_WORKERS} paralel işle kontrol ediliyor..."}
+    skipped_archives = 0
+    for event in extract_archives_concurrently(extract_jobs):
+        job, result = event["job"], event["result"]
+        alan_adi, archive_filename = job["alan_adi"], job["filename"]
+        if "error" in result:
+            yield {"type": "error", "message": f"[{alan_adi}] {archive_filename} açılamadı: {result['error']}"}
+        elif result["skipped"]:
+            skipped_archives += 1
+        else:
+            yield {"type": "progress", "message": f"📦 [{alan_adi}] {archive_filename} açıldı ({result['files']} dosya)",
+                   "progress": event["completed"] / event["total"]}
+    if skipped_archives:
+        yield {"type": "info", "message": f"📦 {skipped_archives} arşiv değişmediği için tekrar açılmadı"}
 
     # DBF URL'lerini JSON formatında veritabanına kaydet
     yield {'type': 'status', 'message': 'DBF URL\'leri veritabanına kaydediliyor...'}
@@ -620,26 +559,10 @@ def match_dbf_to_course_by_content(dbf_file_path, course_name):
     if not extracted_course_name:
         return False, 0
     
-    extracted_clean = extracted_course_name.lower().strip()
-    course_clean = course_name.lower().strip()
-    
-    # Tam eşleşme
-    if extracted_clean == course_clean:
-        return True, 100
-    
-    # Kısmi eşleşme
-    if extracted_clean in course_clean or course_clean in extracted_clean:
-        return True, 90
-    
-    # Kelime bazlı eşleşme
-    extracted_words = set(extracted_clean.split())
-    course_words = set(course_clean.split())
-    common_words = extracted_words.intersection(course_words)
-    
-    if len(common_words) > 0:
-        similarity = (len(common_words) * 2) / (len(extracted_words) + len(course_words)) * 100
-        if similarity > 70:
-            return True, similarity
+    # Ortak eşleştirme motorunun puanı (Türkçe karakter/büyük harf/yazım farklarına dayanıklı)
+    similarity = name_similarity(extracted_course_name, course_name)
+    if similarity >= MATCH_MIN_SCORE:
+        return True, round(similarity * 100)
     
     return False, 0
 
@@ -10,9 +10,7 @@ Doğru URL: https://meslek.meb.gov.tr/dm_listele.aspx?sinif_kodu={sinif}&kurum_i
 
 import os
 import sqlite3
-import requests
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import SoupStrainer
 import json
 import re
 import time
@@ -21,22 +19,24 @@ try:
     from .utils_normalize import normalize_to_title_case_tr
     from .utils_database import find_or_create_database, get_or_create_alan, with_database, get_meb_alan_id_with_fallback, get_folder_name_for_download, get_meb_alan_ids_cached
     from .utils_file_management import download_and_cache_pdf
+    from .utils_http import http_get, parse_html, SCRAPE_CACHE_TTL
+    from .utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
 except ImportError:
     from utils_normalize import normalize_to_title_case_tr
     from utils_database import find_or_create_database, get_or_create_alan, with_database, get_meb_alan_id_with_fallback, get_folder_name_for_download, get_meb_alan_ids_cached
     from utils_file_management import download_and_cache_pdf
+    from utils_http import http_get, parse_html, SCRAPE_CACHE_TTL
+    from utils_scheduler import get_scrape_scheduler, SCRAPE_PRIORITIES, MESLEK_HOST
 
 # Doğru URL yapısı
 BASE_DM_URL = "https://meslek.meb.gov.tr/dmgoster.aspx"
+# Ortak başlıklar utils_http.DEFAULT_HEADERS'tan gelir
 HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9,tr;q=0.8',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1'
 }
 
+DM_CARD_STRAINER = SoupStrainer('div', class_='col-lg-3')
+
 @with_database
 def get_areas_from_db_with_meb_id(cursor):
     """
@@ -173,16 +173,15 @@ def get_dm_data_for_area(sinif_kodu, alan_id, alan_adi):
     dm_list = []
     
     try:
-        # Debug logging
-        url = f"{BASE_DM_URL}?kurum_id=1&sinif_kodu={sinif_kodu}&alan_id={alan_id}"
-        print(f"DM URL istegi: {url}")
-        
-        response = requests.get(BASE_DM_URL, params=params, headers=HEADERS, timeout=15)
+        # İstek hızı ve eşzamanlılık utils_http'deki host sınırlarıyla kontrol edilir
+        response = http_get(BASE_DM_URL, params=params, headers=HEADERS, timeout=15, cache_ttl=SCRAPE_CACHE_TTL)
         response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        soup = BeautifulSoup(response.text, "html.parser")
+        # apparent_encoding tüm sayfayı tarar - sadece sunucu charset bildirmediyse kullan
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = response.apparent_encoding
         
-        # col-lg-3 divlerini bul (DM card yapısı)
+        # Sadece col-lg-3 divleri (DM card yapısı) ağaca alınır
+        soup = parse_html(response.text, parse_only=DM_CARD_STRAINER)
         card_divs = soup.find_all('div', class_='col-lg-3')
         
         print(f"  {alan_adi} ({sinif_kodu}. sınıf): {len(card_divs)} card bulundu")
@@ -196,7 +195,6 @@ def get_dm_data_for_area(sinif_kodu, alan_id, alan_adi):
                     dm_info['sinif'] = sinif_kodu
                     dm_info['alan_adi'] = alan_adi
                     dm_list.append(dm_info)
-                    print(f"    DM bulundu: {dm_info['title']}")
                     
             except Exception as e:
                 print(f"Card işleme hatası: {e}")
@@ -248,6 +246,7 @@ def get_dm_with_cursor(cursor):
                     except Exception as e:
                         yield {'type': 'warning', 'message': f'Alan oluşturma hatası ({alan_adi}): {e}'}
                 
+                cursor.connection.commit()
                 yield {'type': 'success', 'message': f'✅ {created_count} alan otomatik oluşturuldu.'}
                 
                 # Yeni oluşturulan alanları tekrar çek
@@ -276,18 +275,20 @@ def get_dm_with_cursor(cursor):
             
             yield {'type': 'status', 'message': f'{len(tasks)} alan+sınıf kombinasyonu için paralel DM çekimi başlatılıyor...'}
             
-            # ThreadPoolExecutor ile paralel veri çekme
-            with ThreadPoolExecutor(max_workers=4) as executor:
+            # Merkezi scraper kuyruğu ile paralel veri çekme (global/host sınırları utils_scheduler'da,
+            # hız sınırı utils_http'de). SSE bağlantısı kapanırsa grup bekleyen işleri iptal eder.
+            with get_scrape_scheduler().group('dm', priority=SCRAPE_PRIORITIES['dm'], host=MESLEK_HOST) as group:
                 # Future'ları submit et
                 future_to_task = {
-                    executor.submit(get_dm_data_for_area, sinif, meb_alan_id, alan_adi): (alan_adi, sinif, meb_alan_id)
+                    group.submit(get_dm_data_for_area, sinif, meb_alan_id, alan_adi,
+                                 name=f"dm:{alan_adi}:{sinif}"): (alan_adi, sinif, meb_alan_id)
                     for alan_adi, sinif, meb_alan_id in tasks
                 }
                 
                 # Alan bazında sonuçları grupla
                 completed_tasks = 0
                 
-                for future in as_completed(future_to_task):
+                for future in group.as_completed(future_to_task):
                     alan_adi, sinif, meb_alan_id = future_to_task[future]
                     completed_tasks += 1
                     
@@ -313,6 +314,9 @@ def get_dm_with_cursor(cursor):
                     if completed_tasks in [len(tasks)//4, len(tasks)//2, len(tasks)*3//4, len(tasks)]:
                         progress_pct = (completed_tasks / len(tasks)) * 100
                         yield {'type': 'status', 'message': f'%{progress_pct:.0f} tamamlandı ({completed_tasks}/{len(tasks)})'}
+                
+                summary = group.summary()
+                yield {'type': 'info', 'message': f"⏱️ DM sayfaları: {summary['done']}/{summary['tasks']} iş, toplam çalışma {summary['total_run_s']}s, kuyrukta bekleme {summary['total_wait_s']}s"}
             
             # Boş alan verilerini temizle
             alan_dm_urls = {alan_adi: sinif_data for alan_adi, sinif_data in alan_dm_urls.items() if sinif_data}
@@ -323,7 +327,10 @@ def get_dm_with_cursor(cursor):
             # ÖNCE: Tüm URL'leri veritabanına kaydet
             yield {'type': 'status', 'message': 'DM URL\'leri veritabanına kaydediliyor...'}
             
+            # Tüm alanlar tek transaction'da yazılır; dm_url güncellemeleri tek executemany
             saved_alan_count = 0
+            resolved_meb_ids = {}
+            dm_url_updates = []
             for alan_adi, sinif_dm_data in alan_dm_urls.items():
                 try:
                     # Alan bilgilerini veritabanından al
@@ -333,27 +340,17 @@ def get_dm_with_cursor(cursor):
                     if area_db_info:
                         data_meb_id = area_db_info['meb_alan_id']
                         
-                        # MEB ID'yi fallback stratejisi ile al
+                        # MEB ID'yi fallback stratejisi ile al (indirme aşaması da bunu kullanır)
                         meb_alan_id, source = get_meb_alan_id_with_fallback(normalized_alan_adi, data_meb_id)
+                        resolved_meb_ids[alan_adi] = meb_alan_id
                         
                         # DM URL'lerini JSON formatında kaydet
                         dm_urls_json = json.dumps(sinif_dm_data)
                         
                         # Veritabanında dm_url sütunu yoksa, get_or_create_alan kullan
                         get_or_create_alan(cursor, normalized_alan_adi, meb_alan_id=meb_alan_id)
+                        dm_url_updates.append((dm_urls_json, normalized_alan_adi))
                         
-                        # DM URL'lerini ayrı olarak güncelle (eğer sütun varsa)
-                        try:
-                            cursor.execute("""
-                                UPDATE temel_plan_alan 
-                                SET dm_url = ?
-                                WHERE alan_adi = ?
-                            """, (dm_urls_json, normalized_alan_adi))
-                        except sqlite3.OperationalError:
-                            # dm_url sütunu yoksa atla
-                            pass
-                        
-                        # Commit otomatik olarak decorator tarafından yapılır
                         saved_alan_count += 1
                         sınıf_sayısı = len(sinif_dm_data)
                         
@@ -365,7 +362,6 @@ def get_dm_with_cursor(cursor):
                     else:
                         # Alan veritabanında yoksa otomatik oluştur
                         alan_id = get_or_create_alan(cursor, normalized_alan_adi)
-                        # Commit otomatik olarak decorator tarafından yapılır
                         yield {'type': 'warning', 'message': f'Yeni alan oluşturuldu: {alan_adi}'}
                         saved_alan_count += 1
                         
@@ -373,6 +369,20 @@ def get_dm_with_cursor(cursor):
                     yield {'type': 'error', 'message': f'DM URL kaydetme hatası ({alan_adi}): {e}'}
                     continue
             
+            # DM URL'lerini toplu güncelle (eğer sütun varsa)
+            try:
+                cursor.executemany("""
+                    UPDATE temel_plan_alan 
+                    SET dm_url = ?
+                    WHERE alan_adi = ?
+                """, dm_url_updates)
+            except sqlite3.OperationalError:
+                # dm_url sütunu yoksa atla
+                pass
+            
+            # with_database generator'larda commit'i gövde çalışmadan önce yapar - açık commit gerekli
+            cursor.connection.commit()
+            
             yield {'type': 'success', 'message': f'✅ {saved_alan_count} alan için DM URL\'leri veritabanına kaydedildi.'}
             
             # SONRA: PDF indirme işlemi (isteğe bağlı)
@@ -386,10 +396,8 @@ def get_dm_with_cursor(cursor):
                     area_db_info = db_areas.get(normalized_alan_adi) or db_areas.get(alan_adi)
                     
                     if area_db_info:
-                        data_meb_id = area_db_info['meb_alan_id']
-                        
-                        # MEB ID'yi fallback stratejisi ile al
-                        meb_alan_id, source = get_meb_alan_id_with_fallback(normalized_alan_adi, data_meb_id)
+                        # Kaydetme aşamasında çözülen MEB ID
+                        meb_alan_id = resolved_meb_ids.get(alan_adi, area_db_info['meb_alan_id'])
                         
                         # Her sınıfın PDF'lerini indir
                         for sinif, dm_list in sinif_dm_data.items():
@@ -10,6 +10,8 @@ try:
     from .utils_normalize import normalize_to_title_case_tr
     from .utils_database import with_database
     from .utils_file_management import scan_directory_for_pdfs
+    from .utils_cache import invalidates_tables
+    from .utils_document import open_document_source
 except ImportError:
     import os
     import sys
@@ -20,6 +22,8 @@ except ImportError:
     from modules.utils import normalize_to_title_case_tr
     from modules.utils_database import with_database
     from modules.utils_file_management import scan_directory_for_pdfs
+    from modules.utils_cache import invalidates_tables
+    from modules.utils_document import open_document_source
 
 # ------------- YARDIMCI FONKSİYONLAR ------------- #
 
@@ -31,6 +35,17 @@ def clean_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text)
     return text.strip()
 
+def iter_pages(pdf: pdfplumber.PDF):
+    """
+    Sayfaları sırayla verir; işi biten sayfanın layout önbelleği bırakılır.
+    Büyük ÇÖP PDF'lerinde tüm sayfaların nesneleri aynı anda bellekte tutulmaz.
+    """
+    for page in pdf.pages:
+        try:
+            yield page
+        finally:
+            page.close()
+
 # ------------- YENİ İŞ AKIŞI FONKSİYONLARI ------------- #
 
 def extract_alan_dal_from_table_headers(pdf: pdfplumber.PDF) -> Tuple[Optional[str], List[str]]:
@@ -42,7 +57,7 @@ def extract_alan_dal_from_table_headers(pdf: pdfplumber.PDF) -> Tuple[Optional[s
 
     print("   🔍 Tablo başlıklarından alan ve dal bilgileri aranıyor...")
     
-    for page_num, page in enumerate(pdf.pages):
+    for page_num, page in enumerate(iter_pages(pdf)):
         text = page.extract_text()
         if not text:
             continue
@@ -268,7 +283,7 @@ def extract_ders_info_from_schedules(pdf: pdfplumber.PDF) -> Dict[str, List[Dict
     dal_ders_map = {}
     tum_dersler = []
 
-    for i, page in enumerate(pdf.pages):
+    for i, page in enumerate(iter_pages(pdf)):
         text = page.extract_text()
         if not text:
             continue
@@ -335,7 +350,9 @@ def oku_cop_pdf_file(pdf_path: str) -> Dict[str, Any]:
     dal_ders_map = {}
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        # mmap ile aç: PDF içeriği Python belleğine kopyalanmaz
+        with open_document_source(pdf_path) as source:
+            pdf = source.open_pdfplumber()
             print(f"\n▶︎ {pdf_path} işleniyor...")
             # 1. Alan ve Dalları "Tablo başlıkları"ndan al
             alan_adi, dallar = extract_alan_dal_from_table_headers(pdf)
@@ -433,6 +450,7 @@ def oku_cop_pdf_file(pdf_path: str) -> Dict[str, Any]:
 
 # ------------- VERİTABANI ENTEGRASYONU ------------- #
 
+@invalidates_tables('temel_plan_alan', 'temel_plan_dal', 'temel_plan_ders', 'temel_plan_ders_dal')
 @with_database
 def save_cop_results_to_db(cursor, result: Dict[str, Any]) -> int:
     """
@@ -540,6 +558,78 @@ def save_cop_results_to_db(cursor, result: Dict[str, Any]) -> int:
 
 # ------------- COP PROCESSING WORKFLOW FONKSİYONLARI ------------- #
 
+def oku_cop_files(checkpoint=None, cop_folder="data/cop"):
+    """
+    ÇÖP PDF'lerini işleyip alan-dal-ders ilişkilerini veritabanına kaydeder.
+    /api/oku-cop arka plan işi olarak çalıştırır.
+
+    Args:
+        checkpoint: İşlenen dosyaların tutulduğu dict (utils_jobs.JobCheckpoint);
+            yarıda kalan çalıştırmada bu dosyalar tekrar okunmaz
+        cop_folder: ÇÖP PDF'lerinin bulunduğu ana dizin
+
+    Yields:
+        dict: İlerleme mesajları
+    """
+    if not os.path.exists(cop_folder):
+        yield {'type': 'error', 'message': 'ÇÖP klasörü bulunamadı. Önce ÇÖP dosyalarını indirin.'}
+        return
+
+    yield {'type': 'status', 'message': 'ÇÖP PDF dosyaları taranıyor...'}
+
+    # ÇÖP PDF dosyalarını dosya envanterinden bul (değişmemiş klasörler taranmaz)
+    from modules.utils_stats import list_inventory_files
+    cop_files = list_inventory_files('cop', ('.pdf',))
+
+    if not cop_files:
+        yield {'type': 'error', 'message': 'ÇÖP PDF dosyası bulunamadı.'}
+        return
+
+    checkpoint = checkpoint if checkpoint is not None else {}
+    done_files = set(checkpoint.get('processed', []))
+    total_processed = len([f for f in cop_files if f in done_files])
+    total_courses = checkpoint.get('courses', 0)
+
+    if total_processed:
+        yield {'type': 'status', 'message': f'{len(cop_files)} ÇÖP PDF dosyası bulundu, {total_processed} tanesi önceki çalıştırmada işlenmiş. Devam ediliyor...'}
+    else:
+        yield {'type': 'status', 'message': f'{len(cop_files)} ÇÖP PDF dosyası bulundu. İşleniyor...'}
+
+    for cop_file in cop_files:
+        if cop_file in done_files:
+            continue
+        try:
+            yield {'type': 'status', 'message': f'{os.path.basename(cop_file)} işleniyor...'}
+
+            result = oku_cop_pdf_file(cop_file)
+
+            if result:
+                # Sonuçları veritabanına kaydet (@with_database decorator ile)
+                saved_count = save_cop_results_to_db(result)
+                total_courses += saved_count
+
+                if saved_count > 0:
+                    yield {'type': 'success', 'message': f'{os.path.basename(cop_file)}: {saved_count} ders bilgisi çıkarıldı'}
+                else:
+                    yield {'type': 'warning', 'message': f'{os.path.basename(cop_file)}: Ders bilgisi çıkarılamadı'}
+            else:
+                yield {'type': 'warning', 'message': f'{os.path.basename(cop_file)}: İşlenemedi'}
+
+            total_processed += 1
+            done_files.add(cop_file)
+            checkpoint['processed'] = sorted(done_files)
+            checkpoint['courses'] = total_courses
+            if hasattr(checkpoint, 'save'):
+                checkpoint.save()
+
+            if total_processed % 5 == 0:
+                yield {'type': 'info', 'message': f'{total_processed}/{len(cop_files)} dosya işlendi...'}
+
+        except Exception as e:
+            yield {'type': 'error', 'message': f'{os.path.basename(cop_file)} işlenirken hata: {str(e)}'}
+
+    yield {'type': 'done', 'message': f'İşlem tamamlandı! {total_processed} ÇÖP PDF dosyası işlendi, {total_courses} ders bilgisi çıkarıldı.'}
+
 def process_all_cop_pdfs(cop_root_dir="data/cop"):
     """
     Standalone COP PDF işleme fonksiyonu.
@@ -12,26 +12,50 @@ ilgili ders kaydının `dbf_url` sütununu günceller.
 - DBF dosyalarından ders adlarını çıkarmak.
 - Çıkarılan ders adlarını veritabanındaki derslerle eşleştirmek.
 - Eşleşen derslerin `dbf_url` alanını dosya yolu ile güncellemek.
+- DBF kazanım tablolarından öğrenme birimlerini toplu olarak import etmek
+  (tek transaction, executemany; `python -m modules.oku_dbf` ile CLI).
 """
 
 import os
+import sys
 import json
+import argparse
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 try:
     from .utils_database import with_database
-    from .utils_dbf1 import get_all_dbf_files, process_dbf_file
-    from .utils_normalize import normalize_to_title_case_tr
+    from .utils_dbf1 import get_all_dbf_files, process_dbf_file, ex_kazanim_tablosu, read_full_text_from_file
+    from .utils_cache import bump_table_versions, invalidates_tables, LEARNING_UNIT_TABLES
+    from .utils_env import get_project_root
+    from .utils_archive import split_member_ref
+    from .utils_document import iter_document_sources
+    from .utils_matching import get_course_matcher
 except ImportError:
     # Test ortamları veya bağımsız çalıştırma için
     from modules.utils_database import with_database
-    from modules.utils_dbf1 import get_all_dbf_files, process_dbf_file
-    from modules.utils_normalize import normalize_to_title_case_tr
+    from modules.utils_dbf1 import get_all_dbf_files, process_dbf_file, ex_kazanim_tablosu, read_full_text_from_file
+    from modules.utils_cache import bump_table_versions, invalidates_tables, LEARNING_UNIT_TABLES
+    from modules.utils_env import get_project_root
+    from modules.utils_archive import split_member_ref
+    from modules.utils_document import iter_document_sources
+    from modules.utils_matching import get_course_matcher
     
 
+def _meb_alan_id_from_path(file_path):
+    """data/dbf/<meb_alan_id>_<alan>/... yolundan MEB alan ID'sini çıkarır (yoksa None)."""
+    try:
+        from .utils_env import get_data_path
+    except ImportError:
+        from modules.utils_env import get_data_path
+    relative = os.path.relpath(file_path, get_data_path("dbf"))
+    alan_klasoru = relative.split(os.sep, 1)[0]
+    meb_alan_id = alan_klasoru.split('_', 1)[0]
+    return meb_alan_id if meb_alan_id.isdigit() else None
+
+
 @with_database
-def link_dbf_files_to_database(cursor):
+def link_dbf_files_to_database(cursor, checkpoint=None):
     """
     Tüm DBF dosyalarını tarayarak ders adları ile eşleştirir ve temel_plan_ders tablosundaki
     dbf_url alanını günceller. Bu temel fonksiyon, ileride amaç, kazanım, ders saati gibi
@@ -39,24 +63,28 @@ def link_dbf_files_to_database(cursor):
 
     Args:
         cursor: Veritabanı cursor nesnesi.
+        checkpoint: Dosya bazında eşleşme sonuçlarının tutulduğu dict (utils_jobs.JobCheckpoint).
+            Yarıda kalan çalıştırmada okunmuş dosyalar tekrar parse edilmez.
 
     Yields:
         Dict: SSE (Server-Sent Events) için işlem durumu mesajları.
     """
     yield {"type":"info","message":f"Kullanılan DB dosyası: {cursor.connection}"}
     try:
-        # 1. Veritabanından mevcut dersleri yükle ve bir harita oluştur
+        # 1. Veritabanındaki derslerden eşleştirme motorunu kur (çalıştırma başına bir kez)
         yield {"type": "status", "message": "Veritabanındaki dersler önbelleğe alınıyor..."}
-        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders")
-        all_dersler = cursor.fetchall()
+        course_matcher = get_course_matcher(cursor)
+        cursor.connection.commit()  # sync_ders_adi_norm yazımları
         
-        # Normalize edilmiş ders adlarını anahtar, ID'leri değer olarak tutan harita
-        ders_map = {normalize_to_title_case_tr(row['ders_adi']): row['id'] for row in all_dersler}
-        yield {"type": "info", "message": f"{len(ders_map)} ders veritabanından yüklendi."}
+        # DBF klasörleri "<meb_alan_id>_<alan>" adlıdır; eşleşme önce o alanın derslerinde aranır
+        cursor.execute("SELECT id, meb_alan_id FROM temel_plan_alan WHERE meb_alan_id IS NOT NULL")
+        meb_to_alan_id = {row['meb_alan_id']: row['id'] for row in cursor.fetchall()}
+        yield {"type": "info", "message": f"{len(course_matcher)} ders veritabanından yüklendi."}
 
         # 2. Tüm DBF dosyalarını bul
         yield {"type": "status", "message": "DBF dosyaları taranıyor..."}
-        dbf_files = get_all_dbf_files(validate_files=True)
+        # Açılmamış arşivlerdeki belgeler de dahil; metinleri arşivden bellekte okunur
+        dbf_files = get_all_dbf_files(validate_files=True, include_archives=True)
         if not dbf_files:
             yield {"type": "warning", "message": "İşlenecek DBF dosyası bulunamadı."}
             yield {"type": "done", "message": "İşlem tamamlandı, ancak işlenecek dosya yoktu."}
@@ -68,16 +96,32 @@ def link_dbf_files_to_database(cursor):
         updates_to_execute = []
         processed_count = 0
         matched_count = 0
+        checkpoint = checkpoint if checkpoint is not None else {}
+        file_results = checkpoint.setdefault('files', {})
 
-        for file_path in dbf_files:
+        # Arşiv üyeleri arşiv başına tek geçişte okunur; checkpoint'teki dosyalar hiç okunmaz
+        for file_path, source in iter_document_sources(dbf_files, skip=file_results.__contains__):
             processed_count += 1
             filename = os.path.basename(file_path)
+
+            # Önceki (yarıda kalan) çalıştırmada okunmuş dosya
+            if file_path in file_results:
+                if file_results[file_path]:
+                    matched_count += 1
+                    updates_to_execute.append(tuple(file_results[file_path]))
+                continue
+            # Önceki dosyaların sonuçlarını kaydet. Bu dosyanın sonucu ancak işlendikten
+            # sonra yazılır: iptal burada gelirse dosya devamda yeniden işlenir
+            if hasattr(checkpoint, 'save'):
+                checkpoint.save()
+
             yield {"type": "progress", "message": f"[{processed_count}/{len(dbf_files)}] İşleniyor: {filename}"}
 
             # Dosyadan ders adını çıkar
-            result = process_dbf_file(file_path)
+            result = process_dbf_file(file_path, source=source)
             if not result or not result.get("success"):
-                yield {"type": "warning", "message": f"Okunamadı: {filename} - {result.get('error', 'Bilinmeyen hata')}"}
+                file_results[file_path] = None
+                yield {"type": "warning", "message": f"Okunamadı: {filename} - {(result or {}).get('error', 'Bilinmeyen hata')}"}
                 continue
 
             temel_bilgiler = result.get("temel_bilgiler", {})
@@ -88,14 +132,16 @@ def link_dbf_files_to_database(cursor):
                     break
             
             if not ders_adi_extracted:
+                file_results[file_path] = None
                 yield {"type": "warning", "message": f"Ders adı bulunamadı: {filename}"}
                 continue
 
-            # Eşleştirme yap
-            normalized_ders_adi = normalize_to_title_case_tr(ders_adi_extracted)
-            
-            # Haritadan ders ID'sini bul
-            ders_id = ders_map.get(normalized_ders_adi)
+            # Eşleştirme yap (alan klasörü biliniyorsa önce o alanın dersleri)
+            alan_id = meb_to_alan_id.get(_meb_alan_id_from_path(file_path))
+            match = course_matcher.best(ders_adi_extracted, alan_id=alan_id) if alan_id else None
+            if match is None:
+                match = course_matcher.best(ders_adi_extracted)
+            ders_id = match.ders_id if match else None
 
             if ders_id:
                 matched_count += 1
@@ -105,6 +151,7 @@ def link_dbf_files_to_database(cursor):
                     project_root = get_project_root()
                     relative_path = os.path.relpath(file_path, project_root)
                     updates_to_execute.append((relative_path, ders_id))
+                    file_results[file_path] = [relative_path, ders_id]
                     yield {"type": "success", "message": f"Eşleşti: '{ders_adi_extracted}' -> DB ID: {ders_id} -> {relative_path}"}
                     
                     # ⭐ PLACEHOLDER: Öğrenme birimi, konu ve kazanım kayıt sistemi
@@ -114,8 +161,10 @@ def link_dbf_files_to_database(cursor):
                 except Exception as e:
                     # Fallback: tam path'i kullan
                     updates_to_execute.append((file_path, ders_id))
+                    file_results[file_path] = [file_path, ders_id]
                     yield {"type": "success", "message": f"Eşleşti: '{ders_adi_extracted}' -> DB ID: {ders_id} (tam path)"}
             else:
+                file_results[file_path] = None
                 yield {"type": "info", "message": f"Eşleşmedi: '{ders_adi_extracted}' veritabanında bulunamadı."}
 
         # 4. Toplu veritabanı güncellemesi
@@ -127,6 +176,7 @@ def link_dbf_files_to_database(cursor):
                     updates_to_execute
                 )
                 cursor.connection.commit() # Explicit commit here
+                bump_table_versions('temel_plan_ders')
                 print(f"✅ DBF yolları veritabanına başarıyla kaydedildi: {cursor.rowcount} kayıt güncellendi.") # Terminal log
                 yield {"type": "success", "message": f"{cursor.rowcount} dersin DBF yolu başarıyla güncellendi."}
             except Exception as db_error:
@@ -138,3 +188,366 @@ def link_dbf_files_to_database(cursor):
 
     except Exception as e:
         yield {"type": "error", "message": f"DBF işleme sırasında beklenmedik bir hata oluştu: {str(e)}"}
+
+
+# SQLite'ın eski sürümlerindeki 999 parametre sınırının altında kalmak için IN (...) parça boyutu
+SQL_IN_CHUNK_SIZE = 500
+
+
+def _parse_unit_duration(duration):
+    """Kazanım tablosundaki süre değerini integer'a çevirir ("18/36" → 18)."""
+    try:
+        if isinstance(duration, str):
+            # "18/36" gibi kesir formatını kontrol et
+            if '/' in duration:
+                return int(duration.split('/')[0])
+            return int(duration)
+        if isinstance(duration, int):
+            return duration
+    except (TypeError, ValueError):
+        pass
+    return 0
+
+
+def _parse_unit_count(konu_sayisi):
+    """Konu sayısını integer'a çevirir, okunamazsa 0 döner."""
+    try:
+        return int(konu_sayisi) if konu_sayisi else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _resolve_dbf_path(dbf_file_path):
+    """
+    dbf_url değerini (PROJECT_ROOT'a göre relative olabilir) mevcut dosya yoluna çevirir.
+    Arşiv üyesi referanslarında ("<arşiv>::<üye>") arşivin varlığı kontrol edilir.
+    """
+    if not dbf_file_path:
+        return None
+    member = split_member_ref(dbf_file_path)
+    check_path = member[0] if member else dbf_file_path
+    if os.path.exists(check_path):
+        return dbf_file_path
+    candidate = os.path.join(get_project_root(), dbf_file_path)
+    candidate_check = os.path.join(get_project_root(), check_path)
+    return candidate if os.path.exists(candidate_check) else None
+
+
+def parse_dbf_learning_units(dbf_file_path, source=None):
+    """
+    DBF dosyasındaki kazanım tablosundan öğrenme birimi başlıklarını çıkarır.
+    Her birim için konu sayısı kadar "Konu N" / "Kazanım N" yer tutucusu oluşturulur.
+    source (DocumentSource) verilirse içerik dosya yerine ondan okunur.
+
+    Returns:
+        Dict: {"success": True, "units": [...]} veya {"success": False, "error": "..."}
+    """
+    resolved_path = dbf_file_path if source is not None else _resolve_dbf_path(dbf_file_path)
+    if not resolved_path:
+        return {"success": False, "error": f"DBF dosyası bulunamadı: {dbf_file_path}"}
+
+    # PDF/DOCX dosyasından text çıkar
+    full_text = read_full_text_from_file(source if source is not None else resolved_path)
+    if not full_text.strip():
+        return {"success": False, "error": "Dosyadan metin çıkarılamadı"}
+
+    # Kazanım tablosunu parse et
+    _, kazanim_tablosu_data = ex_kazanim_tablosu(full_text)
+    if not kazanim_tablosu_data:
+        return {"success": False, "error": "Kazanım tablosu bulunamadı"}
+
+    units = []
+    for i, unit_data in enumerate(kazanim_tablosu_data):
+        konu_sayisi = _parse_unit_count(unit_data.get('count', 0))
+        units.append({
+            'birim_adi': unit_data.get('title', f'Öğrenme Birimi {i+1}'),
+            'sure': _parse_unit_duration(unit_data.get('duration', 0)),
+            'sira': i + 1,
+            'konular': [
+                {
+                    'konu_adi': f"Konu {j + 1}",
+                    'sira': j + 1,
+                    'kazanimlar': [{'kazanim_adi': f"Kazanım {j + 1}", 'sira': 1}]
+                }
+                for j in range(konu_sayisi)
+            ]
+        })
+
+    return {"success": True, "units": units}
+
+
+def _select_ids_in(cursor, sql, ids):
+    """`... IN ({placeholders}) ORDER BY id` sorgusunu parçalara bölerek çalıştırır."""
+    rows = []
+    ids = list(ids)
+    for start in range(0, len(ids), SQL_IN_CHUNK_SIZE):
+        chunk = ids[start:start + SQL_IN_CHUNK_SIZE]
+        cursor.execute(sql.format(placeholders=','.join('?' * len(chunk))), chunk)
+        rows.extend(cursor.fetchall())
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def insert_learning_units_bulk(cursor, units_by_ders, replace=False):
+    """
+    Birden çok dersin öğrenme birimi / konu / kazanım ağaçlarını set-based ekler.
+    Her seviye tek bir executemany ile yazılır; yeni ID'ler ekleme sonrası tek
+    SELECT ile (ID sırası = ekleme sırası) eşlenir. Transaction yönetimi çağırana aittir.
+
+    Args:
+        cursor: Veritabanı cursor nesnesi.
+        units_by_ders: {ders_id: [birim_dict, ...]} (parse_dbf_learning_units formatı)
+        replace: True ise derslerin mevcut öğrenme birimleri önce silinir.
+
+    Returns:
+        Dict: {ders_id: [ID'leri doldurulmuş birim_dict, ...]}
+    """
+    ders_ids = [ders_id for ders_id, units in units_by_ders.items() if units]
+    if not ders_ids:
+        return {}
+
+    if replace:
+        stale = [(ders_id,) for ders_id in ders_ids]
+        # Kazanım ve konular açıkça silinir; foreign_keys kapalı bağlantılarda da yetim kalmaz
+        cursor.executemany("""
+            DELETE FROM temel_plan_kazanim WHERE konu_id IN (
+                SELECT k.id FROM temel_plan_konu k
+                JOIN temel_plan_ogrenme_birimi ob ON ob.id = k.ogrenme_birimi_id
+                WHERE ob.ders_id = ?
+            )
+        """, stale)
+        cursor.executemany("""
+            DELETE FROM temel_plan_konu WHERE ogrenme_birimi_id IN (
+                SELECT id FROM temel_plan_ogrenme_birimi WHERE ders_id = ?
+            )
+        """, stale)
+        cursor.executemany("DELETE FROM temel_plan_ogrenme_birimi WHERE ders_id = ?", stale)
+        existing_unit_ids = set()
+    else:
+        existing_unit_ids = {row[0] for row in _select_ids_in(
+            cursor,
+            "SELECT id FROM temel_plan_ogrenme_birimi WHERE ders_id IN ({placeholders})",
+            ders_ids
+        )}
+
+    # 1. Öğrenme birimleri
+    unit_list = [(ders_id, unit) for ders_id in ders_ids for unit in units_by_ders[ders_id]]
+    cursor.executemany("""
+        INSERT INTO temel_plan_ogrenme_birimi (ders_id, birim_adi, sure, sira)
+        VALUES (?, ?, ?, ?)
+    """, [(ders_id, unit['birim_adi'], unit['sure'], unit['sira']) for ders_id, unit in unit_list])
+
+    new_unit_ids = {}
+    for unit_id, ders_id in _select_ids_in(
+        cursor,
+        "SELECT id, ders_id FROM temel_plan_ogrenme_birimi WHERE ders_id IN ({placeholders})",
+        ders_ids
+    ):
+        if unit_id not in existing_unit_ids:
+            new_unit_ids.setdefault(ders_id, []).append(unit_id)
+
+    imported = {}
+    for ders_id in ders_ids:
+        imported[ders_id] = []
+        for unit_id, unit in zip(new_unit_ids.get(ders_id, []), units_by_ders[ders_id]):
+            imported[ders_id].append(dict(unit, id=unit_id, konular=[dict(k) for k in unit['konular']]))
+    imported_units = [unit for ders_id in ders_ids for unit in imported[ders_id]]
+
+    # 2. Konular (yeni birimlerin tüm konuları yeni eklenenlerdir)
+    konu_list = [(unit, konu) for unit in imported_units for konu in unit['konular']]
+    if not konu_list:
+        return imported
+
+    cursor.executemany("""
+        INSERT INTO temel_plan_konu (ogrenme_birimi_id, konu_adi, sira)
+        VALUES (?, ?, ?)
+    """, [(unit['id'], konu['konu_adi'], konu['sira']) for unit, konu in konu_list])
+
+    konu_ids_by_unit = {}
+    for konu_id, unit_id in _select_ids_in(
+        cursor,
+        "SELECT id, ogrenme_birimi_id FROM temel_plan_konu WHERE ogrenme_birimi_id IN ({placeholders})",
+        [unit['id'] for unit in imported_units]
+    ):
+        konu_ids_by_unit.setdefault(unit_id, []).append(konu_id)
+
+    for unit in imported_units:
+        for konu_id, konu in zip(konu_ids_by_unit.get(unit['id'], []), unit['konular']):
+            konu['id'] = konu_id
+            konu['kazanimlar'] = [dict(kz) for kz in konu.get('kazanimlar', [])]
+
+    # 3. Kazanımlar
+    kazanim_list = [
+        (konu, kazanim)
+        for unit in imported_units for konu in unit['konular'] if 'id' in konu
+        for kazanim in konu['kazanimlar']
+    ]
+    if kazanim_list:
+        cursor.executemany("""
+            INSERT INTO temel_plan_kazanim (konu_id, kazanim_adi, sira)
+            VALUES (?, ?, ?)
+        """, [(konu['id'], kazanim['kazanim_adi'], kazanim['sira']) for konu, kazanim in kazanim_list])
+
+        kazanim_ids_by_konu = {}
+        for kazanim_id, konu_id in _select_ids_in(
+            cursor,
+            "SELECT id, konu_id FROM temel_plan_kazanim WHERE konu_id IN ({placeholders})",
+            sorted({konu['id'] for konu, _ in kazanim_list})
+        ):
+            kazanim_ids_by_konu.setdefault(konu_id, []).append(kazanim_id)
+
+        for unit in imported_units:
+            for konu in unit['konular']:
+                for kazanim_id, kazanim in zip(kazanim_ids_by_konu.get(konu.get('id'), []), konu['kazanimlar']):
+                    kazanim['id'] = kazanim_id
+
+    return imported
+
+
+def import_dbf_learning_units(cursor, courses, skip_existing=False, replace=False):
+    """
+    Birden çok dersin DBF dosyasından öğrenme birimlerini tek transaction içinde import eder.
+    Önce tüm dosyalar parse edilir, ardından yazma işlemi tek seferde
+    (insert_learning_units_bulk) yapılır; böylece yazma kilidi kısa tutulur.
+
+    Args:
+        cursor: Veritabanı cursor nesnesi.
+        courses: [(ders_id, dbf_file_path), ...]
+        skip_existing: True ise zaten öğrenme birimi olan dersler atlanır.
+        replace: True ise mevcut öğrenme birimleri silinip yeniden oluşturulur.
+
+    Returns:
+        List[Dict]: Ders başına sonuç
+            {"ders_id", "dbf_file_path", "status": imported|skipped|error, ...}
+    """
+    courses = [(int(ders_id), dbf_file_path) for ders_id, dbf_file_path in courses]
+
+    existing_counts = {}
+    if skip_existing and courses:
+        for ders_id, unit_count in _select_ids_in(
+            cursor,
+            "SELECT ders_id, COUNT(*) FROM temel_plan_ogrenme_birimi WHERE ders_id IN ({placeholders}) GROUP BY ders_id",
+            sorted({ders_id for ders_id, _ in courses})
+        ):
+            existing_counts[ders_id] = unit_count
+
+    results = []
+    queued = set()
+    to_parse = {}
+    for ders_id, dbf_file_path in courses:
+        result = {"ders_id": ders_id, "dbf_file_path": dbf_file_path}
+        results.append(result)
+
+        if ders_id in queued:
+            result.update(status="skipped", message="Ders listede birden fazla kez var")
+            continue
+        if existing_counts.get(ders_id):
+            result.update(status="skipped", message=f"{existing_counts[ders_id]} öğrenme birimi zaten mevcut")
+            continue
+
+        # Bulunamayan yol olduğu gibi bırakılır; hatayı parse_dbf_learning_units bildirir
+        resolved_path = _resolve_dbf_path(dbf_file_path) or dbf_file_path
+        queued.add(ders_id)
+        to_parse.setdefault(resolved_path, []).append(result)
+
+    # Aynı arşivdeki belgeler arşiv bir kez dolaşılarak okunur
+    parsed_units = {}
+    for resolved_path, source in iter_document_sources(list(to_parse)):
+        try:
+            parsed = parse_dbf_learning_units(resolved_path, source=source)
+        except Exception as e:
+            parsed = {"success": False, "error": str(e)}
+        for result in to_parse[resolved_path]:
+            if not parsed.get("success"):
+                result.update(status="error", error=parsed.get("error", "Bilinmeyen hata"))
+                continue
+            parsed_units[result["ders_id"]] = parsed["units"]
+            result["status"] = "imported"
+
+    # Yazma sırası ders listesinin sırasıdır (okuma sırası arşivlere göre değişebilir)
+    units_by_ders = {result["ders_id"]: parsed_units[result["ders_id"]]
+                     for result in results if result.get("status") == "imported"}
+
+    imported = insert_learning_units_bulk(cursor, units_by_ders, replace=replace)
+
+    for result in results:
+        if result["status"] == "imported":
+            result["imported_units"] = imported.get(result["ders_id"], [])
+            result["message"] = f"{len(result['imported_units'])} öğrenme birimi başarıyla import edildi"
+
+    return results
+
+
+def get_courses_with_dbf_files(cursor, ders_ids=None):
+    """
+    link_dbf_files_to_database ile DBF dosyası eşleştirilmiş dersleri döndürür.
+
+    Returns:
+        List[Tuple[int, str]]: [(ders_id, dbf_url), ...]
+    """
+    cursor.execute("""
+        SELECT id, dbf_url FROM temel_plan_ders
+        WHERE dbf_url IS NOT NULL AND dbf_url != ''
+        ORDER BY id
+    """)
+    courses = []
+    for row in cursor.fetchall():
+        if ders_ids and row[0] not in ders_ids:
+            continue
+        if row[1].lower().endswith(('.pdf', '.docx')):
+            courses.append((row[0], row[1]))
+    return courses
+
+
+@invalidates_tables(*LEARNING_UNIT_TABLES)
+@with_database
+def import_all_dbf_learning_units(cursor, skip_existing=True, replace=False, ders_ids=None):
+    """
+    DBF dosyası eşleşmiş tüm dersler için öğrenme birimlerini tek transaction içinde import eder.
+
+    Returns:
+        List[Dict]: import_dbf_learning_units ders başına sonuçları
+    """
+    courses = get_courses_with_dbf_files(cursor, ders_ids=ders_ids)
+    return import_dbf_learning_units(cursor, courses, skip_existing=skip_existing, replace=replace)
+
+
+def main():
+    """Tüm DBF dosyalarından öğrenme birimi import CLI'ı."""
+    parser = argparse.ArgumentParser(description="DBF dosyalarından öğrenme birimlerini toplu import eder")
+    parser.add_argument("--ders-id", type=int, action="append", dest="ders_ids",
+                        help="Sadece verilen ders(ler)i import et (tekrarlanabilir)")
+    parser.add_argument("--replace", action="store_true",
+                        help="Mevcut öğrenme birimlerini silip yeniden oluştur")
+    parser.add_argument("--include-existing", action="store_true",
+                        help="Öğrenme birimi olan dersleri atlama (yeni birimler eklenir)")
+    args = parser.parse_args()
+
+    skip_existing = not (args.replace or args.include_existing)
+    print("📚 DBF öğrenme birimleri import ediliyor...")
+    results = import_all_dbf_learning_units(
+        skip_existing=skip_existing, replace=args.replace, ders_ids=args.ders_ids
+    )
+    if isinstance(results, dict):
+        print(f"❌ Import başarısız: {results.get('error')}")
+        return 1
+
+    counts = {"imported": 0, "skipped": 0, "error": 0}
+    unit_total = 0
+    for result in results:
+        counts[result["status"]] += 1
+        if result["status"] == "imported":
+            unit_total += len(result["imported_units"])
+            print(f"✅ Ders {result['ders_id']}: {result['message']}")
+        elif result["status"] == "skipped":
+            print(f"⏭️ Ders {result['ders_id']}: {result['message']}")
+        else:
+            print(f"❌ Ders {result['ders_id']}: {result['error']} ({result['dbf_file_path']})")
+
+    print(f"\n📊 Özet: {counts['imported']} ders import edildi ({unit_total} öğrenme birimi), "
+          f"{counts['skipped']} atlandı, {counts['error']} hata")
+    return 1 if counts["error"] and not counts["imported"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
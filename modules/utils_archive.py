@@ -0,0 +1,338 @@
+"""
+modules/utils_archive.py - Süreç İçi Arşiv Açma
+
+DBF arşivleri (RAR/ZIP) harici `unar` komutu yerine zipfile/rarfile ile açılır.
+Sadece işimize yarayan üyeler (.pdf/.docx) listelenir ve hedefe akış halinde
+yazılır; diğer üyeler hiç açılmaz. Üyeler diske yazılmadan da okunabilir
+(iter_archive_member_streams), böylece metin çıkarıcıya doğrudan beslenebilir.
+
+Açma sonuçları arsiv_cikarma tablosunda tutulur: boyutu ve değiştirilme zamanı
+değişmemiş arşivler tekrar açılmaz.
+
+Açılmamış arşivdeki bir belge "<arşiv yolu>::<üye adı>" referansıyla gösterilir
+(örn. data/dbf/08_Bilisim/9.SINIF.rar::DBF/Ağ Temelleri.pdf). Metin çıkarıcılar bu
+referansı bellekten okur; dosya sadece sunulması gerektiğinde arşivin yanına açılır.
+
+İçerdiği fonksiyonlar:
+- detect_archive_type: Gerçek formatı header'dan tespit eder
+- open_archive: Header'a göre ZipFile/RarFile döndürür
+- list_archive_members: Filtrelenmiş üye listesi (Türkçe ad düzeltmesiyle)
+- iter_archive_member_streams: Üyeleri açık dosya nesnesi olarak verir (diske yazmadan)
+- extract_archive_members: Filtrelenmiş üyeleri hedef klasöre akış halinde yazar
+- extract_archives_concurrently: Birden fazla arşivi paralel açar, değişmeyenleri atlar
+- member_ref / split_member_ref: Arşiv üyesi referansı oluşturur/çözer
+- list_archive_documents: Arşivdeki belgelerin referansları ve açılınca oluşacak yolları
+- read_archive_member: Tek üyeyi belleğe okur
+- materialize_archive_member / resolve_document_path: Referansı gerçek dosyaya çevirir
+"""
+
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import rarfile
+
+try:
+    from .utils_database import with_database
+    from .utils_stats import record_file_in_inventory
+except ImportError:
+    from utils_database import with_database
+    from utils_stats import record_file_in_inventory
+
+ARCHIVE_MEMBER_EXTENSIONS = ('.pdf', '.docx')
+ARCHIVE_EXTENSIONS = ('.rar', '.zip')
+ARCHIVE_MEMBER_SEPARATOR = '::'
+ARCHIVE_COPY_BUFFER = 1024 * 1024
+# Açma işlemi disk/zlib ağırlıklı; zlib ve unrar süreçleri GIL'i bıraktığı için thread yeterli
+ARCHIVE_EXTRACT_WORKERS = 4
+
+# ZIP'te UTF-8 bayrağı olmayan adlar cp437 olarak çözülür; MEB arşivleri Türkçe
+# Windows'ta (cp857) oluşturulduğu için adlar bu kodlamaya geri çevrilir
+ZIP_UTF8_FLAG = 0x800
+ZIP_LEGACY_ENCODING = 'cp857'
+
+
+def detect_archive_type(file_path: str) -> str:
+    """
+    Dosyanın gerçek formatını header'dan tespit eder.
+
+    Args:
+        file_path: Arşiv dosyasının yolu
+
+    Returns:
+        Dosya tipi: RAR, ZIP, 7Z veya UNKNOWN
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(16)
+
+        if header.startswith(b'Rar!'):
+            return "RAR"
+        elif header.startswith(b'PK'):
+            return "ZIP"
+        elif header.startswith(b'7z'):
+            return "7Z"
+        else:
+            return f"UNKNOWN (header: {header[:8].hex()})"
+
+    except Exception as e:
+        return f"ERROR: {e}"
+
+
+@contextmanager
+def open_archive(archive_path: str):
+    """Uzantıya değil header'a bakarak arşivi açar (.rar uzantılı ZIP'ler de mevcut)."""
+    real_type = detect_archive_type(archive_path)
+    if real_type == "ZIP":
+        archive = zipfile.ZipFile(archive_path)
+    elif real_type == "RAR":
+        archive = rarfile.RarFile(archive_path)
+    else:
+        raise ValueError(f"Desteklenmeyen arşiv formatı ({real_type}): {archive_path}")
+    try:
+        yield archive
+    finally:
+        archive.close()
+
+
+def _member_name(info) -> str:
+    name = info.filename
+    if isinstance(info, zipfile.ZipInfo) and not info.flag_bits & ZIP_UTF8_FLAG:
+        try:
+            name = name.encode('cp437').decode(ZIP_LEGACY_ENCODING)
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return name.replace('\\', '/')
+
+
+def _safe_relative_path(name: str) -> Optional[str]:
+    """Üye adını hedef klasörün dışına çıkamayacak göreli bir yola çevirir."""
+    parts = [part for part in name.split('/') if part not in ('', '.', '..')]
+    return os.path.join(*parts) if parts else None
+
+
+def list_archive_members(archive, extensions=ARCHIVE_MEMBER_EXTENSIONS) -> List[Tuple[str, object]]:
+    """
+    Arşivdeki uzantısı uyan dosya üyelerini (ad, info) olarak döndürür.
+    Klasörler ve macOS metadata dosyaları (__MACOSX, ._*) atlanır.
+    """
+    members = []
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        name = _member_name(info)
+        basename = name.rsplit('/', 1)[-1]
+        if '__MACOSX/' in name or basename.startswith('._'):
+            continue
+        if not basename.lower().endswith(extensions):
+            continue
+        members.append((name, info))
+    return members
+
+
+def iter_archive_member_streams(archive_path: str, extensions=ARCHIVE_MEMBER_EXTENSIONS,
+                                names=None) -> Iterator[Tuple[str, object]]:
+    """
+    Filtrelenmiş üyeleri (ad, okunabilir dosya nesnesi) olarak verir. Hiçbir şey diske
+    yazılmaz; nesne bir sonraki üyeye geçildiğinde kapanır. names verilirse sadece
+    o adlardaki üyeler açılır; arşiv her durumda bir kez dolaşılır.
+    """
+    with open_archive(archive_path) as archive:
+        for name, info in list_archive_members(archive, extensions):
+            if names is not None and name not in names:
+                continue
+            with archive.open(info) as stream:
+                yield name, stream
+
+
+def _write_member(archive, info, dest_path: str):
+    """Üyeyi akış halinde tmp dosyaya yazar, tamamlanınca atomik olarak yerine koyar."""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.{threading.get_ident()}.tmp"
+    try:
+        with archive.open(info) as source, open(tmp_path, 'wb') as target:
+            shutil.copyfileobj(source, target, ARCHIVE_COPY_BUFFER)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    record_file_in_inventory(dest_path)
+
+
+def extract_archive_members(archive_path: str, extract_to: str,
+                            extensions=ARCHIVE_MEMBER_EXTENSIONS) -> List[str]:
+    """
+    Filtrelenmiş üyeleri extract_to altına akış halinde yazar. Aynı boyutta zaten
+    var olan dosyalar atlanır; yarım dosya hedef adda görünmez (tmp + os.replace).
+
+    Returns:
+        Hedefteki dosya yolları
+    """
+    if not os.path.exists(archive_path):
+        raise FileNotFoundError(f"Arşiv dosyası bulunamadı: {archive_path}")
+
+    written = []
+    with open_archive(archive_path) as archive:
+        for name, info in list_archive_members(archive, extensions):
+            relative_path = _safe_relative_path(name)
+            if not relative_path:
+                continue
+            dest_path = os.path.join(extract_to, relative_path)
+            if os.path.exists(dest_path) and os.path.getsize(dest_path) == info.file_size:
+                written.append(dest_path)
+                continue
+
+            _write_member(archive, info, dest_path)
+            written.append(dest_path)
+    return written
+
+
+def _archive_signature(archive_path: str) -> Tuple[int, int]:
+    stat = os.stat(archive_path)
+    return stat.st_size, int(stat.st_mtime)
+
+
+@with_database
+def _get_extraction_record(cursor, archive_path: str) -> Optional[Dict]:
+    cursor.execute(
+        "SELECT boyut, mtime, hedef_klasor, dosya_sayisi FROM arsiv_cikarma WHERE arsiv_yolu = ?",
+        (archive_path,)
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return {"boyut": row[0], "mtime": row[1], "hedef_klasor": row[2], "dosya_sayisi": row[3]}
+
+
+@with_database
+def _save_extraction_record(cursor, archive_path: str, signature: Tuple[int, int],
+                            extract_to: str, file_count: int):
+    cursor.execute("""
+        INSERT INTO arsiv_cikarma (arsiv_yolu, boyut, mtime, hedef_klasor, dosya_sayisi)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(arsiv_yolu) DO UPDATE SET
+            boyut = excluded.boyut,
+            mtime = excluded.mtime,
+            hedef_klasor = excluded.hedef_klasor,
+            dosya_sayisi = excluded.dosya_sayisi,
+            extracted_at = CURRENT_TIMESTAMP
+    """, (archive_path, signature[0], signature[1], extract_to, file_count))
+
+
+def extract_archive_if_changed(archive_path: str, extract_to: str,
+                               extensions=ARCHIVE_MEMBER_EXTENSIONS) -> Dict:
+    """
+    Arşiv son açılıştan beri değişmediyse (boyut + mtime) açmaz.
+
+    Returns:
+        Dict: {"archive", "skipped", "files"} veya hata durumunda {"archive", "error"}
+    """
+    try:
+        signature = _archive_signature(archive_path)
+        record = _get_extraction_record(archive_path)
+        # with_database hata durumunda {"error", "success"} döndürür: kayıt yok sayılır
+        if isinstance(record, dict) and "error" in record:
+            record = None
+        if (record is not None and (record["boyut"], record["mtime"]) == signature
+                and record["hedef_klasor"] == extract_to):
+            return {"archive": archive_path, "skipped": True, "files": record["dosya_sayisi"]}
+
+        files = extract_archive_members(archive_path, extract_to, extensions)
+        _save_extraction_record(archive_path, signature, extract_to, len(files))
+        return {"archive": archive_path, "skipped": False, "files": len(files)}
+    except (zipfile.BadZipFile, rarfile.Error, ValueError, OSError) as e:
+        return {"archive": archive_path, "error": str(e)}
+
+
+def extract_archives_concurrently(jobs: List[Dict], max_workers: int = ARCHIVE_EXTRACT_WORKERS,
+                                  extensions=ARCHIVE_MEMBER_EXTENSIONS):
+    """
+    Arşivleri sınırlı thread havuzu ile paralel açar; her arşiv bittiğinde sonucu verir.
+
+    Args:
+        jobs: [{"path": arşiv yolu, "extract_to": hedef klasör, ...}] (ek alanlar sonuçla geri döner)
+
+    Yields:
+        Dict: {"job", "result", "completed", "total"}
+    """
+    if not jobs:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        pending = {
+            executor.submit(extract_archive_if_changed, job["path"], job["extract_to"], extensions): job
+            for job in jobs
+        }
+        completed = 0
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                completed += 1
+                yield {"job": job, "result": future.result(), "completed": completed, "total": len(jobs)}
+
+
+def member_ref(archive_path: str, name: str) -> str:
+    return f"{archive_path}{ARCHIVE_MEMBER_SEPARATOR}{name}"
+
+
+def split_member_ref(path: str) -> Optional[Tuple[str, str]]:
+    """Referans ise (arşiv yolu, üye adı), normal dosya yolu ise None döndürür."""
+    if ARCHIVE_MEMBER_SEPARATOR not in path:
+        return None
+    archive_path, name = path.split(ARCHIVE_MEMBER_SEPARATOR, 1)
+    if not archive_path.lower().endswith(ARCHIVE_EXTENSIONS):
+        return None
+    return archive_path, name
+
+
+def member_extract_path(archive_path: str, name: str) -> Optional[str]:
+    """Üyenin açıldığında yazılacağı yol (extract_archive_members ile aynı düzen)."""
+    relative_path = _safe_relative_path(name)
+    return os.path.join(os.path.dirname(archive_path), relative_path) if relative_path else None
+
+
+def list_archive_documents(archive_path: str, extensions=ARCHIVE_MEMBER_EXTENSIONS) -> List[Tuple[str, Optional[str]]]:
+    """Arşivdeki belgeler için (referans, açılınca oluşacak yol) listesi. Hiçbir üye açılmaz."""
+    with open_archive(archive_path) as archive:
+        return [(member_ref(archive_path, name), member_extract_path(archive_path, name))
+                for name, _ in list_archive_members(archive, extensions)]
+
+
+def _find_member(archive, name: str):
+    for member_name, info in list_archive_members(archive, extensions=('',)):
+        if member_name == name:
+            return info
+    raise KeyError(f"Arşivde bulunamadı: {name}")
+
+
+def read_archive_member(archive_path: str, name: str) -> bytes:
+    """Tek üyeyi diske yazmadan belleğe okur."""
+    with open_archive(archive_path) as archive:
+        with archive.open(_find_member(archive, name)) as stream:
+            return stream.read()
+
+
+def materialize_archive_member(ref: str) -> str:
+    """
+    Referanstaki üyeyi arşivin yanına açar (zaten açıksa tekrar yazmaz) ve gerçek
+    dosya yolunu döndürür.
+    """
+    archive_path, name = split_member_ref(ref)
+    dest_path = member_extract_path(archive_path, name)
+    if not dest_path:
+        raise ValueError(f"Geçersiz arşiv üyesi: {ref}")
+    with open_archive(archive_path) as archive:
+        info = _find_member(archive, name)
+        if not (os.path.exists(dest_path) and os.path.getsize(dest_path) == info.file_size):
+            _write_member(archive, info, dest_path)
+    return dest_path
+
+
+def resolve_document_path(path: str) -> str:
+    """Normal yolları olduğu gibi, arşiv referanslarını açılmış dosya yolu olarak döndürür."""
+    return materialize_archive_member(path) if split_member_ref(path) else path
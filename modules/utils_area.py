@@ -0,0 +1,265 @@
+"""
+modules/utils_area.py - Alan Adı Çözümleyici
+
+Scraper'lar (get_dbf, get_bom, get_cop, get_dm) her link için alan adını
+veritabanındaki alanla eşleştirir ve MEB alan ID'sini arar. Bu modül
+temel_plan_alan tablosunu süreç başına bir kez belleğe yükler; aramalar
+SQLite'a gitmeden cevaplanır.
+
+- AreaResolver: alan kayıtlarını normalize_match_key_tr anahtarıyla ve
+  MEB ID'siyle indeksler. MEB sitesindeki alan listesi (get_meb_alan_ids)
+  eklendiğinde listedeki adlar da aynı MEB ID'li alanın takma adı olur.
+  match(), eski find_matching_area_id kurallarını (tam eşleşme, protokol
+  önceliği, kısmi eşleşme) bellekteki anahtarlar üzerinde uygular; sonuçlar
+  sorgu anahtarına göre hatırlanır.
+- Geçersiz kılma: temel_plan_alan tablo sürümü (bump_table_versions)
+  değişince yeniden yüklenir. get_or_create_alan / MEB ID güncellemeleri
+  kaydı yerinde günceller (note_area), toplu yazan yollar
+  invalidate_area_resolver() çağırır. Yerinde işlenen kayıtlar commit
+  edilmemiş olabilir: yeniden yüklenene kadar "doğrulanmamış" sayılır ve
+  with_database rollback'inde çözümleyici atılır.
+
+İçerdiği fonksiyonlar:
+- get_area_resolver: Güncel AreaResolver'ı döndürür (gerekirse yükler)
+- note_area: Yazılan alan kaydını çözümleyiciye işler
+- invalidate_area_resolver: Çözümleyiciyi bir sonraki aramada yeniden yükletir
+- find_matching_area_id: Alan adını (alan_id, meb_alan_id, matched_name) olarak çözer
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from .utils_normalize import normalize_match_key_tr
+    from .utils_cache import get_table_versions
+    from .utils_database import with_database
+except ImportError:
+    from utils_normalize import normalize_match_key_tr
+    from utils_cache import get_table_versions
+    from utils_database import with_database
+
+PROTOKOL_SUFFIX = re.compile(r'\s*-\s*protokol\s*$', re.IGNORECASE)
+
+
+class AreaRecord(NamedTuple):
+    id: int
+    alan_adi: str
+    meb_alan_id: Optional[str]
+    key: str
+    is_protokol: bool
+
+
+def area_key(alan_adi: str) -> str:
+    """Alan adının karşılaştırma anahtarı ("Bilişim Teknolojileri - Protokol" -> "bilisim teknolojileri protokol")."""
+    return normalize_match_key_tr(alan_adi.strip() if alan_adi else '')
+
+
+def base_area_name(alan_adi: str) -> str:
+    """Protokol ekini atar: "Denizcilik - Protokol" -> "Denizcilik"."""
+    return PROTOKOL_SUFFIX.sub('', alan_adi or '').strip()
+
+
+def _is_protokol_key(key: str) -> bool:
+    return 'protokol' in key.split()
+
+
+class AreaResolver:
+    """temel_plan_alan kayıtları üzerinde bellek içi ad ve MEB ID araması."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str]]] = ()):
+        """rows: (id, alan_adi, meb_alan_id) kayıtları"""
+        self._lock = threading.RLock()
+        self.records: Dict[int, AreaRecord] = {}
+        self.by_name: Dict[str, int] = {}
+        self.by_key: Dict[str, int] = {}
+        self.aliases: Dict[str, int] = {}
+        self.by_meb_id: Dict[str, List[int]] = {}
+        self.meb_names: Dict[str, str] = {}
+        self._meb_listing_id = None
+        self._match_memo: Dict[str, Optional[int]] = {}
+        # note() ile işlenen kayıtlar: transaction'ları geri alınmış olabilir
+        self.uncommitted: Set[int] = set()
+        for area_id, alan_adi, meb_alan_id in sorted(rows, key=lambda row: row[0]):
+            self._index(area_id, alan_adi, meb_alan_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _index(self, area_id: int, alan_adi: str, meb_alan_id: Optional[str]) -> AreaRecord:
+        old = self.records.get(area_id)
+        if old and old.meb_alan_id and area_id in self.by_meb_id.get(old.meb_alan_id, []):
+            self.by_meb_id[old.meb_alan_id].remove(area_id)
+        key = area_key(alan_adi)
+        record = AreaRecord(area_id, alan_adi, meb_alan_id, key, _is_protokol_key(key))
+        self.records[area_id] = record
+        self.by_name[alan_adi] = area_id
+        # Aynı anahtara düşen mükerrer kayıtlarda en eski kayıt kullanılır
+        self.by_key.setdefault(key, area_id)
+        if meb_alan_id:
+            self.by_meb_id.setdefault(meb_alan_id, []).append(area_id)
+        return record
+
+    def note(self, area_id: int, alan_adi: str, meb_alan_id: Optional[str]) -> AreaRecord:
+        """Yeni/güncellenen kaydı işler; hatırlanan eşleşmeler silinir."""
+        with self._lock:
+            record = self._index(area_id, alan_adi, meb_alan_id)
+            self.uncommitted.add(area_id)
+            self._match_memo.clear()
+            self._meb_listing_id = None
+            return record
+
+    def forget(self, area_id: int) -> None:
+        """Veritabanında bulunmayan (geri alınmış) kaydı çıkarır."""
+        with self._lock:
+            record = self.records.pop(area_id, None)
+            if record is None:
+                return
+            for index in (self.by_name, self.by_key, self.aliases):
+                for name in [name for name, value in index.items() if value == area_id]:
+                    del index[name]
+            if record.meb_alan_id and area_id in self.by_meb_id.get(record.meb_alan_id, []):
+                self.by_meb_id[record.meb_alan_id].remove(area_id)
+            self.uncommitted.discard(area_id)
+            self._match_memo.clear()
+
+    def is_committed(self, area_id: int) -> bool:
+        """Kayıt veritabanından okunduysa True (yerinde işlenen kayıt henüz doğrulanmadı)."""
+        return area_id not in self.uncommitted
+
+    def lookup(self, alan_adi: str) -> Optional[AreaRecord]:
+        """Tam eşleşme: kayıtlı ad, normalize anahtar veya MEB listesindeki takma ad."""
+        if not alan_adi:
+            return None
+        area_id = self.by_name.get(alan_adi)
+        if area_id is None:
+            key = area_key(alan_adi)
+            area_id = self.by_key.get(key, self.aliases.get(key))
+        return self.records.get(area_id) if area_id is not None else None
+
+    def match(self, alan_adi: str) -> Optional[AreaRecord]:
+        """
+        HTML'den gelen alan adını eşleştirir: tam eşleşme, sonra kısmi eşleşme.
+        Protokol alanı aranıyorsa protokol kayıtları, değilse normal kayıtlar önceliklidir.
+        """
+        record = self.lookup(alan_adi)
+        if record:
+            return record
+        key = area_key(alan_adi)
+        if not key:
+            return None
+        with self._lock:
+            if key in self._match_memo:
+                area_id = self._match_memo[key]
+                return self.records.get(area_id) if area_id is not None else None
+
+            is_protokol = _is_protokol_key(key)
+            candidates = [r for r in sorted(self.records.values(), key=lambda r: r.alan_adi)
+                          if key in r.key or r.key in key]
+            preferred = [r for r in candidates if r.is_protokol == is_protokol]
+            found = (preferred or candidates or [None])[0]
+            self._match_memo[key] = found.id if found else None
+            return found
+
+    def set_meb_listing(self, meb_alan_ids: Dict[str, str]) -> None:
+        """
+        MEB sitesindeki {alan_adi: meb_alan_id} listesini ekler. Listedeki ad
+        veritabanındaki addan farklıysa, aynı MEB ID'li normal alanın takma adı olur.
+        """
+        if not meb_alan_ids:
+            return
+        with self._lock:
+            if self._meb_listing_id == id(meb_alan_ids) and len(self.meb_names) >= len(meb_alan_ids):
+                return
+            self.meb_names = {area_key(name): meb_id for name, meb_id in meb_alan_ids.items()}
+            self.aliases = {}
+            for key, meb_id in self.meb_names.items():
+                if key in self.by_key:
+                    continue
+                area_ids = [area_id for area_id in self.by_meb_id.get(meb_id, [])
+                            if not self.records[area_id].is_protokol]
+                if area_ids:
+                    self.aliases[key] = area_ids[0]
+            self._meb_listing_id = id(meb_alan_ids)
+            self._match_memo.clear()
+
+    def meb_id_from_listing(self, alan_adi: str) -> Tuple[Optional[str], str]:
+        """
+        MEB listesinden MEB ID: ad birebir yoksa protokol alanı için ana alanın ID'si.
+        Returns: (meb_alan_id, source) - source: 'cache', 'cache_protokol', 'none'
+        """
+        key = area_key(alan_adi)
+        if key in self.meb_names:
+            return self.meb_names[key], 'cache'
+        base_key = area_key(base_area_name(alan_adi))
+        if base_key != key and base_key in self.meb_names:
+            return self.meb_names[base_key], 'cache_protokol'
+        return None, 'none'
+
+    def area_for_meb_id(self, meb_alan_id: str, protokol: bool = False) -> Optional[AreaRecord]:
+        """MEB ID'li (protokol veya normal) ilk alan kaydı."""
+        for area_id in self.by_meb_id.get(meb_alan_id, []):
+            record = self.records[area_id]
+            if record.is_protokol == protokol:
+                return record
+        return None
+
+
+_resolver: Optional[AreaResolver] = None
+_resolver_versions = None
+_resolver_lock = threading.Lock()
+
+
+@with_database
+def _load_area_rows(cursor) -> List[Tuple[int, str, Optional[str]]]:
+    cursor.execute("SELECT id, alan_adi, meb_alan_id FROM temel_plan_alan")
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def get_area_resolver(cursor=None) -> AreaResolver:
+    """
+    Çözümleyiciyi döndürür. temel_plan_alan sürümü değişmediyse bellekteki
+    kayıtlar kullanılır. cursor verilmezse yükleme kendi bağlantısıyla yapılır;
+    yüklenemezse boş (önbelleğe alınmayan) bir çözümleyici döner.
+    """
+    global _resolver, _resolver_versions
+    with _resolver_lock:
+        versions = get_table_versions('temel_plan_alan')
+        if _resolver is not None and versions == _resolver_versions:
+            return _resolver
+        if cursor is not None:
+            cursor.execute("SELECT id, alan_adi, meb_alan_id FROM temel_plan_alan")
+            rows = [tuple(row) for row in cursor.fetchall()]
+        else:
+            rows = _load_area_rows()
+            if isinstance(rows, dict):
+                return AreaResolver()
+        _resolver = AreaResolver(rows)
+        _resolver_versions = versions
+        return _resolver
+
+
+def note_area(area_id: int, alan_adi: str, meb_alan_id: Optional[str]) -> None:
+    """Alan yazıldıktan sonra çağrılır; çözümleyici yüklüyse kaydı yerinde günceller."""
+    resolver = _resolver
+    if resolver is not None:
+        resolver.note(area_id, alan_adi, meb_alan_id)
+
+
+def invalidate_area_resolver() -> None:
+    """Toplu alan yazımlarından sonra çağrılır; bir sonraki arama yeniden yükler."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
+
+
+def find_matching_area_id(html_area_name: str, cursor=None) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """
+    HTML'den gelen alan adını veritabanındaki alanla eşleştirir.
+    Returns: (alan_id, meb_alan_id, matched_name) veya (None, None, None)
+    """
+    record = get_area_resolver(cursor).match(html_area_name)
+    if record is None:
+        print(f"Eşleşme bulunamadı: '{html_area_name}'")
+        return None, None, None
+    return record.id, record.meb_alan_id, record.alan_adi
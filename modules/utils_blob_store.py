@@ -0,0 +1,220 @@
+"""
+modules/utils_blob_store.py - İçerik Adresli Dosya Deposu
+
+ÇÖP, DBF, DM ve BÖM dosyalarının içeriği data/blobs/<ilk 2 hex>/<sha256><uzantı>
+altında tek kopya olarak saklanır. Alışılmış klasör yapısı
+(data/<tip>/<meb_id>_<alan>/<dosya>) bu blob'lara hard link'lerden oluşan hafif
+bir görünümdür; dosya yolunu açan mevcut kod (oku_cop, oku_dbf, /api/files)
+değişmeden çalışır.
+
+Metadata dosya_hash tablosunda tutulur: görünüm yolu -> sha256 + (tip, alan klasörü,
+ek bilgi/sınıf, kaynak URL). Blob'lar dosya_blob tablosundadır.
+Duplicate kontrolü klasör listelemek yerine birincil anahtar sorgusudur.
+
+İçerdiği fonksiyonlar:
+- blob_path: sha256 + uzantıdan blob yolunu üretir
+- store_blob_file: Hash'i bilinen geçici dosyayı depoya taşır (varsa atar)
+- find_blob_for_url: Aynı URL'nin blob'unu bulur (ağa çıkmadan bağlamak için)
+- link_view: Blob'u klasör görünümüne bağlar ve metadata'yı kaydeder
+- import_existing_files: Mevcut data/<tip>/ dosyalarını depoya alır, kopyaları link'e çevirir
+- restore_folder_views: Silinmiş görünüm link'lerini metadata'dan yeniden oluşturur
+- find_duplicate_groups: Birden fazla yerde kullanılan blob'lar
+- gc_blobs: Hiçbir görünümün kullanmadığı blob'ları siler
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .utils_file_hash import hash_file, link_file, register_file_hash, HASHED_CACHE_TYPES, HASHED_EXTENSIONS
+    from .utils_stats import record_file_in_inventory, remove_file_from_inventory
+except ImportError:
+    from utils_file_hash import hash_file, link_file, register_file_hash, HASHED_CACHE_TYPES, HASHED_EXTENSIONS
+    from utils_stats import record_file_in_inventory, remove_file_from_inventory
+
+BLOB_ROOT = os.path.join("data", "blobs")
+
+
+def blob_tmp_dir() -> str:
+    """İndirmelerin yazıldığı geçici klasör (blob'larla aynı dosya sisteminde, os.replace atomik)."""
+    path = os.path.join(BLOB_ROOT, "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def blob_path(sha256: str, uzanti: str) -> str:
+    return os.path.join(BLOB_ROOT, sha256[:2], f"{sha256}{uzanti.lower()}")
+
+
+def _register_blob(cursor, sha256: str, boyut: int, uzanti: str):
+    cursor.execute(
+        "INSERT OR IGNORE INTO dosya_blob (sha256, boyut, uzanti) VALUES (?, ?, ?)",
+        (sha256, boyut, uzanti.lower())
+    )
+
+
+def store_blob_file(tmp_path: str, sha256: str, uzanti: str) -> str:
+    """
+    Hash'i hesaplanmış geçici dosyayı depoya taşır. Aynı blob zaten varsa geçici
+    dosya silinir (O(1) varlık kontrolü). Blob yolunu döndürür.
+    """
+    target = blob_path(sha256, uzanti)
+    if os.path.exists(target):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+        record_file_in_inventory(target)
+    return target
+
+
+def find_blob_for_url(cursor, url: str) -> Optional[str]:
+    """Aynı URL'den daha önce indirilmiş ve diskte duran blob'un yolunu döndürür."""
+    cursor.execute("""
+        SELECT b.sha256, b.uzanti FROM dosya_hash h
+        JOIN dosya_blob b ON b.sha256 = h.sha256
+        WHERE h.kaynak_url = ? LIMIT 1
+    """, (url,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    path = blob_path(row[0], row[1])
+    return path if os.path.exists(path) else None
+
+
+def link_view(cursor, blob: str, view_path: str, sha256: str, boyut: int,
+              cache_type: Optional[str] = None, alan_klasoru: Optional[str] = None,
+              ek_bilgi: Optional[str] = None, url: Optional[str] = None) -> str:
+    """
+    Blob'u klasör görünümündeki yola bağlar (hard link, desteklenmiyorsa kopya) ve
+    görünüm + blob metadata'sını kaydeder. Kullanılan yöntemi döndürür.
+    """
+    method = 'existing'
+    if not os.path.exists(view_path):
+        os.makedirs(os.path.dirname(view_path) or '.', exist_ok=True)
+        method = link_file(blob, view_path)
+        record_file_in_inventory(view_path)
+    _register_blob(cursor, sha256, boyut, os.path.splitext(blob)[1])
+    register_file_hash(cursor, view_path, sha256, boyut, cache_type, url)
+    cursor.execute(
+        "UPDATE dosya_hash SET alan_klasoru = COALESCE(?, alan_klasoru), ek_bilgi = COALESCE(?, ek_bilgi) WHERE dosya_yolu = ?",
+        (alan_klasoru, ek_bilgi, os.path.normpath(view_path).replace(os.sep, '/'))
+    )
+    return method
+
+
+def import_existing_files(cursor, data_root: str = "data",
+                          cache_types=HASHED_CACHE_TYPES) -> Dict[str, int]:
+    """
+    data/<tip>/ altındaki dosyaları depoya alır: içerik blob olarak saklanır, klasördeki
+    dosya blob'a hard link ile değiştirilir. Aynı içeriğin diğer kopyaları aynı blob'a
+    bağlandığı için disk kullanımı düşer. Zaten blob'a bağlı dosyalar atlanır.
+
+    Returns:
+        Dict: {"imported", "already_linked", "bytes_saved"}
+    """
+    stats = {"imported": 0, "already_linked": 0, "bytes_saved": 0}
+    cursor.execute("""
+        SELECT h.dosya_yolu, b.sha256, b.uzanti FROM dosya_hash h
+        JOIN dosya_blob b ON b.sha256 = h.sha256
+    """)
+    known_blobs = {row[0]: blob_path(row[1], row[2]) for row in cursor.fetchall()}
+
+    for cache_type in cache_types:
+        root = os.path.join(data_root, cache_type)
+        if not os.path.isdir(root):
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                ext = os.path.splitext(filename)[1].lower()
+                if ext not in HASHED_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, filename)
+                known = known_blobs.get(os.path.normpath(path).replace(os.sep, '/'))
+                if known and os.path.exists(known) and os.path.samefile(known, path):
+                    # Aynı inode: içerik blob'dan değişmemiş, tekrar hash'lemeye gerek yok
+                    stats["already_linked"] += 1
+                    continue
+                sha256, size = hash_file(path)
+                target = blob_path(sha256, ext)
+                alan_klasoru = os.path.relpath(dirpath, root).split(os.sep)[0]
+
+                if os.path.exists(target) and os.path.samefile(target, path):
+                    stats["already_linked"] += 1
+                elif os.path.exists(target):
+                    # İçerik zaten depoda: bu kopyayı blob'a link ile değiştir
+                    tmp_path = path + '.link.tmp'
+                    if link_file(target, tmp_path) == 'hardlink':
+                        stats["bytes_saved"] += size
+                    os.replace(tmp_path, path)
+                    stats["imported"] += 1
+                else:
+                    # İlk kopya: blob olarak bağla (dosya yerinde kalır, aynı inode)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    link_file(path, target)
+                    record_file_in_inventory(target)
+                    stats["imported"] += 1
+
+                link_view(cursor, target, path, sha256, size, cache_type, alan_klasoru)
+    return stats
+
+
+def restore_folder_views(cursor, cache_type: Optional[str] = None) -> Dict[str, int]:
+    """Metadata'da olup diskte olmayan görünüm dosyalarını blob'lardan yeniden bağlar."""
+    stats = {"restored": 0, "missing_blob": 0}
+    query = """
+        SELECT h.dosya_yolu, b.sha256, b.uzanti FROM dosya_hash h
+        JOIN dosya_blob b ON b.sha256 = h.sha256
+    """
+    params: Tuple = ()
+    if cache_type:
+        query += " WHERE h.cache_type = ?"
+        params = (cache_type,)
+    cursor.execute(query, params)
+    for view_path, sha256, uzanti in cursor.fetchall():
+        if os.path.exists(view_path):
+            continue
+        blob = blob_path(sha256, uzanti)
+        if not os.path.exists(blob):
+            stats["missing_blob"] += 1
+            continue
+        os.makedirs(os.path.dirname(view_path) or '.', exist_ok=True)
+        link_file(blob, view_path)
+        record_file_in_inventory(view_path)
+        stats["restored"] += 1
+    return stats
+
+
+def find_duplicate_groups(cursor, cache_type: Optional[str] = None) -> List[Dict]:
+    """Aynı blob'u paylaşan görünüm yolları (idx_dosya_hash_sha256 üzerinden gruplama)."""
+    query = "SELECT sha256, COUNT(*), GROUP_CONCAT(dosya_yolu, '|') FROM dosya_hash"
+    params: Tuple = ()
+    if cache_type:
+        query += " WHERE cache_type = ?"
+        params = (cache_type,)
+    query += " GROUP BY sha256 HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC"
+    cursor.execute(query, params)
+    return [{"sha256": sha256, "count": count, "paths": paths.split('|')}
+            for sha256, count, paths in cursor.fetchall()]
+
+
+def gc_blobs(cursor) -> Dict[str, int]:
+    """Görünüm kaydı kalmayan blob'ları ve kayıtlarını siler."""
+    stats = {"removed": 0, "bytes_freed": 0}
+    # Önce diskten silinmiş görünümlerin kayıtlarını temizle
+    cursor.execute("SELECT dosya_yolu FROM dosya_hash")
+    stale = [row[0] for row in cursor.fetchall() if not os.path.exists(row[0])]
+    cursor.executemany("DELETE FROM dosya_hash WHERE dosya_yolu = ?", [(path,) for path in stale])
+    cursor.execute("""
+        SELECT sha256, uzanti, boyut FROM dosya_blob
+        WHERE sha256 NOT IN (SELECT sha256 FROM dosya_hash)
+    """)
+    for sha256, uzanti, boyut in cursor.fetchall():
+        path = blob_path(sha256, uzanti)
+        if os.path.exists(path):
+            os.remove(path)
+            remove_file_from_inventory(path)
+            stats["bytes_freed"] += boyut
+        cursor.execute("DELETE FROM dosya_blob WHERE sha256 = ?", (sha256,))
+        stats["removed"] += 1
+    return stats
@@ -0,0 +1,238 @@
+"""
+modules/utils_cache.py - Okuma Cache Katmanı
+
+Bu modül, Flask okuma endpoint'leri için sürüm etiketli (versioned) bir
+read-through cache sağlar.
+
+Mantık:
+- Her cache kaydı endpoint + parametre anahtarı ile saklanır
+- Kayıt oluşturulurken bağlı olduğu tabloların sürüm sayaçları kaydedilir
+- Yazma yolları bump_table_versions() ile ilgili tabloların sürümünü artırır
+- Okumada sürümler değişmişse kayıt geçersiz sayılır (stale) ve yeniden üretilir
+- Boyut sınırlıdır, en az kullanılan kayıt (LRU) atılır
+
+İçerdiği fonksiyonlar:
+- bump_table_versions: Yazma sonrası tablo sürümlerini artırır
+- get_table_versions: Güncel tablo sürümlerini döndürür
+- cached_endpoint: Flask endpoint'leri için cache decorator'ı
+- invalidates_tables: Yazma endpoint'leri için commit sonrası sürüm artırma decorator'ı
+- get_cache_stats: Hit/miss metrikleri
+- clear_read_cache: Cache'i tamamen temizler
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Tuple
+
+# Uygulamadaki tüm tablolar - "hepsini geçersiz kıl" durumları için
+ALL_TABLES = (
+    'temel_plan_alan',
+    'temel_plan_dal',
+    'temel_plan_ders',
+    'temel_plan_ders_dal',
+    'temel_plan_ogrenme_birimi',
+    'temel_plan_konu',
+    'temel_plan_kazanim',
+    'files',  # data/ altındaki indirilen dosyalar (istatistikler için)
+)
+
+# Öğrenme birimi hiyerarşisi - save/import işlemleri hep birlikte yazar
+LEARNING_UNIT_TABLES = (
+    'temel_plan_ogrenme_birimi',
+    'temel_plan_konu',
+    'temel_plan_kazanim',
+)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class VersionedReadCache:
+    """
+    Tablo sürüm sayaçlarıyla etiketlenmiş, boyutu sınırlı LRU cache.
+    Thread-safe'tir; Flask'ın threaded sunucusunda güvenle kullanılabilir.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def bump(self, *tables: str) -> None:
+        """Verilen tabloların sürüm sayaçlarını artırır."""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            self._invalidations += 1
+
+    def versions_for(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Tabloların güncel sürümlerini tuple olarak döndürür."""
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def get(self, key, tables: Tuple[str, ...]):
+        """
+        Cache'den kayıt döndürür. Kayıt yoksa veya tablo sürümleri değişmişse None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            current = tuple(self._versions.get(table, 0) for table in tables)
+            if entry['versions'] != current:
+                # Tablo yazılmış - kayıt bayat
+                del self._entries[key]
+                self._stale += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry['value']
+
+    def put(self, key, value, versions: Tuple[int, ...]) -> None:
+        """
+        Kaydı cache'e ekler. versions, değerin üretimine başlamadan önce alınmış
+        sürümler olmalıdır; böylece üretim sırasında gelen yazmalar kaydı bayatlatır.
+        """
+        with self._lock:
+            self._entries[key] = {
+                'value': value,
+                'versions': versions,
+                'created_at': time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'stale': self._stale,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'table_versions': dict(self._versions)
+            }
+
+
+# Global instance - süreç genelinde tek cache
+_read_cache = VersionedReadCache()
+
+
+def bump_table_versions(*tables: str) -> None:
+    """
+    Yazma işlemlerinden sonra çağrılır. Tablo verilmezse tüm tablolar geçersiz olur.
+
+    Usage:
+        bump_table_versions('temel_plan_ders', 'temel_plan_ders_dal')
+    """
+    _read_cache.bump(*(tables or ALL_TABLES))
+
+
+def get_table_versions(*tables: str) -> Tuple[int, ...]:
+    """Tabloların güncel sürüm sayaçlarını döndürür."""
+    return _read_cache.versions_for(tables or ALL_TABLES)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit-rate dahil cache metriklerini döndürür."""
+    return _read_cache.stats()
+
+
+def clear_read_cache() -> None:
+    """Tüm cache kayıtlarını siler (sayaçlar korunur)."""
+    _read_cache.clear()
+
+
+def _is_cacheable(response) -> bool:
+    """Sadece başarılı ve hata içermeyen JSON yanıtları cache'lenir."""
+    if getattr(response, 'status_code', None) != 200:
+        return False
+    payload = response.get_json(silent=True)
+    if isinstance(payload, dict) and 'error' in payload:
+        return False
+    return True
+
+
+def cached_endpoint(*tables: str) -> Callable:
+    """
+    Flask okuma endpoint'leri için read-through cache decorator'ı.
+
+    Anahtar: endpoint yolu + sıralı query parametreleri.
+    Etiket: verilen tabloların sürüm sayaçları.
+
+    @app.route'un altına, @with_database_json'ın üstüne konur:
+
+        @app.route('/api/alan-dal-options')
+        @cached_endpoint('temel_plan_alan', 'temel_plan_dal')
+        @with_database_json
+        def get_alan_dal_options(cursor):
+            ...
+    """
+    tag_tables = tuple(tables) or ALL_TABLES
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from flask import Response, request
+
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+
+            cached = _read_cache.get(key, tag_tables)
+            if cached is not None:
+                body, status, mimetype = cached
+                return Response(body, status=status, mimetype=mimetype)
+
+            # Sürümleri üretimden ÖNCE al (yarış durumunda kayıt bayat kalır)
+            versions = _read_cache.versions_for(tag_tables)
+            result = func(*args, **kwargs)
+
+            if isinstance(result, Response) and _is_cacheable(result):
+                _read_cache.put(key, (result.get_data(), result.status_code, result.mimetype), versions)
+
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidates_tables(*tables: str) -> Callable:
+    """
+    Yazma endpoint'leri için decorator. Fonksiyon (ve altındaki
+    @with_database_json commit'i) bittikten SONRA tablo sürümlerini artırır;
+    böylece commit öncesi okunan veri yeni sürümle cache'lenemez.
+
+        @app.route('/api/save', methods=['POST'])
+        @invalidates_tables('temel_plan_ders')
+        @with_database_json
+        def save(cursor):
+            ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                bump_table_versions(*tables)
+        return wrapper
+    return decorator
@@ -0,0 +1,297 @@
+"""
+modules/utils_conversion_service.py - DOC/DOCX → PDF Dönüşüm Servisi
+
+/api/convert-docx-to-pdf isteği dönüşümü beklemez: önbellekte PDF yoksa iş kuyruğa
+alınır ve istemciye görev kimliği döner (/api/conversions/<id> ile sorgulanır).
+
+- Sabit sayıda işçi thread'i; her işçinin kendi LibreOffice kullanıcı profili vardır.
+  Profiller servis açılırken bir kez ısıtılır (ilk çalıştırmadaki profil kurulumu her
+  dönüşümde tekrarlanmaz) ve eşzamanlı soffice süreçleri profil kilidinde çakışmaz.
+- Öncelikli kuyruk: kullanıcının açtığı belge (INTERACTIVE) toplu ön dönüşümün
+  (BATCH) önüne geçer; kuyruktaki toplu iş etkileşimli istenirse önceliği yükselir.
+- Aynı dosya için devam eden dönüşüm varsa yeni iş açılmaz, mevcut görev döner.
+- convert_dbf_tree: data/dbf altındaki tüm DOC/DOCX'leri (arşiv üyeleri dahil)
+  arka plan işi olarak ön dönüştürür.
+"""
+
+import heapq
+import itertools
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from .utils_docx_to_pdf import get_converter, cleanup_legacy_conversions
+    from .utils_archive import resolve_document_path, split_member_ref, member_extract_path
+except ImportError:
+    from utils_docx_to_pdf import get_converter, cleanup_legacy_conversions
+    from utils_archive import resolve_document_path, split_member_ref, member_extract_path
+
+CONVERSION_WORKERS = int(os.getenv('MEB_CONVERT_WORKERS', '2'))
+CONVERSION_PROFILE_ROOT = os.path.join('data', 'lo_profiles')
+INTERACTIVE_PRIORITY = 0
+BATCH_PRIORITY = 10
+# Bellekte tutulan bitmiş görev sayısı (durum sorguları için)
+MAX_FINISHED_TASKS = 500
+# Toplu dönüşüm beklerken bu aralıkla mesaj verilir (iş iptali mesaj arasında görülür)
+BATCH_HEARTBEAT_INTERVAL = 5.0
+
+
+class ConversionTask:
+    """Tek belgenin dönüşüm durumu; wait() ile bitişi beklenebilir."""
+
+    def __init__(self, doc_path: str, priority: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.doc_path = doc_path
+        self.priority = priority
+        self.status = 'queued'  # queued, running, done, failed, cancelled
+        self.pdf_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.message: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        self._done.set()
+
+    def to_dict(self) -> Dict:
+        return {
+            'task_id': self.id,
+            'doc_path': self.doc_path,
+            'status': self.status,
+            'pdf_path': self.pdf_path,
+            'error': self.error,
+            'message': self.message,
+        }
+
+
+class ConversionService:
+    def __init__(self, workers: int = CONVERSION_WORKERS, profile_root: str = CONVERSION_PROFILE_ROOT,
+                 convert=None):
+        self.workers = max(1, workers)
+        self.profile_root = profile_root
+        # convert(doc_path, profile_dir) -> (success, pdf_path, error)
+        self._convert = convert or (lambda doc_path, profile_dir:
+                                    get_converter().convert_to_pdf(doc_path, profile_dir=profile_dir))
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._inflight: Dict[str, ConversionTask] = {}
+        self._tasks: Dict[str, ConversionTask] = {}
+        self._threads: List[threading.Thread] = []
+        self._stats = {'converted': 0, 'failed': 0, 'deduplicated': 0}
+
+    def submit(self, doc_path: str, priority: int = INTERACTIVE_PRIORITY) -> ConversionTask:
+        """Dönüşümü kuyruğa alır; aynı dosya zaten kuyrukta/işleniyorsa o görevi döndürür."""
+        key = os.path.normpath(doc_path)
+        with self._cond:
+            task = self._inflight.get(key)
+            if task:
+                self._stats['deduplicated'] += 1
+                if task.status == 'queued' and priority < task.priority:
+                    # Daha acil istek: aynı görevi öne al (eski heap girdisi atlanır)
+                    task.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._counter), task))
+                    self._cond.notify()
+                return task
+
+            task = ConversionTask(doc_path, priority)
+            self._inflight[key] = task
+            self._tasks[task.id] = task
+            heapq.heappush(self._heap, (priority, next(self._counter), task))
+            self._ensure_workers()
+            self._cond.notify()
+            return task
+
+    def get_task(self, task_id: str) -> Optional[ConversionTask]:
+        with self._cond:
+            return self._tasks.get(task_id)
+
+    def cancel(self, task: ConversionTask, min_priority: int = INTERACTIVE_PRIORITY) -> bool:
+        """
+        Henüz başlamamış görevi iptal eder. min_priority verilirse önceliği bundan
+        yüksek (sayıca küçük) görevler iptal edilmez: toplu iş iptal edilirken
+        kullanıcının istediği (önceliği yükseltilmiş) dönüşüm sürer.
+        """
+        with self._cond:
+            if task.status != 'queued' or task.priority < min_priority:
+                return False
+            self._inflight.pop(os.path.normpath(task.doc_path), None)
+            task._finish('cancelled')
+            return True
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            queued = sum(1 for task in self._inflight.values() if task.status == 'queued')
+            running = sum(1 for task in self._inflight.values() if task.status == 'running')
+            return {'workers': len(self._threads), 'queued': queued, 'running': running, **self._stats}
+
+    def _ensure_workers(self):
+        # _cond tutulurken çağrılır; işçiler ilk işte başlatılır
+        while len(self._threads) < self.workers:
+            index = len(self._threads)
+            thread = threading.Thread(target=self._worker_loop, args=(index,),
+                                      name=f"docx-convert-{index}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self) -> ConversionTask:
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, task = heapq.heappop(self._heap)
+                    # İptal edilmiş veya önceliği yükseltilmiş görevin eski girdisi
+                    if task.status == 'queued' and priority == task.priority:
+                        task.status = 'running'
+                        return task
+                self._cond.wait()
+
+    def _worker_loop(self, index: int):
+        profile_dir = os.path.join(self.profile_root, f"worker_{index}")
+        warm_up_profile(profile_dir)
+        while True:
+            task = self._next_task()
+            try:
+                success, pdf_path, error = self._convert(resolve_document_path(task.doc_path), profile_dir)
+            except Exception as e:
+                success, pdf_path, error = False, '', str(e)
+
+            with self._cond:
+                self._inflight.pop(os.path.normpath(task.doc_path), None)
+                if success:
+                    task.pdf_path = pdf_path
+                    task.message = error or None  # PyMuPDF fallback uyarısı
+                    self._stats['converted'] += 1
+                    task._finish('done')
+                else:
+                    task.error = error
+                    self._stats['failed'] += 1
+                    task._finish('failed')
+                self._prune_finished()
+
+    def _prune_finished(self):
+        finished = [task for task in self._tasks.values() if task.finished]
+        if len(finished) <= MAX_FINISHED_TASKS:
+            return
+        finished.sort(key=lambda task: task.finished_at)
+        for task in finished[:len(finished) - MAX_FINISHED_TASKS]:
+            self._tasks.pop(task.id, None)
+
+
+def warm_up_profile(profile_dir: str, timeout: int = 60) -> bool:
+    """
+    İşçinin LibreOffice profilini bir kez oluşturur. Profil kurulumu soğuk açılışın
+    en pahalı kısmıdır; sonraki dönüşümler hazır profil ile başlar.
+    """
+    if os.path.isdir(os.path.join(profile_dir, 'user')):
+        return True
+    libreoffice_cmd = shutil.which('libreoffice') or shutil.which('soffice')
+    if not libreoffice_cmd:
+        return False
+    os.makedirs(profile_dir, exist_ok=True)
+    try:
+        subprocess.run(
+            [libreoffice_cmd, f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}",
+             '--headless', '--terminate_after_init'],
+            capture_output=True, timeout=timeout
+        )
+        return True
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"⚠️ LibreOffice profili hazırlanamadı ({profile_dir}): {e}")
+        return False
+
+
+_service: Optional[ConversionService] = None
+_service_lock = threading.Lock()
+
+
+def get_conversion_service() -> ConversionService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConversionService()
+        return _service
+
+
+def convert_dbf_tree(checkpoint=None, poll_interval: float = 1.0):
+    """
+    data/dbf altındaki DOC/DOCX belgelerini düşük öncelikle ön dönüştürür (utils_jobs
+    pipeline'ı). Önbelleği geçerli olanlar atlanır. İş iptal edilirse kuyruktaki
+    görevler geri çekilir.
+
+    Yields:
+        Dict: SSE mesajları
+    """
+    try:
+        from .utils_dbf1 import get_all_dbf_files
+    except ImportError:
+        from utils_dbf1 import get_all_dbf_files
+
+    converter = get_converter()
+    service = get_conversion_service()
+
+    # Eski sürümün belgelerin yanına yazdığı *_converted.pdf dosyaları önbelleğe taşınır
+    legacy = cleanup_legacy_conversions()
+    if legacy['adopted'] or legacy['removed']:
+        yield {'type': 'info', 'message': f"Eski dönüşümler: {legacy['adopted']} önbelleğe taşındı, {legacy['removed']} silindi."}
+
+    yield {'type': 'status', 'message': 'DOCX dosyaları taranıyor...'}
+    documents = [path for path in get_all_dbf_files(validate_files=False, include_archives=True)
+                 if converter.is_supported_format(path)]
+    pending = []
+    for path in documents:
+        # Açılmamış arşiv üyeleri dönüştürülürken açılır
+        member = split_member_ref(path)
+        local_path = member_extract_path(*member) if member else path
+        if not local_path or not os.path.exists(local_path) or not converter.find_cached_pdf(local_path, touch=False):
+            pending.append(service.submit(path, BATCH_PRIORITY))
+
+    yield {'type': 'info', 'message': f'{len(documents)} DOCX bulundu, {len(pending)} tanesi dönüştürülecek.'}
+    completed = failed = 0
+    try:
+        remaining = list(pending)
+        last_message = time.monotonic()
+        while remaining:
+            remaining[0].wait(poll_interval)
+            if not any(task.finished for task in remaining):
+                # Görev bitmese de düzenli mesaj verilir; iş iptali ancak yield arasında görülür
+                if time.monotonic() - last_message >= BATCH_HEARTBEAT_INTERVAL:
+                    last_message = time.monotonic()
+                    yield {'type': 'status', 'message': f'{len(remaining)} belge dönüştürülüyor...'}
+                continue
+            last_message = time.monotonic()
+            still_running = []
+            for task in remaining:
+                if not task.finished:
+                    still_running.append(task)
+                    continue
+                completed += 1
+                if task.status == 'done':
+                    yield {'type': 'progress', 'message': f'✅ {os.path.basename(task.doc_path)}',
+                           'progress': completed / len(pending)}
+                else:
+                    failed += 1
+                    yield {'type': 'warning', 'message': f'⚠️ {os.path.basename(task.doc_path)}: {task.error}'}
+            remaining = still_running
+    finally:
+        # İptal/kopma durumunda başlamamış toplu dönüşümler kuyruktan çıkarılır;
+        # etkileşimli istekle önceliği yükseltilmiş görevler kullanıcıya aittir, kalır
+        for task in pending:
+            service.cancel(task, min_priority=BATCH_PRIORITY)
+
+    yield {'type': 'done', 'message': f'{completed - failed} belge dönüştürüldü, {failed} hata.'}
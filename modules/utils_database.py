@@ -7,7 +7,6 @@ and statistics functions.
 """
 
 import os
-import requests
 import sqlite3
 import functools
 from typing import Optional, Callable
@@ -16,6 +15,11 @@ import re
 import time
 from bs4 import BeautifulSoup
 
+try:
+    from .utils_http import http_get
+except ImportError:
+    from utils_http import http_get
+
 
 def find_or_create_database() -> Optional[str]:
     """
@@ -51,6 +55,82 @@ def find_or_create_database() -> Optional[str]:
     
     return db_path
 
+# Sonradan eklenen kolonlar: CREATE TABLE IF NOT EXISTS mevcut tabloyu değiştirmediği için
+# eski veritabanlarına ALTER TABLE ile eklenir (tablo -> {kolon: tanım})
+COLUMN_MIGRATIONS = {
+    'dosya_hash': {
+        'alan_klasoru': 'TEXT',
+        'ek_bilgi': 'TEXT',
+    },
+    'temel_plan_ders': {
+        'ders_adi_norm': 'TEXT',
+    },
+}
+
+def ensure_table_columns(cursor, table: str, columns: dict) -> list:
+    """
+    Tabloda eksik olan kolonları ekler. Tablo yoksa bir şey yapmaz.
+
+    Returns:
+        Eklenen kolon adları
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    if not existing:
+        return []
+
+    added = []
+    for column, definition in columns.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            added.append(column)
+    return added
+
+def apply_column_migrations(cursor) -> dict:
+    """COLUMN_MIGRATIONS'daki tüm eksik kolonları ekler; {tablo: [kolonlar]} döndürür."""
+    applied = {}
+    for table, columns in COLUMN_MIGRATIONS.items():
+        added = ensure_table_columns(cursor, table, columns)
+        if added:
+            applied[table] = added
+    return applied
+
+def merge_duplicate_areas(cursor) -> int:
+    """
+    Aynı alan_adi ile birden fazla kaydedilmiş alanları en eski kayıtta birleştirir
+    (dallar taşınır, eksik MEB ID/URL'ler doldurulur). Şemadaki UNIQUE alan_adi
+    indeksi mükerrer kayıt varken oluşturulamadığı için şemadan önce çalışır.
+
+    Returns:
+        Silinen mükerrer kayıt sayısı
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'temel_plan_alan'")
+    if not cursor.fetchone():
+        return 0
+    cursor.execute("""
+        SELECT alan_adi, MIN(id) FROM temel_plan_alan
+        GROUP BY alan_adi HAVING COUNT(*) > 1
+    """)
+    removed = 0
+    for alan_adi, keep_id in cursor.fetchall():
+        cursor.execute("SELECT id FROM temel_plan_alan WHERE alan_adi = ? AND id != ?", (alan_adi, keep_id))
+        duplicate_ids = [row[0] for row in cursor.fetchall()]
+        placeholders = ','.join('?' * len(duplicate_ids))
+        for column in ('meb_alan_id', 'cop_url', 'dbf_urls'):
+            cursor.execute(f"""
+                UPDATE temel_plan_alan SET {column} = (
+                    SELECT {column} FROM temel_plan_alan
+                    WHERE id IN ({placeholders}) AND {column} IS NOT NULL AND {column} != '{{}}'
+                    ORDER BY id LIMIT 1)
+                WHERE id = ? AND ({column} IS NULL OR {column} = '{{}}')
+                  AND EXISTS (SELECT 1 FROM temel_plan_alan WHERE id IN ({placeholders})
+                              AND {column} IS NOT NULL AND {column} != '{{}}')
+            """, (*duplicate_ids, keep_id, *duplicate_ids))
+        cursor.execute(f"UPDATE temel_plan_dal SET alan_id = ? WHERE alan_id IN ({placeholders})", (keep_id, *duplicate_ids))
+        cursor.execute(f"DELETE FROM temel_plan_alan WHERE id IN ({placeholders})", duplicate_ids)
+        removed += len(duplicate_ids)
+    return removed
+
 def with_database(func: Callable) -> Callable:
     """
     Database connection decorator.
@@ -84,11 +164,17 @@ def with_database(func: Callable) -> Callable:
                 return result
                 
         except Exception as e:
+            _discard_uncommitted_state()
             print(f"❌ Database error in {func.__name__}: {e}")
             return {"error": str(e), "success": False}
     
     return wrapper
 
+def _discard_uncommitted_state():
+    """Geri alınan (rollback) transaction'da belleğe işlenmiş alan kayıtlarını atar."""
+    from .utils_area import invalidate_area_resolver
+    invalidate_area_resolver()
+
 def with_database_json(func: Callable) -> Callable:
     """
     Database connection decorator for Flask endpoints.
@@ -130,6 +216,7 @@ def with_database_json(func: Callable) -> Callable:
                     
         except Exception as e:
             import datetime
+            _discard_uncommitted_state()
             error_response = {
                 "success": False,
                 "error": str(e),
@@ -251,11 +338,30 @@ def get_or_create_alan(cursor, alan_adi, meb_alan_id=None, cop_url=None, dbf_url
     """
     # Import normalize_alan_adi from utils
     from .utils_normalize import normalize_to_title_case_tr
+    from .utils_area import get_area_resolver, note_area
     
     normalized_alan_adi = normalize_to_title_case_tr(alan_adi.strip()) if alan_adi else "Belirtilmemiş"
     
-    cursor.execute("SELECT id, cop_url, meb_alan_id FROM temel_plan_alan WHERE alan_adi = ?", (normalized_alan_adi,))
-    result = cursor.fetchone()
+    # Alan bellekteki çözümleyiciden bulunur; commit edilmiş kayıtta güncellenecek bir
+    # şey yoksa SQLite'a gidilmez (henüz commit edilmemiş olabilecek kayıtlar doğrulanır)
+    resolver = get_area_resolver(cursor)
+    record = resolver.lookup(normalized_alan_adi)
+    if (record and resolver.is_committed(record.id) and record.meb_alan_id
+            and cop_url is None and dbf_urls is None and meb_alan_id in (None, record.meb_alan_id)):
+        return record.id
+    
+    result = None
+    if record:
+        cursor.execute("SELECT id, cop_url, meb_alan_id FROM temel_plan_alan WHERE id = ? AND alan_adi = ?",
+                       (record.id, record.alan_adi))
+        result = cursor.fetchone()
+        if not result:
+            # Kaydın transaction'ı geri alınmış (id başka bir alana verilmiş olabilir)
+            resolver.forget(record.id)
+            record = None
+    if not result:
+        cursor.execute("SELECT id, cop_url, meb_alan_id FROM temel_plan_alan WHERE alan_adi = ?", (normalized_alan_adi,))
+        result = cursor.fetchone()
     
     if result:
         alan_id, existing_cop_url, existing_meb_alan_id = result
@@ -320,6 +426,7 @@ def get_or_create_alan(cursor, alan_adi, meb_alan_id=None, cop_url=None, dbf_url
             """
             update_values.append(alan_id)
             cursor.execute(update_query, tuple(update_values))
+            note_area(alan_id, record.alan_adi if record else normalized_alan_adi, updated_meb_alan_id)
         
         return alan_id
     else:
@@ -356,10 +463,15 @@ def get_or_create_alan(cursor, alan_adi, meb_alan_id=None, cop_url=None, dbf_url
                 meb_alan_id = extracted_id
                 print(f"      🔍 MEB ID URL'den çıkarıldı: {alan_adi} -> {extracted_id}")
         
+        # alan_adi UNIQUE: başka bir bağlantı aynı alanı henüz commit etmeden eklediyse
+        # INSERT onun commit'ini bekler ve yok sayılır; kayıt yeniden bulunup güncellenir
         cursor.execute("""
-            INSERT INTO temel_plan_alan (alan_adi, meb_alan_id, cop_url, dbf_urls) 
+            INSERT OR IGNORE INTO temel_plan_alan (alan_adi, meb_alan_id, cop_url, dbf_urls) 
             VALUES (?, ?, ?, ?)
         """, (normalized_alan_adi, meb_alan_id, cop_url_json, dbf_urls_json))
+        if cursor.rowcount == 0:
+            return get_or_create_alan(cursor, normalized_alan_adi, meb_alan_id, cop_url, dbf_urls)
+        note_area(cursor.lastrowid, normalized_alan_adi, meb_alan_id)
         return cursor.lastrowid
 
 # Geriye uyumluluk için eski fonksiyonları yeni fonksiyonlara yönlendiren wrapper'lar
@@ -470,22 +582,13 @@ def get_meb_alan_ids(force_refresh=False, info_only=False):
     print("📋 MEB Alan ID'leri çekiliyor...")
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9,tr;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
         alan_id_map = {}
         
         # cercevelistele.aspx sayfasından alan dropdown'unu çek
         url = "https://meslek.meb.gov.tr/cercevelistele.aspx"
         params = {"sinif_kodu": "9", "kurum_id": "1"}
         
-        response = requests.get(url, params=params, headers=headers, timeout=45)
+        response = http_get(url, params=params, timeout=45)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
@@ -552,6 +655,8 @@ def get_meb_alan_ids(force_refresh=False, info_only=False):
                             continue
                     
                     if updated_count > 0:
+                        from .utils_area import invalidate_area_resolver
+                        invalidate_area_resolver()
                         print(f"✅ {updated_count} alan database'de güncellendi")
                     else:
                         print("✅ Tüm alanlar zaten güncel")
@@ -577,8 +682,8 @@ def get_meb_alan_id(alan_adi, data_meb_id=None):
     
     Strateji:
     1. Verilen data'dan MEB ID'yi kontrol et
-    2. Veritabanındaki meb_alan_id'yi kontrol et  
-    3. Cache'den MEB ID'leri al ve eşleştir
+    2. Veritabanındaki meb_alan_id'yi kontrol et (bellekteki alan çözümleyicisinden)
+    3. Cache'den MEB ID'leri al ve eşleştir (protokol alanları için ana alanın ID'si)
     4. Hiçbiri yoksa None döndür
     
     Args:
@@ -586,104 +691,41 @@ def get_meb_alan_id(alan_adi, data_meb_id=None):
         data_meb_id: Data'dan gelen MEB ID (opsiyonel)
     
     Returns:
-        tuple: (meb_alan_id, source) - source: 'data', 'db', 'cache', 'none'
+        tuple: (meb_alan_id, source) - source: 'data', 'db', 'cache', 'cache_protokol', 'none'
     """
     # Import normalize_alan_adi from utils
     from .utils_normalize import normalize_to_title_case_tr
+    from .utils_area import get_area_resolver
     
     # 1. Önce verilen data'dan kontrol et
     if data_meb_id:
         return data_meb_id, 'data'
     
-    # 2. Veritabanından kontrol et
-    db_path = find_or_create_database()
-    if db_path:
-        try:
-            with sqlite3.connect(db_path, timeout=30.0) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                normalized_alan_adi = normalize_to_title_case_tr(alan_adi.strip()) if alan_adi else "Belirtilmemiş"
-                cursor.execute("SELECT meb_alan_id FROM temel_plan_alan WHERE alan_adi = ?", (normalized_alan_adi,))
-                result = cursor.fetchone()
-                
-                if result and result['meb_alan_id']:
-                    return result['meb_alan_id'], 'db'
-        except Exception as e:
-            print(f"DB MEB ID kontrol hatası: {e}")
+    normalized_alan_adi = normalize_to_title_case_tr(alan_adi.strip()) if alan_adi else "Belirtilmemiş"
+    
+    # 2. Veritabanından kontrol et (her çağrıda bağlantı açılmaz)
+    resolver = get_area_resolver()
+    record = resolver.lookup(normalized_alan_adi)
+    if record and record.meb_alan_id:
+        return record.meb_alan_id, 'db'
     
     # 3. Cache'den MEB ID'leri al ve eşleştir
     try:
-        meb_alan_ids = get_meb_alan_ids()
-        
-        # Tam eşleşme ara
-        if alan_adi in meb_alan_ids:
-            meb_alan_id = meb_alan_ids[alan_adi]
-            
-            # Veritabanını güncelle
-            if db_path:
-                try:
-                    with sqlite3.connect(db_path, timeout=30.0) as conn:
-                        cursor = conn.cursor()
-                        normalized_alan_adi = normalize_to_title_case_tr(alan_adi.strip()) if alan_adi else "Belirtilmemiş"
-                        cursor.execute("""
-                            UPDATE temel_plan_alan 
-                            SET meb_alan_id = ?, updated_at = datetime('now')
-                            WHERE alan_adi = ?
-                        """, (meb_alan_id, normalized_alan_adi))
-                        print(f"📋 MEB ID güncellendi: {alan_adi} -> {meb_alan_id}")
-                except Exception as e:
-                    print(f"MEB ID güncelleme hatası: {e}")
-            
-            return meb_alan_id, 'cache'
-        
-        # Normalize edilmiş adla ara
-        normalized_alan_adi = normalize_to_title_case_tr(alan_adi.strip()) if alan_adi else "Belirtilmemiş"
-        if normalized_alan_adi in meb_alan_ids:
-            meb_alan_id = meb_alan_ids[normalized_alan_adi]
+        resolver.set_meb_listing(get_meb_alan_ids())
+        meb_alan_id, source = resolver.meb_id_from_listing(alan_adi)
+        if meb_alan_id:
+            if source == 'cache_protokol':
+                print(f"🔗 Protokol alan MEB ID bulundu: {alan_adi} -> {meb_alan_id}")
             
             # Veritabanını güncelle
-            if db_path:
-                try:
-                    with sqlite3.connect(db_path, timeout=30.0) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE temel_plan_alan 
-                            SET meb_alan_id = ?, updated_at = datetime('now')
-                            WHERE alan_adi = ?
-                        """, (meb_alan_id, normalized_alan_adi))
-                        print(f"📋 MEB ID güncellendi (normalize): {alan_adi} -> {meb_alan_id}")
-                except Exception as e:
-                    print(f"MEB ID güncelleme hatası: {e}")
-            
-            return meb_alan_id, 'cache'
-        
-        # Protokol alanlar için özel arama
-        # "Alan - Protokol" -> "Alan" şeklinde arama yap
-        if alan_adi and (" - Protokol" in alan_adi or " - protokol" in alan_adi):
-            import re
-            base_alan_adi = re.sub(r'\s*-\s*[Pp]rotokol\s*$', '', alan_adi).strip()
-            base_alan_adi = normalize_to_title_case_tr(base_alan_adi)
+            if record:
+                result = _set_area_meb_id(record.id, record.alan_adi, meb_alan_id)
+                if isinstance(result, dict):
+                    print(f"MEB ID güncelleme hatası: {result['error']}")
+                else:
+                    print(f"📋 MEB ID güncellendi: {alan_adi} -> {meb_alan_id}")
             
-            if base_alan_adi in meb_alan_ids:
-                meb_alan_id = meb_alan_ids[base_alan_adi]
-                print(f"🔗 Protokol alan MEB ID bulundu: {alan_adi} -> {base_alan_adi} -> {meb_alan_id}")
-                
-                # Veritabanını güncelle (protokol alan adı ile)
-                if db_path:
-                    try:
-                        with sqlite3.connect(db_path, timeout=30.0) as conn:
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                UPDATE temel_plan_alan 
-                                SET meb_alan_id = ?, updated_at = datetime('now')
-                                WHERE alan_adi = ?
-                            """, (meb_alan_id, normalized_alan_adi))
-                            print(f"📋 Protokol alan MEB ID güncellendi: {alan_adi} -> {meb_alan_id}")
-                    except Exception as e:
-                        print(f"Protokol alan MEB ID güncelleme hatası: {e}")
-                
-                return meb_alan_id, 'cache_protokol'
+            return meb_alan_id, source
         
     except Exception as e:
         print(f"Cache'den MEB ID çekme hatası: {e}")
@@ -691,6 +733,19 @@ def get_meb_alan_id(alan_adi, data_meb_id=None):
     # 4. Hiçbiri yoksa None döndür
     return None, 'none'
 
+@with_database
+def _set_area_meb_id(cursor, alan_id, alan_adi, meb_alan_id):
+    """Alanın MEB ID'sini yazar ve alan çözümleyicisini günceller."""
+    from .utils_area import note_area
+    
+    cursor.execute("""
+        UPDATE temel_plan_alan 
+        SET meb_alan_id = ?, updated_at = datetime('now')
+        WHERE id = ?
+    """, (meb_alan_id, alan_id))
+    note_area(alan_id, alan_adi, meb_alan_id)
+    return True
+
 @with_database
 def update_database_from_cache(cursor):
     """
@@ -756,6 +811,10 @@ def update_database_from_cache(cursor):
             print(f"❌ {error_msg}")
             continue
     
+    if updated_count:
+        from .utils_area import invalidate_area_resolver
+        invalidate_area_resolver()
+    
     print(f"✅ Toplu güncelleme tamamlandı: {updated_count} güncellendi, {skipped_count} atlandı, {len(errors)} hata")
     
     return {
@@ -879,107 +938,193 @@ def create_ders_dal_relation(cursor, ders_id, dal_id):
     
     return True
 
+def _load_learning_unit_tree(cursor, ders_id):
+    """
+    Bir dersin kayıtlı öğrenme birimi ağacını 3 sorguda yükler.
+
+    Returns:
+        (birimler, konu_agaci)
+        birimler: {birim_id: (birim_adi, sure, sira)}
+        konu_agaci: {birim_id: [(konu_adi, sira, ((kazanim_adi, sira), ...)), ...]}
+    """
+    cursor.execute(
+        "SELECT id, birim_adi, sure, sira FROM temel_plan_ogrenme_birimi WHERE ders_id = ? ORDER BY id",
+        (ders_id,)
+    )
+    birimler = {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT k.id, k.ogrenme_birimi_id, k.konu_adi, k.sira
+        FROM temel_plan_konu k
+        JOIN temel_plan_ogrenme_birimi ob ON ob.id = k.ogrenme_birimi_id
+        WHERE ob.ders_id = ?
+        ORDER BY k.id
+    """, (ders_id,))
+    konu_rows = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT kz.konu_id, kz.kazanim_adi, kz.sira
+        FROM temel_plan_kazanim kz
+        JOIN temel_plan_konu k ON k.id = kz.konu_id
+        JOIN temel_plan_ogrenme_birimi ob ON ob.id = k.ogrenme_birimi_id
+        WHERE ob.ders_id = ?
+        ORDER BY kz.id
+    """, (ders_id,))
+    kazanimlar_by_konu = {}
+    for konu_id, kazanim_adi, sira in cursor.fetchall():
+        kazanimlar_by_konu.setdefault(konu_id, []).append((kazanim_adi, sira))
+
+    konu_agaci = {}
+    for konu_id, birim_id, konu_adi, sira in konu_rows:
+        konu_agaci.setdefault(birim_id, []).append(
+            (konu_adi, sira, tuple(kazanimlar_by_konu.get(konu_id, ())))
+        )
+
+    return birimler, konu_agaci
+
+def _normalize_konu_tree(konular):
+    """Gelen konu listesini karşılaştırılabilir tuple ağacına çevirir (boş adlar atlanır)."""
+    tree = []
+    for konu_data in konular or []:
+        konu_adi = (konu_data.get('konu_adi') or '').strip()
+        if not konu_adi:
+            continue
+        kazanimlar = []
+        for kazanim_data in konu_data.get('kazanimlar') or []:
+            kazanim_adi = (kazanim_data.get('kazanim_adi') or '').strip()
+            if kazanim_adi:
+                kazanimlar.append((kazanim_adi, kazanim_data.get('sira', 0)))
+        tree.append((konu_adi, konu_data.get('sira', 0), tuple(kazanimlar)))
+    return tree
+
 def save_learning_units(cursor, ders_id, ogrenme_birimleri):
     """
     Bir dersin öğrenme birimlerini, konularını ve kazanımlarını kaydeder.
     Hiyerarşik veri yapısını handle eder.
     Duplicate kayıtları engeller (INSERT OR UPDATE), case-insensitive.
     Foreign key constraints aktif olduğu için ilişkisel bütünlük garanti edilir.
+
+    Set-based çalışır: kayıtlı ağaç tek seferde yüklenir, gelen ağaçla
+    karşılaştırılır ve sadece değişen kısımlar executemany ile yazılır.
+    Değişmeyen birimler ve konu ağaçları hiç yazılmaz.
     """
     saved_count = 0
-    
+
     try:
+        birimler, konu_agaci = _load_learning_unit_tree(cursor, ders_id)
+        birim_by_name = {}
+        for birim_id, (birim_adi, _, _) in birimler.items():
+            birim_by_name.setdefault((birim_adi or '').upper(), ('id', birim_id))
+
+        # 1. Gelen listeyi nihai duruma indir (aynı birim tekrar gelirse son gelen kazanır)
+        final_units = {}
+        new_unit_count = 0
         for birim_data in ogrenme_birimleri:
+            birim_adi = (birim_data.get('birim_adi') or '').strip()
+            if not birim_adi:
+                continue
+
             birim_id = birim_data.get('id')
-            birim_adi = birim_data.get('birim_adi', '').strip()
+            if birim_id and birim_id in birimler:
+                ref = ('id', birim_id)
+            else:
+                # ID yoksa (veya bu derse ait değilse) case-insensitive ad eşleşmesi
+                ref = birim_by_name.get(birim_adi.upper())
+                if ref is None:
+                    ref = ('new', new_unit_count)
+                    new_unit_count += 1
+            birim_by_name[birim_adi.upper()] = ref
 
-            if not birim_adi:
+            unit = final_units.setdefault(ref, {'konular': None})
+            unit['row'] = (birim_adi, birim_data.get('sure', 0), birim_data.get('sira', 0))
+            if 'konular' in birim_data:
+                unit['konular'] = _normalize_konu_tree(birim_data.get('konular'))
+            saved_count += 1
+
+        # 2. Birim güncellemeleri (değişmeyenler atlanır) ve eklemeleri
+        unit_updates = [
+            (*unit['row'], ref[1])
+            for ref, unit in final_units.items()
+            if ref[0] == 'id' and unit['row'] != birimler[ref[1]]
+        ]
+        if unit_updates:
+            cursor.executemany("""
+                UPDATE temel_plan_ogrenme_birimi
+                SET birim_adi=?, sure=?, sira=?, updated_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            """, unit_updates)
+
+        unit_ids = {ref: ref[1] for ref in final_units if ref[0] == 'id'}
+        new_refs = [ref for ref in final_units if ref[0] == 'new']
+        if new_refs:
+            cursor.executemany("""
+                INSERT INTO temel_plan_ogrenme_birimi (ders_id, birim_adi, sure, sira)
+                VALUES (?, ?, ?, ?)
+            """, [(ders_id, *final_units[ref]['row']) for ref in new_refs])
+
+            # Yeni ID'ler: bu derse ait, önceden olmayan satırlar (ID sırası = ekleme sırası)
+            cursor.execute(
+                "SELECT id FROM temel_plan_ogrenme_birimi WHERE ders_id = ? ORDER BY id",
+                (ders_id,)
+            )
+            inserted_ids = [row[0] for row in cursor.fetchall() if row[0] not in birimler]
+            unit_ids.update(zip(new_refs, inserted_ids))
+
+        # 3. Konu ağaçları - sadece değişen birimler yeniden yazılır (REPLACE strategy)
+        rewrite_units = []
+        for ref, unit in final_units.items():
+            if unit['konular'] is None:
+                continue
+            if ref[0] == 'id' and konu_agaci.get(ref[1], []) == unit['konular']:
                 continue
+            rewrite_units.append((unit_ids[ref], unit['konular']))
 
-            # ID yoksa, mevcut bir kayıt var mı diye case-insensitive kontrol et
-            if not birim_id:
-                cursor.execute(
-                    "SELECT id FROM temel_plan_ogrenme_birimi WHERE ders_id = ? AND UPPER(birim_adi) = ?",
-                    (ders_id, birim_adi.upper())
+        stale_unit_ids = [(birim_id,) for birim_id, _ in rewrite_units if birim_id in birimler]
+        if stale_unit_ids:
+            # Kazanımlar açıkça silinir; foreign_keys kapalı bağlantılarda da yetim kalmaz
+            cursor.executemany("""
+                DELETE FROM temel_plan_kazanim WHERE konu_id IN (
+                    SELECT id FROM temel_plan_konu WHERE ogrenme_birimi_id = ?
                 )
-                existing_birim = cursor.fetchone()
-                if existing_birim:
-                    birim_id = existing_birim['id']
+            """, stale_unit_ids)
+            cursor.executemany("DELETE FROM temel_plan_konu WHERE ogrenme_birimi_id = ?", stale_unit_ids)
 
-            if birim_id:
-                # Güncelleme
-                cursor.execute("""
-                    UPDATE temel_plan_ogrenme_birimi 
-                    SET birim_adi=?, sure=?, sira=?, updated_at=CURRENT_TIMESTAMP
-                    WHERE id=?
-                """, (
-                    birim_adi,
-                    birim_data.get('sure', 0),
-                    birim_data.get('sira', 0),
-                    birim_id
-                ))
-            else:
-                # Yeni kayıt
-                cursor.execute("""
-                    INSERT INTO temel_plan_ogrenme_birimi (ders_id, birim_adi, sure, sira)
-                    VALUES (?, ?, ?, ?)
-                """, (
-                    ders_id,
-                    birim_adi,
-                    birim_data.get('sure', 0),
-                    birim_data.get('sira', 0)
-                ))
-                birim_id = cursor.lastrowid
-            
-            saved_count += 1
-            
-            # Konuları kaydet - önceki konuları sil ve yeniden yaz (REPLACE strategy)
-            if 'konular' in birim_data:
-                # Önce bu öğrenme biriminin tüm konularını sil (CASCADE ile kazanımlar da silinecek)
-                cursor.execute("DELETE FROM temel_plan_konu WHERE ogrenme_birimi_id = ?", (birim_id,))
-                
-                # Şimdi yeni konuları ekle
-                for konu_data in birim_data.get('konular', []):
-                    konu_adi = konu_data.get('konu_adi', '').strip()
+        konu_rows = [
+            (birim_id, konu_adi, sira)
+            for birim_id, konular in rewrite_units
+            for konu_adi, sira, _ in konular
+        ]
+        if not konu_rows:
+            return saved_count
+
+        cursor.executemany("""
+            INSERT INTO temel_plan_konu (ogrenme_birimi_id, konu_adi, sira)
+            VALUES (?, ?, ?)
+        """, konu_rows)
+
+        # Yeniden yazılan birimlerin tüm konuları yeni eklenenlerdir (ID sırası = ekleme sırası)
+        rewrite_ids = [birim_id for birim_id, _ in rewrite_units]
+        placeholders = ','.join('?' * len(rewrite_ids))
+        cursor.execute(
+            f"SELECT id, ogrenme_birimi_id FROM temel_plan_konu WHERE ogrenme_birimi_id IN ({placeholders}) ORDER BY id",
+            rewrite_ids
+        )
+        konu_ids_by_unit = {}
+        for konu_id, birim_id in cursor.fetchall():
+            konu_ids_by_unit.setdefault(birim_id, []).append(konu_id)
+
+        kazanim_rows = []
+        for birim_id, konular in rewrite_units:
+            for konu_id, (_, _, kazanimlar) in zip(konu_ids_by_unit.get(birim_id, []), konular):
+                kazanim_rows.extend((konu_id, kazanim_adi, sira) for kazanim_adi, sira in kazanimlar)
+        if kazanim_rows:
+            cursor.executemany("""
+                INSERT INTO temel_plan_kazanim (konu_id, kazanim_adi, sira)
+                VALUES (?, ?, ?)
+            """, kazanim_rows)
 
-                    if not konu_adi:
-                        continue
-                    
-                    # Yeni kayıt - DELETE yapıldığı için UPDATE gereksiz
-                    cursor.execute("""
-                        INSERT INTO temel_plan_konu (ogrenme_birimi_id, konu_adi, sira)
-                        VALUES (?, ?, ?)
-                    """, (
-                        birim_id,
-                        konu_adi,
-                        konu_data.get('sira', 0)
-                    ))
-                    konu_id = cursor.lastrowid
-                    
-                    # Kazanımları kaydet - önceki kazanımları sil ve yeniden yaz
-                    if 'kazanimlar' in konu_data:
-                        # Önce bu konunun tüm kazanımlarını sil
-                        cursor.execute("DELETE FROM temel_plan_kazanim WHERE konu_id = ?", (konu_id,))
-                        
-                        # Şimdi yeni kazanımları ekle
-                        for kazanim_data in konu_data.get('kazanimlar', []):
-                            kazanim_adi = kazanim_data.get('kazanim_adi', '').strip()
-
-                            if not kazanim_adi:
-                                continue
-
-                            # Yeni kayıt - DELETE yapıldığı için UPDATE gereksiz
-                            cursor.execute("""
-                                INSERT INTO temel_plan_kazanim (konu_id, kazanim_adi, sira)
-                                VALUES (?, ?, ?)
-                            """, (
-                                konu_id,
-                                kazanim_adi,
-                                kazanim_data.get('sira', 0)
-                            ))
-        
         return saved_count
-        
+
     except Exception as e:
         print(f"❌ save_learning_units hatası: {e}")
         raise e
\ No newline at end of file
@@ -4,14 +4,20 @@ modules/utils_dbf1.py
 PDF'nin 1. sayfasındaki temel bilgiler ve kazanım tablosu işlemleri
 - ex_temel_bilgiler(): Ders adı, sınıf, süre, amaç çıkarma
 - ex_kazanim_tablosu(): Kazanım sayısı ve süre tablosu parse etme
-- read_full_text_from_file(): PDF/DOCX okuma (fitz kullanılan tek yer)
+- read_full_text_from_file(): PDF/DOCX okuma; dosyalar mmap ile, arşiv üyeleri ve
+  indirilen baytlar bellekten okunur (fitz, utils_document.DocumentSource üzerinden)
 """
 
-import fitz  # PyMuPDF
 import re
 import os
 
 # Modüler import'lar (read_full_text_from_file locally defined below)
+try:
+    from .utils_archive import list_archive_documents, ARCHIVE_EXTENSIONS
+    from .utils_document import open_document_source
+except ImportError:
+    from utils_archive import list_archive_documents, ARCHIVE_EXTENSIONS
+    from utils_document import open_document_source
 
 
 # ===========================
@@ -325,38 +331,46 @@ def ex_kazanim_tablosu(full_text):
 # FILE I/O FUNCTIONS
 # ===========================
 
+def _read_full_text(source):
+    doc = source.open_fitz()
+    full_text = "\n".join(page.get_text() for page in doc) + "\n"
+    doc.close()
+    
+    # Metni normalize et
+    return re.sub(r'\s+', ' ', full_text)
+
+
 def read_full_text_from_file(file_path):
     """
     PDF veya DOCX dosyasından tam metni okur (PyMuPDF ile unified processing)
     
     Args:
-        file_path (str): Dosya yolu
+        file_path (str): Dosya yolu, "<arşiv>::<üye>" referansı veya DocumentSource
         
     Returns:
         str: Dosyadan çıkarılan tam metin
     """
     try:
-        doc = fitz.open(file_path)
-        full_text = ""
-        for page in doc:
-            full_text += page.get_text() + "\n"
-        doc.close()
-        
-        # Metni normalize et
-        full_text = re.sub(r'\s+', ' ', full_text)
-        return full_text
+        if hasattr(file_path, 'open_fitz'):
+            return _read_full_text(file_path)
+        # Dosya mmap ile, arşiv üyesi bellekten açılır (geçici dosya yok)
+        with open_document_source(file_path) as source:
+            return _read_full_text(source)
         
     except Exception as e:
         print(f"Error reading file {file_path}: {str(e)}")
         return ""
 
 
-def get_all_dbf_files(validate_files=True):
+def get_all_dbf_files(validate_files=True, include_archives=False):
     """
     DBF PDF ve DOCX dosyalarını bulma ve yönetme fonksiyonu - API sistemine optimize edildi
     
     Args:
         validate_files (bool): Dosya bütünlüğü kontrolü yap (varsayılan: True)
+        include_archives (bool): Açılmamış RAR/ZIP içindeki belgeleri "<arşiv>::<üye>"
+            referansı olarak ekle. Arşivin yanına zaten açılmış üyeler için açılmış
+            dosya kullanılır (aynı belge iki kez listelenmez).
     
     Returns:
         list: PDF ve DOCX dosya yolları listesi (sadece geçerli dosyalar)
@@ -381,19 +395,17 @@ def get_all_dbf_files(validate_files=True):
             return True
             
         try:
-            # PyMuPDF ile dosyayı açmayı dene
-            doc = fitz.open(file_path)
-            
-            # Dosya açılabildi, temel kontroller yap
-            page_count = len(doc)
-            if page_count == 0:
-                doc.close()
-                return False
-            
-            # İlk sayfayı okumayı dene
-            page = doc.load_page(0)
-            text = page.get_text()
-            doc.close()
+            # PyMuPDF ile dosyayı açmayı dene (mmap - dosya belleğe kopyalanmaz)
+            with open_document_source(file_path) as source:
+                doc = source.open_fitz()
+                
+                # Dosya açılabildi, temel kontroller yap
+                page_count = len(doc)
+                if page_count == 0:
+                    return False
+                
+                # İlk sayfayı okumayı dene
+                text = doc.load_page(0).get_text()
             
             # Eğer hiç metin yoksa ve sayfa sayısı 1'den azsa bozuk olabilir
             if not text.strip() and page_count <= 1:
@@ -410,6 +422,7 @@ def get_all_dbf_files(validate_files=True):
     all_files = []
     supported_extensions = ('.pdf', '.docx')
     skipped_files = 0
+    archive_refs = []
     
     for root, dirs, files in os.walk(base_path):
         for file in files:
@@ -421,6 +434,18 @@ def get_all_dbf_files(validate_files=True):
                     all_files.append(file_path)
                 else:
                     skipped_files += 1
+            elif include_archives and file.lower().endswith(ARCHIVE_EXTENSIONS):
+                archive_path = os.path.join(root, file)
+                try:
+                    archive_refs.extend(list_archive_documents(archive_path))
+                except Exception as e:
+                    print(f"⚠️  Arşiv okunamadı: {file} - {str(e)}")
+    
+    # Açılmamış üyeler referans olarak eklenir; içerikleri işlenirken bellekten okunur
+    extracted = {os.path.normpath(path) for path in all_files}
+    for ref, extract_path in archive_refs:
+        if extract_path and os.path.normpath(extract_path) not in extracted:
+            all_files.append(ref)
     
     # Sonuç bilgilerini yazdır
     print(f"📊 Toplam {len(all_files)} geçerli dosya bulundu")
@@ -430,12 +455,13 @@ def get_all_dbf_files(validate_files=True):
     return all_files
 
 
-def process_dbf_file(file_path):
+def process_dbf_file(file_path, source=None):
     """
     Tek DBF dosyasını işler ve sonuçları döndürür
     
     Args:
-        file_path (str): İşlenecek dosya yolu
+        file_path (str): İşlenecek dosya yolu (source verildiyse sadece ad/etiket)
+        source (DocumentSource): Bellekteki içerik (örn. indirilen PDF, geçici dosya yazılmaz)
         
     Returns:
         dict: İşlem sonucu
@@ -448,7 +474,7 @@ def process_dbf_file(file_path):
             from utils_dbf2 import ex_ob_tablosu
         
         # Dosyadan tam metni oku
-        full_text = read_full_text_from_file(file_path)
+        full_text = read_full_text_from_file(source if source is not None else file_path)
         
         if not full_text.strip():
             return {"success": False, "error": "Dosya içeriği boş", "file_path": file_path}
@@ -0,0 +1,161 @@
+"""
+modules/utils_document.py - Belge Kaynağı (mmap / bellek)
+
+PDF/DOCX okuyucular (fitz, pdfplumber) dosya yolu yerine DocumentSource alır.
+Diskteki dosyalar mmap ile açılır ve fitz'e memoryview olarak verilir: içerik
+Python heap'ine kopyalanmaz, sayfalar işletim sisteminin sayfa önbelleğinden
+okunur (büyük ÇÖP PDF'lerinde tepe RSS düşer). İndirilen veya arşivden okunan
+baytlar geçici dosyaya yazılmadan aynı arayüzle işlenir.
+
+Kullanım:
+    with open_document_source("data/cop/08_Bilisim/cop.pdf") as source:
+        doc = source.open_fitz()
+        ...
+
+Kaynak kapanırken ondan açılmış fitz/pdfplumber belgeleri de kapatılır
+(mmap, üzerindeki görünümler serbest bırakılmadan kapatılamaz).
+
+Çok sayıda belge okunurken iter_document_sources kullanılır: aynı arşivdeki
+üyeler arşiv bir kez açılıp dolaşılarak okunur (üye başına arşiv açılmaz).
+"""
+
+import io
+import mmap
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+try:
+    from .utils_archive import split_member_ref, read_archive_member, iter_archive_member_streams
+except ImportError:
+    from utils_archive import split_member_ref, read_archive_member, iter_archive_member_streams
+
+
+class DocumentSource:
+    """Dosya (mmap) veya bellekteki bayt dizisi üzerinde salt okunur belge kaynağı."""
+
+    def __init__(self, name: str, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self._data = data
+        self._file = None
+        self._mmap = None
+        self._view = None
+        self._opened = []
+
+    @classmethod
+    def from_path(cls, path: str) -> 'DocumentSource':
+        """Dosya yolu veya "<arşiv>::<üye>" referansından kaynak oluşturur."""
+        member = split_member_ref(path)
+        if member:
+            return cls(member[1], data=read_archive_member(*member))
+        return cls(os.path.basename(path), path=path)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, name: str = "document.pdf") -> 'DocumentSource':
+        return cls(name, data=data)
+
+    @property
+    def filetype(self) -> str:
+        return os.path.splitext(self.name)[1].lstrip('.').lower() or 'pdf'
+
+    def view(self) -> memoryview:
+        """İçeriğin kopyasız görünümü (dosyada mmap, bellekte bytes)."""
+        if self._view is None:
+            if self._data is None:
+                self._file = open(self.path, 'rb')
+                if os.fstat(self._file.fileno()).st_size == 0:
+                    self._data = b''
+                else:
+                    self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap if self._mmap is not None else self._data)
+        return self._view
+
+    def open_fitz(self) -> fitz.Document:
+        doc = fitz.open(stream=self.view(), filetype=self.filetype)
+        self._opened.append(doc)
+        return doc
+
+    def open_pdfplumber(self) -> pdfplumber.PDF:
+        """pdfminer seek/read ile okur; mmap dosya nesnesi gibi verilir."""
+        self.view()
+        stream = self._mmap if self._mmap is not None else io.BytesIO(self._data)
+        pdf = pdfplumber.open(stream)
+        self._opened.append(pdf)
+        return pdf
+
+    def close(self):
+        for document in reversed(self._opened):
+            try:
+                document.close()
+            except Exception:
+                pass
+        self._opened = []
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'DocumentSource':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_document_source(path_or_data, name: Optional[str] = None) -> DocumentSource:
+    """Yol/referans için mmap'li, bytes için bellekteki kaynak döndürür."""
+    if isinstance(path_or_data, (bytearray, memoryview)):
+        path_or_data = bytes(path_or_data)
+    if isinstance(path_or_data, bytes):
+        return DocumentSource.from_bytes(path_or_data, name or "document.pdf")
+    return DocumentSource.from_path(path_or_data)
+
+
+def iter_document_sources(paths: Sequence[str],
+                          skip: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, Optional[DocumentSource]]]:
+    """
+    Yolları (yol, kaynak) olarak verir. Arşiv üyesi referansları arşiv başına tek
+    geçişte okunur: arşiv ilk referansının sırasında bir kez açılır ve istenen tüm
+    üyeleri arşivdeki sırayla verilir. Normal dosyalarda kaynak None'dur (okuyucu
+    dosyayı kendisi mmap ile açar); skip(yol) True olan yollar da okunmadan None ile
+    verilir. Arşiv okunamazsa üyeleri None ile verilir. Kaynak bir sonraki öğeye
+    geçildiğinde kapanır.
+    """
+    wanted: Dict[str, Dict[str, List[str]]] = {}
+    for path in paths:
+        member = split_member_ref(path)
+        if member and not (skip and skip(path)):
+            wanted.setdefault(member[0], {}).setdefault(member[1], []).append(path)
+
+    walked = set()
+    for path in paths:
+        member = split_member_ref(path)
+        if not member or (skip and skip(path)):
+            yield path, None
+            continue
+        archive_path = member[0]
+        if archive_path in walked:
+            continue
+        walked.add(archive_path)
+        refs = wanted[archive_path]
+        pending = set(refs)
+        try:
+            for name, stream in iter_archive_member_streams(archive_path, extensions=('',), names=pending):
+                with DocumentSource(name, data=stream.read()) as source:
+                    pending.discard(name)
+                    for ref in refs[name]:
+                        yield ref, source
+        except Exception as e:
+            print(f"⚠️ Arşiv okunamadı: {archive_path} - {e}")
+        # Bulunamayan / okunamayan üyeler: okuyucu referansı kendisi açmayı dener
+        for name in pending:
+            for ref in refs[name]:
+                yield ref, None
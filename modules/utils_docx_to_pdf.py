@@ -8,7 +8,14 @@ CLAUDE.md Prensiplerine Uygun:
 - Modüler Import Sistemi (utils_env, utils_file_management)  
 - Environment Aware Paths (PROJECT_ROOT bazlı)
 - PyMuPDF Unified Processing (DOC/DOCX için tek API)
-- File-based Caching System (same directory caching)
+- İçerik hash'i ile anahtarlanan dönüşüm önbelleği (data/converted/<sha[:2]>/<sha>.pdf)
+  Merkezi indeks pdf_donusum tablosundadır (yöntem, boyut, son kullanım); toplam
+  boyut MEB_CONVERT_CACHE_MB bütçesini aşınca en az kullanılanlar silinir (LRU).
+  Son kullanım zamanları bellekte toplanıp seyrek ve toplu yazılır; son
+  MEB_CONVERT_EVICT_GRACE_S saniyede kullanılan PDF'ler silinmez.
+  Arşivden yeniden açılıp mtime'ı değişen dosyalar tekrar dönüştürülmez.
+- Eski sürümün belgenin yanına yazdığı <stem>_converted.pdf dosyaları önbelleğe
+  taşınır (belgeden yeniyse) ya da silinir.
 - Error Handling & Fallback Mechanisms
 
 Son Güncelleme: 2025-07-28
@@ -21,10 +28,24 @@ import logging
 from typing import Optional, Tuple
 import subprocess
 import shutil
+import threading
+import time
 
 # CLAUDE.md Prensibi: Modüler Import Sistemi
-from modules.utils_env import get_project_root
+from modules.utils_env import get_project_root, get_data_path
 from modules.utils_normalize import sanitize_filename_tr
+from modules.utils_database import with_database
+from modules.utils_file_hash import hash_file
+from modules.utils_stats import record_file_in_inventory, remove_file_from_inventory
+
+CONVERSION_CACHE_DIR = os.path.join('data', 'converted')
+CONVERSION_CACHE_BUDGET_MB = int(os.getenv('MEB_CONVERT_CACHE_MB', '2048'))
+# LRU tahliyesinde bu süre içinde kullanılmış PDF'ler silinmez (az önce döndürülmüş olabilir)
+CONVERSION_EVICT_GRACE_SECONDS = int(os.getenv('MEB_CONVERT_EVICT_GRACE_S', '300'))
+# Önbellek isabetlerinin son kullanım zamanları en fazla bu aralıkla veritabanına yazılır
+CONVERSION_TOUCH_FLUSH_SECONDS = 60
+# Eski sürümün belgenin yanına yazdığı dönüşüm dosyası: <stem>_converted.pdf
+LEGACY_CONVERTED_SUFFIX = '_converted.pdf'
 
 # Logger setup
 logger = logging.getLogger(__name__)
@@ -33,63 +54,110 @@ class DocxToPdfConverter:
     """
     DOC/DOCX dosyalarını PDF'e çeviren sınıf
     
-    CLAUDE.md Prensibi: Same directory caching + Smart extension handling
+    CLAUDE.md Prensibi: Content-hash caching + Smart extension handling
     """
     
     SUPPORTED_EXTENSIONS = ['.doc', '.docx', '.DOC', '.DOCX']
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, cache_budget_mb: int = CONVERSION_CACHE_BUDGET_MB,
+                 evict_grace_seconds: int = CONVERSION_EVICT_GRACE_SECONDS):
         self.project_root = get_project_root()
+        self.cache_dir = cache_dir or os.path.join(self.project_root, CONVERSION_CACHE_DIR)
+        self.cache_budget = cache_budget_mb * 1024 * 1024
+        self.evict_grace = evict_grace_seconds
+        # abspath -> (boyut, mtime_ns, sha256): değişmemiş dosyalar tekrar hash'lenmez
+        self._hash_memo = {}
+        self._hash_lock = threading.Lock()
+        # sha256 -> son kullanım (time.time()); veritabanına toplu yazılır
+        self._pending_touches = {}
+        self._last_touch_flush = time.monotonic()
+        self._touch_lock = threading.Lock()
         logger.info(f"📁 DocxToPdfConverter initialized with PROJECT_ROOT: {self.project_root}")
     
+    def source_hash(self, doc_path: str) -> str:
+        """Kaynak belgenin sha256'sı (boyut + mtime değişmedikçe bellekten)."""
+        key = os.path.abspath(doc_path)
+        stat = os.stat(key)
+        with self._hash_lock:
+            memo = self._hash_memo.get(key)
+        if memo and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+            return memo[2]
+        sha256, _ = hash_file(key)
+        with self._hash_lock:
+            self._hash_memo[key] = (stat.st_size, stat.st_mtime_ns, sha256)
+        return sha256
+    
     def get_cached_pdf_path(self, original_path: str) -> str:
         """
-        Aynı dizinde cache edilmiş PDF path'ini döndürür
+        Belgenin içeriğine göre önbellekteki PDF path'ini döndürür
         
         Args:
             original_path: /path/to/document.docx
             
         Returns:
-            /path/to/document_converted.pdf
+            <cache_dir>/<sha256[:2]>/<sha256>.pdf
         """
-        original_file = Path(original_path)
-        
-        # Same directory + _converted suffix
-        pdf_name = f"{original_file.stem}_converted.pdf"
-        cached_pdf_path = original_file.parent / pdf_name
-        
-        return str(cached_pdf_path)
+        sha256 = self.source_hash(original_path)
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}.pdf")
     
-    def is_pdf_cache_valid(self, original_path: str, cached_pdf_path: str) -> bool:
+    def find_cached_pdf(self, original_path: str, touch: bool = True) -> Optional[str]:
         """
-        Cache edilmiş PDF'in geçerli olup olmadığını kontrol eder
-        
-        CLAUDE.md Prensibi: File validation
+        Aynı içerik daha önce dönüştürüldüyse PDF path'ini döndürür (yoksa None).
+        touch=True ise LRU için son kullanım zamanı kaydedilir (bellekte; dosya
+        sunma yolunda her isabette veritabanına yazılmaz).
         """
         try:
-            if not os.path.exists(cached_pdf_path):
-                return False
-                
-            if not os.path.exists(original_path):
-                return False
-            
-            # Modification time karşılaştırması
-            original_mtime = os.path.getmtime(original_path)
-            cached_mtime = os.path.getmtime(cached_pdf_path)
-            
-            # Cache daha yeni ise geçerli
-            is_valid = cached_mtime >= original_mtime
-            
-            if is_valid:
-                logger.info(f"✅ Valid PDF cache found: {cached_pdf_path}")
-            else:
-                logger.info(f"⚠️ PDF cache outdated: {cached_pdf_path}")
-                
-            return is_valid
-            
-        except Exception as e:
-            logger.error(f"❌ Cache validation error: {e}")
-            return False
+            cached_pdf_path = self.get_cached_pdf_path(original_path)
+        except OSError:
+            return None
+        if not os.path.exists(cached_pdf_path):
+            return None
+        if touch:
+            self._note_use(os.path.basename(cached_pdf_path)[:-4])
+        logger.info(f"✅ Valid PDF cache found: {cached_pdf_path}")
+        return cached_pdf_path
+    
+    def _note_use(self, sha256: str):
+        """Kullanımı bellekte işler; CONVERSION_TOUCH_FLUSH_SECONDS dolduysa toplu yazar."""
+        with self._touch_lock:
+            self._pending_touches[sha256] = time.time()
+            if time.monotonic() - self._last_touch_flush < CONVERSION_TOUCH_FLUSH_SECONDS:
+                return
+        self.flush_touches()
+    
+    def flush_touches(self):
+        """Bekleyen son kullanım zamanlarını tek executemany ile yazar."""
+        with self._touch_lock:
+            touches = list(self._pending_touches.items())
+            self._pending_touches.clear()
+            self._last_touch_flush = time.monotonic()
+        if touches:
+            _touch_conversions(touches)
+    
+    def adopt_legacy_pdf(self, doc_path: str) -> Optional[str]:
+        """
+        Belgenin yanındaki eski <stem>_converted.pdf dosyasını ele alır: belgeden yeniyse
+        (eski sürümün geçerlilik kuralı) içerik hash'li önbelleğe taşınır, değilse silinir.
+        
+        Returns:
+            Önbelleğe taşındıysa yeni PDF yolu, yoksa None
+        """
+        legacy_path = legacy_converted_path(doc_path)
+        if not os.path.exists(legacy_path):
+            return None
+        cached_pdf_path = self.get_cached_pdf_path(doc_path)
+        adopted = None
+        if not os.path.exists(cached_pdf_path) and os.path.getmtime(legacy_path) >= os.path.getmtime(doc_path):
+            os.makedirs(os.path.dirname(cached_pdf_path), exist_ok=True)
+            shutil.move(legacy_path, cached_pdf_path)
+            adopted = cached_pdf_path
+        else:
+            os.remove(legacy_path)
+        remove_file_from_inventory(legacy_path)
+        if adopted:
+            self._record_conversion(doc_path, adopted, 'legacy')
+            logger.info(f"📦 Eski dönüşüm önbelleğe taşındı: {legacy_path}")
+        return adopted
     
     def is_supported_format(self, file_path: str) -> bool:
         """
@@ -100,9 +168,14 @@ class DocxToPdfConverter:
         file_ext = Path(file_path).suffix
         return file_ext in self.SUPPORTED_EXTENSIONS
     
-    def convert_to_pdf_libreoffice(self, doc_path: str, cached_pdf_path: str) -> Tuple[bool, str]:
+    def convert_to_pdf_libreoffice(self, doc_path: str, cached_pdf_path: str,
+                                   profile_dir: Optional[str] = None) -> Tuple[bool, str]:
         """
         LibreOffice ile DOC/DOCX'i PDF'e çevirir (tablo yapısını korur)
+        
+        profile_dir verilirse LibreOffice bu kullanıcı profiliyle çalışır ve çıktıyı
+        profilin out/ klasörüne yazar. Ayrı profiller eşzamanlı dönüşümlerin profil
+        kilidinde ve aynı adlı çıktılarda çakışmasını önler (utils_conversion_service).
         """
         try:
             # LibreOffice var mı kontrol et
@@ -114,10 +187,17 @@ class DocxToPdfConverter:
             
             # Output directory
             output_dir = Path(cached_pdf_path).parent
+            output_dir.mkdir(parents=True, exist_ok=True)
+            profile_args = []
+            if profile_dir:
+                output_dir = Path(profile_dir) / 'out'
+                output_dir.mkdir(parents=True, exist_ok=True)
+                profile_args = [f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}"]
             
             # LibreOffice headless conversion
             cmd = [
                 libreoffice_cmd,
+                *profile_args,
                 '--headless',
                 '--convert-to', 'pdf',
                 '--outdir', str(output_dir),
@@ -135,7 +215,7 @@ class DocxToPdfConverter:
             )
             
             if result.returncode == 0:
-                # LibreOffice creates filename.pdf, we need filename_converted.pdf
+                # LibreOffice creates filename.pdf, we need <sha256>.pdf in the cache
                 original_pdf = output_dir / f"{Path(doc_path).stem}.pdf"
                 if original_pdf.exists():
                     # Rename to our cache naming convention
@@ -156,7 +236,9 @@ class DocxToPdfConverter:
     
     def convert_to_pdf_pymupdf_fallback(self, doc_path: str, cached_pdf_path: str) -> Tuple[bool, str]:
         """
-        PyMuPDF ile fallback conversion (görüntü kalitesi düşük ama her zaman çalışır)
+        PyMuPDF ile fallback conversion. MuPDF belgeyi kendi düzenler ve metin
+        katmanıyla PDF'e yazar: çıktı küçük kalır, metin aranabilir/seçilebilir
+        (sayfaları resme çevirmek yerine). Eski .doc biçimini desteklemez.
         """
         try:
             # PyMuPDF ile DOC/DOCX açma
@@ -166,23 +248,12 @@ class DocxToPdfConverter:
                 doc.close()
                 return False, "Belge boş veya okunamıyor"
             
-            # PDF'e dönüştürme - PyMuPDF pixmap method
-            pdf_doc = fitz.open()  # Yeni PDF oluştur
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                
-                # Page'i pixmap'e çevir (high resolution)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))  # 2x resolution
-                
-                # Yeni PDF page oluştur ve pixmap'i ekle
-                pdf_page = pdf_doc.new_page(width=pix.width, height=pix.height)
-                pdf_page.insert_image(pdf_page.rect, pixmap=pix)
-            
+            pdf_doc = fitz.open("pdf", doc.convert_to_pdf())
             doc.close()
             
-            # PDF'i kaydet
-            pdf_doc.save(cached_pdf_path)
+            # PDF'i kaydet (kullanılmayan nesneler atılır, akışlar sıkıştırılır)
+            os.makedirs(os.path.dirname(cached_pdf_path), exist_ok=True)
+            pdf_doc.save(cached_pdf_path, garbage=3, deflate=True)
             pdf_doc.close()
             
             logger.info(f"✅ PyMuPDF fallback conversion successful: {cached_pdf_path}")
@@ -191,7 +262,7 @@ class DocxToPdfConverter:
         except Exception as e:
             return False, f"PyMuPDF conversion error: {str(e)}"
 
-    def convert_to_pdf(self, doc_path: str) -> Tuple[bool, str, str]:
+    def convert_to_pdf(self, doc_path: str, profile_dir: Optional[str] = None) -> Tuple[bool, str, str]:
         """
         DOC/DOCX dosyasını PDF'e çevirir - Multiple methods with priority
         
@@ -201,6 +272,7 @@ class DocxToPdfConverter:
         
         Args:
             doc_path: DOC/DOCX dosya yolu
+            profile_dir: LibreOffice kullanıcı profili (dönüşüm havuzu işçileri için)
             
         Returns:
             (success: bool, pdf_path: str, error_message: str)
@@ -213,25 +285,28 @@ class DocxToPdfConverter:
                 return False, "", f"Dosya bulunamadı: {doc_path}"
             
             # Cache kontrolü
-            cached_pdf_path = self.get_cached_pdf_path(doc_path)
-            if self.is_pdf_cache_valid(doc_path, cached_pdf_path):
+            cached_pdf_path = self.find_cached_pdf(doc_path) or self.adopt_legacy_pdf(doc_path)
+            if cached_pdf_path:
                 logger.info(f"🔄 Using cached PDF: {cached_pdf_path}")
                 return True, cached_pdf_path, ""
+            cached_pdf_path = self.get_cached_pdf_path(doc_path)
             
             logger.info(f"🔄 Converting {doc_path} to PDF...")
             
             # Method 1: LibreOffice (preferred - preserves formatting)
-            success, error = self.convert_to_pdf_libreoffice(doc_path, cached_pdf_path)
+            success, error = self.convert_to_pdf_libreoffice(doc_path, cached_pdf_path, profile_dir)
             if success:
+                self._record_conversion(doc_path, cached_pdf_path, 'libreoffice')
                 return True, cached_pdf_path, ""
             
             logger.warning(f"⚠️ LibreOffice conversion failed: {error}")
             logger.info(f"🔄 Trying PyMuPDF fallback...")
             
-            # Method 2: PyMuPDF fallback (image quality)
+            # Method 2: PyMuPDF fallback (MuPDF layout, text preserved)
             success, error = self.convert_to_pdf_pymupdf_fallback(doc_path, cached_pdf_path)
             if success:
-                return True, cached_pdf_path, f"Warning: Using image conversion (LibreOffice not available)"
+                self._record_conversion(doc_path, cached_pdf_path, 'pymupdf')
+                return True, cached_pdf_path, f"Warning: Using PyMuPDF conversion (LibreOffice not available), layout may differ"
             
             # Both methods failed
             error_msg = f"All conversion methods failed. LibreOffice: {error}"
@@ -257,13 +332,106 @@ class DocxToPdfConverter:
         """
         logger.info(f"📄 Processing document: {doc_path}")
         
-        # Önce cache kontrolü
-        cached_pdf_path = self.get_cached_pdf_path(doc_path)
-        if self.is_pdf_cache_valid(doc_path, cached_pdf_path):
-            return True, cached_pdf_path, ""
-        
-        # Cache yoksa convert et
+        # convert_to_pdf önce içerik hash'i ile önbelleğe bakar
         return self.convert_to_pdf(doc_path)
+    
+    def _record_conversion(self, doc_path: str, cached_pdf_path: str, method: str):
+        """Dönüşümü indekse yazar ve önbellek bütçesi aşıldıysa eski PDF'leri siler."""
+        sha256 = os.path.basename(cached_pdf_path)[:-4]
+        _record_conversion(sha256, cached_pdf_path, method, os.path.getsize(cached_pdf_path), doc_path)
+        record_file_in_inventory(cached_pdf_path)
+        # Tahliye sırası güncel kullanım zamanlarıyla belirlenir
+        self.flush_touches()
+        evicted = _evict_conversions(self.cache_budget, keep=sha256, grace=self.evict_grace)
+        if isinstance(evicted, int) and evicted:
+            logger.info(f"🧹 PDF conversion cache: {evicted} eski dönüşüm silindi (LRU)")
+
+
+def legacy_converted_path(doc_path: str) -> str:
+    """Eski sürümün dönüşüm yolu: /path/to/document.docx -> /path/to/document_converted.pdf"""
+    return os.path.splitext(doc_path)[0] + LEGACY_CONVERTED_SUFFIX
+
+
+@with_database
+def _touch_conversions(cursor, touches):
+    """touches: [(sha256, son kullanım), ...]"""
+    cursor.executemany(
+        "UPDATE pdf_donusum SET last_used_at = MAX(COALESCE(last_used_at, 0), ?) WHERE kaynak_sha256 = ?",
+        [(used_at, sha256) for sha256, used_at in touches]
+    )
+
+
+@with_database
+def _record_conversion(cursor, sha256: str, pdf_path: str, method: str, size: int, source_path: str):
+    now = time.time()
+    cursor.execute("""
+        INSERT OR REPLACE INTO pdf_donusum
+            (kaynak_sha256, pdf_yolu, yontem, boyut, kaynak_yolu, created_at, last_used_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (sha256, pdf_path, method, size, source_path, now, now))
+
+
+@with_database
+def _evict_conversions(cursor, budget: int, keep: Optional[str] = None,
+                       grace: int = CONVERSION_EVICT_GRACE_SECONDS) -> int:
+    """
+    Toplam boyut bütçeyi aşana kadar en uzun süredir kullanılmayan PDF'leri siler.
+    Son grace saniyede kullanılanlar (az önce döndürülmüş olabilir) silinmez.
+    """
+    cursor.execute("SELECT COALESCE(SUM(boyut), 0) FROM pdf_donusum")
+    total = cursor.fetchone()[0]
+    if total <= budget:
+        return 0
+    cursor.execute(
+        "SELECT kaynak_sha256, pdf_yolu, boyut FROM pdf_donusum WHERE last_used_at < ? ORDER BY last_used_at",
+        (time.time() - grace,)
+    )
+    evicted = 0
+    for sha256, pdf_path, size in cursor.fetchall():
+        if total <= budget:
+            break
+        if sha256 == keep:
+            continue
+        try:
+            os.remove(pdf_path)
+        except FileNotFoundError:
+            pass
+        remove_file_from_inventory(pdf_path)
+        cursor.execute("DELETE FROM pdf_donusum WHERE kaynak_sha256 = ?", (sha256,))
+        total -= size
+        evicted += 1
+    return evicted
+
+def cleanup_legacy_conversions(root: Optional[str] = None) -> dict:
+    """
+    DBF klasörlerindeki eski <stem>_converted.pdf dosyalarını temizler: kaynak belgesi
+    olanlar önbelleğe taşınır (ya da geçersizse silinir), kaynağı olmayanlar silinir.
+    
+    Returns:
+        dict: {"adopted": int, "removed": int}
+    """
+    converter = get_converter()
+    root = root or get_data_path("dbf")
+    stats = {"adopted": 0, "removed": 0}
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for filename in filenames:
+            if not filename.endswith(LEGACY_CONVERTED_SUFFIX):
+                continue
+            legacy_path = os.path.join(dirpath, filename)
+            stem = filename[:-len(LEGACY_CONVERTED_SUFFIX)]
+            source = next((stem + ext for ext in DocxToPdfConverter.SUPPORTED_EXTENSIONS if stem + ext in names), None)
+            try:
+                if source and converter.adopt_legacy_pdf(os.path.join(dirpath, source)):
+                    stats["adopted"] += 1
+                    continue
+                if os.path.exists(legacy_path):
+                    os.remove(legacy_path)
+                    remove_file_from_inventory(legacy_path)
+                stats["removed"] += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Eski dönüşüm temizlenemedi: {legacy_path} - {e}")
+    return stats
 
 # Global instance - CLAUDE.md Prensibi: Singleton pattern
 _converter_instance = None
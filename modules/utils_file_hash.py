@@ -0,0 +1,111 @@
+"""
+modules/utils_file_hash.py - İçerik Hash İndeksi
+
+İndirilen dosyaların (ÇÖP, DBF, DM, BÖM) SHA-256 özetleri dosya_hash tablosunda
+tutulur. İçerik adresli depo (utils_blob_store) bu indeksi görünüm metadata'sı
+olarak kullanır.
+
+İçerdiği fonksiyonlar:
+- write_stream_with_hash: Parça parça gelen veriyi diske yazarken hash'ler
+- hash_file: Diskteki dosyanın hash'ini akış halinde hesaplar
+- register_file_hash: Dosyayı indekse ekler/günceller
+- link_file: Mevcut kopyayı hedef yola hard link (yoksa kopya) olarak bağlar
+- rebuild_file_hash_index: Mevcut data/ klasörlerini indekse ekler
+"""
+
+import hashlib
+import os
+import shutil
+from typing import Dict, Iterable, Optional, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASHED_CACHE_TYPES = ('cop', 'dbf', 'dm', 'bom')
+HASHED_EXTENSIONS = ('.pdf', '.docx', '.rar', '.zip')
+
+
+def _normalize_path(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def write_stream_with_hash(chunks: Iterable[bytes], dest_path: str) -> Tuple[str, int]:
+    """Parçaları dest_path'e yazar; (sha256, boyut) döndürür. Dosya belleğe alınmaz."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest_path, 'wb') as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def hash_file(path: str) -> Tuple[str, int]:
+    """Dosyanın (sha256, boyut) değerini HASH_CHUNK_SIZE parçalarla hesaplar."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def register_file_hash(cursor, path: str, sha256: str, size: int,
+                       cache_type: Optional[str] = None, url: Optional[str] = None):
+    """Dosyayı hash indeksine ekler (aynı yol varsa günceller)."""
+    cursor.execute("""
+        INSERT INTO dosya_hash (dosya_yolu, sha256, boyut, cache_type, kaynak_url)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(dosya_yolu) DO UPDATE SET
+            sha256 = excluded.sha256,
+            boyut = excluded.boyut,
+            cache_type = COALESCE(excluded.cache_type, dosya_hash.cache_type),
+            kaynak_url = COALESCE(excluded.kaynak_url, dosya_hash.kaynak_url),
+            hashed_at = CURRENT_TIMESTAMP
+    """, (_normalize_path(path), sha256, size, cache_type, url))
+
+
+def link_file(source_path: str, dest_path: str) -> str:
+    """
+    source_path'i dest_path'e hard link olarak bağlar. Dosya sistemi desteklemiyorsa
+    (farklı disk, FAT vb.) kopyalar. Kullanılan yöntemi ('hardlink'/'copy') döndürür.
+    """
+    try:
+        os.link(source_path, dest_path)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(source_path, dest_path)
+        return 'copy'
+
+
+def rebuild_file_hash_index(cursor, data_root: str = "data", cache_types=HASHED_CACHE_TYPES) -> Dict[str, int]:
+    """
+    data/<tip>/ altındaki dosyaları hash'leyip indekse ekler. Boyutu ve değiştirilme
+    zamanı indeksten eski olmayan dosyalar tekrar hash'lenmez.
+
+    Returns:
+        Dict: {"hashed", "skipped"}
+    """
+    stats = {"hashed": 0, "skipped": 0}
+    cursor.execute("SELECT dosya_yolu, sha256, boyut, strftime('%s', hashed_at) FROM dosya_hash")
+    known = {row[0]: (row[1], row[2], int(row[3] or 0)) for row in cursor.fetchall()}
+
+    for cache_type in cache_types:
+        root = os.path.join(data_root, cache_type)
+        if not os.path.isdir(root):
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(HASHED_EXTENSIONS):
+                    continue
+                path = _normalize_path(os.path.join(dirpath, filename))
+                stat = os.stat(path)
+                entry = known.get(path)
+                if entry and entry[1] == stat.st_size and int(stat.st_mtime) <= entry[2]:
+                    stats["skipped"] += 1
+                else:
+                    sha256, size = hash_file(path)
+                    register_file_hash(cursor, path, sha256, size, cache_type)
+                    stats["hashed"] += 1
+    return stats
@@ -6,59 +6,43 @@ ortak alan dosya sistemi işlemlerini içerir.
 
 """
 
+import json
 import os
 import shutil
 import requests
-import zipfile
-import tempfile
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Optional
 try:
     from .utils_normalize import sanitize_filename_tr
+    from .utils_stats import record_file_in_inventory
+    from .utils_http import http_get, get_shared_session, is_replay_mode, request as http_request, RETRY_STATUS_CODES
+    from .utils_database import with_database
+    from .utils_file_hash import write_stream_with_hash
+    from .utils_blob_store import blob_tmp_dir, store_blob_file, find_blob_for_url, link_view, find_duplicate_groups
+    from .utils_archive import detect_archive_type, extract_archive_members
 except ImportError:
     from utils_normalize import sanitize_filename_tr
+    from utils_stats import record_file_in_inventory
+    from utils_http import http_get, get_shared_session, is_replay_mode, request as http_request, RETRY_STATUS_CODES
+    from utils_database import with_database
+    from utils_file_hash import write_stream_with_hash
+    from utils_blob_store import blob_tmp_dir, store_blob_file, find_blob_for_url, link_view, find_duplicate_groups
+    from utils_archive import detect_archive_type, extract_archive_members
 
-def detect_archive_type(file_path: str) -> str:
+def extract_archive(archive_path: str, extract_to: str) -> List[str]:
     """
-    Dosyanın gerçek formatını header'dan tespit eder.
-    
-    Args:
-        file_path: Arşiv dosyasının yolu
-        
-    Returns:
-        Dosya tipi: RAR, ZIP, 7Z veya UNKNOWN
-    """
-    try:
-        with open(file_path, 'rb') as f:
-            header = f.read(16)
-        
-        if header.startswith(b'Rar!'):
-            return "RAR"
-        elif header.startswith(b'PK'):
-            return "ZIP"
-        elif header.startswith(b'7z'):
-            return "7Z"
-        else:
-            return f"UNKNOWN (header: {header[:8].hex()})"
-            
-    except Exception as e:
-        return f"ERROR: {e}"
-
-def extract_archive(archive_path: str, extract_to: str):
-    """
-    RAR, ZIP veya 7Z arşivini açar. 
-    unar komutu kullanır (%100 başarı - tüm formatları destekler)
+    RAR veya ZIP arşivindeki PDF/DOCX dosyalarını süreç içinde açar (utils_archive).
+    Gerçek format uzantıdan değil header'dan tespit edilir.
     
     Args:
         archive_path: Arşiv dosyasının yolu
         extract_to: Çıkarılacak klasör
-    """
-    if not os.path.exists(archive_path):
-        raise FileNotFoundError(f"Arşiv dosyası bulunamadı: {archive_path}")
     
-    os.makedirs(extract_to, exist_ok=True)
-    
-    # Gerçek dosya tipini header'dan tespit et
+    Returns:
+        Çıkarılan dosya yolları
+    """
     real_type = detect_archive_type(archive_path)
     file_extension = archive_path.lower().split('.')[-1]
     
@@ -68,136 +52,120 @@ def extract_archive(archive_path: str, extract_to: str):
     elif file_extension == 'zip' and real_type == 'RAR':
         print(f"⚠️ Dikkat: .zip uzantılı ama aslında RAR dosyası: {os.path.basename(archive_path)}")
     
-    # unar komutu - hem RAR hem ZIP hem 7Z açabilir (%100 başarı)
     try:
-        import subprocess
-        result = subprocess.run(['unar', '-o', extract_to, archive_path], 
-                              capture_output=True, text=True, timeout=60)
-        
-        if result.returncode == 0:
-            print(f"📦 Arşiv açıldı: {os.path.basename(archive_path)} ({real_type})")
-            return
-        else:
-            raise ValueError(f"unar başarısız: {result.stderr[:100]}")
-    
+        files = extract_archive_members(archive_path, extract_to)
     except FileNotFoundError:
-        raise ValueError(f"unar komutu bulunamadı. Lütfen 'brew install unar' çalıştırın.")
-    except subprocess.TimeoutExpired:
-        raise ValueError(f"Arşiv açma timeout (60s): {archive_path}")
+        raise
     except Exception as e:
         raise ValueError(f"Arşiv açılamadı: {archive_path} - {e}")
+    
+    print(f"📦 Arşiv açıldı: {os.path.basename(archive_path)} ({real_type}, {len(files)} dosya)")
+    return files
 
-def check_existing_file_in_all_areas(filename: str, cache_type: str, current_folder: str) -> Optional[str]:
+def download_with_retry(url: str, max_retries: int = 3, timeout: int = 30) -> Optional[requests.Response]:
     """
-    Dosyanın diğer alan klasörlerinde olup olmadığını kontrol eder.
+    Retry mekanizması ile dosya indirir.
+    Retry/backoff ve bağlantı havuzu utils_http paylaşılan istemcisinden gelir.
     
     Args:
-        filename: Aranacak dosya adı
-        cache_type: Cache tipi (cop, dbf, dm, bom)
-        current_folder: Şu anki klasör (dahil edilmez)
+        url: İndirilecek URL
+        max_retries: Maksimum deneme sayısı
+        timeout: Request timeout (saniye)
         
     Returns:
-        Bulunan dosyanın tam yolu veya None
+        requests.Response veya None
     """
-    cache_root = os.path.join("data", cache_type)
-    if not os.path.exists(cache_root):
-        return None
-    
-    for item in os.listdir(cache_root):
-        item_path = os.path.join(cache_root, item)
-        if not os.path.isdir(item_path) or item == current_folder:
-            continue
-            
-        file_path = os.path.join(item_path, filename)
-        if os.path.exists(file_path):
-            return file_path
+    try:
+        response = http_get(url, retries=max_retries, timeout=timeout, conditional=False)
+        response.raise_for_status()
+        return response
+        
+    except requests.exceptions.Timeout:
+        print(f"❌ Timeout (tüm denemeler tükendi): {url}")
+    except requests.exceptions.ConnectionError:
+        print(f"❌ Bağlantı hatası (tüm denemeler tükendi): {url}")
+    except requests.exceptions.HTTPError as e:
+        print(f"❌ HTTP hatası: {e} - {url}")
+    except Exception as e:
+        print(f"❌ Genel hata ({url}): {e}")
     
     return None
 
-def move_file_to_shared_folder(source_path: str, cache_type: str, filename: str) -> Optional[str]:
+_filename_locks = {}
+_filename_locks_guard = threading.Lock()
+
+def _filename_lock(cache_type: str, filename: str) -> threading.Lock:
+    """Aynı cache tipi + dosya adı için paylaşılan kilit (paralel indirmelerde yarışı önler)."""
+    with _filename_locks_guard:
+        return _filename_locks.setdefault((cache_type, filename), threading.Lock())
+
+# Blob deposu erişimi (veritabanı yoksa/erişilemezse metadata atlanır, dosya yine indirilir)
+@with_database
+def _lookup_blob_by_url(cursor, url: str) -> Optional[str]:
+    return find_blob_for_url(cursor, url)
+
+@with_database
+def _link_blob_view(cursor, blob: str, view_path: str, sha256: str, size: int,
+                    cache_type: str, alan_klasoru: str, ek_bilgi: Optional[str], url: str) -> str:
+    return link_view(cursor, blob, view_path, sha256, size, cache_type, alan_klasoru, ek_bilgi, url)
+
+@with_database
+def _blob_duplicate_groups(cursor, cache_type: str) -> List[Dict]:
+    return find_duplicate_groups(cursor, cache_type)
+
+def _path_or_none(result) -> Optional[str]:
+    # with_database hata durumunda {"error": ...} döndürür
+    return result if isinstance(result, str) else None
+
+def _link_or_copy_view(blob: str, view_path: str, sha256: str, size: int, cache_type: str,
+                       alan_klasoru: str, ek_bilgi: Optional[str], url: str) -> str:
     """
-    Duplicate dosyayı ortak alana taşır.
-    NOT: 00_Ortak_Alan_Dersleri sistemi kaldırıldı.
-    
-    Args:
-        source_path: Kaynak dosya yolu
-        cache_type: Cache tipi
-        filename: Dosya adı
-    
-    Returns:
-        Taşınan dosyanın yeni yolu veya None
+    Blob'u görünüme bağlar; metadata yazılamazsa (DB yok) sadece dosya bağlantısı yapılır.
+    Yeni görünüm dosyası istatistik envanterine link_view'de (ya da burada) eklenir.
     """
-    try:
-        # 00_Ortak_Alan_Dersleri sistemi kaldırıldı - dosyalar kendi klasörlerinde kalır
-        print(f"🔄 Duplicate dosya tespit edildi ancak taşınmayacak: {filename}")
-        return None  # Shared folder sistemi kaldırıldı
-        
-    except Exception as e:
-        print(f"❌ Dosya taşıma hatası ({filename}): {e}")
-        return None
+    method = _link_blob_view(blob, view_path, sha256, size, cache_type, alan_klasoru, ek_bilgi, url)
+    if isinstance(method, str):
+        return method
+    if not os.path.exists(view_path):
+        shutil.copy2(blob, view_path)
+        record_file_in_inventory(view_path)
+    return 'copy'
 
-def download_with_retry(url: str, max_retries: int = 3, timeout: int = 30) -> Optional[requests.Response]:
+def download_to_file_with_hash(url: str, dest_path: str, max_retries: int = 3, timeout: int = 60) -> Optional[tuple]:
     """
-    Retry mekanizması ile dosya indirir.
-    SOLID S: Single Responsibility - sadece retry logic
-    SOLID O: Open/Closed - farklı retry stratejileri eklenebilir
-    
-    Args:
-        url: İndirilecek URL
-        max_retries: Maksimum deneme sayısı
-        timeout: Request timeout (saniye)
-        
+    URL'yi parça parça dest_path'e yazarken SHA-256 hesaplar (yanıt belleğe alınmaz).
+    Aktarım yarıda koparsa ya da sunucu 429/5xx dönerse baştan tekrar dener; tek tekrar
+    katmanı budur (utils_http.request tek denemeyle çağrılır).
+
     Returns:
-        requests.Response veya None
+        (sha256, boyut) veya None
     """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers=headers, timeout=timeout)
-            response.raise_for_status()
-            return response
-            
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                wait_time = 2 ** attempt  # Exponential backoff
-                print(f"⏱️ Timeout (deneme {attempt + 1}/{max_retries}), {wait_time}s bekleniyor: {url}")
-                time.sleep(wait_time)
+            with http_request('GET', url, retries=1, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                return write_stream_with_hash(response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), dest_path)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in RETRY_STATUS_CODES and attempt < max_retries - 1:
+                time.sleep(2 ** attempt)
                 continue
-            else:
-                print(f"❌ Timeout (tüm denemeler tükendi): {url}")
-                
-        except requests.exceptions.ConnectionError:
+            print(f"❌ HTTP hatası: {e} - {url}")
+            return None
+        except requests.exceptions.RequestException as e:
             if attempt < max_retries - 1:
-                wait_time = 2 ** attempt
-                print(f"🔌 Bağlantı hatası (deneme {attempt + 1}/{max_retries}), {wait_time}s bekleniyor: {url}")
-                time.sleep(wait_time)
+                print(f"🔌 İndirme kesildi (deneme {attempt + 1}/{max_retries}), tekrar deneniyor: {url}")
+                time.sleep(2 ** attempt)
                 continue
-            else:
-                print(f"❌ Bağlantı hatası (tüm denemeler tükendi): {url}")
-                
-        except requests.exceptions.HTTPError as e:
-            if e.response and 500 <= e.response.status_code < 600:
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"🔧 Sunucu hatası {e.response.status_code} (deneme {attempt + 1}/{max_retries}), {wait_time}s bekleniyor: {url}")
-                    time.sleep(wait_time)
-                    continue
-            print(f"❌ HTTP hatası: {e} - {url}")
-            break
-            
-        except Exception as e:
-            print(f"❌ Genel hata ({url}): {e}")
-            break
-    
+            print(f"❌ İndirme hatası (tüm denemeler tükendi): {url} - {e}")
     return None
 
 def download_and_cache_pdf(url: str, cache_type: str, alan_adi: str = None, additional_info: str = None, alan_id: str = None, alan_db_id: int = None, meb_alan_id: str = None, max_retries: int = 3) -> Optional[str]:
     """
     PDF'yi indirir ve organize şekilde cache'ler.
-    Duplicate dosyalar için ortak alan klasörü kullanır.
+    İndirme diske akış halinde yazılırken SHA-256 hesaplanır; içerik data/blobs/ altında
+    tek kopya olarak saklanır ve alan klasöründeki dosya blob'a hard link'tir
+    (utils_blob_store). Aynı içerik veya aynı URL tekrar saklanmaz.
     
     Args:
         url: PDF URL'si
@@ -248,31 +216,41 @@ def download_and_cache_pdf(url: str, cache_type: str, alan_adi: str = None, addi
         
         file_path = os.path.join(cache_dir, filename)
         
-        # Dosya zaten varsa indirme
-        if os.path.exists(file_path):
-            print(f"📁 Cache'den alınıyor: {file_path}")
-            return file_path
-        
-        # Dosyanın başka alan klasörlerinde olup olmadığını kontrol et
-        existing_file_path = check_existing_file_in_all_areas(filename, cache_type, folder_name)
-        if existing_file_path:
-            # Dosya başka bir alanda mevcut - ortak alana taşı
-            shared_path = move_file_to_shared_folder(existing_file_path, cache_type, filename)
-            if shared_path:
-                print(f"📁 Ortak alandan kullanılıyor: {shared_path}")
-                return shared_path
-        
-        # 00_Ortak_Alan_Dersleri sistemi kaldırıldı - bu kontrol artık yapılmıyor
-        
-        # PDF'yi retry mekanizması ile indir
-        print(f"⬇️ İndiriliyor: {url}")
-        response = download_with_retry(url, max_retries=max_retries)
-        if not response:
-            return None
-        
-        # Dosyayı kaydet
-        with open(file_path, 'wb') as f:
-            f.write(response.content)
+        # Paralel indirmelerde aynı dosya adı için kontrol + bağlama + yazma sıralı yapılır
+        with _filename_lock(cache_type, filename):
+            # Dosya zaten varsa indirme
+            if os.path.exists(file_path):
+                print(f"📁 Cache'den alınıyor: {file_path}")
+                return file_path
+            
+            # Aynı URL daha önce indirildiyse ağa çıkmadan blob'a bağla
+            blob = _path_or_none(_lookup_blob_by_url(url))
+            if blob:
+                sha256 = os.path.basename(blob).split('.')[0]
+                method = _link_or_copy_view(blob, file_path, sha256, os.path.getsize(blob),
+                                            cache_type, folder_name, additional_info, url)
+                print(f"🔗 Aynı URL blob'a bağlandı ({method}): {file_path}")
+                return file_path
+            
+            # Diske akış halinde indir, hash'i yazarken hesapla
+            print(f"⬇️ İndiriliyor: {url}")
+            tmp_path = os.path.join(blob_tmp_dir(), f"{threading.get_ident()}_{filename}.tmp")
+            try:
+                downloaded = download_to_file_with_hash(url, tmp_path, max_retries=max_retries)
+                if not downloaded:
+                    return None
+                sha256, size = downloaded
+                
+                # İçerik deposuna atomik olarak al (aynı blob varsa geçici dosya atılır),
+                # klasör görünümüne hard link ile bağla (yarım PDF asla hedef adda görünmez)
+                blob = store_blob_file(tmp_path, sha256, os.path.splitext(filename)[1])
+                method = _link_or_copy_view(blob, file_path, sha256, size,
+                                            cache_type, folder_name, additional_info, url)
+                if method == 'copy':
+                    print(f"⚠️ Hard link kullanılamadı, kopyalandı: {file_path}")
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
         
         print(f"✅ İndirildi: {file_path}")
         return file_path
@@ -284,10 +262,247 @@ def download_and_cache_pdf(url: str, cache_type: str, alan_adi: str = None, addi
         print(f"❌ Genel hata ({url}): {e}")
         return None
 
+# Paralel / devam ettirilebilir indirme ayarları
+PARTIAL_SUFFIX = '.part'
+# Yarım dosyanın ETag / Last-Modified doğrulayıcısı (If-Range için) `.part.meta` yan dosyasında tutulur
+PARTIAL_META_SUFFIX = '.meta'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def download_file_resumable(url: str, dest_path: str, session: requests.Session = None,
+                            timeout: int = 60, max_retries: int = 3,
+                            progress_callback=None) -> Dict:
+    """
+    Dosyayı `dest_path + '.part'` içine indirir; bağlantı koparsa HTTP Range ile
+    kaldığı yerden devam eder. Tamamlanınca `.part` dosyası atomik olarak
+    `dest_path`'e taşınır (os.replace), böylece yarım dosya asla hedef adda görünmez.
+    Tüm denemeler başarısız olursa `.part` dosyası bir sonraki çalıştırma için bırakılır.
+
+    Devam isteği, indirme başlarken kaydedilen ETag / Last-Modified ile If-Range
+    gönderir. Sunucu 200 dönerse (dosya değişmiş) ya da 206 yanıtındaki doğrulayıcı
+    kayıtlı olanla uyuşmazsa indirme baştan yapılır. Doğrulayıcısı olmayan yarım
+    dosyaya devam edilmez.
+
+    Args:
+        url: İndirilecek URL
+        dest_path: Hedef dosya yolu
+        session: Kullanılacak requests.Session (None ise utils_http paylaşılan session'ı)
+        timeout: Bağlantı / okuma timeout (saniye)
+        max_retries: Maksimum deneme sayısı
+        progress_callback: Her yazılan parça için çağrılır: callback(byte_sayisi)
+
+    Returns:
+        Dict: {"success", "path", "bytes", "resumed_from", "status_code", "error"}
+    """
+    session = session or get_shared_session()
+    part_path = dest_path + PARTIAL_SUFFIX
+    result = {"success": False, "path": dest_path, "bytes": 0, "resumed_from": 0,
+              "status_code": None, "error": None}
+    if is_replay_mode():
+        result["error"] = "Replay modu: ağ erişimi kapalı"
+        return result
+
+    for attempt in range(max_retries):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = _read_partial_validator(part_path) if offset else {}
+        if_range = _if_range_value(validator)
+        if offset and not if_range:
+            # Yarım dosyanın hangi sürüme ait olduğu bilinmiyor: baştan indir
+            _discard_partial(part_path)
+            offset = 0
+        headers = {'Range': f'bytes={offset}-', 'If-Range': if_range} if offset else {}
+        try:
+            # Host eşzamanlılık sınırı ve hız sınırlayıcı utils_http üzerinden uygulanır;
+            # tekrar deneme bu döngüde yapılır (kaldığı yerden devam için)
+            with http_request('GET', url, session=session, retries=1, headers=headers,
+                              stream=True, timeout=timeout) as r:
+                result["status_code"] = r.status_code
+
+                if r.status_code == 416 and offset:
+                    # Range karşılanamadı: .part muhtemelen zaten tam; değilse baştan indir
+                    total = _content_range_total(r.headers.get('Content-Range'))
+                    if total is not None and total == offset:
+                        break
+                    _discard_partial(part_path)
+                    continue
+
+                r.raise_for_status()
+
+                if offset and r.status_code == 206:
+                    if not _validator_matches(validator, r.headers):
+                        # Sunucu If-Range'i yok saydı ve dosya değişmiş: eski parça kullanılamaz
+                        print(f"⚠️ Sunucudaki dosya değişmiş, indirme baştan başlıyor: {url}")
+                        _discard_partial(part_path)
+                        continue
+                    mode = 'ab'
+                    result["resumed_from"] = result["resumed_from"] or offset
+                    total = _content_range_total(r.headers.get('Content-Range'))
+                else:
+                    # Range desteklenmiyor ya da If-Range tutmadı (200): baştan yaz
+                    mode, offset = 'wb', 0
+                    content_length = r.headers.get('content-length')
+                    total = int(content_length) if content_length and content_length.isdigit() else None
+                    _write_partial_validator(part_path, r.headers)
+
+                written = offset
+                with open(part_path, mode) as f:
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            written += len(chunk)
+                            if progress_callback:
+                                progress_callback(len(chunk))
+
+                if total is not None and written < total:
+                    raise requests.exceptions.ConnectionError(
+                        f"Bağlantı erken kapandı ({written}/{total} byte)"
+                    )
+                break
+
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            result["error"] = f"HTTP {status}" if status else str(e)
+            if status and 500 <= status < 600 and attempt < max_retries - 1:
+                time.sleep(2 ** attempt)
+                continue
+            return result
+
+        except requests.exceptions.RequestException as e:
+            result["error"] = str(e)
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt  # Exponential backoff
+                print(f"🔌 İndirme kesildi (deneme {attempt + 1}/{max_retries}), {wait_time}s sonra devam edilecek: {url}")
+                time.sleep(wait_time)
+                continue
+            return result
+    else:
+        return result
+
+    os.replace(part_path, dest_path)
+    _remove_quietly(part_path + PARTIAL_META_SUFFIX)
+    result.update(success=True, error=None, bytes=os.path.getsize(dest_path))
+    return result
+
+
+def _read_partial_validator(part_path: str) -> Dict:
+    """Yarım dosya için kaydedilmiş {"etag", "last_modified"} bilgisini okur."""
+    try:
+        with open(part_path + PARTIAL_META_SUFFIX, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_partial_validator(part_path: str, headers) -> None:
+    """Yeni başlayan indirmenin ETag / Last-Modified değerini yan dosyaya yazar."""
+    validator = {"etag": headers.get('ETag'), "last_modified": headers.get('Last-Modified')}
+    if not validator["etag"] and not validator["last_modified"]:
+        _remove_quietly(part_path + PARTIAL_META_SUFFIX)
+        return
+    with open(part_path + PARTIAL_META_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(validator, f)
+
+
+def _if_range_value(validator: Dict) -> Optional[str]:
+    """If-Range yalnızca güçlü ETag ya da Last-Modified ile kullanılabilir."""
+    etag = validator.get("etag")
+    if etag and not etag.startswith('W/'):
+        return etag
+    return validator.get("last_modified")
+
+
+def _validator_matches(validator: Dict, headers) -> bool:
+    """206 yanıtındaki doğrulayıcı, yarım dosyanınkiyle aynı mı?"""
+    for key, header in (("etag", 'ETag'), ("last_modified", 'Last-Modified')):
+        value = headers.get(header)
+        if validator.get(key) and value and value != validator[key]:
+            return False
+    return True
+
+
+def _discard_partial(part_path: str) -> None:
+    _remove_quietly(part_path)
+    _remove_quietly(part_path + PARTIAL_META_SUFFIX)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """'bytes 100-199/2000' başlığından toplam boyutu (2000) çıkarır."""
+    if not content_range or '/' not in content_range:
+        return None
+    total = content_range.rsplit('/', 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+def download_files_concurrently(jobs: List[Dict], max_workers: int = 4, timeout: int = 60,
+                                max_retries: int = 3, progress_interval: float = 2.0):
+    """
+    İş listesini sınırlı bir thread havuzunda devam ettirilebilir şekilde indirir.
+    Tüm thread'ler paylaşılan Session'ın host başına bağlantı havuzunu kullanır.
+
+    Args:
+        jobs: [{"url": ..., "path": ..., ...ek alanlar}, ...]
+        max_workers: Eşzamanlı indirme sayısı
+
+    Yields:
+        {"event": "throughput", "bytes", "elapsed", "rate", "completed", "total"}
+            progress_interval saniyede bir toplam indirme hızı
+        {"event": "result", "job", "result", "completed", "total"}
+            her iş tamamlandığında download_file_resumable sonucu
+    """
+    if not jobs:
+        return
+
+    lock = threading.Lock()
+    counters = {"bytes": 0}
+
+    def add_bytes(n):
+        with lock:
+            counters["bytes"] += n
+
+    def run(job):
+        return download_file_resumable(job["url"], job["path"], timeout=timeout,
+                                       max_retries=max_retries, progress_callback=add_bytes)
+
+    started = time.time()
+    completed = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = {executor.submit(run, job): job for job in jobs}
+        while pending:
+            done, _ = wait(pending, timeout=progress_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                completed += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "path": job["path"], "bytes": 0,
+                              "resumed_from": 0, "status_code": None, "error": str(e)}
+                yield {"event": "result", "job": job, "result": result,
+                       "completed": completed, "total": len(jobs)}
+
+            elapsed = time.time() - started
+            with lock:
+                total_bytes = counters["bytes"]
+            yield {"event": "throughput", "bytes": total_bytes, "elapsed": elapsed,
+                   "rate": total_bytes / elapsed if elapsed > 0 else 0.0,
+                   "completed": completed, "total": len(jobs)}
+    finally:
+        # Tüketici generator'ı kapattıysa (iş iptali) kuyruktaki indirmeler beklenmez;
+        # sürmekte olanlar arka planda biter, .part dosyaları sonraki çalıştırmada devam eder
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def check_duplicate_files_in_cache(cache_type: str = 'cop') -> Dict:
     """
-    Cache klasörlerindaki duplicate dosyaları kontrol eder.
-    Ortak alan sistemi kaldırıldığı için sadece bilgi amaçlı.
+    Aynı içeriği paylaşan dosyaları blob metadata'sından bulur (klasör taraması yapılmaz).
+    Kopyalar diskte tek blob olarak saklandığı için sadece bilgi amaçlı.
     
     Args:
         cache_type: 'cop', 'dbf', 'dm', 'bom' gibi dosya tipi
@@ -295,43 +510,13 @@ def check_duplicate_files_in_cache(cache_type: str = 'cop') -> Dict:
     Returns:
         Dict: Duplicate dosya bilgileri
     """
-    cache_root = os.path.join("data", cache_type)
-    if not os.path.exists(cache_root):
-        return {"error": f"Cache dizini bulunamadı: {cache_root}"}
-    
-    # Dosya analizi
-    files_by_name = {}
-    folder_stats = {}
-    
-    for item in os.listdir(cache_root):
-        item_path = os.path.join(cache_root, item)
-        if not os.path.isdir(item_path):
-            continue
-        
-        folder_name = item
-        files = [f for f in os.listdir(item_path) if f.lower().endswith(('.pdf', '.rar', '.zip'))]
-        folder_stats[folder_name] = len(files)
-        
-        # Dosya adlarını kaydet
-        if folder_name not in files_by_name:
-            files_by_name[folder_name] = {}
-        
-        for file in files:
-            files_by_name[folder_name][file] = True
-        
-        # 00_Ortak_Alan_Dersleri sistemi kaldırıldı
-        # Duplicate dosyalar artık sadece log ile takip edilir
-        duplicate_count = 0
-        for file in files:
-            if any(file in files_by_name.get(other_folder, {}) for other_folder in files_by_name if other_folder != folder_name):
-                duplicate_count += 1
-        
-        if duplicate_count > 0:
-            print(f"      🔄 Duplicate tespit edildi: {duplicate_count} dosya (artık taşınmıyor)")
+    groups = _blob_duplicate_groups(cache_type)
+    if isinstance(groups, dict):
+        return groups
     
     return {
-        "folder_stats": folder_stats,
-        "shared_folders": []  # Ortak klasör sistemi kaldırıldı
+        "duplicate_groups": groups,
+        "duplicate_files": sum(group["count"] - 1 for group in groups)
     }
 
 def scan_directory_for_pdfs(root_dir: str) -> List[Dict]:
@@ -394,37 +579,21 @@ def scan_directory_for_archives(root_dir: str) -> List[Dict]:
 
 def log_duplicate_files_info(cache_type: str = 'cop'):
     """
-    Duplicate dosyaları konsola loglar. 
-    00_Ortak_Alan_Dersleri sistemi kaldırıldı, sadece bilgi amaçlı.
+    Aynı içeriği paylaşan dosyaları konsola loglar (blob metadata'sından).
     
     Args:
         cache_type: 'cop', 'dbf', 'dm', 'bom' gibi dosya tipi
     """
-    cache_root = os.path.join("data", cache_type)
-    if not os.path.exists(cache_root):
-        print(f"Cache dizini bulunamadı: {cache_root}")
+    result = check_duplicate_files_in_cache(cache_type)
+    if "error" in result:
+        print(f"Duplicate kontrolü yapılamadı: {result['error']}")
         return
     
-    # Dosya adı -> klasör listesi mapping
-    file_locations = {}
-    
-    for item in os.listdir(cache_root):
-        item_path = os.path.join(cache_root, item)
-        if not os.path.isdir(item_path) or item.startswith('00_'):
-            continue
-            
-        for file in os.listdir(item_path):
-            if file.lower().endswith(('.pdf', '.rar', '.zip')):
-                if file not in file_locations:
-                    file_locations[file] = []
-                file_locations[file].append(item)
-    
-    # Duplicate dosyaları listele
-    duplicates = {file: locations for file, locations in file_locations.items() if len(locations) > 1}
-    
-    if duplicates:
-        print(f"\n🔄 {cache_type.upper()} duplicate dosyalar tespit edildi:")
-        for file, locations in duplicates.items():
-            print(f"  📄 {file} -> {len(locations)} klasörde: {', '.join(locations)}")
+    groups = result["duplicate_groups"]
+    if groups:
+        print(f"\n🔄 {cache_type.upper()} aynı içerikli dosyalar (tek blob olarak saklanıyor):")
+        for group in groups:
+            locations = [os.path.basename(os.path.dirname(path)) for path in group["paths"]]
+            print(f"  📄 {os.path.basename(group['paths'][0])} -> {group['count']} klasörde: {', '.join(locations)}")
     else:
-        print(f"\n✅ {cache_type.upper()} duplicate dosya bulunamadı")
\ No newline at end of file
+        print(f"\n✅ {cache_type.upper()} duplicate dosya bulunamadı")
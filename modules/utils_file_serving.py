@@ -0,0 +1,139 @@
+"""
+modules/utils_file_serving.py - /api/files Dosya Sunumu
+
+Side viewer'ın açtığı DBF/ÇÖP PDF'leri her açılışta baştan indirilmesin diye:
+- Koşullu istekler: ETag / Last-Modified ile değişmemiş dosyaya 304 döner
+- Byte aralıkları (Range): tarayıcının PDF görüntüleyicisi büyük PDF'i parça parça yükler
+- Cache-Control: içerik adresli dosyalar (data/blobs, data/converted) değişmez,
+  uzun süre "immutable" önbelleklenir; diğerleri FILE_MAX_AGE saniye sonra ETag ile
+  doğrulanır
+- Sıfır kopya: gövde wsgi.file_wrapper ile gönderilir (gunicorn vb. sendfile kullanır);
+  MEB_X_SENDFILE=1 ise gönderim önündeki nginx/Apache'ye bırakılır (X-Sendfile)
+- Yol çözümleme önbelleği: URL yolu -> doğrulanmış gerçek yol (realpath, arşiv
+  üyesi açma, proje dışı kontrolü her istekte tekrarlanmaz)
+
+İçerdiği fonksiyonlar:
+- FilePathResolver: URL yolunu güvenli gerçek yola çözen LRU önbellek
+- get_file_resolver: Proses genelindeki resolver
+- send_project_file: Önbellek başlıklarıyla dosya yanıtı üretir
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from flask import send_file
+
+try:
+    from .utils_env import get_project_root
+    from .utils_archive import split_member_ref, materialize_archive_member
+    from .utils_blob_store import BLOB_ROOT
+    from .utils_docx_to_pdf import CONVERSION_CACHE_DIR
+except ImportError:
+    from utils_env import get_project_root
+    from utils_archive import split_member_ref, materialize_archive_member
+    from utils_blob_store import BLOB_ROOT
+    from utils_docx_to_pdf import CONVERSION_CACHE_DIR
+
+FILE_MAX_AGE = int(os.getenv('MEB_FILE_MAX_AGE', '300'))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+FILE_PATH_CACHE_SIZE = 4096
+# Dosya adı içeriğin sha256'sı olan klasörler: aynı URL hep aynı baytları döndürür
+IMMUTABLE_DIRS = (BLOB_ROOT, CONVERSION_CACHE_DIR)
+
+
+class FilePathResolver:
+    """
+    /api/files yolunu proje klasörü içindeki gerçek dosya yoluna çevirir.
+    Sonuçlar LRU önbellekte tutulur; kayıt kullanılmadan önce dosyanın hâlâ
+    durduğu kontrol edilir (silinmişse yeniden çözülür).
+    """
+
+    def __init__(self, project_root: Optional[str] = None, max_entries: int = FILE_PATH_CACHE_SIZE):
+        self.project_root = project_root or get_project_root()
+        self.real_project_root = os.path.realpath(self.project_root)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, file_path: str) -> Optional[str]:
+        """
+        Gerçek yolu döndürür; dosya yoksa None. Proje dışına çıkan yollar için
+        PermissionError fırlatır.
+        """
+        with self._lock:
+            real_path = self._entries.get(file_path)
+            if real_path is not None:
+                self._entries.move_to_end(file_path)
+        if real_path is not None:
+            if os.path.isfile(real_path):
+                return real_path
+            with self._lock:
+                self._entries.pop(file_path, None)
+
+        real_path = self._resolve_uncached(file_path)
+        if real_path is not None:
+            with self._lock:
+                self._entries[file_path] = real_path
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return real_path
+
+    def _resolve_uncached(self, file_path: str) -> Optional[str]:
+        # Güvenlik: path traversal saldırılarını engelle
+        if '..' in file_path or file_path.startswith('/'):
+            raise PermissionError(file_path)
+
+        full_path = os.path.join(self.project_root, file_path)
+
+        # Arşiv üyesi referansı: dosya ilk kez sunulurken arşivin yanına açılır
+        if split_member_ref(full_path):
+            try:
+                full_path = materialize_archive_member(full_path)
+            except (KeyError, ValueError, OSError):
+                return None
+
+        if not os.path.isfile(full_path):
+            return None
+
+        # Güvenlik: sadece proje klasörü altındaki dosyalara izin ver
+        real_path = os.path.realpath(full_path)
+        if os.path.commonpath([real_path, self.real_project_root]) != self.real_project_root:
+            raise PermissionError(file_path)
+        return real_path
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_resolver: Optional[FilePathResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_file_resolver() -> FilePathResolver:
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = FilePathResolver()
+        return _resolver
+
+
+def _is_immutable(file_path: str) -> bool:
+    normalized = os.path.normpath(file_path)
+    return any(normalized.startswith(directory + os.sep) for directory in IMMUTABLE_DIRS)
+
+
+def send_project_file(real_path: str, file_path: str):
+    """
+    Dosyayı koşullu istek (304) ve Range (206) desteğiyle gönderir. İçerik adresli
+    dosyalarda ETag dosya adındaki sha256'dır ve yanıt immutable işaretlenir.
+    """
+    if _is_immutable(file_path):
+        sha256 = os.path.splitext(os.path.basename(real_path))[0]
+        response = send_file(real_path, conditional=True, etag=sha256, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+    else:
+        response = send_file(real_path, conditional=True, etag=True, max_age=FILE_MAX_AGE)
+    return response
@@ -0,0 +1,449 @@
+"""
+modules/utils_http.py - Ortak HTTP İstemcisi
+
+Tüm MEB scraper'ları (ÇÖP, DBF, DM, BOM, Dal) bu modül üzerinden istek yapar.
+
+Mantık:
+- Tek bir paylaşılan requests.Session ile keep-alive bağlantı havuzu
+- Host başına eşzamanlı istek sınırı (HOST_CONCURRENCY, configure_host_concurrency)
+- Host başına hız sınırı (HOST_RATE_LIMITS, token bucket): thread sayısı artsa da
+  sunucuya saniyede giden istek sayısı sabit kalır (cache isabetleri sayılmaz)
+- Bağlantı hatası / timeout / 429 / 5xx için jitter'lı exponential backoff ile retry
+- gzip/deflate sıkıştırma (requests otomatik açar; brotli kurulu olmadığı için 'br' istenmez)
+- ETag / Last-Modified ile koşullu GET: yanıtlar data/http_cache/ altında saklanır,
+  sunucu 304 döndüğünde gövde diskteki kopyadan okunur
+- Scraper liste sayfaları için TTL'li yanıt cache'i (anahtar: metot + URL + parametreler
+  + POST gövdesi); TTL dolmadan aynı istek ağa hiç çıkmaz
+- Replay modu (MEB_HTTP_REPLAY=1 veya set_replay_mode): tüm istekler yalnızca cache'ten
+  karşılanır, cache'te olmayan istek ConnectionError verir. Böylece tüm pipeline bir
+  site snapshot'ı (MEB_HTTP_CACHE_DIR) üzerinden ağsız çalıştırılabilir:
+      MEB_HTTP_REPLAY=1 MEB_HTTP_CACHE_DIR=/snapshot python -m modules.get_dbf
+
+İçerdiği fonksiyonlar:
+- http_get / http_post: Paylaşılan istemci ile istek
+- create_session: Durum (çerez, ASP.NET form) tutan akışlar için ayrı Session
+- get_shared_session: Paylaşılan havuzlu Session (stream indirmeler için)
+- configure_host_concurrency: Host başına eşzamanlılık sınırını ayarlar
+- configure_host_rate_limit / RateLimiter: Host başına istek/saniye sınırı
+- set_replay_mode / is_replay_mode: Ağsız replay modu
+- get_http_stats: İstek / cache / 304 / retry sayaçları
+- clear_http_cache: Disk cache'ini temizler
+- parse_html: Seçilebilir parser (MEB_HTML_PARSER, varsayılan lxml varsa lxml) ile BeautifulSoup
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,tr;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Host başına eşzamanlı istek sınırı (listede olmayan hostlar DEFAULT_HOST_CONCURRENCY kullanır)
+DEFAULT_HOST_CONCURRENCY = 4
+HOST_CONCURRENCY = {
+    'meslek.meb.gov.tr': 4,
+    'mtegm.meb.gov.tr': 2,
+}
+
+# Host başına istek/saniye sınırı (listede olmayan hostlar sınırsız)
+HOST_RATE_LIMITS = {
+    'meslek.meb.gov.tr': 8.0,
+    'mtegm.meb.gov.tr': 4.0,
+}
+
+POOL_SIZE = 16
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 1.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+HTTP_CACHE_DIR = os.path.join("data", "http_cache")
+
+# Scraper liste sayfaları (ÇÖP, DBF, DM, BÖM) için varsayılan cache süresi (saniye)
+SCRAPE_CACHE_TTL = int(os.getenv('MEB_HTTP_CACHE_TTL', 6 * 3600))
+
+
+def _default_html_parser() -> str:
+    """lxml kuruluysa onu (C tabanlı, hızlı), değilse Python'un html.parser'ını seçer."""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+# BeautifulSoup parser backend'i: 'lxml', 'html.parser' veya 'html5lib'
+HTML_PARSER = os.getenv('MEB_HTML_PARSER') or _default_html_parser()
+
+_session_lock = threading.Lock()
+_shared_session = None
+_host_semaphores = {}
+_host_rate_limiters = {}
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "cache_hits": 0, "not_modified": 0, "retries": 0, "errors": 0}
+_replay_mode = None
+
+
+def create_session(headers: Optional[Dict] = None) -> requests.Session:
+    """Havuz boyutu ayarlı, varsayılan başlıkları taşıyan yeni bir Session oluşturur."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """Tüm modüllerin kullandığı paylaşılan Session'ı döndürür (lazy)."""
+    global _shared_session
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
+
+
+def configure_host_concurrency(host: str, limit: int):
+    """Bir host için eşzamanlı istek sınırını değiştirir."""
+    with _session_lock:
+        HOST_CONCURRENCY[host] = limit
+        _host_semaphores.pop(host, None)
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).hostname or ''
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        with _session_lock:
+            semaphore = _host_semaphores.get(host)
+            if semaphore is None:
+                limit = HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY)
+                semaphore = threading.BoundedSemaphore(max(1, limit))
+                _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def _release_on_close(response: requests.Response, semaphore: threading.BoundedSemaphore):
+    """
+    Akış (stream=True) yanıtında host slotu gövde okunup yanıt kapatılana kadar
+    tutulur: response.close() (veya with bloğunun sonu) slotu bir kez bırakır.
+    """
+    close = response.close
+    released = []
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                semaphore.release()
+
+    response.close = close_and_release
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket. acquire() bir token alana kadar bekler;
+    ortalama hız `rate` istek/saniye, ani artış en fazla `burst` istek.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def configure_host_rate_limit(host: str, rate: Optional[float]):
+    """Bir host için istek/saniye sınırını değiştirir (None: sınırsız)."""
+    with _session_lock:
+        if rate:
+            HOST_RATE_LIMITS[host] = rate
+        else:
+            HOST_RATE_LIMITS.pop(host, None)
+        _host_rate_limiters.pop(host, None)
+
+
+def _host_rate_limiter(url: str) -> Optional[RateLimiter]:
+    host = urlsplit(url).hostname or ''
+    limiter = _host_rate_limiters.get(host)
+    if limiter is None and HOST_RATE_LIMITS.get(host):
+        with _session_lock:
+            limiter = _host_rate_limiters.get(host)
+            if limiter is None and HOST_RATE_LIMITS.get(host):
+                limiter = RateLimiter(HOST_RATE_LIMITS[host])
+                _host_rate_limiters[host] = limiter
+    return limiter
+
+
+def set_replay_mode(enabled: bool):
+    """Replay modunu açar/kapatır (None: MEB_HTTP_REPLAY ortam değişkenine göre)."""
+    global _replay_mode
+    _replay_mode = enabled
+
+
+def is_replay_mode() -> bool:
+    """İsteklerin sadece disk cache'inden karşılanıp karşılanmayacağını döndürür."""
+    if _replay_mode is not None:
+        return _replay_mode
+    return os.getenv('MEB_HTTP_REPLAY', '').lower() in ('1', 'true', 'yes')
+
+
+def get_http_cache_dir() -> str:
+    """Disk cache klasörü (MEB_HTTP_CACHE_DIR ile snapshot klasörüne yönlendirilebilir)."""
+    return os.getenv('MEB_HTTP_CACHE_DIR') or HTTP_CACHE_DIR
+
+
+def clear_http_cache(cache_dir: Optional[str] = None) -> int:
+    """Disk cache'indeki tüm yanıtları siler, silinen yanıt sayısını döndürür."""
+    cache_dir = cache_dir or get_http_cache_dir()
+    removed = 0
+    if not os.path.isdir(cache_dir):
+        return 0
+    for name in os.listdir(cache_dir):
+        if name.endswith(('.json', '.body')):
+            os.remove(os.path.join(cache_dir, name))
+            removed += name.endswith('.json')
+    return removed
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_http_stats() -> Dict[str, int]:
+    """İstek, cache isabeti, 304 (değişmedi), retry ve hata sayaçlarını döndürür."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Jitter'lı exponential backoff: 1s, 2s, 4s ... ±%50."""
+    return BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+# --- Disk üzerindeki yanıt cache'i (koşullu GET + TTL + replay) ---
+
+def _prepare(method: str, url: str, params=None, data=None) -> requests.PreparedRequest:
+    return requests.Request(method.upper(), url, params=params, data=data).prepare()
+
+
+def _cache_key(prepared: requests.PreparedRequest) -> str:
+    """Metot + tam URL (parametreler dahil) + POST gövdesinden anahtar üretir."""
+    body = prepared.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha256(f"{prepared.method} {prepared.url}\n".encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _cache_paths(key: str, cache_dir: str):
+    return os.path.join(cache_dir, f"{key}.json"), os.path.join(cache_dir, f"{key}.body")
+
+
+def _load_cached_response(key: str, cache_dir: str):
+    meta_path, body_path = _cache_paths(key, cache_dir)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return meta, body
+    except (OSError, ValueError):
+        return None, None
+
+
+def _store_cached_response(key: str, cache_dir: str, response: requests.Response, always: bool = False):
+    """
+    200 yanıtlarını atomik olarak diske yazar. always=False ise sadece
+    doğrulayıcı (ETag / Last-Modified) içeren yanıtlar saklanır.
+    """
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not (always or etag or last_modified):
+        return
+
+    meta = {
+        "method": response.request.method if response.request is not None else None,
+        "url": response.url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "headers": {k: v for k, v in response.headers.items()
+                    if k.lower() in ('content-type', 'etag', 'last-modified')},
+        "fetched_at": time.time(),
+    }
+    meta_path, body_path = _cache_paths(key, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for path, data, mode in ((body_path, response.content, 'wb'),
+                                 (meta_path, json.dumps(meta, ensure_ascii=False), 'w')):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ HTTP cache yazılamadı ({response.url}): {e}")
+
+
+def _response_from_cache(meta: Dict, body: bytes, prepared: requests.PreparedRequest) -> requests.Response:
+    """Diskteki gövdeden (TTL isabeti, replay veya 304) 200 Response nesnesi oluşturur."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response.url = meta.get("url") or prepared.url
+    response.request = prepared
+    response.reason = 'OK (cached)'
+    response.from_cache = True
+    return response
+
+
+# --- İstek fonksiyonları ---
+
+def request(method: str, url: str, session: Optional[requests.Session] = None,
+            retries: int = DEFAULT_RETRIES, conditional: bool = False,
+            cache_ttl: Optional[float] = None, cache_dir: Optional[str] = None,
+            **kwargs) -> requests.Response:
+    """
+    Host eşzamanlılık sınırı ve retry ile HTTP isteği yapar.
+
+    - conditional=True ise (sadece GET) önceki yanıtın ETag/Last-Modified değeri
+      gönderilir; 304 gelirse gövde disk cache'inden döndürülür.
+    - cache_ttl verilirse (GET veya POST) yanıt her durumda saklanır ve TTL
+      dolmadan aynı istek (metot + URL + parametre + gövde) ağa çıkmadan döner.
+    - Replay modunda istek sadece cache'ten karşılanır.
+    Cache'ten dönen yanıtlarda response.from_cache=True olur.
+
+    Hata durumunda son exception'ı (requests.RequestException) fırlatır;
+    HTTP 4xx yanıtları çağırana döndürülür (raise_for_status çağıranın sorumluluğunda).
+
+    stream=True yanıtlarda host eşzamanlılık slotu gövde aktarımı boyunca tutulur;
+    çağıran yanıtı kapatmalıdır (with http_request(..., stream=True) as response).
+    """
+    session = session or get_shared_session()
+    cache_dir = cache_dir or get_http_cache_dir()
+    kwargs.setdefault('timeout', 30)
+    replay = is_replay_mode()
+
+    cache_key = meta = body = None
+    if not kwargs.get('stream') and (replay or cache_ttl is not None
+                                     or (conditional and method.upper() == 'GET')):
+        prepared = _prepare(method, url, kwargs.get('params'), kwargs.get('data'))
+        cache_key = _cache_key(prepared)
+        meta, body = _load_cached_response(cache_key, cache_dir)
+        if meta:
+            age = time.time() - meta.get('fetched_at', 0)
+            if replay or (cache_ttl is not None and age < cache_ttl):
+                _count("cache_hits")
+                return _response_from_cache(meta, body, prepared)
+            headers = dict(kwargs.get('headers') or {})
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+            kwargs['headers'] = headers
+
+    if replay:
+        _count("errors")
+        raise requests.exceptions.ConnectionError(f"Replay modu: yanıt cache'te yok ({method.upper()} {url})")
+
+    rate_limiter = _host_rate_limiter(url)
+    retries = max(1, retries)
+    last_error = None
+    for attempt in range(retries):
+        try:
+            _count("requests")
+            if rate_limiter:
+                rate_limiter.acquire()
+            semaphore = _host_semaphore(url)
+            semaphore.acquire()
+            try:
+                response = session.request(method, url, **kwargs)
+            except BaseException:
+                semaphore.release()
+                raise
+            if kwargs.get('stream'):
+                _release_on_close(response, semaphore)
+            else:
+                semaphore.release()
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < retries - 1:
+                response.close()
+                _count("retries")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if cache_key:
+                if response.status_code == 304 and meta:
+                    _count("not_modified")
+                    # Tazelik süresini yenile ki TTL boyunca tekrar sorulmasın
+                    meta['fetched_at'] = time.time()
+                    cached = _response_from_cache(meta, body, response.request)
+                    if cache_ttl is not None:
+                        _store_cached_response(cache_key, cache_dir, cached, always=True)
+                    return cached
+                if response.status_code == 200:
+                    _store_cached_response(cache_key, cache_dir, response, always=cache_ttl is not None)
+
+            response.from_cache = False
+            return response
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            last_error = e
+            if attempt < retries - 1:
+                _count("retries")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+    _count("errors")
+    raise last_error
+
+
+def http_get(url: str, params: Optional[Dict] = None, conditional: bool = True, **kwargs) -> requests.Response:
+    """Paylaşılan istemci ile GET. Varsayılan olarak koşullu GET (ETag/Last-Modified) kullanır."""
+    return request('GET', url, params=params, conditional=conditional, **kwargs)
+
+
+def http_post(url: str, data=None, **kwargs) -> requests.Response:
+    """Paylaşılan istemci ile POST (sadece cache_ttl verilirse cache'lenir)."""
+    return request('POST', url, data=data, **kwargs)
+
+
+def parse_html(markup, parse_only=None, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    HTML'i seçili parser ile ayrıştırır.
+    parse_only (SoupStrainer) verilirse sadece eşleşen etiketler ağaca alınır.
+    """
+    return BeautifulSoup(markup, parser or HTML_PARSER, parse_only=parse_only)
@@ -0,0 +1,369 @@
+"""
+modules/utils_jobs.py - Kalıcı Arka Plan İşleri
+
+Uzun süren pipeline'lar (DBF indirme, ÇÖP/DBF okuma, scrape-to-db) SSE isteğinin
+generator'ı içinde değil, arka planda bir thread'de iş (job) olarak çalışır.
+SSE endpoint'leri yalnızca işin olay günlüğüne abone olur: tarayıcı yenilenmesi
+veya kopan bağlantı işi durdurmaz.
+
+Mantık:
+- Her iş data/jobs/<job_id>.json (durum + checkpoint) ve
+  data/jobs/<job_id>.events.jsonl (olay günlüğü) olarak diske yazılır
+- Aynı anahtarla (pipeline adı + parametreler) çalışan bir iş varsa yenisi açılmaz,
+  mevcut işe abone olunur (dedup)
+- Sunucu yeniden başladığında 'running' kalan işler 'interrupted' olarak işaretlenir;
+  aynı pipeline tekrar başlatılınca checkpoint'i devralır ve kaldığı yerden devam eder
+- Birden fazla SSE istemcisi aynı işe bağlanıp ayrılabilir; Last-Event-ID ile
+  kaldığı olaydan devam eder
+
+Pipeline fonksiyonu checkpoint'i (JobCheckpoint) parametre olarak alır ve mesaj
+dict'leri yield eder:
+    def oku_cop_files(checkpoint):
+        done = checkpoint.setdefault('processed', [])
+        ...
+        checkpoint.save()
+
+İçerdiği fonksiyonlar:
+- register_pipeline: Pipeline adını fonksiyonla eşleştirir
+- start_job: İşi başlatır veya çalışan aynı işi döndürür
+- get_job / list_jobs / cancel_job: İş sorgulama ve iptal
+- stream_job_events: SSE formatında olay akışı
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+JOBS_DIR = os.path.join("data", "jobs")
+MAX_KEPT_JOBS = 50
+CHECKPOINT_SAVE_INTERVAL = 2.0
+SUBSCRIBER_POLL_INTERVAL = 15.0
+
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled', 'interrupted')
+
+
+class JobCheckpoint(dict):
+    """İşin devam bilgisi. save() belirli aralıklarla diske yazar (force=True hemen)."""
+
+    def __init__(self, job: 'Job', data: Optional[Dict] = None):
+        super().__init__(data or {})
+        self._job = job
+        self._last_save = 0.0
+
+    def save(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self._last_save >= CHECKPOINT_SAVE_INTERVAL:
+            self._last_save = now
+            self._job.persist()
+
+
+class Job:
+    """Tek bir pipeline çalıştırması: durum, checkpoint ve olay günlüğü."""
+
+    def __init__(self, job_id: str, name: str, key: str, params: Optional[Dict] = None,
+                 status: str = 'pending', checkpoint: Optional[Dict] = None,
+                 created_at: Optional[str] = None, finished_at: Optional[str] = None,
+                 error: Optional[str] = None, resumed_from: Optional[str] = None):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.params = params or {}
+        self.status = status
+        self.created_at = created_at or datetime.now().isoformat(timespec='seconds')
+        self.finished_at = finished_at
+        self.error = error
+        self.resumed_from = resumed_from
+        self.checkpoint = JobCheckpoint(self, checkpoint)
+        self.events: Optional[List[Dict]] = []
+        self._cond = threading.Condition()
+        self._cancel = threading.Event()
+        self._events_file = None
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(JOBS_DIR, f"{self.id}.json")
+
+    @property
+    def events_path(self) -> str:
+        return os.path.join(JOBS_DIR, f"{self.id}.events.jsonl")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def to_dict(self) -> Dict:
+        with self._cond:
+            event_count = len(self.events) if self.events is not None else None
+        return {
+            'id': self.id,
+            'name': self.name,
+            'key': self.key,
+            'params': self.params,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'resumed_from': self.resumed_from,
+            'event_count': event_count,
+        }
+
+    def persist(self):
+        """Durum + checkpoint'i atomik olarak yazar."""
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        state = {**self.to_dict(), 'checkpoint': dict(self.checkpoint)}
+        state.pop('event_count', None)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def append_event(self, message: Dict):
+        with self._cond:
+            if self.events is None:
+                self.events = self._read_events()
+            event = {'seq': len(self.events), **message}
+            self.events.append(event)
+            if self._events_file is None:
+                os.makedirs(JOBS_DIR, exist_ok=True)
+                self._events_file = open(self.events_path, 'a', encoding='utf-8')
+            self._events_file.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self._events_file.flush()
+            self._cond.notify_all()
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        with self._cond:
+            self.status = status
+            if error:
+                self.error = error
+            if status in FINISHED_STATUSES:
+                self.finished_at = datetime.now().isoformat(timespec='seconds')
+                if self._events_file is not None:
+                    self._events_file.close()
+                    self._events_file = None
+            # Durum (ve checkpoint) abonelere haber verilmeden önce diske yazılır
+            self.persist()
+            self._cond.notify_all()
+
+    def request_cancel(self):
+        self._cancel.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _read_events(self) -> List[Dict]:
+        if not os.path.exists(self.events_path):
+            return []
+        events = []
+        with open(self.events_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # Yarım yazılmış son satır
+        return events
+
+    def iter_events(self, after: int = -1, poll_interval: float = SUBSCRIBER_POLL_INTERVAL) -> Iterator[Optional[Dict]]:
+        """
+        seq > after olan olayları döndürür, iş bitene kadar yenilerini bekler.
+        poll_interval boyunca yeni olay gelmezse None döner (SSE keep-alive için).
+        """
+        position = after + 1
+        while True:
+            with self._cond:
+                if self.events is None:
+                    self.events = self._read_events()
+                if position >= len(self.events) and not self.finished:
+                    self._cond.wait(poll_interval)
+                pending = self.events[position:]
+                finished = self.finished
+            for event in pending:
+                yield event
+            position += len(pending)
+            if finished and not pending:
+                return
+            if not pending:
+                yield None
+
+
+class JobManager:
+    """İş kaydı: pipeline'ları çalıştırır, diskteki işleri yükler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._pipelines: Dict[str, Dict] = {}
+        self._loaded = False
+
+    def register_pipeline(self, name: str, func: Callable[..., Iterator[Dict]],
+                          on_finish: Optional[Callable[[], None]] = None):
+        self._pipelines[name] = {'func': func, 'on_finish': on_finish}
+
+    def _load(self):
+        """Diskteki işleri yükler; yarıda kalanları 'interrupted' olarak işaretler."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.isdir(JOBS_DIR):
+            return
+        for filename in os.listdir(JOBS_DIR):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(JOBS_DIR, filename), encoding='utf-8') as f:
+                    state = json.load(f)
+                job = Job(state['id'], state['name'], state['key'], state.get('params'),
+                          state.get('status', 'interrupted'), state.get('checkpoint'),
+                          state.get('created_at'), state.get('finished_at'),
+                          state.get('error'), state.get('resumed_from'))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ İş durumu okunamadı ({filename}): {e}")
+                continue
+            job.events = None  # Olay günlüğü gerektiğinde okunur
+            if not job.finished:
+                job.status = 'interrupted'
+                job.persist()
+            self._jobs[job.id] = job
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished),
+                          key=lambda job: job.created_at)
+        for job in finished[:max(0, len(finished) - MAX_KEPT_JOBS)]:
+            del self._jobs[job.id]
+            for path in (job.state_path, job.events_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def start(self, name: str, params: Optional[Dict] = None, resume: bool = True) -> Job:
+        """
+        Pipeline'ı arka planda başlatır. Aynı anahtarla çalışan iş varsa onu döndürür.
+        resume=True ise aynı anahtarın yarıda kalmış son işinin checkpoint'i devralınır.
+        """
+        if name not in self._pipelines:
+            raise KeyError(f"Tanımsız pipeline: {name}")
+        params = params or {}
+        key = name if not params else f"{name}:{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+        with self._lock:
+            self._load()
+            same_key = [job for job in self._jobs.values() if job.key == key]
+            for job in same_key:
+                if not job.finished:
+                    return job
+
+            previous = max(same_key, key=lambda job: job.created_at, default=None)
+            checkpoint, resumed_from = None, None
+            if resume and previous is not None and previous.status != 'completed' and previous.checkpoint:
+                checkpoint, resumed_from = dict(previous.checkpoint), previous.id
+
+            job_id = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            job = Job(job_id, name, key, params, status='running',
+                      checkpoint=checkpoint, resumed_from=resumed_from)
+            self._jobs[job.id] = job
+            self._prune()
+
+        job.persist()
+        thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: Job):
+        pipeline = self._pipelines[job.name]
+        if job.resumed_from:
+            job.append_event({'type': 'info', 'message': f'⏯️ Yarıda kalan iş ({job.resumed_from}) kaldığı yerden devam ediyor.'})
+        generator = None
+        try:
+            generator = pipeline['func'](job.checkpoint, **job.params)
+            for message in generator:
+                job.append_event(message)
+                if job.cancel_requested:
+                    break
+            if job.cancel_requested:
+                # Generator kapanınca açtığı scraper grupları bekleyen işlerini iptal eder
+                generator.close()
+                job.append_event({'type': 'done', 'message': 'İş iptal edildi. Tekrar başlatıldığında kaldığı yerden devam eder.', 'cancelled': True})
+                job.set_status('cancelled')
+            else:
+                job.set_status('completed')
+        except Exception as e:
+            job.append_event({'type': 'error', 'message': f'İş hatası: {e}'})
+            job.set_status('failed', error=str(e))
+        finally:
+            if generator is not None and hasattr(generator, 'close'):
+                generator.close()
+            if pipeline['on_finish']:
+                try:
+                    pipeline['on_finish']()
+                except Exception as e:
+                    print(f"⚠️ İş sonu işlemi hatası ({job.id}): {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._load()
+            return self._jobs.get(job_id)
+
+    def list(self, name: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            self._load()
+            jobs = [job for job in self._jobs.values() if name is None or job.name == name]
+        return [job.to_dict() for job in sorted(jobs, key=lambda job: job.created_at, reverse=True)]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.request_cancel()
+        return True
+
+
+_manager = JobManager()
+
+
+def register_pipeline(name: str, func: Callable[..., Iterator[Dict]],
+                      on_finish: Optional[Callable[[], None]] = None):
+    """func(checkpoint, **params) mesaj dict'leri üreten generator olmalıdır."""
+    _manager.register_pipeline(name, func, on_finish)
+
+
+def start_job(name: str, params: Optional[Dict] = None, resume: bool = True) -> Job:
+    return _manager.start(name, params, resume)
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _manager.get(job_id)
+
+
+def list_jobs(name: Optional[str] = None) -> List[Dict]:
+    return _manager.list(name)
+
+
+def cancel_job(job_id: str) -> bool:
+    return _manager.cancel(job_id)
+
+
+def stream_job_events(job: Job, last_event_id: Optional[str] = None) -> Iterator[str]:
+    """
+    İşin olaylarını SSE formatında döndürür. Her olay 'id: <seq>' taşır; tarayıcının
+    EventSource yeniden bağlanması Last-Event-ID ile kaldığı yerden devam eder.
+    İstemcinin ayrılması işi etkilemez.
+    """
+    try:
+        after = int(last_event_id) if last_event_id not in (None, '') else -1
+    except ValueError:
+        after = -1
+    if after < 0:
+        yield f"data: {json.dumps({'type': 'job', 'message': f'İş: {job.id} ({job.status})', 'job': job.to_dict()})}\n\n"
+    for event in job.iter_events(after):
+        if event is None:
+            yield ": keep-alive\n\n"
+            continue
+        payload = {key: value for key, value in event.items() if key != 'seq'}
+        yield f"id: {event['seq']}\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,362 @@
+"""
+modules/utils_matching.py - Ders Adı Eşleştirme Motoru
+
+DBF, BÖM ve ÇÖP'ten okunan ders adlarını temel_plan_ders kayıtlarıyla eşleştiren
+tek motor. oku_dbf (DBF -> dbf_url), get_bom (BÖM -> bom_url), get_dbf ve
+server.find_matching_ders aynı puanlamayı kullanır.
+
+- temel_plan_ders.ders_adi_norm: normalize_match_key_tr ile üretilen anahtar,
+  indeksli kolon olarak saklanır. Tam eşleşme tablo taraması yerine indeks
+  aramasıdır. Kolon yeni/adı değişmiş satırlar için NULL'dur (ders_adi
+  güncellenince trigger sıfırlar) ve sync_ders_adi_norm ile doldurulur.
+- CourseMatcher: çalıştırma başına bir kez kurulan bellek içi indeks.
+  Kelime ve karakter üçlüsü (trigram) ters indeksleriyle aday dersler bulunur,
+  yalnızca adaylar puanlanır (tüm dersleri gezmeye gerek kalmaz):
+      puan = TFIDF_WEIGHT * kelime TF-IDF kosinüsü + (1 - TFIDF_WEIGHT) * trigram Dice
+  Kelime puanı "Temelleri" gibi sık geçen kelimelere az ağırlık verir; trigram puanı
+  yazım/ek farklarını ("Temeli" / "Temelleri") yakalar. Sınıf ve alan filtresi
+  desteklenir; top_k en iyi k adayı döndürür.
+- Ders tablosu değişince indeks yeniden kurulur. Değişiklik O(1) sorgularla anlaşılır:
+  tablo sürümü, istatistik_sayac'taki ders sayısı, MAX(id) ve ders_adi_norm'u boş
+  satır olup olmadığı (indeks araması). Boş anahtarlar yalnızca bu parmak izi
+  değiştiğinde doldurulur.
+
+Doğruluk/hız ölçümü: python -m modules.utils_matching (veritabanındaki ders
+adlarının bozulmuş hâlleriyle precision/recall ve sorgu başına süre).
+
+İçerdiği fonksiyonlar:
+- sync_ders_adi_norm: Boş ders_adi_norm değerlerini doldurur
+- get_course_matcher: Güncel CourseMatcher'ı döndürür (gerekirse kurar)
+- load_course_matcher: Kendi bağlantısıyla CourseMatcher yükler (pipeline'lar için)
+- find_matching_ders: Tam eşleşme (SQL indeks), yoksa benzerlik araması
+- name_similarity: İki adın benzerlik puanı (0-1)
+- evaluate_matcher: Etiketli sorgularla precision/recall ölçümü
+"""
+
+import heapq
+import math
+import sqlite3
+import time
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from .utils_normalize import normalize_match_key_tr
+    from .utils_cache import get_table_versions
+    from .utils_database import with_database
+except ImportError:
+    from utils_normalize import normalize_match_key_tr
+    from utils_cache import get_table_versions
+    from utils_database import with_database
+
+# Eşleşmede sayılmayan bağlaçlar (her ders adında geçip sonuç vermezler)
+MATCH_STOPWORDS = frozenset({'ve', 'ile', 'icin', 'de', 'da', 'ki'})
+# Eşleşme sayılması için gereken en düşük benzerlik puanı
+MATCH_MIN_SCORE = 0.6
+TFIDF_WEIGHT = 0.5
+# Derslerin bu oranından fazlasında geçen trigram'lar aday bulmada kullanılmaz
+# (puanlamada kullanılır); "eri", "ler" gibi ekler her dersi aday yapardı
+TRIGRAM_MAX_DF_RATIO = 0.05
+TRIGRAM_CANDIDATES = 50
+
+
+def match_tokens(key: str) -> List[str]:
+    """Anahtarın bağlaç olmayan, tekrarsız kelimeleri."""
+    return list(dict.fromkeys(token for token in key.split() if token not in MATCH_STOPWORDS))
+
+
+def sync_ders_adi_norm(cursor) -> int:
+    """ders_adi_norm değeri boş olan dersleri doldurur; güncellenen satır sayısını döndürür."""
+    cursor.execute("SELECT id, ders_adi FROM temel_plan_ders WHERE ders_adi_norm IS NULL")
+    rows = [(normalize_match_key_tr(ders_adi), ders_id) for ders_id, ders_adi in cursor.fetchall()]
+    if rows:
+        cursor.executemany("UPDATE temel_plan_ders SET ders_adi_norm = ? WHERE id = ?", rows)
+    return len(rows)
+
+
+def name_trigrams(key: str) -> Set[str]:
+    """Kelime başı/sonu boşlukla doldurulmuş karakter üçlüleri (pg_trgm gibi)."""
+    trigrams = set()
+    for token in key.split():
+        padded = f"  {token} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def _dice(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def name_similarity(name_a: str, name_b: str) -> float:
+    """
+    İki adın 0-1 arası benzerliği (dersler arası IDF olmadan: kelime Dice +
+    trigram Dice). Tek bir dosyayı tek bir dersle karşılaştırmak için.
+    """
+    key_a, key_b = normalize_match_key_tr(name_a), normalize_match_key_tr(name_b)
+    if not key_a or not key_b:
+        return 0.0
+    if key_a == key_b:
+        return 1.0
+    token_score = _dice(set(match_tokens(key_a)), set(match_tokens(key_b)))
+    return TFIDF_WEIGHT * token_score + (1 - TFIDF_WEIGHT) * _dice(name_trigrams(key_a), name_trigrams(key_b))
+
+
+class CourseMatch(NamedTuple):
+    ders_id: int
+    ders_adi: str
+    sinif: Optional[int]
+    score: float
+
+
+class CourseMatcher:
+    """Ders adları üzerinde tam eşleşme ve TF-IDF + trigram benzerlik araması."""
+
+    def __init__(self, rows, ders_alanlari: Iterable[Tuple[int, int]] = ()):
+        """
+        rows: (id, ders_adi, sinif, ders_adi_norm) kayıtları
+        ders_alanlari: (ders_id, alan_id) çiftleri (alan filtresi için)
+        """
+        self.courses: Dict[int, Tuple[str, Optional[int]]] = {}
+        self.by_key: Dict[str, List[int]] = defaultdict(list)
+        self.alanlar: Dict[int, Set[int]] = defaultdict(set)
+        tokens_by_id = {}
+        self.trigrams: Dict[int, Set[str]] = {}
+        for ders_id, ders_adi, sinif, key in rows:
+            key = key or normalize_match_key_tr(ders_adi)
+            self.courses[ders_id] = (ders_adi, sinif)
+            self.by_key[key].append(ders_id)
+            tokens_by_id[ders_id] = match_tokens(key)
+            self.trigrams[ders_id] = name_trigrams(key)
+        for ders_id, alan_id in ders_alanlari:
+            self.alanlar[ders_id].add(alan_id)
+
+        self.token_postings: Dict[str, List[int]] = defaultdict(list)
+        self.trigram_postings: Dict[str, List[int]] = defaultdict(list)
+        for ders_id, tokens in tokens_by_id.items():
+            for token in tokens:
+                self.token_postings[token].append(ders_id)
+            for trigram in self.trigrams[ders_id]:
+                self.trigram_postings[trigram].append(ders_id)
+
+        # Kelime ağırlıkları (idf) ve ders vektörlerinin normu
+        total = len(self.courses)
+        self._max_idf = math.log(total + 1) + 1
+        self.idf = {token: math.log((total + 1) / (len(ids) + 1)) + 1 for token, ids in self.token_postings.items()}
+        self.weights: Dict[int, Dict[str, float]] = {}
+        self.norms: Dict[int, float] = {}
+        for ders_id, tokens in tokens_by_id.items():
+            weights = {token: self.idf[token] for token in tokens}
+            self.weights[ders_id] = weights
+            self.norms[ders_id] = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        self._trigram_max_df = max(1, int(total * TRIGRAM_MAX_DF_RATIO))
+
+    def __len__(self):
+        return len(self.courses)
+
+    def _allowed(self, ders_id: int, sinif, alan_id) -> bool:
+        if sinif is not None and self.courses[ders_id][1] != sinif:
+            return False
+        return alan_id is None or alan_id in self.alanlar.get(ders_id, ())
+
+    def _match(self, ders_id: int, score: float) -> CourseMatch:
+        ders_adi, sinif = self.courses[ders_id]
+        return CourseMatch(ders_id, ders_adi, sinif, score)
+
+    def exact(self, ders_adi: str, sinif: Optional[int] = None, alan_id: Optional[int] = None) -> List[CourseMatch]:
+        return [self._match(ders_id, 1.0) for ders_id in self.by_key.get(normalize_match_key_tr(ders_adi), ())
+                if self._allowed(ders_id, sinif, alan_id)]
+
+    def _candidates(self, tokens: List[str], trigrams: Set[str]) -> Set[int]:
+        candidates = set()
+        for token in tokens:
+            candidates.update(self.token_postings.get(token, ()))
+        # Yazım farklarında ortak kelime olmayabilir: seçici trigram'lardan en çok paylaşanlar
+        hits = Counter()
+        for trigram in trigrams:
+            ids = self.trigram_postings.get(trigram, ())
+            if len(ids) <= self._trigram_max_df:
+                hits.update(ids)
+        candidates.update(ders_id for ders_id, _ in hits.most_common(TRIGRAM_CANDIDATES))
+        return candidates
+
+    def top_k(self, ders_adi: str, k: int = 5, sinif: Optional[int] = None, alan_id: Optional[int] = None,
+              min_score: float = 0.0) -> List[CourseMatch]:
+        """En benzer k dersi puana göre azalan sırada döndürür."""
+        key = normalize_match_key_tr(ders_adi)
+        if not key:
+            return []
+        tokens = match_tokens(key)
+        trigrams = name_trigrams(key)
+        query_weights = {token: self.idf.get(token, self._max_idf) for token in tokens}
+        query_norm = math.sqrt(sum(w * w for w in query_weights.values())) or 1.0
+
+        scored = []
+        for ders_id in self._candidates(tokens, trigrams):
+            if not self._allowed(ders_id, sinif, alan_id):
+                continue
+            weights = self.weights[ders_id]
+            cosine = sum(w * weights[token] for token, w in query_weights.items() if token in weights)
+            cosine /= query_norm * self.norms[ders_id]
+            score = TFIDF_WEIGHT * cosine + (1 - TFIDF_WEIGHT) * _dice(trigrams, self.trigrams[ders_id])
+            if score >= min_score:
+                scored.append((score, -ders_id))
+        return [self._match(-neg_id, round(score, 4)) for score, neg_id in heapq.nlargest(k, scored)]
+
+    def best(self, ders_adi: str, sinif: Optional[int] = None, alan_id: Optional[int] = None,
+             min_score: float = MATCH_MIN_SCORE) -> Optional[CourseMatch]:
+        """Tam eşleşme varsa o, yoksa eşiği geçen en benzer ders (yoksa None)."""
+        exact = self.exact(ders_adi, sinif, alan_id)
+        if exact:
+            return exact[0]
+        matches = self.top_k(ders_adi, 1, sinif, alan_id, min_score)
+        return matches[0] if matches else None
+
+
+_matcher: Optional[CourseMatcher] = None
+_matcher_fingerprint = None
+_matcher_lock = threading.Lock()
+
+
+def _ders_table_fingerprint(cursor) -> Tuple:
+    """
+    Ders tablosunun tarama yapmadan alınan parmak izi (COUNT(*) tablo taraması olduğu
+    için sayaç tablosu kullanılır; MAX(id) ve boş anahtar kontrolü indeks aramasıdır).
+    """
+    try:
+        cursor.execute("SELECT deger FROM istatistik_sayac WHERE sayac_adi = 'ders_count'")
+        row = cursor.fetchone()
+        ders_count = row[0] if row else None
+    except sqlite3.OperationalError:
+        ders_count = None  # Sayaç tablosu olmayan eski veritabanı
+    cursor.execute("""
+        SELECT (SELECT MAX(id) FROM temel_plan_ders),
+               EXISTS(SELECT 1 FROM temel_plan_ders WHERE ders_adi_norm IS NULL)
+    """)
+    return (get_table_versions('temel_plan_ders', 'temel_plan_dal'), ders_count, *cursor.fetchone())
+
+
+def get_course_matcher(cursor) -> CourseMatcher:
+    """
+    Eşleştirme motorunu döndürür. Ders tablosu değişmediyse bellekteki indeks
+    kullanılır; yeni/yeniden adlandırılmış ders varsa anahtarları yazılıp indeks
+    yeniden kurulur.
+    """
+    global _matcher, _matcher_fingerprint
+    with _matcher_lock:
+        fingerprint = _ders_table_fingerprint(cursor)
+        if _matcher is None or fingerprint != _matcher_fingerprint:
+            if sync_ders_adi_norm(cursor):
+                fingerprint = _ders_table_fingerprint(cursor)
+            cursor.execute("SELECT id, ders_adi, sinif, ders_adi_norm FROM temel_plan_ders")
+            rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT DISTINCT dd.ders_id, d.alan_id FROM temel_plan_ders_dal dd
+                JOIN temel_plan_dal d ON d.id = dd.dal_id
+            """)
+            _matcher = CourseMatcher(rows, cursor.fetchall())
+            _matcher_fingerprint = fingerprint
+        return _matcher
+
+
+@with_database
+def load_course_matcher(cursor) -> CourseMatcher:
+    """Kendi bağlantısını açarak motoru yükler (hata durumunda hata dict'i döner)."""
+    return get_course_matcher(cursor)
+
+
+def find_matching_ders(cursor, ders_adi: str, sinif: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    Ders adını veritabanındaki derslerle eşleştirir: önce indeksli ders_adi_norm
+    kolonunda tam eşleşme, bulunamazsa eşiği geçen en benzer dersler.
+
+    Returns:
+        [(ders_id, ders_adi), ...]
+    """
+    if not ders_adi:
+        return []
+
+    matcher = get_course_matcher(cursor)
+    key = normalize_match_key_tr(ders_adi)
+    if sinif:
+        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders WHERE ders_adi_norm = ? AND sinif = ?",
+                       (key, sinif))
+    else:
+        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders WHERE ders_adi_norm = ?", (key,))
+    exact_matches = [tuple(row) for row in cursor.fetchall()]
+    if exact_matches:
+        return exact_matches
+
+    return [(match.ders_id, match.ders_adi)
+            for match in matcher.top_k(ders_adi, sinif=sinif or None, min_score=MATCH_MIN_SCORE)]
+
+
+def evaluate_matcher(matcher: CourseMatcher, labeled: List[Tuple[str, Optional[int], Optional[int]]],
+                     min_score: float = MATCH_MIN_SCORE) -> Dict:
+    """
+    Etiketli sorgularla motoru ölçer. labeled: (sorgu adı, beklenen ders_id ya da
+    eşleşmemesi gerekiyorsa None, sınıf filtresi).
+
+    precision = doğru eşleşme / döndürülen eşleşme, recall = doğru eşleşme / beklenen eşleşme
+    """
+    returned = correct = expected = 0
+    started = time.perf_counter()
+    for query, ders_id, sinif in labeled:
+        match = matcher.best(query, sinif=sinif, min_score=min_score)
+        expected += ders_id is not None
+        if match:
+            returned += 1
+            correct += match.ders_id == ders_id
+    elapsed = time.perf_counter() - started
+    return {
+        'queries': len(labeled),
+        'precision': correct / returned if returned else 0.0,
+        'recall': correct / expected if expected else 0.0,
+        'ms_per_query': elapsed * 1000 / len(labeled) if labeled else 0.0,
+    }
+
+
+def _benchmark_queries(matcher: CourseMatcher) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Veritabanındaki adlardan bozulmuş sorgular üretir: DBF/BÖM'de görülen büyük harf,
+    Türkçe karakter kaybı, "DERSİ" eki, eksik kelime, harf hatası. Olmayan dersler
+    (iki farklı dersin kelimelerinden karışım) eşleşmemelidir.
+    """
+    labeled = []
+    ids = sorted(matcher.courses)
+    for index, ders_id in enumerate(ids):
+        ders_adi, sinif = matcher.courses[ders_id]
+        words = ders_adi.split()
+        labeled.append((ders_adi.upper(), ders_id, sinif))
+        labeled.append((normalize_match_key_tr(ders_adi), ders_id, sinif))
+        labeled.append((f"{ders_adi} Dersi", ders_id, sinif))
+        if len(words) >= 3:
+            labeled.append((' '.join(words[:-1]), ders_id, sinif))
+        longest = max(words, key=len)
+        if len(longest) >= 6:
+            typo = longest[:2] + longest[3:]
+            labeled.append((ders_adi.replace(longest, typo, 1), ders_id, sinif))
+        other_adi = matcher.courses[ids[(index * 7 + 3) % len(ids)]][0]
+        if other_adi.split()[0] != words[0]:
+            labeled.append((f"{words[0]} {other_adi.split()[-1]} Yönetimi Uygulamaları", None, None))
+    return labeled
+
+
+if __name__ == "__main__":
+    @with_database
+    def _run_benchmark(cursor):
+        started = time.perf_counter()
+        matcher = get_course_matcher(cursor)
+        build_ms = (time.perf_counter() - started) * 1000
+        return len(matcher), build_ms, evaluate_matcher(matcher, _benchmark_queries(matcher))
+
+    result = _run_benchmark()
+    if isinstance(result, dict):
+        print(f"❌ {result.get('error')}")
+    else:
+        course_count, build_ms, metrics = result
+        print(f"📚 {course_count} ders, indeks {build_ms:.1f} ms'de kuruldu")
+        print(f"🎯 {metrics['queries']} sorgu: precision {metrics['precision']:.3f}, "
+              f"recall {metrics['recall']:.3f}, {metrics['ms_per_query']:.3f} ms/sorgu")
@@ -7,6 +7,7 @@ Bu modül, string normalizasyon işlemlerini içerir.
 İçerdiği fonksiyonlar:
 - sanitize_filename_tr: Dosya/klasör adı güvenlik normalizasyonu
 - normalize_to_title_case_tr: Türkçe dil kurallarına uygun başlık formatı
+- normalize_match_key_tr: Ad eşleştirme anahtarı (küçük harf, ASCII, noktalamasız)
 """
 
 import os
@@ -115,4 +116,28 @@ def normalize_to_title_case_tr(name: str) -> str:
             else:
                 final_words.append(capitalized)
 
-    return ' '.join(final_words)
\ No newline at end of file
+    return ' '.join(final_words)
+
+# Eşleştirme anahtarı için Türkçe karakter katlama (PDF'den gelen bozuk karakterler dahil)
+_MATCH_KEY_TRANSLATION = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u',
+    'ġ': 'i', 'ģ': 's', 'ĝ': 'g',
+})
+_MATCH_KEY_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+def normalize_match_key_tr(name: str) -> str:
+    """
+    Ad eşleştirmede kullanılan karşılaştırma anahtarını üretir: Türkçe kurallarla
+    küçük harfe çevirir, Türkçe karakterleri ASCII'ye katlar, harf/rakam dışını
+    boşluk yapar.
+
+    Örnek: "BİLİŞİM TEKNOLOJİLERİNİN TEMELLERİ (9. Sınıf)" -> "bilisim teknolojilerinin temelleri 9 sinif"
+
+    temel_plan_ders.ders_adi_norm kolonunda saklanan değer budur.
+    """
+    if not name:
+        return ""
+    lowered = name.replace('İ', 'i').replace('I', 'ı').replace('Ġ', 'i').lower()
+    folded = lowered.translate(_MATCH_KEY_TRANSLATION)
+    return ' '.join(_MATCH_KEY_SEPARATORS.sub(' ', folded).split())
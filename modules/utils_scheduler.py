@@ -0,0 +1,420 @@
+"""
+modules/utils_scheduler.py - Merkezi Scraper Zamanlayıcısı
+
+DAL, ÇÖP, DBF, DM ve BÖM scraper'larının sayfa çekme işleri tek bir öncelikli
+kuyruktan, sabit sayıda worker thread ile çalıştırılır. Her modülün kendi
+ThreadPoolExecutor'ını açması yerine (sınıf sayısı kadar, 3, 8...) toplam
+eşzamanlılık tek yerden ayarlanır.
+
+Mantık:
+- Öncelik kuyruğu: küçük sayı önce çalışır (SCRAPE_PRIORITIES); eşit öncelikte FIFO
+- Global sınır: SCRAPE_MAX_WORKERS (env MEB_SCRAPE_WORKERS)
+- Host başına görev sınırı (HOST_TASK_LIMITS): sınırı dolu hostun işleri kuyrukta
+  bekler, diğer hostların işleri öne geçer. İstek seviyesindeki sınırlar utils_http'de.
+- Backpressure: kuyrukta MAX_PENDING_TASKS iş varken submit bloklanır
+- İptal: TaskGroup / CancelScope ile bekleyen işler iptal edilir (SSE istemcisi
+  bağlantıyı kapattığında); çalışmakta olan iş biter, sonucu atılır
+- Zamanlama: her iş için kuyrukta bekleme ve çalışma süresi kaydedilir
+
+Kullanım (mevcut as_completed döngüleri aynen çalışır):
+    with get_scrape_scheduler().group('dbf', priority=SCRAPE_PRIORITIES['dbf'],
+                                      host=MESLEK_HOST) as group:
+        futures = {group.submit(fetch, alan, sinif): (alan, sinif) for ...}
+        for future in group.as_completed(futures):
+            ...
+
+İçerdiği fonksiyonlar:
+- get_scrape_scheduler: Paylaşılan zamanlayıcı (lazy)
+- ScrapeScheduler.group: İptal edilebilir iş grubu
+- cancel_scope: Thread'de açılan grupları dışarıdan iptal edilebilir yapar
+- merge_generators: Birden fazla SSE generator'ını eşzamanlı çalıştırıp mesajları birleştirir
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, CancelledError, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCRAPE_MAX_WORKERS = int(os.getenv('MEB_SCRAPE_WORKERS', 12))
+MAX_PENDING_TASKS = 512
+
+MESLEK_HOST = 'meslek.meb.gov.tr'
+MTEGM_HOST = 'mtegm.meb.gov.tr'
+
+# Host başına aynı anda çalışabilecek görev sayısı (listede olmayan hostlar sadece global sınıra tabi)
+HOST_TASK_LIMITS = {
+    MESLEK_HOST: 8,
+    MTEGM_HOST: 2,
+}
+
+# Küçük sayı önce çalışır: alan/dal verisi ve dersleri üreten ÇÖP, URL güncelleyen adımlardan önce
+SCRAPE_PRIORITIES = {
+    'dal': 10,
+    'cop': 20,
+    'dbf': 30,
+    'dm': 40,
+    'bom': 50,
+}
+DEFAULT_PRIORITY = 100
+
+_TIMING_HISTORY = 1000
+_WAIT_SLICE = 0.5
+
+_scope_local = threading.local()
+
+
+class ScrapeTask:
+    """Kuyruktaki tek bir iş ve zamanlama bilgisi."""
+
+    __slots__ = ('name', 'host', 'priority', 'fn', 'args', 'kwargs', 'future',
+                 'queued_at', 'started_at', 'finished_at', 'status')
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, name: str,
+                 host: Optional[str], priority: int):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name
+        self.host = host
+        self.priority = priority
+        self.future = Future()
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.status = 'queued'
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            self.status = 'cancelled'
+            return
+        self.started_at = time.monotonic()
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.status = 'failed'
+            self.finished_at = time.monotonic()
+            self.future.set_exception(e)
+        else:
+            self.status = 'done'
+            self.finished_at = time.monotonic()
+            self.future.set_result(result)
+
+    def timing(self) -> Dict:
+        started = self.started_at
+        wait = (started if started is not None else time.monotonic()) - self.queued_at
+        run = (self.finished_at - started) if started is not None and self.finished_at is not None else None
+        return {
+            'name': self.name,
+            'host': self.host,
+            'priority': self.priority,
+            'status': 'cancelled' if self.future.cancelled() else self.status,
+            'wait_s': round(wait, 3),
+            'run_s': round(run, 3) if run is not None else None,
+        }
+
+
+class TaskGroup:
+    """
+    Aynı akışa ait işler. Gruptan çıkılırken (normal bitiş, hata ya da generator
+    kapanması) bekleyen işler iptal edilir.
+    """
+
+    def __init__(self, scheduler: 'ScrapeScheduler', name: str,
+                 priority: int = DEFAULT_PRIORITY, host: Optional[str] = None):
+        self.scheduler = scheduler
+        self.name = name
+        self.priority = priority
+        self.host = host
+        self.tasks: List[ScrapeTask] = []
+        self._cancelled = threading.Event()
+        scope = getattr(_scope_local, 'scope', None)
+        if scope is not None:
+            scope.register(self)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def submit(self, fn: Callable, *args, priority: Optional[int] = None,
+               host: Optional[str] = None, name: Optional[str] = None, **kwargs) -> Future:
+        if self.cancelled:
+            raise CancelledError(f"'{self.name}' grubu iptal edildi")
+        task = ScrapeTask(
+            fn, args, kwargs,
+            name=name or f"{self.name}:{getattr(fn, '__name__', 'task')}",
+            host=host if host is not None else self.host,
+            priority=self.priority if priority is None else priority,
+        )
+        self.tasks.append(task)
+        self.scheduler._enqueue(task, self)
+        return task.future
+
+    def as_completed(self, futures: Iterable[Future], timeout: Optional[float] = None) -> Iterator[Future]:
+        """concurrent.futures.as_completed; grup iptal edilince durur, iptal edilen işleri atlar."""
+        for future in as_completed(futures, timeout=timeout):
+            if self.cancelled:
+                return
+            if future.cancelled():
+                continue
+            yield future
+
+    def cancel(self) -> int:
+        """Bekleyen işleri iptal eder; iptal edilen iş sayısını döndürür."""
+        self._cancelled.set()
+        cancelled = sum(1 for task in self.tasks if task.future.cancel())
+        self.scheduler._notify()
+        return cancelled
+
+    def timings(self) -> List[Dict]:
+        return [task.timing() for task in self.tasks]
+
+    def summary(self) -> Dict:
+        """Grup için toplam/en yavaş iş özetleri."""
+        timings = self.timings()
+        finished = [t for t in timings if t['run_s'] is not None]
+        slowest = max(finished, key=lambda t: t['run_s'], default=None)
+        return {
+            'name': self.name,
+            'tasks': len(timings),
+            'done': sum(1 for t in timings if t['status'] == 'done'),
+            'failed': sum(1 for t in timings if t['status'] == 'failed'),
+            'cancelled': sum(1 for t in timings if t['status'] == 'cancelled'),
+            'total_wait_s': round(sum(t['wait_s'] for t in finished), 3),
+            'total_run_s': round(sum(t['run_s'] for t in finished), 3),
+            'slowest': slowest,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cancel()
+        return False
+
+
+class CancelScope:
+    """Bir thread içinde açılan tüm TaskGroup'ları başka bir thread'den iptal etmeyi sağlar."""
+
+    def __init__(self):
+        self._groups: List[TaskGroup] = []
+        self._lock = threading.Lock()
+        self.event = threading.Event()
+
+    def register(self, group: TaskGroup):
+        with self._lock:
+            self._groups.append(group)
+            cancelled = self.event.is_set()
+        if cancelled:
+            group.cancel()
+
+    def cancel(self):
+        with self._lock:
+            self.event.set()
+            groups = list(self._groups)
+        for group in groups:
+            group.cancel()
+
+
+@contextmanager
+def cancel_scope(scope: Optional[CancelScope] = None):
+    """Bu blokta (aynı thread'de) oluşturulan grupları scope'a bağlar."""
+    scope = scope or CancelScope()
+    previous = getattr(_scope_local, 'scope', None)
+    _scope_local.scope = scope
+    try:
+        yield scope
+    finally:
+        _scope_local.scope = previous
+
+
+class ScrapeScheduler:
+    """Öncelikli, host sınırlı, backpressure'lı paylaşılan worker havuzu."""
+
+    def __init__(self, max_workers: int = SCRAPE_MAX_WORKERS,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 max_pending: int = MAX_PENDING_TASKS):
+        self.max_workers = max(1, max_workers)
+        self.host_limits = dict(HOST_TASK_LIMITS if host_limits is None else host_limits)
+        self.max_pending = max(1, max_pending)
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, ScrapeTask]] = []
+        self._seq = itertools.count()
+        self._running = Counter()
+        self._running_total = 0
+        self._threads: List[threading.Thread] = []
+        self._history = deque(maxlen=_TIMING_HISTORY)
+        self._counts = Counter()
+
+    def group(self, name: str, priority: int = DEFAULT_PRIORITY, host: Optional[str] = None) -> TaskGroup:
+        return TaskGroup(self, name, priority=priority, host=host)
+
+    def submit(self, fn: Callable, *args, priority: int = DEFAULT_PRIORITY,
+               host: Optional[str] = None, name: Optional[str] = None, **kwargs) -> Future:
+        """Gruba bağlı olmayan tek iş."""
+        return self.group(name or getattr(fn, '__name__', 'task'), priority, host).submit(fn, *args, **kwargs)
+
+    def _enqueue(self, task: ScrapeTask, group: TaskGroup):
+        with self._cond:
+            # Backpressure: kuyruk dolunca üretici bekler (iptal edilirse vazgeçer)
+            while len(self._heap) >= self.max_pending:
+                if group.cancelled:
+                    task.future.cancel()
+                    raise CancelledError(f"'{group.name}' grubu iptal edildi")
+                self._cond.wait(_WAIT_SLICE)
+            heapq.heappush(self._heap, (task.priority, next(self._seq), task))
+            self._counts['submitted'] += 1
+            self._ensure_workers()
+            self._cond.notify_all()
+
+    def _notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._worker, name=f"scrape-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _host_available(self, host: Optional[str]) -> bool:
+        if host is None or host not in self.host_limits:
+            return True
+        return self._running[host] < self.host_limits[host]
+
+    def _drop_cancelled(self):
+        kept = []
+        for entry in self._heap:
+            task = entry[2]
+            if task.future.cancelled():
+                task.status = 'cancelled'
+                self._counts['cancelled'] += 1
+                self._history.append(task.timing())
+            else:
+                kept.append(entry)
+        self._heap = kept
+        heapq.heapify(self._heap)
+        self._cond.notify_all()
+
+    def _take_next(self) -> Optional[ScrapeTask]:
+        """Hostu müsait olan en yüksek öncelikli işi kuyruktan çıkarır; iptal edilenleri atar."""
+        if any(entry[2].future.cancelled() for entry in self._heap):
+            self._drop_cancelled()
+        best_index = None
+        for index, entry in enumerate(self._heap):
+            if not self._host_available(entry[2].host):
+                continue
+            if best_index is None or entry < self._heap[best_index]:
+                best_index = index
+        if best_index is None:
+            return None
+        entry = self._heap[best_index]
+        self._heap[best_index] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        return entry[2]
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._take_next()
+                while task is None:
+                    self._cond.wait()
+                    task = self._take_next()
+                self._running[task.host] += 1
+                self._running_total += 1
+                # Kuyrukta yer açıldı: bekleyen üreticileri uyandır
+                self._cond.notify_all()
+            try:
+                task.run()
+            finally:
+                with self._cond:
+                    self._running[task.host] -= 1
+                    self._running_total -= 1
+                    self._counts[task.status] += 1
+                    self._history.append(task.timing())
+                    self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Kuyruk durumu ve son işlerin zamanlamaları."""
+        with self._cond:
+            return {
+                'max_workers': self.max_workers,
+                'queued': len(self._heap),
+                'running': self._running_total,
+                'running_by_host': {host: count for host, count in self._running.items() if count},
+                'counts': dict(self._counts),
+                'recent': list(self._history)[-50:],
+            }
+
+
+_scheduler: Optional[ScrapeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scrape_scheduler() -> ScrapeScheduler:
+    """Tüm scraper'ların paylaştığı zamanlayıcıyı döndürür (lazy)."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ScrapeScheduler()
+    return _scheduler
+
+
+_STREAM_DONE = object()
+
+
+def merge_generators(sources: Dict[str, Callable[[], Iterator[Dict]]],
+                     scope: Optional[CancelScope] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Her kaynağı (mesaj üreten generator fabrikası) ayrı bir thread'de çalıştırır ve
+    mesajları geldikleri sırayla (kaynak_adı, mesaj) olarak döndürür.
+
+    Tüketici durursa (ör. SSE istemcisi bağlantıyı kapattı, GeneratorExit) scope iptal
+    edilir: kaynakların açtığı gruplardaki bekleyen işler kuyruktan düşer ve kaynak
+    generator'ları bir sonraki mesajlarında kapatılır.
+    Kaynak hata verirse {'type': 'error'} mesajı üretilir; diğer kaynaklar devam eder.
+    """
+    scope = scope or CancelScope()
+    messages: 'queue.Queue' = queue.Queue()
+
+    def pump(name, factory):
+        with cancel_scope(scope):
+            generator = None
+            try:
+                generator = factory()
+                for message in generator:
+                    if scope.event.is_set():
+                        break
+                    messages.put((name, message))
+            except Exception as e:
+                messages.put((name, {'type': 'error', 'message': f'{name} hatası: {e}'}))
+            finally:
+                if generator is not None and hasattr(generator, 'close'):
+                    generator.close()
+                messages.put((name, _STREAM_DONE))
+
+    threads = [
+        threading.Thread(target=pump, args=(name, factory), name=f"scrape-stage-{name}", daemon=True)
+        for name, factory in sources.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    remaining = len(threads)
+    try:
+        while remaining:
+            name, message = messages.get()
+            if message is _STREAM_DONE:
+                remaining -= 1
+                continue
+            yield name, message
+    finally:
+        if remaining:
+            scope.cancel()
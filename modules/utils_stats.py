@@ -5,19 +5,76 @@ Bu modül, veritabanı istatistikleri ve sistem monitoring fonksiyonlarını iç
 utils_database.py'den ayrıştırılmıştır.
 
 İçerdiği fonksiyonlar:
-- get_database_statistics: Kapsamlı veritabanı istatistikleri
+- get_database_statistics: Kapsamlı veritabanı istatistikleri (istatistik_sayac tablosundan)
+- rebuild_statistics_counters: Sayaçları COUNT(*) ile yeniden hesaplar (açık istek)
 - format_database_statistics_message: İstatistikleri konsol formatına çevirir
+- get_file_statistics: Dosya sayıları (data/file_inventory.json envanterinden)
+- record_file_in_inventory / remove_file_from_inventory: Dosya yazan/silen yolların envanter güncellemesi
+  (bellekte yapılır; diske yazma ve "files" sürüm artışı toplu yapılır)
+- flush_file_inventory: Bekleyen envanter değişikliklerini diske yazar (iş sonu, çıkış)
+- scan_file_inventory: data/ ağacını tek geçişte tarar (mtime ile artımlı)
+- rescan_file_inventory: Tüm klasörleri yeniden listeleyen tam tarama (açık istek)
+- list_inventory_files: Cache tipine ve uzantıya göre dosya listesi
 """
 
 import os
+import json
+import time
+import atexit
 import sqlite3
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 # Database connection'ı utils_database.py'den import et
 try:
     from .utils_database import with_database
+    from .utils_cache import bump_table_versions
 except ImportError:
     from utils_database import with_database
+    from utils_cache import bump_table_versions
+
+
+# istatistik_sayac tablosundaki sayaç anahtarları (data/schema.sql tetikleyicileri günceller)
+DB_COUNTER_KEYS = (
+    "alan_count",
+    "cop_url_count",
+    "dbf_url_count",
+    "ders_count",
+    "dal_count",
+    "ders_dal_relations",
+    "ogrenme_birimi_count",
+    "konu_count",
+    "kazanim_count",
+)
+
+# Sayaç anahtarı -> yeniden sayım sorgusu (sadece açık rescan isteğinde kullanılır)
+_COUNTER_QUERIES = {
+    "alan_count": "SELECT COUNT(*) FROM temel_plan_alan",
+    "cop_url_count": "SELECT COUNT(*) FROM temel_plan_alan WHERE cop_url IS NOT NULL",
+    "dbf_url_count": "SELECT COUNT(*) FROM temel_plan_alan WHERE dbf_urls IS NOT NULL",
+    "ders_count": "SELECT COUNT(*) FROM temel_plan_ders",
+    "dal_count": "SELECT COUNT(*) FROM temel_plan_dal",
+    "ders_dal_relations": "SELECT COUNT(*) FROM temel_plan_ders_dal",
+    "ogrenme_birimi_count": "SELECT COUNT(*) FROM temel_plan_ogrenme_birimi",
+    "konu_count": "SELECT COUNT(*) FROM temel_plan_konu",
+    "kazanim_count": "SELECT COUNT(*) FROM temel_plan_kazanim",
+}
+
+
+def _count_database_statistics(cursor) -> Dict[str, Any]:
+    """
+    Sayaçları COUNT(*) ile baştan hesaplar. Sayaç tablosu olmayan eski
+    veritabanları ve açık yeniden sayım istekleri için kullanılır.
+    """
+    stats = {}
+    for key, query in _COUNTER_QUERIES.items():
+        try:
+            cursor.execute(query)
+            stats[key] = cursor.fetchone()[0]
+        except sqlite3.OperationalError:
+            # Tablo yoksa (eski şema)
+            stats[key] = 0
+    return stats
 
 
 @with_database
@@ -26,6 +83,9 @@ def get_database_statistics(cursor) -> Dict[str, Any]:
     Merkezi veritabanı istatistikleri çekme fonksiyonu.
     CLAUDE.md kurallarına uygun olarak @with_database decorator kullanır.
     
+    Değerler istatistik_sayac tablosundan tek sorguyla okunur; tablo
+    tetikleyicilerle güncel tutulduğu için süre veri boyutundan bağımsızdır.
+    
     Returns:
         dict: Kapsamlı veritabanı istatistikleri
         {
@@ -40,53 +100,18 @@ def get_database_statistics(cursor) -> Dict[str, Any]:
             "kazanim_count": int
         }
     """
-    stats = {}
-    
     try:
-        # Alan sayıları
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_alan')
-        stats['alan_count'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_alan WHERE cop_url IS NOT NULL')
-        stats['cop_url_count'] = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_alan WHERE dbf_urls IS NOT NULL')
-        stats['dbf_url_count'] = cursor.fetchone()[0]
-        
-        # Ders sayıları
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_ders')
-        stats['ders_count'] = cursor.fetchone()[0]
-        
-        # Dal sayıları  
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_dal')
-        stats['dal_count'] = cursor.fetchone()[0]
-        
-        # Ders-Dal ilişkileri
-        cursor.execute('SELECT COUNT(*) FROM temel_plan_ders_dal')
-        stats['ders_dal_relations'] = cursor.fetchone()[0]
-        
-        # Öğrenme birimi sayıları (varsa)
         try:
-            cursor.execute('SELECT COUNT(*) FROM temel_plan_ogrenme_birimi')
-            stats['ogrenme_birimi_count'] = cursor.fetchone()[0]
-        except:
-            stats['ogrenme_birimi_count'] = 0
+            cursor.execute('SELECT sayac_adi, deger FROM istatistik_sayac')
+            counters = {row[0]: row[1] for row in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            # Sayaç tablosu henüz oluşturulmamış (init_database çalışmamış)
+            counters = {}
         
-        # Konu sayıları (varsa)
-        try:
-            cursor.execute('SELECT COUNT(*) FROM temel_plan_konu')
-            stats['konu_count'] = cursor.fetchone()[0]
-        except:
-            stats['konu_count'] = 0
+        if not all(key in counters for key in DB_COUNTER_KEYS):
+            return _count_database_statistics(cursor)
         
-        # Kazanım sayıları (varsa)
-        try:
-            cursor.execute('SELECT COUNT(*) FROM temel_plan_kazanim')
-            stats['kazanim_count'] = cursor.fetchone()[0]
-        except:
-            stats['kazanim_count'] = 0
-            
-        return stats
+        return {key: counters[key] for key in DB_COUNTER_KEYS}
         
     except Exception as e:
         print(f"❌ İstatistik çekme hatası: {e}")
@@ -104,6 +129,25 @@ def get_database_statistics(cursor) -> Dict[str, Any]:
         }
 
 
+@with_database
+def rebuild_statistics_counters(cursor) -> Dict[str, Any]:
+    """
+    istatistik_sayac tablosunu COUNT(*) ile yeniden hesaplar.
+    Sadece açık istek üzerine (örn. /api/rescan-statistics) çağrılır.
+    """
+    stats = _count_database_statistics(cursor)
+    cursor.executemany(
+        """
+        INSERT INTO istatistik_sayac (sayac_adi, deger, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(sayac_adi) DO UPDATE SET deger = excluded.deger, updated_at = CURRENT_TIMESTAMP
+        """,
+        list(stats.items())
+    )
+    print(f"🔄 İstatistik sayaçları yeniden hesaplandı: {stats}")
+    return stats
+
+
 def format_database_statistics_message(stats: Dict[str, Any]) -> str:
     """
     İstatistikleri konsol mesajı formatına çevirir.
@@ -120,18 +164,379 @@ def format_database_statistics_message(stats: Dict[str, Any]) -> str:
     return f"📊 Veritabanı Durumu: {stats['alan_count']} toplam alan | {stats['cop_url_count']} COP URL | {stats['dbf_url_count']} DBF URL | {stats['ders_count']} ders | {stats['dal_count']} dal"
 
 
-def get_file_statistics(data_root: str = "data") -> Dict[str, int]:
+# ------------- DOSYA ENVANTERİ ------------- #
+#
+# data/ ağacı tek geçişte os.scandir ile taranır; her dosya cache tipi
+# (ilk klasör: cop, dbf, dm, bom...) ve uzantısına göre sınıflandırılır.
+# Envanter klasör mtime'larıyla birlikte data/file_inventory.json'a yazılır.
+# Sonraki taramada mtime'ı değişmemiş klasörler yeniden listelenmez
+# (sadece stat edilir), alt klasörlerine inilmeye devam edilir. data/ kökü
+# envanter dosyasını barındırdığından her taramada listelenir (küçük bir klasör).
+
+FILE_INVENTORY_FILENAME = "file_inventory.json"
+INVENTORY_FORMAT_VERSION = 2
+
+# Yarım kalan indirmeler / atomik yazma ara dosyaları sayılmaz
+IGNORED_FILE_SUFFIXES = (".part", ".part.meta", ".tmp")
+
+# İstatistik anahtarı -> (cache tipleri, uzantılar)
+FILE_STAT_RULES = {
+    "cop_pdf": (("cop", "cop_files"), (".pdf",)),
+    "dbf_rar": (("dbf",), (".rar", ".zip")),
+    "dbf_pdf": (("dbf",), (".pdf",)),
+    "dbf_docx": (("dbf",), (".docx",)),
+    "dm_pdf": (("dm",), (".pdf",)),
+    "bom_pdf": (("bom",), (".pdf",)),
+}
+FILE_STAT_KEYS = tuple(FILE_STAT_RULES)
+
+# record/remove çağrıları envanteri bellekte günceller; dosya toplu indirmelerde her
+# dosya için yeniden yazılmasın diye en fazla bu aralıkla (ve iş sonunda) diske yazılır
+INVENTORY_FLUSH_SECONDS = 2.0
+
+_inventory_lock = threading.Lock()
+_inventories = {}  # data_root -> inventory dict
+_dirty_roots = set()  # diske yazılmamış değişikliği olan data_root'lar
+_flush_timer = None
+
+
+def classify_data_file(rel_path: str) -> Optional[str]:
+    """
+    data/ köküne göre göreli dosya yolunu istatistik anahtarına eşler.
+    
+    Örnek: "dbf/08_Bilisim/bilisim_9.rar" -> "dbf_rar"
+    
+    Returns:
+        İstatistik anahtarı veya sayılmayan dosyalar için None
     """
-    Dosya sistemindeki dosya sayılarını hesaplar.
+    parts = rel_path.replace("\\", "/").split("/")
+    if len(parts) < 2:
+        return None
+    
+    cache_type = parts[0]
+    ext = os.path.splitext(parts[-1])[1].lower()
+    for stat_key, (cache_types, extensions) in FILE_STAT_RULES.items():
+        if cache_type in cache_types and ext in extensions:
+            return stat_key
+    return None
+
+
+def _empty_inventory() -> Dict[str, Any]:
+    return {"version": INVENTORY_FORMAT_VERSION, "dirs": {}, "counts": {}, "scanned_at": None}
+
+
+def _cache_type_of(rel_dir: str) -> str:
+    return rel_dir.split("/", 1)[0]
+
+
+def _count_inventory(dirs: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Klasör kayıtlarından cache tipi -> uzantı -> adet sayımını üretir."""
+    counts = {}
+    for rel_dir, entry in dirs.items():
+        if not rel_dir:
+            continue
+        type_counts = counts.setdefault(_cache_type_of(rel_dir), {})
+        for ext in entry["files"].values():
+            type_counts[ext] = type_counts.get(ext, 0) + 1
+    return counts
+
+
+def _adjust_count(inventory: Dict[str, Any], rel_dir: str, ext: str, delta: int) -> None:
+    type_counts = inventory["counts"].setdefault(_cache_type_of(rel_dir), {})
+    type_counts[ext] = max(0, type_counts.get(ext, 0) + delta)
+
+
+def _inventory_path(data_root: str) -> str:
+    return os.path.join(data_root, FILE_INVENTORY_FILENAME)
+
+
+def _save_inventory(data_root: str, inventory: Dict[str, Any]) -> None:
+    """Envanteri atomik olarak diske yazar (lock altında çağrılmalı)."""
+    path = _inventory_path(data_root)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(data_root, exist_ok=True)
+        persisted = {key: inventory[key] for key in ("version", "dirs", "scanned_at")}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(persisted, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠️ Dosya envanteri kaydedilemedi: {e}")
+
+
+def _load_inventory(data_root: str) -> Optional[Dict[str, Any]]:
+    """Envanteri bellekten veya diskten yükler (lock altında çağrılmalı)."""
+    if data_root in _inventories:
+        return _inventories[data_root]
+    
+    path = _inventory_path(data_root)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            inventory = json.load(f)
+        if inventory.get("version") != INVENTORY_FORMAT_VERSION:
+            # Eski format - baştan taranacak
+            return None
+        inventory["counts"] = _count_inventory(inventory["dirs"])
+    except Exception as e:
+        print(f"⚠️ Dosya envanteri okunamadı, yeniden taranacak: {e}")
+        return None
+    
+    _inventories[data_root] = inventory
+    return inventory
+
+
+def _notify_files_changed() -> None:
+    """Okuma cache'indeki dosya istatistiklerini geçersiz kılar."""
+    bump_table_versions("files")
+
+
+def _mark_dirty(data_root: str) -> None:
+    """Değişikliği işaretler ve zamanlanmış bir yazma yoksa başlatır (lock altında çağrılmalı)."""
+    global _flush_timer
+    _dirty_roots.add(data_root)
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(INVENTORY_FLUSH_SECONDS, flush_file_inventory)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def flush_file_inventory(data_root: Optional[str] = None) -> None:
+    """
+    Bekleyen envanter değişikliklerini diske yazar ve dosya istatistiklerinin okuma
+    cache'ini geçersiz kılar. data_root verilmezse tüm kirli envanterler yazılır.
+    """
+    global _flush_timer
+    with _inventory_lock:
+        roots = [data_root] if data_root is not None else list(_dirty_roots)
+        flushed = False
+        for root in roots:
+            if root not in _dirty_roots:
+                continue
+            _dirty_roots.discard(root)
+            if root in _inventories:
+                _save_inventory(root, _inventories[root])
+                flushed = True
+        if not _dirty_roots and _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    
+    if flushed:
+        _notify_files_changed()
+
+
+atexit.register(flush_file_inventory)
+
+
+def _list_directory(abs_dir: str, is_root: bool) -> Tuple[Dict[str, str], List[str]]:
+    """Tek klasörü os.scandir ile listeler: (dosya adı -> uzantı, alt klasörler)."""
+    files = {}
+    subdirs = []
+    with os.scandir(abs_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif not is_root and entry.is_file():
+                    if entry.name.endswith(IGNORED_FILE_SUFFIXES):
+                        continue
+                    files[entry.name] = os.path.splitext(entry.name)[1].lower()
+            except OSError:
+                continue
+    return files, subdirs
+
+
+def scan_file_inventory(data_root: str = "data", full: bool = False) -> Dict[str, Any]:
+    """
+    data/ ağacını tek geçişte tarayıp envanteri günceller.
+    
+    mtime'ı kayıtlı değerle aynı olan klasörler yeniden listelenmez; sadece
+    alt klasörlerine inilir. full=True tüm klasörleri yeniden listeler.
+    
+    Returns:
+        Güncel envanter
+    """
+    with _inventory_lock:
+        previous = None if full else _load_inventory(data_root)
+    previous_dirs = previous["dirs"] if previous else {}
+    
+    dirs = {}
+    listed = skipped = 0
+    stack = [""]
+    
+    while stack:
+        rel_dir = stack.pop()
+        abs_dir = os.path.join(data_root, rel_dir) if rel_dir else data_root
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            continue
+        
+        entry = previous_dirs.get(rel_dir)
+        if entry is not None and entry.get("mtime_ns") == mtime_ns:
+            skipped += 1
+        else:
+            try:
+                files, subdirs = _list_directory(abs_dir, is_root=(rel_dir == ""))
+            except OSError:
+                continue
+            entry = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+            listed += 1
+        
+        dirs[rel_dir] = entry
+        stack.extend(f"{rel_dir}/{name}" if rel_dir else name for name in entry["subdirs"])
+    
+    inventory = _empty_inventory()
+    inventory["dirs"] = dirs
+    inventory["counts"] = _count_inventory(dirs)
+    inventory["scanned_at"] = time.time()
+    
+    with _inventory_lock:
+        _inventories[data_root] = inventory
+        _dirty_roots.discard(data_root)
+        _save_inventory(data_root, inventory)
+    
+    if listed:
+        _notify_files_changed()
+    print(f"🔄 Dosya envanteri tarandı: {listed} klasör listelendi, {skipped} klasör değişmemiş")
+    return inventory
+
+
+def rescan_file_inventory(data_root: str = "data") -> Dict[str, Any]:
+    """
+    Açık istek üzerine dosya envanterini baştan oluşturur: mtime'ı değişmemiş
+    klasörler de yeniden listelenir (mtime'ı korunarak dışarıdan değiştirilen
+    dosyalar da yakalanır).
+    """
+    return scan_file_inventory(data_root, full=True)
+
+
+def _split_data_path(file_path: str, data_root: str) -> Optional[Tuple[str, str]]:
+    """Dosya yolunu (data/ köküne göre klasör, dosya adı) olarak ayırır."""
+    rel_path = os.path.relpath(os.path.abspath(file_path), os.path.abspath(data_root))
+    if rel_path.startswith(".."):
+        return None
+    rel_dir, name = os.path.split(rel_path.replace(os.sep, "/"))
+    if not rel_dir:
+        return None  # data/ kökündeki dosyalar envantere girmez
+    return rel_dir, name
+
+
+def _ensure_dir_entry(inventory: Dict[str, Any], rel_dir: str) -> Dict[str, Any]:
+    """
+    Klasör kaydını döndürür; yoksa oluşturur ve üst klasörün alt klasör listesine
+    ekler (taramada yeni klasöre üst klasörden inilebilsin).
+    """
+    entry = inventory["dirs"].get(rel_dir)
+    if entry is None:
+        # Yeni klasör: mtime bilinmiyor, sonraki taramada listelenecek
+        entry = inventory["dirs"][rel_dir] = {"mtime_ns": None, "files": {}, "subdirs": []}
+        if rel_dir:
+            parent, _, name = rel_dir.rpartition("/")
+            parent_entry = _ensure_dir_entry(inventory, parent)
+            if name not in parent_entry["subdirs"]:
+                parent_entry["subdirs"].append(name)
+    return entry
+
+
+def record_file_in_inventory(file_path: str, data_root: str = "data") -> None:
+    """
+    Dosya yazan yollardan (indirme, arşiv açma, blob görünümü, PDF dönüşümü)
+    çağrılır; yeni dosyayı bellekteki envantere ekler (diske toplu yazılır).
+    Envanter henüz hiç oluşturulmamışsa bir şey yapmaz (ilk okumada taranır).
+    """
+    split = _split_data_path(file_path, data_root)
+    if not split or split[1].endswith(IGNORED_FILE_SUFFIXES):
+        return
+    rel_dir, name = split
+    ext = os.path.splitext(name)[1].lower()
+    
+    with _inventory_lock:
+        inventory = _load_inventory(data_root)
+        if inventory is None:
+            return
+        entry = _ensure_dir_entry(inventory, rel_dir)
+        if name in entry["files"]:
+            return
+        entry["files"][name] = ext
+        _adjust_count(inventory, rel_dir, ext, +1)
+        _mark_dirty(data_root)
+
+
+def remove_file_from_inventory(file_path: str, data_root: str = "data") -> None:
+    """Silinen dosyayı envanterden çıkarır (LRU tahliyesi, blob temizliği)."""
+    split = _split_data_path(file_path, data_root)
+    if not split:
+        return
+    rel_dir, name = split
+    
+    with _inventory_lock:
+        inventory = _load_inventory(data_root)
+        entry = inventory["dirs"].get(rel_dir) if inventory else None
+        if entry is None or name not in entry["files"]:
+            return
+        ext = entry["files"].pop(name)
+        _adjust_count(inventory, rel_dir, ext, -1)
+        _mark_dirty(data_root)
+
+
+def _get_inventory(data_root: str, rescan: bool = False) -> Dict[str, Any]:
+    inventory = None
+    if not rescan:
+        with _inventory_lock:
+            inventory = _load_inventory(data_root)
+    if inventory is None:
+        inventory = scan_file_inventory(data_root)
+    return inventory
+
+
+def list_inventory_files(cache_type: str, extensions: Tuple[str, ...] = None,
+                         data_root: str = "data", rescan: bool = True) -> List[str]:
+    """
+    Envanterdeki dosyaları listeler (os.walk yerine).
+    
+    Args:
+        cache_type: 'cop', 'dbf', 'dm', 'bom'
+        extensions: ('.pdf',) gibi uzantı filtresi (küçük harf)
+        rescan: Listelemeden önce artımlı tarama yap (değişmemiş klasörler atlanır)
+    
+    Returns:
+        data_root ile başlayan dosya yolları (sıralı)
+    """
+    inventory = _get_inventory(data_root, rescan=rescan)
+    paths = []
+    for rel_dir, entry in inventory["dirs"].items():
+        if _cache_type_of(rel_dir) != cache_type:
+            continue
+        for name, ext in entry["files"].items():
+            if extensions is None or ext in extensions:
+                paths.append(os.path.join(data_root, rel_dir, name))
+    return sorted(paths)
+
+
+def get_file_inventory_summary(data_root: str = "data") -> Dict[str, Dict[str, int]]:
+    """Cache tipi -> uzantı -> dosya sayısı özetini döndürür."""
+    inventory = _get_inventory(data_root)
+    return {cache_type: dict(exts) for cache_type, exts in inventory["counts"].items()}
+
+
+def get_file_statistics(data_root: str = "data", rescan: bool = False) -> Dict[str, int]:
+    """
+    Dosya sistemindeki dosya sayılarını envanterden döndürür.
+    
+    Envanter indirme fonksiyonları tarafından güncel tutulur; dosya sistemi
+    sadece envanter yoksa veya rescan=True ise (artımlı olarak) taranır.
     
     Args:
         data_root: Data klasörünün yolu (varsayılan: "data")
+        rescan: True ise dosya sistemini yeniden tara
         
     Returns:
         Dict: Dosya türü sayıları
         {
             "cop_pdf": int,
-            "dbf_rar": int,
+            "dbf_rar": int,  # RAR + ZIP arşivleri
             "dbf_pdf": int,
             "dbf_docx": int,
             "dbf_total": int,  # Toplam DBF dosya sayısı
@@ -140,59 +545,22 @@ def get_file_statistics(data_root: str = "data") -> Dict[str, int]:
             "bom_total": int  # Toplam BOM dosya sayısı
         }
     """
-    stats = {
-        "cop_pdf": 0,
-        "dbf_rar": 0,
-        "dbf_pdf": 0,
-        "dbf_docx": 0,
-        "dbf_total": 0,  # Toplam DBF dosya sayısı
-        "dm_pdf": 0,
-        "bom_pdf": 0,
-        "bom_total": 0  # Toplam BOM dosya sayısı
-    }
-    
-    if not os.path.exists(data_root):
-        return stats
-    
     try:
-        # COP PDF'leri say
-        cop_dir = os.path.join(data_root, "cop")
-        if os.path.exists(cop_dir):
-            for root, dirs, files in os.walk(cop_dir):
-                stats["cop_pdf"] += len([f for f in files if f.lower().endswith('.pdf')])
-        
-        # DBF dosyalarını say
-        dbf_dir = os.path.join(data_root, "dbf")
-        if os.path.exists(dbf_dir):
-            for root, dirs, files in os.walk(dbf_dir):
-                for file in files:
-                    if file.lower().endswith('.rar'):
-                        stats["dbf_rar"] += 1
-                        stats["dbf_total"] += 1
-                    elif file.lower().endswith('.pdf'):
-                        stats["dbf_pdf"] += 1
-                        stats["dbf_total"] += 1
-                    elif file.lower().endswith('.docx'):
-                        stats["dbf_docx"] += 1
-                        stats["dbf_total"] += 1
-        
-        # DM PDF'leri say
-        dm_dir = os.path.join(data_root, "dm")
-        if os.path.exists(dm_dir):
-            for root, dirs, files in os.walk(dm_dir):
-                stats["dm_pdf"] += len([f for f in files if f.lower().endswith('.pdf')])
+        counts = _get_inventory(data_root, rescan=rescan)["counts"]
+        stats = {}
+        for stat_key, (cache_types, extensions) in FILE_STAT_RULES.items():
+            stats[stat_key] = sum(
+                counts.get(cache_type, {}).get(ext, 0)
+                for cache_type in cache_types
+                for ext in extensions
+            )
         
-        # BOM dosyalarını say
-        bom_dir = os.path.join(data_root, "bom")
-        if os.path.exists(bom_dir):
-            for root, dirs, files in os.walk(bom_dir):
-                pdf_count = len([f for f in files if f.lower().endswith('.pdf')])
-                stats["bom_pdf"] += pdf_count
-                stats["bom_total"] += pdf_count  # BOM'da sadece PDF dosyaları var
-                
     except Exception as e:
         print(f"❌ Dosya istatistik hesaplama hatası: {e}")
+        stats = {key: 0 for key in FILE_STAT_KEYS}
     
+    stats["dbf_total"] = stats["dbf_rar"] + stats["dbf_pdf"] + stats["dbf_docx"]
+    stats["bom_total"] = stats["bom_pdf"]  # BOM'da sadece PDF dosyaları var
     return stats
 
 
@@ -9,12 +9,13 @@ import io
 import sys
 import sqlite3
 import re
+import urllib.parse
 from contextlib import redirect_stdout, redirect_stderr
 
 # artık alanlar_ve_dersler3.py kullanmıyoruz, getir_* modülleri kullanıyoruz
 
 # oku_dbf.py'den fonksiyonları import ediyoruz
-from modules.oku_dbf import link_dbf_files_to_database
+from modules.oku_dbf import link_dbf_files_to_database, import_dbf_learning_units, get_courses_with_dbf_files
 
 # Yeni modülleri import et
 from modules.get_dbf import get_dbf_data, get_dbf
@@ -25,21 +26,62 @@ from modules.get_bom import get_bom
 from modules.get_dal import get_dal
 
 # Database utilities from utils_database.py
-from modules.utils_database import with_database_json, find_or_create_database, get_or_create_alan, save_learning_units
-from modules.utils_normalize import normalize_to_title_case_tr
+from modules.utils_database import with_database, with_database_json, find_or_create_database, get_or_create_alan, save_learning_units
 
-# DBF parsing utilities
-from modules.utils_dbf1 import ex_kazanim_tablosu, read_full_text_from_file
+# Paylaşılan HTTP istemcisi (havuzlu, retry'lı)
+from modules.utils_http import http_get
+
+# Okuma cache katmanı (tablo sürüm sayaçlı LRU)
+from modules.utils_cache import cached_endpoint, invalidates_tables, bump_table_versions, get_cache_stats, LEARNING_UNIT_TABLES
+
+# DBF ders adı -> temel_plan_ders eşleştirmesi (indeksli ders_adi_norm + ters kelime indeksi)
+from modules.utils_matching import find_matching_ders
+
+# Merkezi scraper kuyruğu (öncelik, global/host sınırları, iptal)
+from modules.utils_scheduler import get_scrape_scheduler, merge_generators
+
+# Kalıcı arka plan işleri (SSE istemcileri işin olay günlüğüne abone olur)
+from modules.utils_jobs import register_pipeline, start_job, get_job, list_jobs, cancel_job, stream_job_events
+from modules.oku_cop import oku_cop_files
+
+# Açılmamış arşivlerdeki belgeler "<arşiv>::<üye>" referansıyla tutulur, sunulurken açılır
+from modules.utils_archive import split_member_ref
+from modules.utils_file_serving import get_file_resolver, send_project_file
+from modules.utils_stats import flush_file_inventory
+from modules.utils_conversion_service import convert_dbf_tree
+from modules.utils_document import open_document_source
+from modules.utils_dbf1 import process_dbf_file
 
 
 app = Flask(__name__)
 CORS(app)
+# Dosya gövdesini önündeki nginx/Apache göndersin (X-Sendfile); yoksa wsgi.file_wrapper
+app.config['USE_X_SENDFILE'] = os.getenv('MEB_X_SENDFILE') == '1'
+
+
+def job_event_response(name, params=None):
+    """
+    Pipeline'ı arka plan işi olarak başlatır (aynı iş çalışıyorsa ona bağlanır) ve
+    işin olaylarını SSE olarak döndürür. EventSource yeniden bağlandığında
+    (Last-Event-ID) yeni iş başlatılmaz, son işin kaldığı olaydan devam edilir.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    job = None
+    if request.args.get('job_id'):
+        job = get_job(request.args['job_id'])
+    elif last_event_id:
+        latest = list_jobs(name)
+        job = get_job(latest[0]['id']) if latest else None
+    if job is None:
+        job = start_job(name, params, resume=request.args.get('resume', '1') != '0')
+    return Response(stream_job_events(job, last_event_id), mimetype='text/event-stream')
 
 
 
 CACHE_FILE = "data/scraped_data.json"
 
 @app.route('/api/get-cached-data')
+@cached_endpoint('temel_plan_alan', 'temel_plan_dal', 'temel_plan_ders', 'temel_plan_ders_dal')
 @with_database_json
 def get_cached_data(cursor):
     """
@@ -133,6 +175,9 @@ def get_dal_endpoint():
         except Exception as e:
             error_message = {'type': 'error', 'message': f'Alan-Dal çekme hatası: {str(e)}'}
             yield f"data: {json.dumps(error_message)}\n\n"
+        finally:
+            # Job veritabanı/dosya yazdı - okuma cache'ini geçersiz kıl
+            bump_table_versions()
 
     return Response(generate(), mimetype='text/event-stream')
 
@@ -151,6 +196,9 @@ def api_get_cop():
         except Exception as e:
             error_message = {'type': 'error', 'message': f'ÇÖP linkleri çekilirken hata oluştu: {str(e)}'}
             yield f"data: {json.dumps(error_message)}\n\n"
+        finally:
+            # Job veritabanı/dosya yazdı - okuma cache'ini geçersiz kıl
+            bump_table_versions()
 
     return Response(generate(), mimetype='text/event-stream')
 
@@ -158,19 +206,12 @@ def api_get_cop():
 def api_get_dbf():
     """
     DBF (Ders Bilgi Formu) verilerini çeker, veritabanına kaydeder ve dosyaları indirir.
-    İlerlemeyi SSE ile anlık olarak gönderir.
+    İş arka planda çalışır; ilerleme SSE ile iletilir (bağlantı kopsa da iş devam eder).
+    Arşivler açılmaz (metinler arşivden okunur); ?extract=1 ile topluca açılır.
     """
-    def generate():
-        try:
-            # get_dbf fonksiyonu tüm işlemleri yapıyor: link çekme + dosya indirme + DB kaydetme
-            for msg in get_dbf():
-                yield f"data: {json.dumps(msg)}\n\n"
-                time.sleep(0.05)
-            
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'DBF işlemi hatası: {str(e)}'})}\n\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
+    # get_dbf tüm işlemleri yapıyor: link çekme + dosya indirme + DB kaydetme
+    params = {'extract_archives': True} if request.args.get('extract') == '1' else None
+    return job_event_response('get-dbf', params)
 
 @app.route('/api/get-dm')
 def api_get_dm():
@@ -184,6 +225,9 @@ def api_get_dm():
                 yield f"data: {json.dumps(message)}\n\n"
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        finally:
+            # Job veritabanı/dosya yazdı - okuma cache'ini geçersiz kıl
+            bump_table_versions()
     
     return Response(generate(), mimetype='text/event-stream')
 
@@ -202,6 +246,9 @@ def api_get_bom():
         except Exception as e:
             error_message = {'type': 'error', 'message': f'BOM işlemi sırasında bir hata oluştu: {str(e)}'}
             yield f"data: {json.dumps(error_message)}\n\n"
+        finally:
+            # Job veritabanı/dosya yazdı - okuma cache'ini geçersiz kıl
+            bump_table_versions()
 
     return Response(generate(), mimetype='text/event-stream')
 
@@ -209,139 +256,151 @@ def api_get_bom():
 def api_oku_cop():
     """
     ÇÖP PDF'lerini işleyip alan-dal-ders ilişkilerini çıkararak veritabanına kaydeder.
+    Arka plan işi olarak çalışır; yarıda kalırsa işlenmiş dosyalar tekrar okunmaz.
     """
-    def generate():
-        try:
-            # ÇÖP klasörünü kontrol et
-            cop_folder = "data/cop"
-            if not os.path.exists(cop_folder):
-                yield f"data: {json.dumps({'type': 'error', 'message': 'ÇÖP klasörü bulunamadı. Önce ÇÖP dosyalarını indirin.'})}\n\n"
-                return
-            
-            yield f"data: {json.dumps({'type': 'status', 'message': 'ÇÖP PDF dosyaları taranıyor...'})}\n\n"
-            
-            # ÇÖP PDF dosyalarını bul
-            cop_files = []
-            for root, dirs, files in os.walk(cop_folder):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        cop_files.append(os.path.join(root, file))
-            
-            if not cop_files:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'ÇÖP PDF dosyası bulunamadı.'})}\n\n"
-                return
-            
-            yield f"data: {json.dumps({'type': 'status', 'message': f'{len(cop_files)} ÇÖP PDF dosyası bulundu. İşleniyor...'})}\n\n"
-            
-            # oku_cop modülünü import et
-            from modules.oku_cop import oku_cop_pdf_file, save_cop_results_to_db
-            
-            total_processed = 0
-            total_courses = 0
-            
-            # Database işlemleri artık @with_database decorator ile otomatik yönetiliyor
-            
-            for cop_file in cop_files:
-                try:
-                    yield f"data: {json.dumps({'type': 'status', 'message': f'{os.path.basename(cop_file)} işleniyor...'})}\n\n"
-                    
-                    # PDF'yi oku_cop.py ile işle
-                    result = oku_cop_pdf_file(cop_file)
-                    
-                    if result:
-                        # Sonuçları veritabanına kaydet (@with_database decorator ile)
-                        saved_count = save_cop_results_to_db(result)
-                        total_courses += saved_count
-                        
-                        if saved_count > 0:
-                            yield f"data: {json.dumps({'type': 'success', 'message': f'{os.path.basename(cop_file)}: {saved_count} ders bilgisi çıkarıldı'})}\n\n"
-                        else:
-                            yield f"data: {json.dumps({'type': 'warning', 'message': f'{os.path.basename(cop_file)}: Ders bilgisi çıkarılamadı'})}\n\n"
-                    else:
-                        yield f"data: {json.dumps({'type': 'warning', 'message': f'{os.path.basename(cop_file)}: İşlenemedi'})}\n\n"
-                    
-                    total_processed += 1
-                    
-                    # Progress update
-                    if total_processed % 5 == 0:
-                        yield f"data: {json.dumps({'type': 'info', 'message': f'{total_processed}/{len(cop_files)} dosya işlendi...'})}\n\n"
-                        
-                except Exception as e:
-                    yield f"data: {json.dumps({'type': 'error', 'message': f'{os.path.basename(cop_file)} işlenirken hata: {str(e)}'})}\n\n"
-            
-            yield f"data: {json.dumps({'type': 'done', 'message': f'İşlem tamamlandı! {total_processed} ÇÖP PDF dosyası işlendi, {total_courses} ders bilgisi çıkarıldı.'})}\n\n"
-            
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Genel hata: {str(e)}'})}\n\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
+    return job_event_response('oku-cop')
 
 @app.route('/api/oku-dbf')
 def api_oku_dbf():
     """
     DBF dosyalarını tarar, ders adıyla eşleştirir ve temel_plan_ders tablosundaki
-    dbf_url alanını günceller. İşlem ilerlemesini SSE ile iletir.
+    dbf_url alanını günceller. Arka plan işi olarak çalışır, ilerlemeyi SSE ile iletir.
     """
-    def generate():
+    return job_event_response('oku-dbf')
+
+def scrape_to_db_pipeline(checkpoint):
+    """
+    Tüm veri kaynaklarını (DM, DBF, COP, BOM) çekip veritabanına kaydeder.
+    Önce ÇÖP çalışır: alanları, dalları ve dersleri o yazar. DM ve BÖM bu ders
+    listesiyle eşleştirdiği için ÇÖP hatasız bitmeden başlatılmaz; ardından DM, DBF
+    ve BÖM eşzamanlı çalışır. Sayfa istekleri merkezi scraper kuyruğunda
+    (utils_scheduler) önceliklerine göre sıralanır. İş iptal edilirse bekleyen tüm
+    scraper işleri kuyruktan düşer. Hatasız tamamlanan aşamalar checkpoint'e
+    yazılır; yarıda kalan iş tekrar başlatıldığında yalnızca kalan aşamalar çalışır.
+    """
+    def timed_stage(label, stage_fn):
+        def run():
+            started = time.monotonic()
+            yield {'type': 'status', 'message': f'{label} verileri çekiliyor...'}
+            for message in stage_fn():
+                # Alt aşamanın 'done' mesajı tüm akışın bittiği anlamına gelmemeli
+                if message.get('type') == 'done':
+                    message = {**message, 'type': 'success'}
+                yield message
+            yield {'type': 'status', 'message': f'{label} tamamlandı ({time.monotonic() - started:.1f}s)', 'stage_done': True}
+        return run
+
+    db_path = find_or_create_database()
+    if not db_path:
+        yield {'type': 'error', 'message': 'Veritabanı bulunamadı veya oluşturulamadı'}
+        return
+    
+    completed_stages = checkpoint.setdefault('completed_stages', [])
+    started = time.monotonic()
+    stages = {
+        'COP': timed_stage('ÇÖP', get_cop),
+        'DM': timed_stage('Ders Materyali (DM)', get_dm),
+        'DBF': timed_stage('DBF', get_dbf),
+        'BOM': timed_stage('BÖM', get_bom),
+    }
+    # ÇÖP'ün yazdığı alan/ders listesini kullanan aşamalar
+    cop_dependents = ('DM', 'BOM')
+    if completed_stages:
+        yield {'type': 'info', 'message': f'Önceki çalıştırmada tamamlanan aşamalar atlanıyor: {", ".join(completed_stages)}'}
+        stages = {name: stage for name, stage in stages.items() if name not in completed_stages}
+    
+    error_count = 0
+    
+    def run_group(group):
+        nonlocal error_count
+        stage_errors = {name: 0 for name in group}
+        stream = merge_generators(group)
         try:
-            for message in link_dbf_files_to_database():
-                yield f"data: {json.dumps(message)}\n\n"
-                time.sleep(0.05)
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'DBF işlemi hatası: {str(e)}'})}\n\n"
-    return Response(generate(), mimetype='text/event-stream')
+            for stage, message in stream:
+                if message.get('type') == 'error':
+                    error_count += 1
+                    stage_errors[stage] += 1
+                yield {**message, 'stage': stage}
+                # Hata veren aşama tamamlandı sayılmaz; devam edildiğinde tekrar çalışır
+                if message.get('stage_done') and not stage_errors[stage]:
+                    completed_stages.append(stage)
+                    checkpoint.save(force=True)
+        finally:
+            # İş iptal edildiyse/kapandıysa bekleyen scraper işleri iptal edilir
+            stream.close()
+    
+    if 'COP' in stages:
+        yield from run_group({'COP': stages.pop('COP')})
+    if 'COP' not in completed_stages:
+        skipped = [name for name in cop_dependents if name in stages]
+        if skipped:
+            error_count += 1
+            yield {'type': 'error', 'message': f'ÇÖP hatasız tamamlanmadığı için atlandı: {", ".join(skipped)}'}
+        stages = {name: stage for name, stage in stages.items() if name not in cop_dependents}
+    
+    if stages:
+        yield {'type': 'status', 'message': f'{len(stages)} aşama eşzamanlı başlatılıyor: ' + ', '.join(stages)}
+        yield from run_group(stages)
+    
+    elapsed = time.monotonic() - started
+    yield {'type': 'done', 'message': f'Tüm aşamalar {elapsed:.1f}s içinde tamamlandı ({error_count} hata).'}
 
 @app.route('/api/scrape-to-db')
 def scrape_to_db():
     """
     Tüm veri kaynaklarını (DM, DBF, COP, BOM) çekip veritabanına kaydeder.
+    Arka plan işi olarak çalışır; aynı anda gelen ikinci istek çalışan işe bağlanır.
     """
-    def generate():
-        try:
-            # Veritabanını bul/oluştur
-            db_path = find_or_create_database()
-            if not db_path:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Veritabanı bulunamadı veya oluşturulamadı'})}\n\n"
-                return
-            
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                total_saved = 0
-                
-                # 1. Ders Materyali verilerini çek ve kaydet
-                yield f"data: {json.dumps({'type': 'status', 'message': '1/4: Ders Materyali (DM) verileri çekiliyor...'})}\n\n"
-                dm_data = get_dm()
-                dm_saved = save_dm_data_to_db(cursor, dm_data)
-                total_saved += dm_saved
-                yield f"data: {json.dumps({'type': 'status', 'message': f'DM: {dm_saved} ders kaydedildi'})}\n\n"
-                
-                # 2. DBF verilerini çek ve kaydet
-                yield f"data: {json.dumps({'type': 'status', 'message': '2/4: DBF verileri çekiliyor...'})}\n\n"
-                # get_dbf generator olarak çalışır, her mesajı işle
-                for dbf_msg in get_dbf():
-                    yield f"data: {json.dumps(dbf_msg)}\n\n"
-                    time.sleep(0.05)
-                
-                # 3. ÇÖP verilerini çek ve kaydet
-                yield f"data: {json.dumps({'type': 'status', 'message': '3/4: ÇÖP verileri çekiliyor...'})}\n\n"
-                # get_cop generator olarak çalışır, her mesajı işle
-                for cop_msg in get_cop():
-                    yield f"data: {json.dumps(cop_msg)}\n\n"
-                    time.sleep(0.05)
-                
-                # 4. BOM verilerini çek ve kaydet
-                yield f"data: {json.dumps({'type': 'status', 'message': '4/4: BOM verileri çekiliyor...'})}\n\n"
-                bom_data = get_bom()
-                bom_saved = save_bom_data_to_db(cursor, bom_data)
-                yield f"data: {json.dumps({'type': 'status', 'message': f'BOM: {bom_saved} ders güncellendi'})}\n\n"
-                
-                conn.commit()
-                yield f"data: {json.dumps({'type': 'done', 'message': f'Toplam {total_saved} ders veritabanına kaydedildi!'})}\n\n"
-                        
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Hata: {str(e)}'})}\n\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
+    return job_event_response('scrape-to-db')
+
+def finish_pipeline():
+    """İş bitince bekleyen dosya envanteri yazılır ve okuma cache'i geçersiz kılınır."""
+    flush_file_inventory()
+    bump_table_versions()
+
+# Arka plan işi olarak çalışan pipeline'lar
+register_pipeline('get-dbf', lambda checkpoint, **params: get_dbf(**params), on_finish=finish_pipeline)
+register_pipeline('oku-cop', oku_cop_files, on_finish=finish_pipeline)
+register_pipeline('oku-dbf', lambda checkpoint: link_dbf_files_to_database(checkpoint=checkpoint), on_finish=finish_pipeline)
+register_pipeline('scrape-to-db', scrape_to_db_pipeline, on_finish=finish_pipeline)
+register_pipeline('convert-dbf', convert_dbf_tree, on_finish=flush_file_inventory)
+
+@app.route('/api/jobs')
+def api_list_jobs():
+    """
+    Arka plan işlerini (en yeni önce) listeler. ?name= ile pipeline'a göre filtrelenir.
+    """
+    return jsonify(list_jobs(request.args.get('name')))
+
+@app.route('/api/jobs/<job_id>')
+def api_get_job(job_id):
+    """
+    Tek bir arka plan işinin durumunu döndürür.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """
+    Çalışan veya bitmiş bir işin olay günlüğüne SSE ile bağlanır.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(stream_job_events(job, last_event_id), mimetype='text/event-stream')
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """
+    Çalışan bir işi iptal eder (checkpoint korunur, tekrar başlatılınca devam eder).
+    """
+    if not cancel_job(job_id):
+        return jsonify({"success": False, "error": "Çalışan iş bulunamadı"}), 404
+    return jsonify({"success": True})
 
 @app.route('/api/process-pdf', methods=['POST'])
 def process_pdf():
@@ -356,42 +415,34 @@ def process_pdf():
     
     def generate():
         try:
-            # PDF'yi geçici olarak indir
+            # PDF'yi belleğe indir (geçici dosya yazılmaz)
             yield f"data: {json.dumps({'type': 'status', 'message': 'PDF indiriliyor...'})}\n\n"
             
-            response = requests.get(pdf_url, timeout=30)
+            response = http_get(pdf_url, timeout=30, conditional=False)
             response.raise_for_status()
-            
-            # Geçici dosya oluştur
-            temp_filename = f"temp_{int(time.time())}.pdf"
-            with open(temp_filename, 'wb') as f:
-                f.write(response.content)
+            pdf_name = os.path.basename(urllib.parse.urlparse(pdf_url).path) or "document.pdf"
             
             yield f"data: {json.dumps({'type': 'status', 'message': 'PDF işleniyor...'})}\n\n"
             
             # Çıktıyı yakalamak için StringIO kullan
             output_buffer = io.StringIO()
             
-            try:
-                # stdout'u yakalayarak oku_dbf() fonksiyonunun çıktısını al
+            # İndirilen baytlar doğrudan parser'a verilir
+            with open_document_source(response.content, pdf_name) as source:
+                # stdout'u yakalayarak DBF işleme çıktısını al
                 with redirect_stdout(output_buffer):
-                    result = oku_dbf(temp_filename)
-                
-                # Yakalanan çıktıyı satır satır gönder
-                output_lines = output_buffer.getvalue().split('\n')
-                for line in output_lines:
-                    if line.strip():
-                        yield f"data: {json.dumps({'type': 'output', 'message': line})}\n\n"
-                        time.sleep(0.1)  # UI'nin güncellenebilmesi için küçük gecikme
-                
-                # Son olarak JSON sonucunu gönder
-                yield f"data: {json.dumps({'type': 'result', 'data': result})}\n\n"
-                yield f"data: {json.dumps({'type': 'complete', 'message': 'İşlem tamamlandı!'})}\n\n"
-                
-            finally:
-                # Geçici dosyayı sil
-                if os.path.exists(temp_filename):
-                    os.remove(temp_filename)
+                    result = process_dbf_file(pdf_name, source=source)
+            
+            # Yakalanan çıktıyı satır satır gönder
+            output_lines = output_buffer.getvalue().split('\n')
+            for line in output_lines:
+                if line.strip():
+                    yield f"data: {json.dumps({'type': 'output', 'message': line})}\n\n"
+                    time.sleep(0.1)  # UI'nin güncellenebilmesi için küçük gecikme
+            
+            # Son olarak JSON sonucunu gönder
+            yield f"data: {json.dumps({'type': 'result', 'data': result})}\n\n"
+            yield f"data: {json.dumps({'type': 'complete', 'message': 'İşlem tamamlandı!'})}\n\n"
                     
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'message': f'Hata: {str(e)}'})}\n\n"
@@ -399,6 +450,7 @@ def process_pdf():
     return Response(generate(), mimetype='text/event-stream')
 
 @app.route('/api/get-statistics')
+@cached_endpoint()
 @with_database_json
 def get_statistics(cursor):
     """
@@ -406,34 +458,12 @@ def get_statistics(cursor):
     Merkezi get_database_statistics fonksiyonunu kullanır (CLAUDE.md kuralları).
     """
     try:
-        # Merkezi utils-database fonksiyonunu kullan
-        from modules.utils_stats import get_database_statistics
+        # Merkezi utils_stats fonksiyonlarını kullan (sayaç tablosu + dosya envanteri)
+        from modules.utils_stats import get_database_statistics, get_file_statistics
         db_stats = get_database_statistics()
         
-        # Dosya sistem istatistikleri
-        def count_files_in_dir(directory, extensions):
-            count = 0
-            if os.path.exists(directory):
-                for _, _, files in os.walk(directory):
-                    for file in files:
-                        if file.lower().endswith(tuple(extensions)):
-                            count += 1
-            return count
-
-        data_dir = "data"
-        file_stats = {}
-        
-        if os.path.exists(data_dir):
-            file_stats["cop_pdf"] = count_files_in_dir(os.path.join(data_dir, "cop"), ['.pdf']) + count_files_in_dir(os.path.join(data_dir, "cop_files"), ['.pdf'])
-            file_stats["dbf_rar"] = count_files_in_dir(os.path.join(data_dir, "dbf"), ['.rar', '.zip'])
-            file_stats["dbf_pdf"] = count_files_in_dir(os.path.join(data_dir, "dbf"), ['.pdf'])
-            file_stats["dbf_docx"] = count_files_in_dir(os.path.join(data_dir, "dbf"), ['.docx'])
-            file_stats["dm_pdf"] = count_files_in_dir(os.path.join(data_dir, "dm"), ['.pdf'])
-            file_stats["bom_pdf"] = count_files_in_dir(os.path.join(data_dir, "bom"), ['.pdf'])
-        else:
-            file_stats = {"cop_pdf": 0, "dbf_rar": 0, "dbf_pdf": 0, "dbf_docx": 0, "dm_pdf": 0, "bom_pdf": 0}
-
-        
+        # Dosya sistem istatistikleri - envanterden, tarama yapılmaz
+        file_stats = get_file_statistics()
 
         # Yeni kapsamlı format
         comprehensive_stats = {
@@ -449,7 +479,67 @@ def get_statistics(cursor):
         print(f"İstatistik alınırken hata oluştu: {e}")
         return {"error": str(e)}
 
+@app.route('/api/rescan-statistics', methods=['POST'])
+def rescan_statistics():
+    """
+    İstatistik sayaçlarını ve dosya envanterini baştan hesaplar.
+    Normalde gerekmez; dışarıdan elle değiştirilen veriler için açık istekle çalışır.
+    """
+    try:
+        from modules.utils_stats import rebuild_statistics_counters, rescan_file_inventory, get_file_statistics
+        db_stats = rebuild_statistics_counters()
+        # Artımlı tarama değil: değişmemiş görünen klasörler de yeniden listelenir
+        rescan_file_inventory()
+        file_stats = get_file_statistics()
+        bump_table_versions()
+        return jsonify({"success": True, **db_stats, **file_stats})
+    except Exception as e:
+        print(f"İstatistik yeniden tarama hatası: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/rebuild-file-hash-index', methods=['POST'])
+@with_database_json
+def rebuild_file_hash_index_endpoint(cursor):
+    """
+    data/ altındaki mevcut dosyaları içerik hash indeksine ekler ve silinmiş klasör
+    görünümlerini blob deposundan yeniden bağlar.
+    {"dedup": true} ile dosyalar blob deposuna alınır, aynı içerikteki kopyalar tek
+    blob'a hard link'e çevrilir (disk alanı geri kazanılır).
+    """
+    from modules.utils_file_hash import rebuild_file_hash_index
+    from modules.utils_blob_store import import_existing_files, restore_folder_views
+    data = request.get_json(silent=True) or {}
+    stats = rebuild_file_hash_index(cursor)
+    if data.get('dedup'):
+        stats.update(import_existing_files(cursor))
+    stats.update(restore_folder_views(cursor))
+    return {"success": True, **stats}
+
+@app.route('/api/gc-blobs', methods=['POST'])
+@with_database_json
+def gc_blobs_endpoint(cursor):
+    """
+    Hiçbir klasör görünümünün kullanmadığı blob'ları siler.
+    """
+    from modules.utils_blob_store import gc_blobs
+    return {"success": True, **gc_blobs(cursor)}
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """
+    Okuma cache'inin hit/miss metriklerini döndürür.
+    """
+    return jsonify(get_cache_stats())
+
+@app.route('/api/scrape-scheduler-stats')
+def scrape_scheduler_stats():
+    """
+    Merkezi scraper kuyruğunun durumunu ve son işlerin zamanlamalarını döndürür.
+    """
+    return jsonify(get_scrape_scheduler().get_stats())
+
 @app.route('/api/alan-dal-options')
+@cached_endpoint('temel_plan_alan', 'temel_plan_dal')
 @with_database_json
 def get_alan_dal_options(cursor):
     """
@@ -481,6 +571,7 @@ def get_alan_dal_options(cursor):
         return {"error": str(e)}
 
 @app.route('/api/table-data')
+@cached_endpoint('temel_plan_alan', 'temel_plan_dal', 'temel_plan_ders', 'temel_plan_ders_dal')
 def get_table_data():
     """
     React frontend için düz tablo verisi döndürür.
@@ -607,6 +698,7 @@ def copy_course():
             """, (new_ders_id, target_dal_id))
             
             conn.commit()
+            bump_table_versions('temel_plan_ders', 'temel_plan_ders_dal')
             
             return jsonify({
                 "success": True,
@@ -622,6 +714,7 @@ def copy_course():
 
 
 @app.route('/api/save', methods=['POST'])
+@invalidates_tables()
 @with_database_json
 def save(cursor):
     """
@@ -734,6 +827,7 @@ def save(cursor):
         return {"error": str(e)}
 
 @app.route('/api/load', methods=['GET'])
+@cached_endpoint('temel_plan_alan', 'temel_plan_dal', 'temel_plan_ders', 'temel_plan_ders_dal', *LEARNING_UNIT_TABLES)
 @with_database_json
 def load_data(cursor):
     """
@@ -986,6 +1080,15 @@ def init_database():
                 with open(schema_path, 'r', encoding='utf-8') as f:
                     schema_sql = f.read()
                 
+                # Eski tablolara eksik kolonlar önce eklenir (şemadaki indeks/trigger'lar bu kolonları kullanır)
+                from modules.utils_database import apply_column_migrations, merge_duplicate_areas
+                for table, columns in apply_column_migrations(conn.cursor()).items():
+                    print(f"🔧 {table} tablosuna kolon eklendi: {', '.join(columns)}")
+                # Mükerrer alanlar birleştirilir (şemadaki UNIQUE alan_adi indeksi için)
+                merged = merge_duplicate_areas(conn.cursor())
+                if merged:
+                    print(f"🔧 {merged} mükerrer alan kaydı birleştirildi")
+                
                 # SQL komutlarını çalıştır
                 conn.executescript(schema_sql)
                 conn.commit()
@@ -1181,280 +1284,6 @@ def create_kazanim(cursor, konu_id, kazanim):
         INSERT INTO temel_plan_ders_ob_konu_kazanim (konu_id, kazanim) VALUES (?, ?)
     """, (konu_id, kazanim))
 
-def save_dm_data_to_db(cursor, dm_data):
-    """Ders Materyali verilerini veritabanına kaydeder."""
-    saved_count = 0
-    
-    if not dm_data:
-        return saved_count
-    
-    # Yeni DM veri formatı: {sinif: {alan_adi: [ders_listesi]}}
-    for sinif, sinif_data in dm_data.items():
-        for alan_adi, ders_listesi in sinif_data.items():
-            try:
-                # Alan kaydet/güncelle (meb_alan_id yok bu yapıda)
-                alan_id = get_or_create_alan(cursor, alan_adi, None)
-                
-                # Her ders için
-                for ders_data in ders_listesi:
-                    ders_adi = ders_data.get('isim', '')
-                    dm_url = ders_data.get('link', '')
-                    ders_sinif = ders_data.get('sinif', sinif)
-                    
-                    if ders_adi and dm_url:
-                        # Sınıf bilgisini temizle (sadece rakam al)
-                        sinif_no = ders_sinif.replace('.Sınıf', '').replace('Sınıf', '').strip()
-                        
-                        course_data = {
-                            'ders_adi': ders_adi,
-                            'sinif': sinif_no,
-                            'alan_adi': alan_adi,
-                            'dm_url': dm_url
-                        }
-                        
-                        try:
-                            save_single_course(cursor, course_data)
-                            saved_count += 1
-                        except Exception as e:
-                            print(f"DM Ders kaydı hatası: {ders_adi} - {str(e)}")
-                        
-            except Exception as e:
-                print(f"DM Alan kaydı hatası: {alan_adi} - {str(e)}")
-    
-    return saved_count
-
-def save_dbf_data_to_db(cursor, dbf_data):
-    """DBF verilerini veritabanına kaydeder."""
-    updated_count = 0
-    
-    if not dbf_data:
-        return updated_count
-    
-    for sinif, sinif_data in dbf_data.items():
-        for alan_adi, alan_info in sinif_data.items():
-            try:
-                # Alanı bul ve DBF URL'lerini güncelle
-                cursor.execute("SELECT id, dbf_urls FROM temel_plan_alan WHERE alan_adi = ?", (alan_adi,))
-                result = cursor.fetchone()
-                
-                if result:
-                    alan_id, existing_dbf_urls = result
-                    # Mevcut DBF URLs'i JSON olarak parse et
-                    current_urls = json.loads(existing_dbf_urls) if existing_dbf_urls else {}
-                    # Yeni sınıf bilgisini ekle
-                    current_urls[sinif] = alan_info.get('link', '')
-                    
-                    # Güncelle
-                    cursor.execute("""
-                        UPDATE temel_plan_alan 
-                        SET dbf_urls = ? 
-                        WHERE id = ?
-                    """, (json.dumps(current_urls), alan_id))
-                    updated_count += 1
-                    
-            except Exception as e:
-                print(f"DBF güncelleme hatası: {alan_adi} - {str(e)}")
-    
-    return updated_count
-
-def save_cop_data_to_db(cursor, cop_data):
-    """ÇÖP verilerini veritabanına kaydeder."""
-    updated_count = 0
-    
-    if not cop_data:
-        return updated_count
-    
-    # COP data format: {"9": {"alan_adi": {"link": "url", "guncelleme_yili": "2024"}}}
-    for sinif, sinif_data in cop_data.items():
-        for alan_adi, cop_info in sinif_data.items():
-            try:
-                cop_url = cop_info.get('link', '')
-                if cop_url:
-                    cursor.execute("""
-                        UPDATE temel_plan_alan 
-                        SET cop_url = ? 
-                        WHERE alan_adi = ?
-                    """, (cop_url, alan_adi))
-                    if cursor.rowcount > 0:
-                        updated_count += 1
-                        print(f"ÇÖP güncellendi: {alan_adi} -> {cop_url}")
-                        
-            except Exception as e:
-                print(f"ÇÖP güncelleme hatası: {alan_adi} - {str(e)}")
-    
-    return updated_count
-
-def save_bom_data_to_db(cursor, bom_data):
-    """BOM verilerini veritabanına kaydeder."""
-    updated_count = 0
-    
-    if not bom_data or 'dersler' not in bom_data:
-        return updated_count
-    
-    for ders_info in bom_data['dersler']:
-        try:
-            ders_adi = ders_info.get('ders_adi', '')
-            moduller = ders_info.get('moduller', [])
-            
-            # BOM URL'lerini birleştir (virgülle ayrılmış)
-            bom_urls = [modul.get('link', '') for modul in moduller if modul.get('link')]
-            bom_url_string = ', '.join(bom_urls) if bom_urls else ''
-            
-            if bom_url_string:
-                cursor.execute("""
-                    UPDATE temel_plan_ders 
-                    SET bom_url = ? 
-                    WHERE ders_adi = ?
-                """, (bom_url_string, ders_adi))
-                if cursor.rowcount > 0:
-                    updated_count += 1
-                    
-        except Exception as e:
-            print(f"BOM güncelleme hatası: {ders_adi} - {str(e)}")
-    
-    return updated_count
-
-def get_or_create_ders(cursor, ders_adi, sinif, amac='', cop_url=''):
-    """
-    Ders kaydını bulur veya oluşturur.
-    Merkezi utils.create_or_get_ders() fonksiyonunu kullanır.
-    """
-    from modules.utils_database import create_or_get_ders
-    
-    return create_or_get_ders(
-        cursor=cursor,
-        ders_adi=ders_adi,
-        sinif=sinif,
-        ders_saati=0,
-        amac=amac,
-        dm_url='',
-        dbf_url='',
-        bom_url='',
-        cop_url=cop_url
-    )
-
-def save_cop_parsed_data_to_db(cursor, parsed_data, alan_adi, sinif, cop_url):
-    """
-    oku.py ile işlenmiş ÇÖP PDF verilerini temel_plan_* tablolarına kaydeder.
-    Ders deduplication mantığı ile güncellenmiştir.
-    """
-    saved_count = 0
-    
-    if not parsed_data or not isinstance(parsed_data, dict):
-        return saved_count
-    
-    try:
-        # alan_bilgileri bölümünü kontrol et
-        alan_bilgileri = parsed_data.get('alan_bilgileri', {})
-        if not alan_bilgileri:
-            print(f"alan_bilgileri bulunamadı: {alan_adi}")
-            return saved_count
-        
-        # Alan adını oku.py çıktısından al (daha doğru olabilir)
-        parsed_alan_adi = alan_bilgileri.get('alan_adi', alan_adi)
-        
-        # Alan kaydı/bulma
-        alan_id = get_or_create_alan(cursor, parsed_alan_adi, None, cop_url, None)
-        
-        # dal_ders_listesi'ni işle
-        dal_ders_listesi = alan_bilgileri.get('dal_ders_listesi', [])
-        
-        for dal_data in dal_ders_listesi:
-            if not isinstance(dal_data, dict):
-                continue
-                
-            dal_adi = dal_data.get('dal_adi', '').strip().rstrip(',')  # Sonundaki virgülü temizle
-            if not dal_adi:
-                continue
-                
-            # Dal kaydı/bulma
-            dal_id = get_or_create_dal(cursor, dal_adi, alan_id)
-            
-            # Dersler listesini işle
-            dersler = dal_data.get('dersler', [])
-            for ders_adi in dersler:
-                if isinstance(ders_adi, str) and ders_adi.strip():
-                    ders_adi_clean = ders_adi.strip()
-                    
-                    # Dersi bul veya oluştur (deduplication)
-                    ders_id = get_or_create_ders(cursor, ders_adi_clean, sinif, '', cop_url)
-                    
-                    # Ders-Dal ilişkisini kur
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO temel_plan_ders_dal (ders_id, dal_id) 
-                        VALUES (?, ?)
-                    """, (ders_id, dal_id))
-                    
-                    saved_count += 1
-                    print(f"Ders kaydedildi/ilişkilendirildi: {ders_adi_clean} -> {dal_adi}")
-        
-        # Eğer dal yoksa ve doğrudan dersler varsa (nadiren olabilir)
-        if not dal_ders_listesi and 'dersler' in alan_bilgileri:
-            dersler = alan_bilgileri.get('dersler', [])
-            for ders_adi in dersler:
-                if isinstance(ders_adi, str) and ders_adi.strip():
-                    ders_adi_clean = ders_adi.strip()
-                    
-                    # Dersi bul veya oluştur (dal olmadan)
-                    ders_id = get_or_create_ders(cursor, ders_adi_clean, sinif, '', cop_url)
-                    saved_count += 1
-                    print(f"Ders kaydedildi (dal yok): {ders_adi_clean}")
-    
-    except Exception as e:
-        print(f"ÇÖP veri kayıt hatası: {alan_adi} - {str(e)}")
-    
-    return saved_count
-
-def find_matching_ders(cursor, dbf_ders_adi, sinif=None):
-    """
-    DBF'teki ders adını veritabanındaki derslerle eşleştirir.
-    """
-    if not dbf_ders_adi:
-        return []
-    
-    normalized_dbf = normalize_to_title_case_tr(dbf_ders_adi)
-    
-    # Önce tam eşleşme ara
-    if sinif:
-        cursor.execute("""
-            SELECT id, ders_adi FROM temel_plan_ders 
-            WHERE UPPER(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(ders_adi, 'ç', 'c'), 'ğ', 'g'), 'ı', 'i'), 'ö', 'o'), 'ş', 's'), 'ü', 'u')) = ? 
-            AND sinif = ?
-        """, (normalized_dbf, sinif))
-    else:
-        cursor.execute("""
-            SELECT id, ders_adi FROM temel_plan_ders 
-            WHERE UPPER(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(ders_adi, 'ç', 'c'), 'ğ', 'g'), 'ı', 'i'), 'ö', 'o'), 'ş', 's'), 'ü', 'u')) = ?
-        """, (normalized_dbf,))
-    
-    exact_matches = cursor.fetchall()
-    if exact_matches:
-        return exact_matches
-    
-    # Kısmi eşleşme ara (en az 3 kelime ortak)
-    dbf_words = set(normalized_dbf.split())
-    if len(dbf_words) < 2:
-        return []
-    
-    if sinif:
-        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders WHERE sinif = ?", (sinif,))
-    else:
-        cursor.execute("SELECT id, ders_adi FROM temel_plan_ders")
-    
-    all_courses = cursor.fetchall()
-    partial_matches = []
-    
-    for course_id, course_name in all_courses:
-        normalized_course = normalize_to_title_case_tr(course_name)
-        course_words = set(normalized_course.split())
-        
-        # Ortak kelime sayısı
-        common_words = dbf_words.intersection(course_words)
-        if len(common_words) >= min(2, len(dbf_words) * 0.6):  # En az %60 ortak
-            partial_matches.append((course_id, course_name))
-    
-    return partial_matches
-
 def update_ders_saati_from_dbf_data(cursor, parsed_data):
     """
     DBF verilerinden ders saatlerini çıkarıp veritabanını günceller.
@@ -1470,12 +1299,12 @@ def update_ders_saati_from_dbf_data(cursor, parsed_data):
         haftalik_ders_saati = parsed_data.get('haftalik_ders_saati', 0)
         sinif = parsed_data.get('sinif', None)
         
+        # Eşleşen dersleri bul (ders saati ve öğrenme birimleri için bir kez)
+        matching_courses = find_matching_ders(cursor, ders_adi, sinif) if ders_adi else []
+        
         if ders_adi and haftalik_ders_saati and str(haftalik_ders_saati).isdigit():
             ders_saati = int(haftalik_ders_saati)
             
-            # Eşleşen dersleri bul
-            matching_courses = find_matching_ders(cursor, ders_adi, sinif)
-            
             for course_id, course_name in matching_courses:
                 # Mevcut ders saati 0 ise güncelle
                 cursor.execute("SELECT ders_saati FROM temel_plan_ders WHERE id = ?", (course_id,))
@@ -1493,9 +1322,6 @@ def update_ders_saati_from_dbf_data(cursor, parsed_data):
         # Öğrenme birimleri ders saatlerini de işle
         ogrenme_birimleri = parsed_data.get('ogrenme_birimleri', [])
         if ogrenme_birimleri and ders_adi:
-            # İlgili dersi bul
-            matching_courses = find_matching_ders(cursor, ders_adi, sinif)
-            
             for course_id, course_name in matching_courses:
                 # Bu derse ait öğrenme birimlerini güncelle
                 for birim in ogrenme_birimleri:
@@ -1516,30 +1342,51 @@ def update_ders_saati_from_dbf_data(cursor, parsed_data):
     
     return updated_count
 
+def _converted_pdf_response(pdf_path, project_root, cached, message="PDF conversion successful"):
+    # PDF path'ini relative path'e çevir (project_root'tan sonrası) ve file server URL'i oluştur
+    relative_pdf_path = os.path.relpath(pdf_path, project_root)
+    encoded_path = urllib.parse.quote(relative_pdf_path)
+    return {
+        "success": True,
+        "pdf_url": f"http://localhost:5001/api/files/{encoded_path}",
+        "pdf_path": relative_pdf_path,
+        "cached": cached,
+        "message": message
+    }
+
 @app.route('/api/convert-docx-to-pdf', methods=['POST'])
 @with_database_json
 def convert_docx_to_pdf_endpoint(cursor):
     """
-    DOC/DOCX dosyasını PDF'e çevirir ve PDF URL'ini döndürür
-    
-    CLAUDE.md Prensibi: Database decorators + Modular imports
+    DOC/DOCX dosyasının PDF'ini döndürür. PDF önbellekte yoksa dönüşüm servisine
+    kuyruklanır ve beklemeden görev kimliği döner; durum /api/conversions/<task_id>
+    ile sorgulanır.
     
     POST body:
     {
         "file_path": "data/dbf/01_Adalet/document.docx"
     }
     
-    Response:
+    Response (önbellekte):
     {
         "success": true,
-        "pdf_url": "http://localhost:5001/api/files/data/dbf/01_Adalet/document_converted.pdf",
-        "pdf_path": "data/dbf/01_Adalet/document_converted.pdf",
+        "pdf_url": "http://localhost:5001/api/files/data/converted/3f/3f9c...e1.pdf",
+        "pdf_path": "data/converted/3f/3f9c...e1.pdf",
         "cached": true
     }
+    
+    Response (kuyrukta):
+    {
+        "success": true,
+        "pending": true,
+        "task_id": "...",
+        "status_url": "/api/conversions/..."
+    }
     """
     try:
-        from modules.utils_docx_to_pdf import convert_docx_to_pdf, is_conversion_supported
-        import urllib.parse
+        from modules.utils_docx_to_pdf import get_converter, is_conversion_supported
+        from modules.utils_conversion_service import get_conversion_service
+        from modules.utils_archive import member_extract_path
         
         data = request.get_json()
         if not data or 'file_path' not in data:
@@ -1562,28 +1409,22 @@ def convert_docx_to_pdf_endpoint(cursor):
         project_root = get_project_root()
         full_doc_path = os.path.join(project_root, doc_path)
         
-        # Conversion işlemi
-        success, pdf_path, error = convert_docx_to_pdf(full_doc_path)
-        
-        if not success:
-            return {
-                "success": False,
-                "error": error
-            }
-        
-        # PDF path'ini relative path'e çevir (project_root'tan sonrası)
-        relative_pdf_path = os.path.relpath(pdf_path, project_root)
-        
-        # File server URL'ini oluştur
-        encoded_path = urllib.parse.quote(relative_pdf_path)
-        pdf_url = f"http://localhost:5001/api/files/{encoded_path}"
+        # İçerik hash'i ile önbellek kontrolü (arşiv üyeleri açılacakları yolda aranır)
+        member = split_member_ref(full_doc_path)
+        local_path = member_extract_path(*member) if member else full_doc_path
+        if local_path and os.path.exists(local_path):
+            cached_pdf_path = get_converter().find_cached_pdf(local_path)
+            if cached_pdf_path:
+                return _converted_pdf_response(cached_pdf_path, project_root, True)
         
+        # Dönüşüm kuyruğa alınır; aynı dosya zaten dönüştürülüyorsa o görev döner
+        task = get_conversion_service().submit(full_doc_path)
         return {
             "success": True,
-            "pdf_url": pdf_url,
-            "pdf_path": relative_pdf_path,
-            "cached": os.path.exists(pdf_path),
-            "message": "PDF conversion successful"
+            "pending": True,
+            "task_id": task.id,
+            "status": task.status,
+            "status_url": f"/api/conversions/{task.id}"
         }
         
     except Exception as e:
@@ -1593,58 +1434,100 @@ def convert_docx_to_pdf_endpoint(cursor):
             "error": str(e)
         }
 
+@app.route('/api/conversions/<task_id>')
+def api_conversion_status(task_id):
+    """
+    Kuyruğa alınmış DOCX → PDF dönüşümünün durumunu döndürür. Bittiğinde
+    /api/convert-docx-to-pdf ile aynı PDF bilgilerini içerir.
+    """
+    from modules.utils_conversion_service import get_conversion_service
+    from modules.utils_env import get_project_root
+    
+    task = get_conversion_service().get_task(task_id)
+    if task is None:
+        return jsonify({"success": False, "error": "Dönüşüm görevi bulunamadı"}), 404
+    if task.status == 'done':
+        response = _converted_pdf_response(task.pdf_path, get_project_root(), False,
+                                           task.message or "PDF conversion successful")
+        response.update({"task_id": task.id, "status": task.status})
+        return jsonify(response)
+    if task.status in ('failed', 'cancelled'):
+        return jsonify({"success": False, "task_id": task.id, "status": task.status,
+                        "error": task.error or "Dönüşüm iptal edildi"})
+    return jsonify({"success": True, "pending": True, "task_id": task.id, "status": task.status})
+
+@app.route('/api/convert-dbf-tree')
+def api_convert_dbf_tree():
+    """
+    data/dbf altındaki tüm DOC/DOCX dosyalarını arka planda PDF'e ön dönüştürür
+    (düşük öncelik; kullanıcı istekleri kuyrukta öne geçer). İlerleme SSE ile iletilir.
+    """
+    return job_event_response('convert-dbf')
+
 @app.route('/api/files/<path:file_path>')
 def serve_file(file_path):
     """
     Dosya serving endpoint - DBF, PDF ve diğer dosyaları serve eder
     URL format: /api/files/data/dbf/01_Adalet/adalet/11.SINIF/file.pdf
+    
+    ETag/Last-Modified ile 304 ve Range (206) desteklenir; tekrar açılan PDF'ler
+    tarayıcı önbelleğinden gelir (utils_file_serving).
     """
+    # URL decode et (Türkçe karakterler için)
+    file_path = urllib.parse.unquote(file_path)
+    
     try:
-        from modules.utils_env import get_project_root
-        import urllib.parse
-        
-        # URL decode et (Türkçe karakterler için)
-        file_path = urllib.parse.unquote(file_path)
-        
-        # PROJECT_ROOT'u al
-        project_root = get_project_root()
-        
-        # Güvenlik: path traversal saldırılarını engelle
-        if '..' in file_path or file_path.startswith('/'):
-            abort(403)
-        
-        # Tam dosya yolu
-        full_path = os.path.join(project_root, file_path)
-        
-        # Dosya var mı kontrol et
-        if not os.path.exists(full_path) or not os.path.isfile(full_path):
-            abort(404)
-            
-        # Güvenlik: sadece proje klasörü altındaki dosyalara izin ver
-        real_path = os.path.realpath(full_path)
-        real_project_root = os.path.realpath(project_root)
-        if not real_path.startswith(real_project_root):
-            abort(403)
-            
-        return send_file(full_path)
-        
+        real_path = get_file_resolver().resolve(file_path)
+    except PermissionError:
+        abort(403)
     except Exception as e:
         print(f"File serving error: {e}")
         abort(500)
+    
+    if real_path is None:
+        abort(404)
+    return send_project_file(real_path, file_path)
 
 @app.route('/api/import-dbf-learning-units', methods=['POST'])
+@invalidates_tables(*LEARNING_UNIT_TABLES)
 @with_database_json
-def import_dbf_learning_units(cursor):
+def import_dbf_learning_units_endpoint(cursor):
     """
     DBF dosyasından öğrenme birimi başlıklarını import eder
     
-    Request body: { "ders_id": 123, "dbf_file_path": "data/dbf/..." }
+    Request body:
+        { "ders_id": 123, "dbf_file_path": "data/dbf/..." }                  → tek ders
+        { "courses": [{"ders_id": 123, "dbf_file_path": "..."}, ...] }        → çoklu ders
+        { "all": true }                                                      → DBF eşleşmiş tüm dersler
+        Opsiyonel: "skip_existing": bool, "replace": bool
+        Çoklu/tüm derslerde skip_existing varsayılanı True'dur (replace verilmediyse):
+        aksi halde öğrenme birimi olan derslere ikinci bir set eklenirdi.
     """
     try:
         data = request.get_json()
         if not data:
             return {"success": False, "error": "JSON data gerekli"}
         
+        replace = bool(data.get('replace', False))
+        batch = bool(data.get('all')) or data.get('courses') is not None
+        skip_existing = bool(data.get('skip_existing', batch and not replace))
+        
+        if batch:
+            if data.get('all'):
+                courses = get_courses_with_dbf_files(cursor)
+            else:
+                courses = [(c.get('ders_id'), c.get('dbf_file_path')) for c in data['courses']]
+                if not all(ders_id and path for ders_id, path in courses):
+                    return {"success": False, "error": "Her ders için ders_id ve dbf_file_path gerekli"}
+            
+            results = import_dbf_learning_units(cursor, courses, skip_existing=skip_existing, replace=replace)
+            imported_count = sum(1 for r in results if r['status'] == 'imported')
+            return {
+                "success": True,
+                "message": f"{imported_count}/{len(results)} ders için öğrenme birimleri import edildi",
+                "results": results
+            }
+        
         ders_id = data.get('ders_id')
         dbf_file_path = data.get('dbf_file_path')
         
@@ -1655,99 +1538,18 @@ def import_dbf_learning_units(cursor):
         if not os.path.exists(dbf_file_path):
             return {"success": False, "error": f"DBF dosyası bulunamadı: {dbf_file_path}"}
         
-        # PDF/DOCX dosyasından text çıkar
-        full_text = read_full_text_from_file(dbf_file_path)
-        if not full_text.strip():
-            return {"success": False, "error": "Dosyadan metin çıkarılamadı"}
-        
-        # Kazanım tablosunu parse et
-        kazanim_tablosu_str, kazanim_tablosu_data = ex_kazanim_tablosu(full_text)
-        
-        if not kazanim_tablosu_data:
-            return {"success": False, "error": "Kazanım tablosu bulunamadı"}
-        
-        # Öğrenme birimlerini veritabanına ekle
-        imported_units = []
-        for i, unit_data in enumerate(kazanim_tablosu_data):
-            unit_title = unit_data.get('title', f'Öğrenme Birimi {i+1}')
-            duration = unit_data.get('duration', 0)
-            konu_sayisi = unit_data.get('count', 0)
-            
-            # String duration'ı integer'a çevir
-            try:
-                if isinstance(duration, str):
-                    # "18/36" gibi kesir formatını kontrol et
-                    if '/' in duration:
-                        duration = int(duration.split('/')[0])
-                    else:
-                        duration = int(duration)
-                elif not isinstance(duration, int):
-                    duration = 0
-            except:
-                duration = 0
-            
-            # Konu sayısını integer'a çevir
-            try:
-                konu_sayisi = int(konu_sayisi) if konu_sayisi else 0
-            except:
-                konu_sayisi = 0
-            
-            # Öğrenme birimini veritabanına ekle
-            cursor.execute("""
-                INSERT INTO temel_plan_ogrenme_birimi 
-                (ders_id, birim_adi, sure, sira) 
-                VALUES (?, ?, ?, ?)
-            """, (ders_id, unit_title, duration, i + 1))
-            
-            unit_id = cursor.lastrowid
-            
-            # Otomatik konular ve kazanımlar oluştur
-            konular = []
-            for j in range(konu_sayisi):
-                konu_adi = f"Konu {j + 1}"
-                
-                # Konu ekle
-                cursor.execute("""
-                    INSERT INTO temel_plan_konu 
-                    (ogrenme_birimi_id, konu_adi, sira) 
-                    VALUES (?, ?, ?)
-                """, (unit_id, konu_adi, j + 1))
-                
-                konu_id = cursor.lastrowid
-                
-                # Her konu için 1 kazanım ekle
-                kazanim_adi = f"Kazanım {j + 1}"
-                cursor.execute("""
-                    INSERT INTO temel_plan_kazanim 
-                    (konu_id, kazanim_adi, sira) 
-                    VALUES (?, ?, ?)
-                """, (konu_id, kazanim_adi, 1))
-                
-                kazanim_id = cursor.lastrowid
-                
-                konular.append({
-                    'id': konu_id,
-                    'konu_adi': konu_adi,
-                    'sira': j + 1,
-                    'kazanimlar': [{
-                        'id': kazanim_id,
-                        'kazanim_adi': kazanim_adi,
-                        'sira': 1
-                    }]
-                })
-            
-            imported_units.append({
-                'id': unit_id,
-                'birim_adi': unit_title,
-                'sure': duration,
-                'sira': i + 1,
-                'konular': konular
-            })
+        result = import_dbf_learning_units(
+            cursor, [(ders_id, dbf_file_path)], skip_existing=skip_existing, replace=replace
+        )[0]
+        if result['status'] == 'error':
+            return {"success": False, "error": result['error']}
+        if result['status'] == 'skipped':
+            return {"success": True, "message": result['message'], "imported_units": []}
         
         return {
             "success": True, 
-            "message": f"{len(imported_units)} öğrenme birimi başarıyla import edildi",
-            "imported_units": imported_units
+            "message": result['message'],
+            "imported_units": result['imported_units']
         }
         
     except Exception as e:
@@ -1,6 +1,10 @@
 import React, { useState, useEffect } from 'react';
 import './CourseEditor.css'; // Same CSS file for consistent styling
 
+// Kuyruktaki dönüşüm en fazla bu süre sorgulanır
+const CONVERSION_POLL_INTERVAL_MS = 1000;
+const CONVERSION_MAX_WAIT_MS = 120000;
+
 // DOCX to PDF Converter Component - CLAUDE.md prensibi: cache-aware conversion
 const DocxToPdfViewer = ({ url, title, onLoad, onError }) => {
   const [conversionState, setConversionState] = useState('idle'); // idle, converting, success, error, fallback
@@ -8,7 +12,8 @@ const DocxToPdfViewer = ({ url, title, onLoad, onError }) => {
   const [errorMessage, setErrorMessage] = useState('');
   const [cacheStatus, setCacheStatus] = useState(false);
 
-  const convertToPdf = async () => {
+  // request.cancelled: görüntüleyici kapandı veya belge değişti (effect cleanup)
+  const convertToPdf = async (request) => {
     try {
       setConversionState('converting');
       
@@ -28,7 +33,22 @@ const DocxToPdfViewer = ({ url, title, onLoad, onError }) => {
         })
       });
       
-      const result = await response.json();
+      let result = await response.json();
+      
+      // PDF önbellekte yoksa dönüşüm kuyruğa alınır; görev bitene kadar (en fazla
+      // CONVERSION_MAX_WAIT_MS) durum sorgulanır
+      const deadline = Date.now() + CONVERSION_MAX_WAIT_MS;
+      while (result.success && result.pending && !request.cancelled) {
+        if (Date.now() >= deadline) {
+          result = { success: false, error: 'Dönüşüm zaman aşımına uğradı' };
+          break;
+        }
+        await new Promise(resolve => setTimeout(resolve, CONVERSION_POLL_INTERVAL_MS));
+        if (request.cancelled) break;
+        const statusResponse = await fetch(`http://localhost:5001/api/conversions/${result.task_id}`);
+        result = await statusResponse.json();
+      }
+      if (request.cancelled) return;
       
       if (result.success) {
         setPdfUrl(result.pdf_url);
@@ -51,6 +71,7 @@ const DocxToPdfViewer = ({ url, title, onLoad, onError }) => {
       }
       
     } catch (error) {
+      if (request.cancelled) return;
       console.error('❌ DOCX to PDF request failed:', error);
       setErrorMessage(error.message);
       setConversionState('fallback'); // Fallback to download interface
@@ -58,9 +79,12 @@ const DocxToPdfViewer = ({ url, title, onLoad, onError }) => {
   };
 
   useEffect(() => {
-    if (url && conversionState === 'idle') {
-      convertToPdf();
-    }
+    if (!url) return undefined;
+    const request = { cancelled: false };
+    convertToPdf(request);
+    return () => {
+      request.cancelled = true;
+    };
   }, [url]);
 
   // Render based on conversion state
@@ -0,0 +1,80 @@
+import os
+import shutil
+import zipfile
+
+import fitz
+
+from modules.utils_archive import (extract_archives_concurrently, iter_archive_member_streams,
+                                   member_ref, materialize_archive_member)
+from modules.utils_dbf1 import read_full_text_from_file
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+
+
+def _make_archive(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+def test_only_documents_are_extracted_and_unchanged_archives_skipped(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'data' / 'dbf' / '08_Bilisim')
+    shutil.copy(SCHEMA_PATH, tmp_path / 'data' / 'schema.sql')
+    monkeypatch.chdir(tmp_path)
+
+    alan_dir = os.path.join('data', 'dbf', '08_Bilisim')
+    # .rar uzantılı ama aslında ZIP olan arşivler de açılabilmeli
+    archive_path = os.path.join(alan_dir, '9.SINIF.rar')
+    _make_archive(archive_path, {
+        'DBF/Ağ Temelleri.pdf': b'%PDF-1.4 ag',
+        'DBF/Programlama.docx': b'PK docx',
+        'DBF/Thumbs.db': b'x',
+        '__MACOSX/DBF/._Ağ Temelleri.pdf': b'x',
+        '../../kacak.pdf': b'%PDF-1.4 dis',
+    })
+
+    assert [name for name, _ in iter_archive_member_streams(archive_path)] == [
+        'DBF/Ağ Temelleri.pdf', 'DBF/Programlama.docx', '../../kacak.pdf']
+
+    jobs = [{"path": archive_path, "extract_to": alan_dir}]
+    first = [event["result"] for event in extract_archives_concurrently(jobs)]
+    assert first == [{"archive": archive_path, "skipped": False, "files": 3}]
+    assert sorted(os.listdir(os.path.join(alan_dir, 'DBF'))) == ['Ağ Temelleri.pdf', 'Programlama.docx']
+    assert os.path.exists(os.path.join(alan_dir, 'kacak.pdf'))
+    assert not os.path.exists('kacak.pdf')
+
+    second = [event["result"] for event in extract_archives_concurrently(jobs)]
+    assert second[0]["skipped"] is True
+
+
+def test_member_text_is_read_without_extracting(tmp_path):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), 'DERSIN ADI: Ag Temelleri')
+    pdf_bytes = doc.tobytes()
+    doc.close()
+
+    archive_path = str(tmp_path / '10.SINIF.zip')
+    _make_archive(archive_path, {'DBF/ag.pdf': pdf_bytes})
+    ref = member_ref(archive_path, 'DBF/ag.pdf')
+
+    assert 'Ag Temelleri' in read_full_text_from_file(ref)
+    assert os.listdir(tmp_path) == ['10.SINIF.zip']
+
+    # Sunulması gerektiğinde arşivin yanına açılır
+    served = materialize_archive_member(ref)
+    assert served == os.path.join(str(tmp_path), 'DBF', 'ag.pdf')
+    with open(served, 'rb') as f:
+        assert f.read() == pdf_bytes
+
+
+def test_failed_record_lookup_extracts_instead_of_raising(tmp_path, monkeypatch):
+    from modules import utils_archive
+
+    archive_path = str(tmp_path / '9.SINIF.zip')
+    _make_archive(archive_path, {'DBF/ag.pdf': b'%PDF-1.4 ag'})
+    monkeypatch.setattr(utils_archive, '_get_extraction_record',
+                        lambda path: {"error": "database is locked", "success": False})
+    monkeypatch.setattr(utils_archive, '_save_extraction_record', lambda *args: None)
+
+    result = utils_archive.extract_archive_if_changed(archive_path, str(tmp_path))
+    assert result == {"archive": archive_path, "skipped": False, "files": 1}
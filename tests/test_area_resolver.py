@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+
+from modules.utils_area import AreaResolver, get_area_resolver, invalidate_area_resolver
+from modules.utils_database import get_or_create_alan, merge_duplicate_areas, with_database
+
+ALAN_TABLE = """
+CREATE TABLE temel_plan_alan (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    alan_adi TEXT NOT NULL,
+    meb_alan_id TEXT,
+    cop_url TEXT,
+    dbf_urls TEXT
+);
+"""
+
+
+def test_area_names_resolve_from_memory_with_protocol_priority():
+    resolver = AreaResolver([
+        (1, 'Bilişim Teknolojileri', '04'),
+        (2, 'Bilişim Teknolojileri - Protokol', '04'),
+        (3, 'Denizcilik', '08'),
+    ])
+
+    assert resolver.lookup('BİLİŞİM TEKNOLOJİLERİ').id == 1
+    assert resolver.match('Bilisim Teknolojileri Protokol').id == 2
+    assert resolver.match('Bilişim').id == 1
+    assert resolver.match('Tarım') is None
+    assert resolver.area_for_meb_id('04', protokol=True).id == 2
+
+    # MEB listesindeki farklı yazım aynı MEB ID'li alanın takma adı olur
+    resolver.set_meb_listing({'Bilgi Teknolojileri': '04', 'Denizcilik': '08', 'Gemi Yapımı': '09'})
+    assert resolver.lookup('Bilgi Teknolojileri').id == 1
+    assert resolver.meb_id_from_listing('Gemi Yapımı - Protokol') == ('09', 'cache_protokol')
+    assert resolver.meb_id_from_listing('Tarım') == (None, 'none')
+
+
+def test_get_or_create_alan_uses_and_updates_resolver():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.executescript(ALAN_TABLE)
+    cursor.execute("INSERT INTO temel_plan_alan (alan_adi, meb_alan_id) VALUES ('Denizcilik', '08')")
+    invalidate_area_resolver()
+    try:
+        assert get_or_create_alan(cursor, 'DENİZCİLİK') == 1
+        new_id = get_or_create_alan(cursor, 'Gemi Yapımı', meb_alan_id='09')
+
+        # Tablo silinse bile veritabanından yüklenmiş alanlar SQLite'a gitmeden çözülür
+        cursor.execute("DROP TABLE temel_plan_alan")
+        assert get_or_create_alan(cursor, 'Denizcilik', meb_alan_id='08') == 1
+        assert get_area_resolver(cursor).lookup('gemi yapimi').meb_alan_id == '09'
+    finally:
+        invalidate_area_resolver()
+
+
+def test_rolled_back_area_is_not_served_from_resolver(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    with sqlite3.connect('data/temel_plan.db') as conn:
+        conn.executescript(ALAN_TABLE)
+    invalidate_area_resolver()
+
+    @with_database
+    def create_then_fail(cursor):
+        get_or_create_alan(cursor, 'Gemi Yapımı', meb_alan_id='09')
+        raise RuntimeError('yazma hatası')
+
+    try:
+        assert create_then_fail()['success'] is False
+        assert get_area_resolver().lookup('Gemi Yapımı') is None
+
+        # Aynı bağlantıda elle geri alınan kayıt da çözümleyiciden döndürülmez
+        conn = sqlite3.connect('data/temel_plan.db')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        rolled_back_id = get_or_create_alan(cursor, 'Denizcilik', meb_alan_id='08')
+        conn.rollback()
+        cursor.execute("INSERT INTO temel_plan_alan (alan_adi) VALUES ('Tarım')")
+        conn.commit()
+        area_id = get_or_create_alan(cursor, 'Denizcilik', meb_alan_id='08')
+        conn.commit()
+        cursor.execute("SELECT alan_adi FROM temel_plan_alan WHERE id = ?", (area_id,))
+        assert cursor.fetchone()['alan_adi'] == 'Denizcilik'
+        assert area_id != rolled_back_id
+        conn.close()
+    finally:
+        invalidate_area_resolver()
+
+
+def test_concurrent_writers_do_not_duplicate_areas(tmp_path):
+    db_path = str(tmp_path / 'temel_plan.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(ALAN_TABLE + "CREATE UNIQUE INDEX idx_alan_adi ON temel_plan_alan(alan_adi);")
+    invalidate_area_resolver()
+    writer = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+    other = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+    try:
+        # İlk aşama alanı ekledi ama henüz commit etmedi; çözümleyicide kaydı görünür
+        area_id = get_or_create_alan(writer.cursor(), 'Denizcilik', meb_alan_id='08')
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(
+            id=get_or_create_alan(other.cursor(), 'Denizcilik', meb_alan_id='08')))
+        thread.start()
+        thread.join(0.3)
+        writer.commit()
+        thread.join()
+        other.commit()
+
+        assert result['id'] == area_id
+        assert other.execute("SELECT COUNT(*) FROM temel_plan_alan").fetchone()[0] == 1
+    finally:
+        writer.close()
+        other.close()
+        invalidate_area_resolver()
+
+
+def test_duplicate_areas_are_merged_before_unique_index():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(ALAN_TABLE + """
+        CREATE TABLE temel_plan_dal (id INTEGER PRIMARY KEY, dal_adi TEXT, alan_id INTEGER);
+        INSERT INTO temel_plan_alan (alan_adi, meb_alan_id) VALUES ('Denizcilik', NULL), ('Denizcilik', '08');
+        INSERT INTO temel_plan_dal (dal_adi, alan_id) VALUES ('Gemi Makineleri', 2);
+    """)
+
+    assert merge_duplicate_areas(conn.cursor()) == 1
+    assert conn.execute("SELECT id, meb_alan_id FROM temel_plan_alan").fetchall() == [(1, '08')]
+    assert conn.execute("SELECT alan_id FROM temel_plan_dal").fetchall() == [(1,)]
+    conn.execute("CREATE UNIQUE INDEX idx_alan_adi ON temel_plan_alan(alan_adi)")
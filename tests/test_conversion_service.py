@@ -0,0 +1,39 @@
+import threading
+
+from modules.utils_conversion_service import ConversionService, BATCH_PRIORITY
+
+
+def test_same_document_is_converted_once_and_interactive_requests_jump_the_queue(tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+    converted = []
+
+    def convert(doc_path, profile_dir):
+        converted.append(doc_path)
+        if doc_path == 'a.docx':
+            started.set()
+            release.wait(5)
+        return True, doc_path.replace('.docx', '_converted.pdf'), ''
+
+    service = ConversionService(workers=1, profile_root=str(tmp_path), convert=convert)
+    first = service.submit('a.docx')
+    assert started.wait(5)
+
+    # İşçi meşgulken kuyruğa toplu işler girer; aynı dosya için yeni görev açılmaz
+    batch_b = service.submit('b.docx', BATCH_PRIORITY)
+    batch_c = service.submit('c.docx', BATCH_PRIORITY)
+    assert service.submit('a.docx') is first
+    assert service.submit('c.docx') is batch_c  # kullanıcı isteği c'yi öne alır
+
+    # Toplu işin iptali kullanıcının beklediği (önceliği yükseltilmiş) dönüşümü düşürmez
+    batch_d = service.submit('d.docx', BATCH_PRIORITY)
+    assert service.cancel(batch_c, min_priority=BATCH_PRIORITY) is False
+    assert service.cancel(batch_d, min_priority=BATCH_PRIORITY) is True
+
+    release.set()
+    for task in (first, batch_b, batch_c):
+        assert task.wait(5)
+
+    assert converted == ['a.docx', 'c.docx', 'b.docx']
+    assert batch_c.to_dict()['pdf_path'] == 'c_converted.pdf'
+    assert service.get_stats()['deduplicated'] == 2
@@ -0,0 +1,77 @@
+import os
+import shutil
+import sqlite3
+
+from modules import oku_dbf
+from modules.oku_dbf import import_dbf_learning_units
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+
+
+def test_bulk_import_reports_per_course(monkeypatch):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('PRAGMA foreign_keys = ON')
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES (?, 9)", [('A',), ('B',), ('C',)])
+    cursor = conn.cursor()
+
+    parsed = {
+        'a.pdf': {'success': True, 'units': [
+            {'birim_adi': 'Birim 1', 'sure': 18, 'sira': 1, 'konular': [
+                {'konu_adi': 'Konu 1', 'sira': 1, 'kazanimlar': [{'kazanim_adi': 'Kazanım 1', 'sira': 1}]},
+                {'konu_adi': 'Konu 2', 'sira': 2, 'kazanimlar': [{'kazanim_adi': 'Kazanım 2', 'sira': 1}]},
+            ]},
+        ]},
+        'b.pdf': {'success': True, 'units': [
+            {'birim_adi': 'Birim X', 'sure': 36, 'sira': 1, 'konular': []},
+            {'birim_adi': 'Birim Y', 'sure': 10, 'sira': 2, 'konular': [
+                {'konu_adi': 'Konu 1', 'sira': 1, 'kazanimlar': [{'kazanim_adi': 'Kazanım 1', 'sira': 1}]},
+            ]},
+        ]},
+        'c.pdf': {'success': False, 'error': 'Kazanım tablosu bulunamadı'},
+    }
+    monkeypatch.setattr(oku_dbf, 'parse_dbf_learning_units', lambda path, source=None: parsed[path])
+
+    results = import_dbf_learning_units(cursor, [(1, 'a.pdf'), (2, 'b.pdf'), (3, 'c.pdf')])
+    assert [r['status'] for r in results] == ['imported', 'imported', 'error']
+
+    unit_y = results[1]['imported_units'][1]
+    cursor.execute("SELECT ders_id, birim_adi FROM temel_plan_ogrenme_birimi WHERE id = ?", (unit_y['id'],))
+    assert cursor.fetchone() == (2, 'Birim Y')
+    konu_id = unit_y['konular'][0]['id']
+    kazanim_id = unit_y['konular'][0]['kazanimlar'][0]['id']
+    cursor.execute("SELECT konu_id FROM temel_plan_kazanim WHERE id = ?", (kazanim_id,))
+    assert cursor.fetchone() == (konu_id,)
+    cursor.execute("SELECT COUNT(*) FROM temel_plan_kazanim")
+    assert cursor.fetchone()[0] == 3
+
+    results = import_dbf_learning_units(cursor, [(1, 'a.pdf'), (2, 'b.pdf')], skip_existing=True)
+    assert [r['status'] for r in results] == ['skipped', 'skipped']
+
+    results = import_dbf_learning_units(cursor, [(2, 'b.pdf')], replace=True)
+    assert results[0]['status'] == 'imported'
+    cursor.execute("SELECT COUNT(*) FROM temel_plan_ogrenme_birimi WHERE ders_id = 2")
+    assert cursor.fetchone()[0] == 2
+
+
+def test_import_all_endpoint_skips_courses_with_units_by_default(tmp_path, monkeypatch):
+    import server
+
+    os.makedirs(tmp_path / 'data')
+    shutil.copy(SCHEMA_PATH, tmp_path / 'data' / 'schema.sql')
+    monkeypatch.chdir(tmp_path)
+    with sqlite3.connect(server.find_or_create_database()) as conn:
+        conn.execute("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES ('A', 9)")
+    monkeypatch.setattr(server, 'get_courses_with_dbf_files', lambda cursor: [(1, 'a.pdf')])
+    monkeypatch.setattr(oku_dbf, 'parse_dbf_learning_units', lambda path, source=None: {
+        'success': True, 'units': [{'birim_adi': 'Birim 1', 'sure': 18, 'sira': 1, 'konular': []}]})
+    client = server.app.test_client()
+
+    statuses = [client.post('/api/import-dbf-learning-units', json={'all': True}).get_json()['results'][0]['status']
+                for _ in range(2)]
+    assert statuses == ['imported', 'skipped']
+    replaced = client.post('/api/import-dbf-learning-units', json={'all': True, 'replace': True}).get_json()
+    assert replaced['results'][0]['status'] == 'imported'
+    with sqlite3.connect(os.path.join('data', 'temel_plan.db')) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM temel_plan_ogrenme_birimi").fetchone()[0] == 1
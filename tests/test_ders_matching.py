@@ -0,0 +1,96 @@
+import os
+import sqlite3
+
+from modules.utils_database import apply_column_migrations
+from modules import utils_matching
+from modules.utils_matching import CourseMatcher, find_matching_ders, get_course_matcher, name_similarity
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+
+LEGACY_DERS_TABLE = """
+CREATE TABLE temel_plan_ders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ders_adi TEXT NOT NULL,
+    sinif INTEGER,
+    ders_saati INTEGER NOT NULL DEFAULT 0,
+    UNIQUE(ders_adi, sinif)
+);
+CREATE TABLE temel_plan_dal (id INTEGER PRIMARY KEY, dal_adi TEXT, alan_id INTEGER);
+CREATE TABLE temel_plan_ders_dal (id INTEGER PRIMARY KEY, ders_id INTEGER, dal_id INTEGER);
+"""
+
+
+def test_course_names_match_through_normalized_key_and_token_index():
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.executescript(LEGACY_DERS_TABLE)
+    cursor.executemany("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES (?, ?)", [
+        ('Ağ Temelleri', 10),
+        ('Ağ Temelleri', 11),
+        ('Bilişim Teknolojilerinin Temelleri', 9),
+        ('Web Tasarımı ve Programlama', 11),
+    ])
+    assert apply_column_migrations(cursor)['temel_plan_ders'] == ['ders_adi_norm']
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        schema = f.read()
+    trigger = schema[schema.index('CREATE TRIGGER IF NOT EXISTS reset_temel_plan_ders_adi_norm'):]
+    cursor.execute(trigger[:trigger.index('END;') + 4])
+
+    # Büyük harf / Türkçe karakter farkı tam eşleşmeye engel değil
+    assert find_matching_ders(cursor, 'AĞ TEMELLERİ', 10) == [(1, 'Ağ Temelleri')]
+    assert [row[0] for row in find_matching_ders(cursor, 'ag temelleri')] == [1, 2]
+    cursor.execute("SELECT ders_adi_norm FROM temel_plan_ders WHERE id = 3")
+    assert cursor.fetchone()[0] == 'bilisim teknolojilerinin temelleri'
+
+    # Kısmi eşleşme: bağlaçlar sayılmaz, en az iki ortak kelime
+    assert find_matching_ders(cursor, 'WEB TASARIMI VE PROGRAMLAMA DERSİ', 11) == [(4, 'Web Tasarımı ve Programlama')]
+    assert find_matching_ders(cursor, 'Web', 11) == []
+
+    # Yeniden adlandırılan ders yeni adıyla bulunur
+    cursor.execute("UPDATE temel_plan_ders SET ders_adi = 'Ağ Sistemleri' WHERE id = 2")
+    assert find_matching_ders(cursor, 'Ağ Sistemleri') == [(2, 'Ağ Sistemleri')]
+
+
+def test_matcher_ranks_by_similarity_and_filters_by_alan():
+    matcher = CourseMatcher([
+        (1, 'Mesleki Gelişim Atölyesi', 9, None),
+        (2, 'Mesleki Gelişim Atölyesi', 9, None),
+        (3, 'Bilişim Teknolojilerinin Temelleri', 9, None),
+        (4, 'Elektrik Elektronik Esasları', 9, None),
+    ], [(1, 10), (2, 20), (3, 10), (4, 20)])
+
+    # Aynı adlı dersler alan filtresiyle ayrılır
+    assert matcher.best('MESLEKİ GELİŞİM ATÖLYESİ', alan_id=20).ders_id == 2
+    # Yazım hatası / eksik kelime benzerlikle bulunur
+    assert matcher.best('Bilşim Teknolojilerinin Temelleri').ders_id == 3
+    assert matcher.best('Elektrik Esasları').ders_id == 4
+    assert matcher.best('Gemi Yönetimi Uygulamaları') is None
+
+    ranked = matcher.top_k('Bilişim Temelleri', k=2)
+    assert ranked[0].ders_id == 3 and ranked[0].score >= ranked[-1].score
+    assert name_similarity('Ağ Temelleri', 'AĞ TEMELLERİ') == 1.0
+
+
+def test_matcher_is_reused_without_scanning_the_course_table(monkeypatch):
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        cursor.executescript(f.read())
+    cursor.executemany("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES (?, ?)",
+                       [('Ağ Temelleri', 10), ('Web Tasarımı ve Programlama', 11)])
+    monkeypatch.setattr(utils_matching, '_matcher', None)
+    syncs = []
+    original_sync = utils_matching.sync_ders_adi_norm
+    monkeypatch.setattr(utils_matching, 'sync_ders_adi_norm', lambda c: syncs.append(1) or original_sync(c))
+
+    matcher = get_course_matcher(cursor)
+    for _ in range(3):
+        assert find_matching_ders(cursor, 'AĞ TEMELLERİ', 10) == [(1, 'Ağ Temelleri')]
+    assert get_course_matcher(cursor) is matcher
+    assert len(syncs) == 1
+
+    # Başka bir bağlantıdan eklenen ders (tablo sürümü değişmeden) sayaçtan anlaşılır
+    cursor.execute("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES ('Ağ Sistemleri', 12)")
+    assert find_matching_ders(cursor, 'Ağ Sistemleri') == [(3, 'Ağ Sistemleri')]
+    assert get_course_matcher(cursor) is not matcher
+    assert len(syncs) == 2
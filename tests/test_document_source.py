@@ -0,0 +1,56 @@
+import zipfile
+
+import fitz
+
+from modules import utils_archive
+from modules.utils_archive import member_ref
+from modules.utils_dbf1 import read_full_text_from_file
+from modules.utils_document import open_document_source, iter_document_sources
+
+
+def _pdf_bytes(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_file_and_memory_sources_read_the_same_text(tmp_path):
+    data = _pdf_bytes('HAFTALIK DERS CIZELGESI')
+    path = tmp_path / 'cop.pdf'
+    path.write_bytes(data)
+
+    with open_document_source(str(path)) as source:
+        assert source.view().nbytes == len(data)
+        assert 'HAFTALIK' in source.open_pdfplumber().pages[0].extract_text()
+        assert 'HAFTALIK' in read_full_text_from_file(source)
+
+    # Kapanışta mmap ve açılan belgeler serbest bırakılır; dosya tekrar açılabilir
+    assert source._mmap is None and source._view is None
+
+    with open_document_source(data, 'indirilen.pdf') as source:
+        assert 'HAFTALIK' in read_full_text_from_file(source)
+
+
+def test_archive_members_are_read_in_one_pass(tmp_path, monkeypatch):
+    archive_path = str(tmp_path / '9.SINIF.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        for name in ('DBF/Ag.pdf', 'DBF/Web.pdf', 'DBF/Grafik.pdf'):
+            archive.writestr(name, _pdf_bytes(name))
+    regular = tmp_path / 'cop.pdf'
+    regular.write_bytes(_pdf_bytes('COP'))
+
+    opened = []
+    real_open_archive = utils_archive.open_archive
+    monkeypatch.setattr(utils_archive, 'open_archive', lambda path: opened.append(path) or real_open_archive(path))
+
+    paths = [str(regular)] + [member_ref(archive_path, name) for name in ('DBF/Web.pdf', 'DBF/Ag.pdf', 'DBF/Yok.pdf')]
+    texts = {}
+    for path, source in iter_document_sources(paths):
+        texts[path] = read_full_text_from_file(source) if source is not None else None
+
+    assert opened == [archive_path]
+    assert texts[str(regular)] is None
+    assert 'DBF/Ag.pdf' in texts[paths[2]] and 'DBF/Web.pdf' in texts[paths[1]]
+    assert texts[paths[3]] is None
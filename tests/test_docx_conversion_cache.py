@@ -0,0 +1,91 @@
+import os
+import shutil
+import sqlite3
+import zipfile
+
+import fitz
+
+from modules.utils_docx_to_pdf import DocxToPdfConverter, LEGACY_CONVERTED_SUFFIX
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+
+def _make_docx(path, text):
+    with zipfile.ZipFile(path, 'w') as docx:
+        docx.writestr('[Content_Types].xml',
+                      '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                      '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                      '<Default Extension="xml" ContentType="application/xml"/>'
+                      '<Override PartName="/word/document.xml" ContentType="application/'
+                      'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+        docx.writestr('_rels/.rels',
+                      f'<Relationships xmlns="{R_NS}"><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+                      'officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+        docx.writestr('word/_rels/document.xml.rels', f'<Relationships xmlns="{R_NS}"></Relationships>')
+        docx.writestr('word/document.xml',
+                      f'<w:document xmlns:w="{W_NS}"><w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>')
+
+
+def _setup_data(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'data' / 'dbf')
+    shutil.copy(SCHEMA_PATH, tmp_path / 'data' / 'schema.sql')
+    monkeypatch.chdir(tmp_path)
+
+
+def test_conversion_cache_is_keyed_by_content_and_evicts_least_recently_used(tmp_path, monkeypatch):
+    _setup_data(tmp_path, monkeypatch)
+
+    converter = DocxToPdfConverter(cache_dir=str(tmp_path / 'data' / 'converted'), cache_budget_mb=0,
+                                   evict_grace_seconds=0)
+    first_doc = os.path.join('data', 'dbf', 'ag.docx')
+    _make_docx(first_doc, 'DERSIN ADI Ag Temelleri')
+
+    success, pdf_path, _ = converter.convert_to_pdf(first_doc)
+    assert success
+    with fitz.open(pdf_path) as pdf:
+        assert 'Ag Temelleri' in pdf[0].get_text()  # metin katmanı korunur
+
+    # Arşivden yeniden açılmış gibi: içerik aynı, mtime yeni -> aynı önbellek girdisi
+    os.utime(first_doc, (2_000_000_000, 2_000_000_000))
+    assert converter.find_cached_pdf(first_doc) == pdf_path
+
+    # Bütçe 0: yeni dönüşüm en uzun süredir kullanılmayan PDF'i siler
+    second_doc = os.path.join('data', 'dbf', 'web.docx')
+    _make_docx(second_doc, 'Web Programcilik')
+    success, second_pdf, _ = converter.convert_to_pdf(second_doc)
+    assert success and os.path.exists(second_pdf)
+    assert not os.path.exists(pdf_path)
+
+    with sqlite3.connect(os.path.join('data', 'temel_plan.db')) as conn:
+        rows = conn.execute("SELECT pdf_yolu, yontem FROM pdf_donusum").fetchall()
+    assert [row[0] for row in rows] == [second_pdf]
+    assert rows[0][1] in ('libreoffice', 'pymupdf')
+
+
+def test_recently_used_pdf_is_not_evicted_and_legacy_pdf_is_adopted(tmp_path, monkeypatch):
+    _setup_data(tmp_path, monkeypatch)
+    converter = DocxToPdfConverter(cache_dir=str(tmp_path / 'data' / 'converted'), cache_budget_mb=0)
+
+    # Eski sürümün belgenin yanına yazdığı PDF yeniden dönüştürülmeden önbelleğe taşınır
+    first_doc = os.path.join('data', 'dbf', 'ag.docx')
+    _make_docx(first_doc, 'Ag Temelleri')
+    legacy_pdf = os.path.join('data', 'dbf', 'ag' + LEGACY_CONVERTED_SUFFIX)
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text((72, 72), 'ESKI DONUSUM')
+        pdf.save(legacy_pdf)
+    success, pdf_path, _ = converter.convert_to_pdf(first_doc)
+    assert success and not os.path.exists(legacy_pdf)
+    with fitz.open(pdf_path) as pdf:
+        assert 'ESKI DONUSUM' in pdf[0].get_text()
+
+    # Bütçe 0 olsa da az önce kullanılan PDF (grace süresi içinde) silinmez
+    second_doc = os.path.join('data', 'dbf', 'web.docx')
+    _make_docx(second_doc, 'Web Programcilik')
+    success, second_pdf, _ = converter.convert_to_pdf(second_doc)
+    assert success and os.path.exists(pdf_path) and os.path.exists(second_pdf)
+
+    with sqlite3.connect(os.path.join('data', 'temel_plan.db')) as conn:
+        methods = dict(conn.execute("SELECT pdf_yolu, yontem FROM pdf_donusum").fetchall())
+    assert methods[pdf_path] == 'legacy'
@@ -0,0 +1,82 @@
+import os
+import shutil
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.utils_file_management import download_and_cache_pdf
+from modules.utils_blob_store import blob_path, import_existing_files, gc_blobs
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+PDF_BODY = b'%PDF-1.4\n' + b'ortak ders ' * 5000
+
+
+class PdfHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(PDF_BODY)))
+        self.end_headers()
+        self.wfile.write(PDF_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_identical_pdfs_are_stored_once(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'data')
+    shutil.copy(SCHEMA_PATH, tmp_path / 'data' / 'schema.sql')
+    monkeypatch.chdir(tmp_path)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PdfHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        first = download_and_cache_pdf(f'{base}/a/ortak.pdf', 'cop', 'Bilişim', meb_alan_id='08')
+        # Farklı URL, aynı içerik: indirilir ama tek kopya saklanır
+        second = download_and_cache_pdf(f'{base}/b/baska_ad.pdf', 'cop', 'Elektrik', meb_alan_id='04')
+        # Aynı URL başka alanda: ağa hiç çıkmaz
+        third = download_and_cache_pdf(f'{base}/a/ortak.pdf', 'cop', 'Muhasebe', meb_alan_id='11')
+    finally:
+        server.shutdown()
+
+    assert PdfHandler.hits == ['/a/ortak.pdf', '/b/baska_ad.pdf']
+    assert os.path.samefile(first, second) and os.path.samefile(first, third)
+    with open(third, 'rb') as f:
+        assert f.read() == PDF_BODY
+    assert not os.listdir('data/blobs/tmp')
+
+    with sqlite3.connect('data/temel_plan.db') as conn:
+        rows = conn.execute("SELECT COUNT(*), COUNT(DISTINCT sha256) FROM dosya_hash").fetchone()
+        sha256, uzanti = conn.execute("SELECT sha256, uzanti FROM dosya_blob").fetchone()
+        alanlar = {row[0] for row in conn.execute("SELECT alan_klasoru FROM dosya_hash")}
+    assert rows == (3, 1)
+    assert os.path.samefile(blob_path(sha256, uzanti), first)
+    assert alanlar == {'08_Bilisim', '04_Elektrik', '11_Muhasebe'}
+
+
+def test_existing_copies_are_imported_into_blob_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for folder in ('01_A', '02_B'):
+        os.makedirs(f'data/dbf/{folder}')
+        with open(f'data/dbf/{folder}/ders.pdf', 'wb') as f:
+            f.write(PDF_BODY)
+
+    conn = sqlite3.connect(':memory:')
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    cursor = conn.cursor()
+
+    stats = import_existing_files(cursor)
+    assert stats['imported'] == 2 and stats['bytes_saved'] == len(PDF_BODY)
+    assert os.path.samefile('data/dbf/01_A/ders.pdf', 'data/dbf/02_B/ders.pdf')
+    assert import_existing_files(cursor)['already_linked'] == 2
+
+    # Görünümler silinince blob da toplanır
+    os.remove('data/dbf/01_A/ders.pdf')
+    os.remove('data/dbf/02_B/ders.pdf')
+    assert gc_blobs(cursor)['removed'] == 1
+    assert not [name for _, _, files in os.walk('data/blobs') for name in files]
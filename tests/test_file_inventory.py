@@ -0,0 +1,118 @@
+import os
+import zipfile
+
+from modules import utils_stats
+from modules.utils_archive import extract_archive_members
+from modules.utils_stats import (
+    flush_file_inventory,
+    get_file_statistics,
+    list_inventory_files,
+    record_file_in_inventory,
+    remove_file_from_inventory,
+    rescan_file_inventory,
+    scan_file_inventory,
+)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x')
+
+
+def test_single_walk_classifies_files(tmp_path):
+    root = str(tmp_path)
+    _touch(os.path.join(root, 'cop', '01_Adalet', 'adalet_9.pdf'))
+    _touch(os.path.join(root, 'dbf', '08_Bilisim', 'bilisim.rar'))
+    _touch(os.path.join(root, 'dbf', '08_Bilisim', 'DBF', 'ders.docx'))
+    _touch(os.path.join(root, 'dbf', '08_Bilisim', 'yarim.zip.part'))
+    _touch(os.path.join(root, 'temel_plan.db'))
+
+    stats = get_file_statistics(data_root=root)
+    assert stats['cop_pdf'] == 1
+    assert stats['dbf_rar'] == 1
+    assert stats['dbf_docx'] == 1
+    assert stats['dbf_total'] == 2
+    assert list_inventory_files('dbf', ('.docx',), data_root=root) == [
+        os.path.join(root, 'dbf', '08_Bilisim', 'DBF', 'ders.docx')
+    ]
+
+
+def test_unchanged_dirs_are_not_relisted(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _touch(os.path.join(root, 'dm', '01_Adalet', 'a.pdf'))
+    _touch(os.path.join(root, 'bom', '01_Adalet', 'b.pdf'))
+    scan_file_inventory(root)
+
+    listed = []
+    original = utils_stats._list_directory
+    monkeypatch.setattr(utils_stats, '_list_directory',
+                        lambda path, is_root: listed.append(path) or original(path, is_root))
+
+    new_file = os.path.join(root, 'dm', '01_Adalet', 'c.pdf')
+    _touch(new_file)
+    record_file_in_inventory(new_file, data_root=root)
+    assert get_file_statistics(data_root=root)['dm_pdf'] == 2
+
+    scan_file_inventory(root)
+    # Kök klasör envanter dosyasını barındırdığı için her taramada listelenir
+    assert [p for p in listed if p != root] == [os.path.join(root, 'dm', '01_Adalet')]
+    assert get_file_statistics(data_root=root)['dm_pdf'] == 2
+
+    # Klasör mtime'ı korunarak eklenen dosyayı sadece tam tarama görür
+    folder = os.path.join(root, 'bom', '01_Adalet')
+    folder_stat = os.stat(folder)
+    _touch(os.path.join(folder, 'gizli.pdf'))
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+    assert get_file_statistics(data_root=root, rescan=True)['bom_pdf'] == 1
+    rescan_file_inventory(root)
+    assert get_file_statistics(data_root=root)['bom_pdf'] == 2
+
+
+def test_extracted_members_and_new_folders_enter_inventory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils_stats, '_inventories', {})
+    _touch(os.path.join('data', 'dbf', '08_Bilisim', 'bilisim.zip'))
+    scan_file_inventory('data')
+
+    # Arşiv açma, yeni klasörleriyle birlikte envantere yazar
+    archive_path = os.path.join('data', 'dbf', '09_Denizcilik', '9.SINIF.zip')
+    os.makedirs(os.path.dirname(archive_path))
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr('DBF/Gemi.pdf', b'%PDF')
+        archive.writestr('DBF/Seyir.docx', b'PK')
+    extract_archive_members(archive_path, os.path.dirname(archive_path))
+
+    stats = get_file_statistics()
+    assert stats['dbf_pdf'] == 1 and stats['dbf_docx'] == 1
+    inventory = utils_stats._inventories['data']
+    assert '09_Denizcilik' in inventory['dirs']['dbf']['subdirs']
+    assert inventory['dirs']['dbf/09_Denizcilik']['subdirs'] == ['DBF']
+
+    pdf_path = os.path.join('data', 'dbf', '09_Denizcilik', 'DBF', 'Gemi.pdf')
+    os.remove(pdf_path)
+    remove_file_from_inventory(pdf_path)
+    assert get_file_statistics()['dbf_pdf'] == 0
+
+
+def test_inventory_writes_are_batched(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _touch(os.path.join(root, 'dbf', '08_Bilisim', 'ilk.pdf'))
+    scan_file_inventory(root)
+
+    saves = []
+    original = utils_stats._save_inventory
+    monkeypatch.setattr(utils_stats, '_save_inventory',
+                        lambda data_root, inventory: saves.append(data_root) or original(data_root, inventory))
+    for i in range(50):
+        path = os.path.join(root, 'dbf', '08_Bilisim', f'ders_{i}.pdf')
+        _touch(path)
+        record_file_in_inventory(path, data_root=root)
+        record_file_in_inventory(path, data_root=root)
+    assert saves == []
+    assert get_file_statistics(data_root=root)['dbf_pdf'] == 51
+
+    flush_file_inventory(root)
+    assert saves == [root]
+    monkeypatch.setattr(utils_stats, '_inventories', {})
+    assert get_file_statistics(data_root=root)['dbf_pdf'] == 51
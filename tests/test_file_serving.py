@@ -0,0 +1,77 @@
+import os
+
+import server
+from modules import utils_file_serving
+from modules.utils_file_serving import FilePathResolver
+
+
+def _project(tmp_path, monkeypatch):
+    project = tmp_path / 'project'
+    os.makedirs(project / 'data' / 'dbf' / '08_Bilisim')
+    (project / 'data' / 'dbf' / '08_Bilisim' / 'ag.pdf').write_bytes(b'%PDF-1.4 ' + b'x' * 1000)
+    sha = 'ab' * 32
+    for folder in ('converted', 'blobs'):
+        os.makedirs(project / 'data' / folder / 'ab')
+        (project / 'data' / folder / 'ab' / f'{sha}.pdf').write_bytes(b'%PDF-1.4 ' + folder.encode())
+    # Proje dışına işaret eden bağlantı
+    (tmp_path / 'outside.pdf').write_bytes(b'%PDF-1.4 gizli')
+    os.symlink(tmp_path / 'outside.pdf', project / 'data' / 'dbf' / 'link.pdf')
+
+    resolver = FilePathResolver(str(project))
+    monkeypatch.setattr(utils_file_serving, '_resolver', resolver)
+    return resolver, sha
+
+
+def test_files_support_conditional_range_and_immutable_responses(tmp_path, monkeypatch):
+    resolver, sha = _project(tmp_path, monkeypatch)
+    client = server.app.test_client()
+
+    first = client.get('/api/files/data/dbf/08_Bilisim/ag.pdf')
+    assert first.status_code == 200 and first.headers['Accept-Ranges'] == 'bytes'
+    assert 'immutable' not in first.headers['Cache-Control']
+    assert client.get('/api/files/data/dbf/08_Bilisim/ag.pdf',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    part = client.get('/api/files/data/dbf/08_Bilisim/ag.pdf', headers={'Range': 'bytes=0-7'})
+    assert part.status_code == 206 and part.data == b'%PDF-1.4'
+
+    for folder in ('converted', 'blobs'):
+        response = client.get(f'/api/files/data/{folder}/ab/{sha}.pdf')
+        assert response.data == b'%PDF-1.4 ' + folder.encode()
+        assert response.headers['ETag'] == f'"{sha}"'
+        assert 'immutable' in response.headers['Cache-Control']
+
+    # Proje dışına çıkan yollar (../ ve bağlantı) reddedilir
+    assert client.get('/api/files/data/dbf/%2e%2e/%2e%2e/etc/passwd').status_code == 403
+    assert client.get('/api/files/data/dbf/link.pdf').status_code == 403
+    assert client.get('/api/files/data/dbf/yok.pdf').status_code == 404
+
+
+def test_resolved_paths_are_cached_until_file_is_removed(tmp_path, monkeypatch):
+    resolver, _ = _project(tmp_path, monkeypatch)
+    client = server.app.test_client()
+    calls = []
+    resolve_uncached = resolver._resolve_uncached
+    monkeypatch.setattr(resolver, '_resolve_uncached', lambda path: calls.append(path) or resolve_uncached(path))
+
+    url = '/api/files/data/dbf/08_Bilisim/ag.pdf'
+    assert client.get(url).status_code == 200
+    assert client.get(url).status_code == 200
+    assert calls == ['data/dbf/08_Bilisim/ag.pdf']
+
+    # Silinen dosyanın önbellekteki yolu kullanılmaz
+    os.remove(tmp_path / 'project' / 'data' / 'dbf' / '08_Bilisim' / 'ag.pdf')
+    assert client.get(url).status_code == 404
+    assert len(calls) == 2
+
+
+def test_x_sendfile_leaves_body_to_front_server(tmp_path, monkeypatch):
+    resolver, sha = _project(tmp_path, monkeypatch)
+    monkeypatch.setitem(server.app.config, 'USE_X_SENDFILE', True)
+    client = server.app.test_client()
+
+    response = client.get(f'/api/files/data/converted/ab/{sha}.pdf')
+    assert response.status_code == 200
+    assert response.headers['X-Sendfile'] == resolver.resolve(f'data/converted/ab/{sha}.pdf')
+    assert response.data == b''
+    assert 'immutable' in response.headers['Cache-Control']
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import threading
+
+from modules import utils_jobs
+from modules.utils_jobs import JobManager
+
+
+def test_dedup_subscribers_and_resume(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_jobs, 'JOBS_DIR', str(tmp_path))
+    gate = threading.Event()
+    fail_at = {'value': 2}
+
+    def pipeline(checkpoint):
+        done = checkpoint.setdefault('done', [])
+        for item in range(4):
+            if item in done:
+                continue
+            gate.wait(5)
+            if item == fail_at['value']:
+                raise RuntimeError('bağlantı koptu')
+            done.append(item)
+            checkpoint.save()
+            yield {'type': 'progress', 'message': f'öğe {item}'}
+        yield {'type': 'done', 'message': 'bitti'}
+
+    manager = JobManager()
+    manager.register_pipeline('demo', pipeline)
+
+    first = manager.start('demo')
+    assert manager.start('demo') is first  # Çalışan iş tekrar başlatılmaz
+
+    gate.set()
+    subscriber_a = [e['message'] for e in first.iter_events(poll_interval=1) if e]
+    subscriber_b = [e['message'] for e in first.iter_events(after=0, poll_interval=1) if e]
+    assert first.status == 'failed'
+    assert subscriber_a[:2] == ['öğe 0', 'öğe 1']
+    assert subscriber_b == subscriber_a[1:]
+
+    # Yeni yönetici (sunucu yeniden başladı gibi) diskteki işi ve checkpoint'i yükler
+    fail_at['value'] = None
+    restarted = JobManager()
+    restarted.register_pipeline('demo', pipeline)
+    assert restarted.get(first.id).status == 'failed'
+    second = restarted.start('demo')
+    assert second.resumed_from == first.id
+    messages = [e['message'] for e in second.iter_events(poll_interval=1) if e]
+    assert messages[1:] == ['öğe 2', 'öğe 3', 'bitti']
+    assert second.status == 'completed'
+    assert second.checkpoint['done'] == [0, 1, 2, 3]
+
+
+def test_oku_dbf_cancel_then_resume_does_not_skip_file(tmp_path, monkeypatch):
+    from modules import oku_dbf
+    from modules.utils_cache import bump_table_versions
+
+    schema_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    with open(schema_path, encoding='utf-8') as f, sqlite3.connect('data/temel_plan.db') as conn:
+        conn.executescript(f.read())
+        conn.executemany("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES (?, ?)",
+                         [('Ağ Temelleri', 10), ('Web Tasarımı', 11)])
+    bump_table_versions('temel_plan_ders')
+    monkeypatch.setattr(utils_jobs, 'JOBS_DIR', str(tmp_path / 'jobs'))
+
+    files = [str(tmp_path / 'dbf' / 'ag.pdf'), str(tmp_path / 'dbf' / 'web.pdf')]
+    titles = dict(zip(files, ['Ağ Temelleri', 'Web Tasarımı']))
+    monkeypatch.setattr(oku_dbf, 'get_all_dbf_files', lambda **kwargs: files)
+    monkeypatch.setattr(oku_dbf, 'process_dbf_file', lambda path, source=None: {
+        'success': True, 'temel_bilgiler': {'DERSİN ADI': titles[path]}})
+
+    running = {}
+    start = threading.Event()
+
+    def pipeline(checkpoint):
+        start.wait(5)
+        for message in oku_dbf.link_dbf_files_to_database(checkpoint=checkpoint):
+            # İkinci dosyanın ilerleme mesajında (dosya işlenmeden) iptal gelir
+            if message['type'] == 'progress' and 'web.pdf' in message['message'] and 'job' in running:
+                running.pop('job').request_cancel()
+            yield message
+
+    manager = JobManager()
+    manager.register_pipeline('oku-dbf', pipeline)
+    running['job'] = first = manager.start('oku-dbf')
+    start.set()
+    list(first.iter_events(poll_interval=1))
+    assert first.status == 'cancelled'
+    assert list(first.checkpoint['files']) == [files[0]]
+
+    restarted = JobManager()
+    restarted.register_pipeline('oku-dbf', pipeline)
+    second = restarted.start('oku-dbf')
+    list(second.iter_events(poll_interval=1))
+    assert second.status == 'completed'
+    with sqlite3.connect('data/temel_plan.db') as conn:
+        linked = dict(conn.execute("SELECT ders_adi, dbf_url FROM temel_plan_ders").fetchall())
+    assert linked['Ağ Temelleri'].endswith('ag.pdf')
+    assert linked['Web Tasarımı'].endswith('web.pdf')
@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules import utils_file_management
+from modules.utils_file_management import (download_file_resumable, download_files_concurrently,
+                                            PARTIAL_SUFFIX, PARTIAL_META_SUFFIX)
+
+PAYLOAD = bytes(range(256)) * 400
+ETAG = '"v2"'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    range_headers = []
+    if_range_headers = []
+
+    def do_GET(self):
+        header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        self.range_headers.append(header)
+        self.if_range_headers.append(if_range)
+        # If-Range tutmazsa Range yok sayılır ve dosyanın tamamı döner
+        if header and if_range not in (None, ETAG):
+            header = None
+        start = int(header.split('=')[1].rstrip('-')) if header else 0
+        body = PAYLOAD[start:]
+        self.send_response(206 if header else 200)
+        if header:
+            self.send_header('Content-Range', f'bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _download_with_partial(tmp_path, partial, etag):
+    RangeHandler.range_headers = []
+    RangeHandler.if_range_headers = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        dest = str(tmp_path / 'alan.rar')
+        # Önceki çalıştırmadan kalan yarım dosya ve doğrulayıcısı
+        with open(dest + PARTIAL_SUFFIX, 'wb') as f:
+            f.write(partial)
+        with open(dest + PARTIAL_SUFFIX + PARTIAL_META_SUFFIX, 'w', encoding='utf-8') as f:
+            json.dump({"etag": etag, "last_modified": None}, f)
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/alan.rar'
+        result = download_file_resumable(url, dest, timeout=5)
+    finally:
+        server.shutdown()
+
+    assert result['success']
+    assert not os.path.exists(dest + PARTIAL_SUFFIX)
+    assert not os.path.exists(dest + PARTIAL_SUFFIX + PARTIAL_META_SUFFIX)
+    with open(dest, 'rb') as f:
+        assert f.read() == PAYLOAD
+    return result
+
+
+def test_partial_download_is_resumed_with_range(tmp_path):
+    result = _download_with_partial(tmp_path, PAYLOAD[:30000], ETAG)
+
+    assert result['resumed_from'] == 30000
+    assert RangeHandler.range_headers == ['bytes=30000-']
+    assert RangeHandler.if_range_headers == [ETAG]
+
+
+def test_partial_of_changed_file_is_downloaded_again(tmp_path):
+    # Yarım dosya sunucudaki eski sürüme ait: If-Range tutmaz, baştan indirilir
+    result = _download_with_partial(tmp_path, b'\xff' * 30000, '"v1"')
+
+    assert result['resumed_from'] == 0
+    assert result['status_code'] == 200
+    assert RangeHandler.if_range_headers == ['"v1"']
+
+
+def test_closing_concurrent_downloads_cancels_queued_jobs(monkeypatch):
+    started = []
+
+    def slow_download(url, path, **kwargs):
+        started.append(url)
+        time.sleep(0.2)
+        return {"success": True, "path": path}
+
+    monkeypatch.setattr(utils_file_management, 'download_file_resumable', slow_download)
+    jobs = [{"url": f"http://meb/{i}.rar", "path": f"{i}.rar"} for i in range(10)]
+    events = download_files_concurrently(jobs, max_workers=1, progress_interval=0.05)
+
+    assert next(e for e in events if e["event"] == "result")["result"]["success"]
+    begin = time.monotonic()
+    events.close()
+    assert time.monotonic() - begin < 0.5
+    time.sleep(0.3)
+    assert len(started) <= 3
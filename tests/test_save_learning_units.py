@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+from modules.utils_database import save_learning_units
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.sql')
+
+
+def make_db():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA foreign_keys = ON')
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO temel_plan_ders (ders_adi, sinif) VALUES ('Ağ Temelleri', 9)")
+    return conn
+
+
+def load_tree(cursor, ders_id):
+    cursor.execute("SELECT id, birim_adi, sure FROM temel_plan_ogrenme_birimi WHERE ders_id = ? ORDER BY id", (ders_id,))
+    tree = []
+    for birim in cursor.fetchall():
+        cursor.execute("SELECT id, konu_adi FROM temel_plan_konu WHERE ogrenme_birimi_id = ? ORDER BY id", (birim['id'],))
+        konular = []
+        for konu in cursor.fetchall():
+            cursor.execute("SELECT kazanim_adi FROM temel_plan_kazanim WHERE konu_id = ? ORDER BY id", (konu['id'],))
+            konular.append((konu['konu_adi'], [row[0] for row in cursor.fetchall()]))
+        tree.append((birim['birim_adi'], birim['sure'], konular))
+    return tree
+
+
+UNITS = [
+    {'birim_adi': 'Ağ Kurulumu', 'sure': 18, 'sira': 1, 'konular': [
+        {'konu_adi': 'Kablolama', 'sira': 1, 'kazanimlar': [
+            {'kazanim_adi': 'Kablo yapar', 'sira': 1},
+            {'kazanim_adi': 'Test eder', 'sira': 2},
+        ]},
+        {'konu_adi': 'Adresleme', 'sira': 2, 'kazanimlar': []},
+    ]},
+    {'birim_adi': 'Sunucular', 'sure': 36, 'sira': 2, 'konular': [
+        {'konu_adi': 'DNS', 'sira': 1, 'kazanimlar': [{'kazanim_adi': 'DNS kurar', 'sira': 1}]},
+    ]},
+]
+
+
+def test_insert_then_diff_update():
+    conn = make_db()
+    cursor = conn.cursor()
+
+    assert save_learning_units(cursor, 1, UNITS) == 2
+    assert load_tree(cursor, 1) == [
+        ('Ağ Kurulumu', 18, [('Kablolama', ['Kablo yapar', 'Test eder']), ('Adresleme', [])]),
+        ('Sunucular', 36, [('DNS', ['DNS kurar'])]),
+    ]
+    cursor.execute("SELECT id FROM temel_plan_konu WHERE konu_adi = 'DNS'")
+    dns_konu_id = cursor.fetchone()[0]
+
+    # Aynı veri tekrar kaydedilince hiçbir satır yazılmamalı
+    changes_before = conn.total_changes
+    assert save_learning_units(cursor, 1, UNITS) == 2
+    assert conn.total_changes == changes_before
+
+    # Ad eşleşmesi büyük/küçük harf duyarsız; sadece değişen birim yeniden yazılır
+    updated = [dict(UNITS[0], birim_adi='AĞ KURULUMU', konular=[
+        {'konu_adi': 'Kablolama', 'sira': 1, 'kazanimlar': [{'kazanim_adi': 'Kablo yapar', 'sira': 1}]},
+    ])]
+    assert save_learning_units(cursor, 1, updated) == 1
+    assert load_tree(cursor, 1) == [
+        ('AĞ KURULUMU', 18, [('Kablolama', ['Kablo yapar'])]),
+        ('Sunucular', 36, [('DNS', ['DNS kurar'])]),
+    ]
+    cursor.execute("SELECT id FROM temel_plan_konu WHERE konu_adi = 'DNS'")
+    assert cursor.fetchone()[0] == dns_konu_id
+    cursor.execute("SELECT COUNT(*) FROM temel_plan_kazanim")
+    assert cursor.fetchone()[0] == 2
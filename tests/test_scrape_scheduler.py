@@ -0,0 +1,118 @@
+import threading
+import time
+
+from modules.utils_scheduler import ScrapeScheduler, merge_generators
+
+
+def test_priority_host_limit_and_cancel():
+    scheduler = ScrapeScheduler(max_workers=2, host_limits={'a.example': 1})
+    gate = threading.Event()
+    order = []
+    running = {'a.example': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def work(label, host=None):
+        if host:
+            with lock:
+                running[host] += 1
+                running['max'] = max(running['max'], running[host])
+        gate.wait(5)
+        time.sleep(0.01)
+        with lock:
+            order.append(label)
+            if host:
+                running[host] -= 1
+        return label
+
+    # İki worker da meşgulken kuyruğa öncelik sırası karışık işler eklenir
+    blockers = scheduler.group('block', priority=0)
+    first = [blockers.submit(work, f'b{i}') for i in range(2)]
+    time.sleep(0.05)
+
+    with scheduler.group('low', priority=50) as low:
+        low_futures = [low.submit(work, 'low')]
+    with scheduler.group('host', priority=10, host='a.example') as grp:
+        host_futures = [grp.submit(work, f'h{i}', 'a.example') for i in range(3)]
+        gate.set()
+        assert sorted(f.result(5) for f in grp.as_completed(host_futures)) == ['h0', 'h1', 'h2']
+        assert sorted(f.result(5) for f in first) == ['b0', 'b1']
+
+    # 'low' grubu bloktan çıkarken iptal edildi; host sınırı 1'i hiç aşmadı
+    assert all(f.cancelled() for f in low_futures)
+    assert running['max'] == 1
+    assert [label for label in order if label.startswith('h')] == ['h0', 'h1', 'h2']
+    assert grp.summary()['done'] == 3
+
+
+def test_higher_priority_runs_first():
+    scheduler = ScrapeScheduler(max_workers=1)
+    gate = threading.Event()
+    order = []
+    blocker = scheduler.submit(gate.wait, 5)
+    time.sleep(0.05)
+    later = scheduler.submit(order.append, 'bom', priority=50)
+    sooner = scheduler.submit(order.append, 'cop', priority=20)
+    gate.set()
+    for future in (blocker, later, sooner):
+        future.result(5)
+    assert order == ['cop', 'bom']
+
+
+def test_merge_generators_cancels_on_close():
+    scheduler = ScrapeScheduler(max_workers=1)
+    started = threading.Event()
+    groups = []
+
+    def slow_stage():
+        group = scheduler.group('slow')
+        groups.append(group)
+        futures = [group.submit(time.sleep, 0.05) for _ in range(20)]
+        started.set()
+        for _ in group.as_completed(futures):
+            yield {'type': 'progress', 'message': 'adım'}
+
+    def fast_stage():
+        yield {'type': 'status', 'message': 'hızlı'}
+
+    stream = merge_generators({'slow': slow_stage, 'fast': fast_stage})
+    stage, message = next(stream)
+    assert stage in ('slow', 'fast')
+    started.wait(5)
+    stream.close()
+
+    assert groups[0].cancelled
+    assert sum(1 for t in groups[0].timings() if t['status'] == 'cancelled') > 0
+
+
+def test_bom_pages_are_separate_scheduler_tasks(monkeypatch):
+    from modules import get_bom
+    from modules.utils_area import AreaResolver
+
+    scheduler = ScrapeScheduler(max_workers=2, host_limits={'meslek.meb.gov.tr': 1})
+    monkeypatch.setattr(get_bom, 'get_scrape_scheduler', lambda: scheduler)
+    monkeypatch.setattr(get_bom, 'get_area_resolver', lambda: AreaResolver([(1, 'Bilişim', '08')]))
+    monkeypatch.setattr(get_bom, 'load_course_matcher', lambda: [object()])
+    monkeypatch.setattr(get_bom, 'get_alanlar_from_moduller',
+                        lambda: [{'id': '5', 'isim': 'Bilişim'}, {'id': '6', 'isim': 'Denizcilik'}])
+    monkeypatch.setattr(get_bom, 'load_bom_progress', lambda: {})
+    monkeypatch.setattr(get_bom, 'save_bom_progress', lambda *args: None)
+    monkeypatch.setattr(get_bom, 'clear_bom_progress', lambda: None)
+    monkeypatch.setattr(get_bom, 'fetch_bom_ders_list',
+                        lambda alan_id: ([('1', 'Ağ'), ('2', 'Web'), ('3', 'Boş')], {}, {}))
+    monkeypatch.setattr(get_bom, 'fetch_bom_ders_modulleri',
+                        lambda alan_id, ders_value, form, cookies: [] if ders_value == '3' else [{'link': f'{alan_id}/{ders_value}'}])
+    processed = {}
+
+    def fake_process(alan, area_resolver, course_matcher, saved_progress=None, bom_data=None):
+        processed[alan['isim']] = bom_data
+        yield {'type': 'progress', 'message': '2 eşleşme, 1 güncelleme'}
+
+    monkeypatch.setattr(get_bom, 'process_single_area_bom', fake_process)
+
+    messages = list(get_bom.get_bom_with_db_integration())
+
+    # Alan başına bir ders listesi + ders başına bir modül sayfası işi
+    assert scheduler.get_stats()['counts']['submitted'] == 2 * (1 + 3)
+    assert [d['ders_adi'] for d in processed['Denizcilik']['dersler']] == ['Ağ', 'Web']
+    assert processed['Bilişim']['dersler'][1]['moduller'] == [{'link': '5/2'}]
+    assert '2 alan, 4 eşleşme, 2 veritabanı' in messages[-2]['message']
@@ -0,0 +1,42 @@
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from modules.utils_cache import VersionedReadCache, cached_endpoint, bump_table_versions
+
+
+def test_lru_eviction_and_stale_versions():
+    cache = VersionedReadCache(max_entries=2)
+    tables = ('temel_plan_ders',)
+
+    cache.put('a', 1, cache.versions_for(tables))
+    cache.put('b', 2, cache.versions_for(tables))
+    assert cache.get('a', tables) == 1  # 'a' artık en son kullanılan
+    cache.put('c', 3, cache.versions_for(tables))
+    assert cache.get('b', tables) is None  # LRU ile atıldı
+
+    cache.bump('temel_plan_ders')
+    assert cache.get('a', tables) is None  # sürüm değişti, bayat
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['stale'] == 1
+    assert stats['hits'] == 1
+
+
+def test_cached_endpoint_invalidated_by_bump():
+    app = flask.Flask(__name__)
+    calls = []
+
+    @app.route('/items')
+    @cached_endpoint('test_tablo')
+    def items():
+        calls.append(1)
+        return flask.jsonify({'n': len(calls)})
+
+    client = app.test_client()
+    assert client.get('/items').get_json() == {'n': 1}
+    assert client.get('/items').get_json() == {'n': 1}
+    assert client.get('/items?x=1').get_json() == {'n': 2}
+
+    bump_table_versions('test_tablo')
+    assert client.get('/items').get_json() == {'n': 3}
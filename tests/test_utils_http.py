@@ -0,0 +1,119 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from modules import utils_http
+from modules.utils_http import http_get, http_post
+
+BODY = 'Çerçeve öğretim programları listesi'.encode('utf-8')
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_conditional_get_serves_304_from_disk_cache(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ConditionalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/cercevelistele.aspx'
+    try:
+        first = http_get(url, params={'sinif_kodu': '9'}, cache_dir=str(tmp_path), timeout=5)
+        second = http_get(url, params={'sinif_kodu': '9'}, cache_dir=str(tmp_path), timeout=5)
+    finally:
+        server.shutdown()
+
+    assert ConditionalHandler.statuses == [200, 304]
+    assert not first.from_cache and second.from_cache
+    assert second.status_code == 200
+    assert second.content == BODY
+    assert second.text == first.text
+
+
+class FormHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_POST(self):
+        FormHandler.hits += 1
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_ttl_cache_keys_post_body_and_replays_offline(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FormHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/moduller'
+    try:
+        a1 = http_post(url, data={'alan': '01'}, cache_ttl=60, cache_dir=str(tmp_path), timeout=5)
+        a2 = http_post(url, data={'alan': '01'}, cache_ttl=60, cache_dir=str(tmp_path), timeout=5)
+        b = http_post(url, data={'alan': '02'}, cache_ttl=60, cache_dir=str(tmp_path), timeout=5)
+    finally:
+        server.shutdown()
+
+    assert FormHandler.hits == 2
+    assert a2.from_cache and a2.text == a1.text == 'alan=01'
+    assert b.text == 'alan=02'
+
+    utils_http.set_replay_mode(True)
+    try:
+        # Sunucu kapalı: replay modunda cevap sadece diskten gelir
+        assert http_post(url, data={'alan': '02'}, cache_dir=str(tmp_path)).text == 'alan=02'
+        with pytest.raises(requests.exceptions.ConnectionError):
+            http_post(url, data={'alan': '03'}, cache_dir=str(tmp_path))
+    finally:
+        utils_http.set_replay_mode(None)
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_streamed_response_holds_host_slot_until_closed():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowBodyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/alan.rar'
+    utils_http.configure_host_concurrency('127.0.0.1', 1)
+    second = threading.Event()
+    try:
+        with utils_http.request('GET', url, retries=1, stream=True, timeout=5) as response:
+            thread = threading.Thread(target=lambda: http_get(url, conditional=False, timeout=5) and second.set())
+            thread.start()
+            # Gövde okunurken ikinci istek host slotunu bekler
+            assert not second.wait(0.3)
+            assert response.raw.read() == BODY
+        assert second.wait(5)
+        thread.join()
+    finally:
+        server.shutdown()
+        utils_http.configure_host_concurrency('127.0.0.1', utils_http.DEFAULT_HOST_CONCURRENCY)